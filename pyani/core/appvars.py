@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import tempfile
 import pyani.core.anivars
@@ -25,7 +26,9 @@ class AppVars:
         # notes formats supported
         self.notes_format_supported = ["txt", "json"]
         # users path i.e. C:\Users\{username}\
-        self.homepath = os.path.join("C:", os.environ["HOMEPATH"])
+        # HOMEPATH is windows only, fall back to the user dir so app vars still load elsewhere, ex: running against
+        # the cgt bridge emulator on linux
+        self.homepath = os.path.join("C:", os.environ.get("HOMEPATH", os.path.expanduser("~")))
         # user desktop
         self.user_desktop = os.path.join(self.homepath, "Desktop")
         # the code to add to init.py
@@ -48,8 +51,30 @@ class AppVars:
 
         # cgt show and shot asset cache
         self.cgt_asset_info_cache_path = "{0}\\cgt_asset_info_cache.json".format(self.persistent_data_path)
+        # newest server modified date seen per asset type and component when the asset cache was built, incremental
+        # syncs only list what changed after it. See pyani.core.mngr.assets.AniAssetMngr.sync_local_cache_with_server
+        self.cgt_asset_info_watermark_path = "{0}\\cgt_asset_info_cache_watermarks.json".format(
+            self.persistent_data_path
+        )
         # cgt tool asset cache
         self.cgt_tools_cache_path = "{0}\\cgt_tools_cache.json".format(self.persistent_data_path)
+        # guis show the asset and tool caches on disk right away and, when a cache is older than this many seconds,
+        # refresh it from the server in the background. See pyani.core.mngr.core.AniCoreMngr.revalidate_local_cache
+        self.cgt_cache_max_age = 300.0
+        # record of downloaded files with their server modified date and size, used to skip unchanged files. See
+        # pyani.core.mngr.download_manifest
+        self.cgt_download_manifest_path = "{0}\\cgt_download_manifest.json".format(self.persistent_data_path)
+        # don't download files that haven't changed on the server since they were last downloaded
+        self.cgt_skip_unchanged_downloads = True
+        # index of downloaded files by content, see pyani.core.mngr.content_store
+        self.cgt_content_store_path = "{0}\\cgt_content_store.json".format(self.persistent_data_path)
+        # small files like metadata, downloaded in the background after a sync so guis can show them without a
+        # server call. Kept in the same folders as on the server, see
+        # pyani.core.mngr.core.AniCoreMngr.prefetch_server_files
+        self.cgt_prefetch_dir = "{0}\\cgt_prefetch".format(self.persistent_data_path)
+        # release notes from the CGT api, cached with the asset version and notes file they were fetched for. See
+        # pyani.core.mngr.assets.AniAssetMngr.get_release_notes
+        self.cgt_release_notes_cache_path = "{0}\\cgt_release_notes_cache.json".format(self.persistent_data_path)
 
         # CONFIGURATION / PREFERENCES
 
@@ -69,7 +94,39 @@ class AppVars:
         self.cgt_bridge_api_dir = "app_bridge"
         # to test:
         #self.cgt_bridge_api_path = os.path.normpath("C:\\Users\\Patrick\\PycharmProjects\\PyAniTools\\PyAniToolsAppBridge\\venv")
-        self.cgt_bridge_api_path = os.path.normpath("C:\\PyAniTools\\lib\\{0}".format(self.cgt_bridge_api_dir))
+        # local stand in for the app bridge that emulates CGT with a directory tree, for running without CGT. See
+        # pyani/core/mngr/cgt_bridge_emulator/cgt_emulator.py. To use, set the PYANI_CGT_BRIDGE_API_PATH environment
+        # variable to this folder
+        self.cgt_bridge_emulator_path = os.path.normpath(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "mngr", "cgt_bridge_emulator")
+        )
+        self.cgt_bridge_api_path = os.path.normpath(
+            os.environ.get(
+                "PYANI_CGT_BRIDGE_API_PATH", "C:\\PyAniTools\\lib\\{0}".format(self.cgt_bridge_api_dir)
+            )
+        )
+        # the python that ships with CGT, runs the app bridge scripts. The emulator doesn't need CGT's python so
+        # uses the current interpreter
+        if self.is_cgt_bridge_emulated():
+            self.cgt_python_exe = sys.executable
+        else:
+            self.cgt_python_exe = os.path.normpath("C:\\cgteamwork\\python\\python.exe")
+        # long lived process that runs app bridge scripts, looked for in the app bridge folder first then in
+        # pyani.core.mngr. See pyani.core.mngr.bridge
+        self.cgt_bridge_worker_script = "cgt_bridge_worker.py"
+        # use the long lived bridge process, set to False to start a new process for every server call
+        self.cgt_use_persistent_bridge = True
+        # most long lived bridge processes to run at once, separate from the number of threads making server calls
+        self.cgt_bridge_pool_size = 4
+        # a bridge process is restarted after this many requests, 0 to never restart
+        self.cgt_bridge_worker_max_requests = 500
+        # a bridge process that sat idle this many seconds is checked it still answers before it's used
+        self.cgt_bridge_health_check_seconds = 60.0
+        # seconds a bridge process has to start or answer a request before it's killed and the request fails, so a
+        # script that hangs, ex: on a stalled CGT login, doesn't block every later server call. Downloads get longer,
+        # the process answers once the whole download is done. None waits forever. See pyani.core.mngr.bridge
+        self.cgt_bridge_timeout = 300.0
+        self.cgt_bridge_download_timeout = 3600.0
         # force a connection to CGT to be open, i.e. CGT app open. That way user's own account is used.
         self.cgt_user = "publish"
         self.cgt_pass = "publish"
@@ -77,6 +134,113 @@ class AppVars:
         # when getting file information from server, store it in a temp file here
         self.cgt_temp_file_cache_dir = os.path.normpath(os.path.join(self.local_temp_dir, "pyanitools"))
         self.cgt_tmp_file_cache_filename = "cgt_file_dict.json"
+        # the options the app bridge scripts support beyond the original ones, read from a json file the bridge ships
+        # in its folder, see get_cgt_bridge_capabilities. The features below are on when the bridge supports them
+        self.cgt_bridge_capabilities_filename = "cgt_bridge_capabilities.json"
+        self.cgt_bridge_capabilities = self.get_cgt_bridge_capabilities()
+        # ask the bridge to write folder listings with one json record per line instead of one json list, so they can
+        # be read a record at a time. Needs a bridge that supports --line_delimited for folder listings
+        self.cgt_line_delimited_listings = "line delimited listings" in self.cgt_bridge_capabilities
+        # when building the asset cache, list a root path shared by several components of an asset type once instead of
+        # once per component. Asset types with one component still list it with its folder filter. Needs a bridge that
+        # lists everything for an empty folder filter
+        self.cgt_share_asset_type_listing = "empty folder filter" in self.cgt_bridge_capabilities
+        # sync the asset cache incrementally by listing only files modified since the last sync. Needs a bridge that
+        # supports --modified_since for folder listings. Without it every sync is a full rebuild
+        self.cgt_modified_since_listings = "modified since listings" in self.cgt_bridge_capabilities
+        # during an incremental sync, assets that changed are listed one at a time up to this many per component,
+        # past that the whole component is listed once
+        self.cgt_incremental_sync_max_assets = 20
+        # the bridge can report file sizes with --file_size=True
+        self.cgt_file_size_info = "file size" in self.cgt_bridge_capabilities
+        # when a file's content was already downloaded to another path, link or copy it from there instead of
+        # downloading it again. Needs file sizes from the bridge
+        self.cgt_dedupe_downloads = self.cgt_file_size_info
+        # hard link deduplicated files so they don't take up more disk space, they are copied when hard links aren't
+        # possible, ex: a different drive. Off by default, hard linked files share their data so a file written in place
+        # changes every linked copy
+        self.cgt_dedupe_use_hardlinks = False
+        # when hard links are on, these files are always copied since they are written in place, ex: the metadata file
+        # is rewritten when a download updates its version, and notes are edited by users. Checked against the file
+        # name and extension
+        self.cgt_dedupe_hardlink_excludes = [self.cgt_metadata_filename] + [
+            "*.{0}".format(notes_format) for notes_format in self.notes_format_supported
+        ]
+        # copy downloads from the studio's local copy of the server, the Z drive, when it has a current copy instead of
+        # downloading them from CGT. A copy is current when it has the server's size and modified time. Needs file sizes
+        # from the bridge
+        self.cgt_mirror_downloads = self.cgt_file_size_info
+        # root of the local copy of the server, server paths are under it, see
+        # pyani.core.mngr.core.AniCoreMngr.convert_server_path_to_local_server_representation
+        self.cgt_mirror_root = "{0}:".format(self.local_server_drive_letter)
+        # server roots and the local roots they are copied to, the longest root a path is under is used. See
+        # pyani.core.mngr.path_map. Resolved paths are remembered, up to the cache size
+        self.cgt_path_map = [
+            ("/", self.cgt_mirror_root)
+        ]
+        self.cgt_path_map_cache_size = 50000
+        # seconds a copy's modified time can differ from the server's and still be current, file systems round times
+        self.cgt_mirror_mtime_tolerance = 2.0
+        # journal of downloads in progress, kept in the temp dir above so interrupted downloads can be resumed. See
+        # pyani.core.mngr.download_journal
+        self.cgt_download_journal_filename = "cgt_download_journal.txt"
+        # files download to this folder inside their download directory and are renamed into place when complete
+        self.cgt_download_temp_dir_name = ".pyani_download"
+        # seconds a server directory listing is reused before asking the server again, see
+        # pyani.core.mngr.listing_cache. 0 turns off caching
+        self.cgt_listing_cache_ttl = 30.0
+        # folder filter listings are written to a file per listing here, and copied from it to the caller's temp file.
+        # See pyani.core.mngr.core.AniCoreMngr.server_get_file_listing_using_folder_filter
+        self.cgt_listing_cache_dir = os.path.join(self.cgt_temp_file_cache_dir, "listings")
+        # server listings are also kept on disk for this many seconds so other processes, ex: the nightly update and
+        # the asset manager, reuse them. See pyani.core.mngr.listing_cache.SharedListingStore. 0 turns off sharing
+        self.cgt_shared_listing_ttl = 120.0
+        self.cgt_shared_listing_dir = os.path.join(self.cgt_temp_file_cache_dir, "shared_listings")
+        # syncs of a cache hold a lock file next to the cache so two processes don't sync it at once. A lock whose
+        # process stopped touching it for this many seconds is broken, see pyani.core.mngr.machine_lock
+        self.cgt_sync_lock_stale_seconds = 120.0
+        # seconds a sync waits for another process's sync of the same cache before giving up with an error
+        self.cgt_sync_lock_wait_seconds = 1800.0
+        # download scheduling, see pyani.core.mngr.core.AniDownloadScheduler. Most downloads to run at once, None uses
+        # the thread pool's max thread count
+        self.cgt_download_max_concurrent = None
+        # most downloads to run at once per server, {server: most downloads}. Servers not listed are only limited by
+        # cgt_download_max_concurrent, so by default CGT downloads use every thread in the pool, the same as before
+        # downloads were scheduled. To cap a server, ex: {self.cgt_ip: 3}. The concurrency level below never goes
+        # above the CGT server's cap, see pyani.core.mngr.concurrency
+        self.cgt_download_endpoint_limits = dict()
+        # order of downloads within a priority class, "smallest first" or "deadline"
+        self.cgt_download_order = "smallest first"
+        # downloads are grouped by the local directory they go to into batches that each use one bridge call, see
+        # pyani.core.mngr.core.AniCoreMngr.get_download_batches. Most files and bytes in a batch, 1 file turns off
+        # batching and 0 bytes means no byte limit
+        self.cgt_download_batch_max_files = 25
+        self.cgt_download_batch_max_bytes = 256 * 1024 * 1024
+        # download bandwidth budgets by time of day, so a scheduled update that runs into the work day doesn't use up
+        # the studio's connection. Each period has a start and end time, and megabytes per second for background
+        # downloads, ex: the nightly update, and for interactive downloads a user is waiting on. 0 is no limit, and
+        # outside the periods downloads aren't limited. Users can change it in the preferences, see
+        # pyani.core.mngr.bandwidth
+        self.cgt_bandwidth_schedule = [
+            {"start": "9:00 AM", "end": "7:00 PM", "background": 2.0, "interactive": 0}
+        ]
+        # seconds of a budget that can be downloaded at once before the limit applies
+        self.cgt_bandwidth_burst_seconds = 2.0
+        # after a sync, get the release notes of assets whose notes changed at the lowest download priority so opening
+        # them in the asset manager doesn't wait on the server. See pyani.core.mngr.assets.AniAssetMngr
+        self.cgt_prefetch_after_sync = True
+        # release notes fetched in one bridge call when prefetching
+        self.cgt_prefetch_notes_batch_size = 20
+        # seconds cached release notes are used before they are fetched again, notes can be edited in CGT without
+        # publishing a new version
+        self.cgt_release_notes_cache_ttl = 86400.0
+        # server calls to run at once when a manager doesn't set a thread count. The count starts at the level saved
+        # by the last run, or cgt_concurrency_start, and is adjusted between the min and max as calls finish, see
+        # pyani.core.mngr.concurrency
+        self.cgt_concurrency_state_path = "{0}\\cgt_concurrency.json".format(self.persistent_data_path)
+        self.cgt_concurrency_start = 3
+        self.cgt_concurrency_min = 1
+        self.cgt_concurrency_max = 16
 
         # TOOLS
 
@@ -94,6 +258,11 @@ class AppVars:
                 "update": {
                     "update old assets": False
                 }
+            },
+            "downloads": {
+                "bandwidth": {
+                    "schedule": self.cgt_bandwidth_schedule
+                }
             }
         }
         self.audio_metadata_json_name = self.cgt_metadata_filename
@@ -271,6 +440,29 @@ class AppVars:
         # list of folders we get file information for when getting assets
         self.asset_folder_list = ["approved/history", "approved", "work"]
 
+    def is_cgt_bridge_emulated(self):
+        """
+        :return: True if the app bridge path points at the cgt bridge emulator, False if it is the real app bridge
+        """
+        return os.path.exists(os.path.join(self.cgt_bridge_api_path, "cgt_emulator.py"))
+
+    def get_cgt_bridge_capabilities(self):
+        """
+        Reads the options the app bridge supports from the capabilities file in the bridge's folder, in the format:
+            {"capabilities": ["file size", "line delimited listings", "modified since listings", "empty folder filter"]}
+        Bridges without the file only support the original options
+        :return: a list of the capabilities, empty if the file doesn't exist or can't be read
+        """
+        capabilities_path = os.path.join(self.cgt_bridge_api_path, self.cgt_bridge_capabilities_filename)
+        try:
+            with open(capabilities_path, "r") as capabilities_file:
+                capabilities = json.load(capabilities_file).get("capabilities", list())
+        except (IOError, OSError, ValueError, AttributeError):
+            return list()
+        if not isinstance(capabilities, list):
+            return list()
+        return [str(capability) for capability in capabilities]
+
     # produce better output
     def __str__(self):
         return json.dumps(vars(self), indent=4)
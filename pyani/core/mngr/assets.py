@@ -1,7 +1,9 @@
 import os
+import time
 import logging
 import functools
 import copy
+import threading
 from datetime import datetime
 # need to import _strptime for multi-threading, a known python 2.7 bug
 import _strptime
@@ -11,7 +13,7 @@ import pyani.core.appvars
 import pyani.core.anivars
 import pyani.core.ui
 import pyani.core.util
-from pyani.core.mngr.core import AniCoreMngr
+from pyani.core.mngr.core import AniCoreMngr, AniDownloadScheduler
 
 
 logger = logging.getLogger()
@@ -119,6 +121,22 @@ class AniAssetMngr(AniCoreMngr):
         self._existing_assets_before_sync = dict()
         # assets timestamp before downloads
         self._assets_timestamp_before_dl = dict()
+        # newest server modified date in the cache as a string yyyy-mm-dd hh:mm:ss, incremental syncs list what changed
+        # after it. { asset type: { asset component: date } }
+        self._cache_watermarks = dict()
+        # the asset each server directory in the cache belongs to, for looking up assets by server path.
+        # { cgt cloud dir: (asset type, asset component, asset name) }, see get_version_from_cache_by_server_path
+        self._server_dir_index = dict()
+        self._server_dir_index_lock = threading.Lock()
+        # bumped whenever the cache is loaded or synced, the index is only rebuilt when it was built for an older
+        # generation. Directories not in the index are remembered until the next rebuild, see
+        # _get_asset_info_by_server_dir
+        self._asset_info_generation = 0
+        self._server_dir_index_generation = -1
+        self._server_dir_index_misses = set()
+        # release notes from CGT, loaded from disk when first used, see get_release_notes
+        self._release_notes_cache = None
+        self._release_notes_cache_lock = threading.Lock()
 
     @property
     def active_asset_component(self):
@@ -161,6 +179,86 @@ class AniAssetMngr(AniCoreMngr):
         """
         return self._asset_info[asset_type][asset_component][asset_name]["version"]
 
+    def get_version_from_cache_by_server_path(self, server_file_path):
+        """
+        Gets the version of a server file from the asset cache, so a downloaded file's version can be saved without
+        listing the server. See pyani.core.mngr.core.AniCoreMngr.update_local_version
+        :param server_file_path: path to the file on the server
+        :return: the version as a string, or None if no asset in the cache has the file's directory
+        """
+        server_dir = '/'.join(server_file_path.split("/")[:-1])
+        asset_info = self._get_asset_info_by_server_dir(server_dir)
+        if asset_info is None:
+            return None
+        # assets without approved or work folders, like gpu caches, get their version from their files
+        if not asset_info["version"]:
+            return self.core_get_latest_version(file_list=asset_info["files"])[1]
+        return asset_info["version"]
+
+    def get_known_server_modified_dates(self, server_file_paths):
+        """
+        Gets the server modified dates of files from the asset cache, see
+        pyani.core.mngr.core.AniCoreMngr.get_known_server_modified_dates
+        :param server_file_paths: a list of server file paths
+        :return: a dict {server path: yyyy-mm-dd hh:mm:ss} of the files the cache has a date for
+        """
+        modified_dates = dict()
+        for server_file_path in server_file_paths:
+            server_dir = '/'.join(server_file_path.split("/")[:-1])
+            # release notes are in the approved folder's history, the asset is found by its approved folder
+            if server_dir.endswith("/approved/history"):
+                server_dir = server_dir[:-len("/history")]
+            asset_info = self._get_asset_info_by_server_dir(server_dir)
+            # caches saved before dates were kept don't have them
+            if asset_info and server_file_path in asset_info.get("file modified times", dict()):
+                modified_dates[server_file_path] = asset_info["file modified times"][server_file_path]
+        return modified_dates
+
+    def _get_asset_info_by_server_dir(self, server_dir):
+        """
+        Finds the asset in the cache whose files are in a server directory. The index of server directories is
+        rebuilt only when the cache changed since it was built, and directories that aren't in the index are
+        remembered until then so repeated misses don't walk the cache
+        :param server_dir: the server directory, ex: /LongGong/assets/char/charA/rig/approved
+        :return: the asset's cache dict, or None if not found
+        """
+        with self._server_dir_index_lock:
+            if self._server_dir_index_generation != self._asset_info_generation:
+                generation = self._asset_info_generation
+                try:
+                    self._server_dir_index = dict(
+                        (asset_info["cgt cloud dir"], (asset_type, asset_component, asset_name))
+                        for asset_type in self._asset_info
+                        for asset_component in self._asset_info[asset_type]
+                        for asset_name, asset_info in self._asset_info[asset_type][asset_component].items()
+                        if "cgt cloud dir" in asset_info
+                    )
+                # the cache is being synced in another thread, the server will be listed instead and the index is
+                # rebuilt on the next lookup
+                except RuntimeError:
+                    return None
+                self._server_dir_index_generation = generation
+                self._server_dir_index_misses = set()
+
+            if server_dir in self._server_dir_index_misses:
+                return None
+            asset_keys = self._server_dir_index.get(server_dir)
+            if asset_keys:
+                asset_info = pyani.core.util.find_val_in_nested_dict(self._asset_info, list(asset_keys), keys=False)
+                if isinstance(asset_info, dict) and asset_info.get("cgt cloud dir") == server_dir:
+                    return asset_info
+            self._server_dir_index_misses.add(server_dir)
+        return None
+
+    def _asset_info_changed(self):
+        """
+        Marks the cache as changed so the index of server directories is rebuilt on the next lookup, see
+        _get_asset_info_by_server_dir. Call after loading the cache or adding or removing assets
+        :return: None
+        """
+        with self._server_dir_index_lock:
+            self._asset_info_generation += 1
+
     def get_asset_files(self, asset_type, asset_component, asset_name):
         """
         Access method to get the asset file names. Allows dict to change format
@@ -190,10 +288,44 @@ class AniAssetMngr(AniCoreMngr):
         json_data = self.load_server_local_cache(self.app_vars.cgt_asset_info_cache_path)
         if isinstance(json_data, dict):
             self._asset_info = json_data
+            self._asset_info_changed()
+            # caches built before watermarks were saved don't have them, they sync with a full rebuild
+            watermarks = None
+            if os.path.exists(self.app_vars.cgt_asset_info_watermark_path):
+                watermarks = self.load_server_local_cache(self.app_vars.cgt_asset_info_watermark_path)
+            self._cache_watermarks = watermarks if isinstance(watermarks, dict) else dict()
             return None
         else:
             return json_data
 
+    def get_local_cache_path(self):
+        """
+        :return: the path of the asset cache, see pyani.core.mngr.core.AniCoreMngr.revalidate_local_cache
+        """
+        return self.app_vars.cgt_asset_info_cache_path
+
+    def get_local_cache_data(self):
+        """
+        :return: the asset cache, see pyani.core.mngr.core.AniCoreMngr.get_local_cache_changes
+        """
+        return self._asset_info if self._asset_info else dict()
+
+    def load_local_cache(self):
+        """
+        Loads the asset cache off disk, see load_server_asset_info_cache
+        :return: None or error as string
+        """
+        return self.load_server_asset_info_cache()
+
+    def start_local_cache_sync(self, server_ops):
+        """
+        Syncs the asset cache with the server without a gui, see
+        pyani.core.mngr.server_ops.ServerOperations.sync_asset_cache
+        :param server_ops: a pyani.core.mngr.server_ops.ServerOperations
+        :return: a pyani.core.mngr.server_ops.ServerFuture for a list of errors
+        """
+        return server_ops.sync_asset_cache(self)
+
     def get_asset_component_names(self):
         """
         Gets a list of all possible asset components using user friendly name - see pyani.core.appvars.AppVars
@@ -259,11 +391,44 @@ class AniAssetMngr(AniCoreMngr):
 
     def get_release_notes(self, asset_component, asset_name):
         """
-        Gets the release notes for the asset from CGT
+        Gets the release notes for the asset from CGT. The notes are cached with the asset's version and the server
+        modified date of its notes file, see prefetch_server_data. Cached notes are returned until either changes or
+        the cache entry is older than AppVars cgt_release_notes_cache_ttl
         :param asset_component: the asset component - see pyani.core.appvars.py for asset components
         :param asset_name: the asset name as a string
         :return: a tuple of the notes (string) and error if any (string).
         """
+        notes_stamp = self._get_release_notes_stamp(asset_component, asset_name)
+        notes = self._get_cached_release_notes(asset_component, asset_name, notes_stamp)
+        if notes is not None:
+            return notes, None
+
+        notes, error = self._server_get_release_notes(asset_component, asset_name)
+        if not error:
+            self._cache_release_notes([(asset_component, asset_name, notes_stamp, notes)])
+        return notes, error
+
+    def _server_get_release_notes(self, asset_component, asset_name, report_errors=True):
+        """
+        Gets the release notes for the asset from the CGT notes API
+        :param asset_component: the asset component - see pyani.core.appvars.py for asset components
+        :param asset_name: the asset name as a string
+        :param report_errors: whether to send errors to listening objects via send_thread_error
+        :return: a tuple of the notes (string, empty if the asset has no notes) and error if any (string).
+        """
+        try:
+            result = self.call_bridge_api(self._get_release_notes_command(asset_component, asset_name))
+        # CGT errors
+        except pyani.core.util.CGTError as error:
+            result = error
+        return self._read_release_notes_result(result, report_errors=report_errors)
+
+    def _get_release_notes_command(self, asset_component, asset_name):
+        """
+        :param asset_component: the asset component - see pyani.core.appvars.py for asset components
+        :param asset_name: the asset name as a string
+        :return: the bridge command that gets the asset's release notes from CGT
+        """
         # the python script to call that connects to cgt
         py_script = os.path.join(self.app_vars.cgt_bridge_api_path, "cgt_get_notes.py")
 
@@ -271,7 +436,7 @@ class AniAssetMngr(AniCoreMngr):
         asset_component = asset_component[0].upper() + asset_component[1:]
 
         # the command that subprocess will execute
-        command = [
+        return [
             py_script,
             asset_component,
             asset_name,
@@ -280,24 +445,153 @@ class AniAssetMngr(AniCoreMngr):
             self.app_vars.cgt_pass,
         ]
 
-        try:
-            output, error = pyani.core.util.call_ext_py_api(command)
+    def _read_release_notes_result(self, result, report_errors=True):
+        """
+        :param result: what the notes command returned, an (output, error) tuple or the CGTError it raised, see
+        pyani.core.mngr.core.AniCoreMngr.call_bridge_api_batch
+        :param report_errors: whether to send errors to listening objects via send_thread_error
+        :return: a tuple of the notes (string, empty if the asset has no notes) and error if any (string).
+        """
+        # CGT errors
+        if isinstance(result, pyani.core.util.CGTError):
+            error_fmt = "Error occurred connecting to CGT. Error is {0}".format(result)
+            if report_errors:
+                self.send_thread_error(error_fmt)
+            return None, error_fmt
 
-            # check for subprocess errors
-            if error:
-                error_fmt = "Error occurred launching subprocess. Error is {0}".format(error)
+        output, error = result
+        # check for subprocess errors
+        if error:
+            error_fmt = "Error occurred launching subprocess. Error is {0}".format(error)
+            if report_errors:
                 self.send_thread_error(error_fmt)
-                return None, error_fmt
+            return None, error_fmt
 
-            # check for output and return
-            if output:
-                return output, None
+        return output if output else "", None
 
-        # CGT errors
-        except pyani.core.util.CGTError as error:
-            error_fmt = "Error occurred connecting to CGT. Error is {0}".format(error)
-            self.send_thread_error(error_fmt)
-            return None, error_fmt
+    def _get_release_notes_stamp(self, asset_component, asset_name):
+        """
+        Identifies the release notes an asset has now, cached notes with another stamp are out of date
+        :param asset_component: the asset component - see pyani.core.appvars.py for asset components
+        :param asset_name: the asset name as a string
+        :return: a list of the asset's version, its notes file's server path and the file's server modified date.
+        Values the cache doesn't have are None
+        """
+        if not self._asset_info:
+            self.load_server_asset_info_cache()
+        for asset_type in self.get_asset_type_by_asset_component_name(asset_component):
+            asset_info = self._asset_info[asset_type][asset_component].get(asset_name)
+            if asset_info:
+                return self._get_release_notes_stamp_from_asset_info(asset_info)
+        return [None, None, None]
+
+    @staticmethod
+    def _get_release_notes_stamp_from_asset_info(asset_info):
+        """
+        :param asset_info: the asset's cache dict
+        :return: the asset's notes stamp, see _get_release_notes_stamp
+        """
+        notes_path = asset_info.get("notes path")
+        return [asset_info.get("version"), notes_path, asset_info.get("file modified times", dict()).get(notes_path)]
+
+    def _load_release_notes_cache(self):
+        """
+        Loads the cached release notes from disk if not loaded yet, call with _release_notes_cache_lock held. The
+        cache is a dict:
+            { asset component: { asset name: { "stamp": see _get_release_notes_stamp, "cached": seconds since the
+            epoch, "notes": the notes } } }
+        :return: the cache
+        """
+        if self._release_notes_cache is None:
+            self._release_notes_cache = dict()
+            if os.path.exists(self.app_vars.cgt_release_notes_cache_path):
+                notes_cache = pyani.core.util.load_json(self.app_vars.cgt_release_notes_cache_path)
+                if isinstance(notes_cache, dict):
+                    self._release_notes_cache = notes_cache
+                else:
+                    logger.warning("Could not load release notes cache. Error is {0}".format(notes_cache))
+        return self._release_notes_cache
+
+    def _get_cached_release_notes(self, asset_component, asset_name, notes_stamp):
+        """
+        :param asset_component: the asset component - see pyani.core.appvars.py for asset components
+        :param asset_name: the asset name as a string
+        :param notes_stamp: the asset's notes stamp, see _get_release_notes_stamp
+        :return: the cached notes, or None if they aren't cached or are out of date
+        """
+        with self._release_notes_cache_lock:
+            entry = self._load_release_notes_cache().get(asset_component, dict()).get(asset_name)
+        if not entry or not entry.get("stamp") == notes_stamp or \
+                time.time() - entry.get("cached", 0.0) > self.app_vars.cgt_release_notes_cache_ttl:
+            return None
+        return entry.get("notes")
+
+    def _cache_release_notes(self, release_notes):
+        """
+        Caches release notes from CGT and saves the cache, a cache that can't be saved is only logged
+        :param release_notes: a list of tuples (asset component, asset name, notes stamp, notes)
+        """
+        with self._release_notes_cache_lock:
+            notes_cache = self._load_release_notes_cache()
+            for asset_component, asset_name, notes_stamp, notes in release_notes:
+                if asset_component not in notes_cache:
+                    notes_cache[asset_component] = dict()
+                notes_cache[asset_component][asset_name] = {
+                    "stamp": notes_stamp,
+                    "cached": time.time(),
+                    "notes": notes
+                }
+            error = pyani.core.util.write_json(self.app_vars.cgt_release_notes_cache_path, notes_cache)
+        if error:
+            logger.warning("Could not save release notes cache. Error is {0}".format(error))
+
+    def prefetch_server_data(self):
+        """
+        Gets the release notes of assets whose notes changed since they were cached from CGT, so opening them doesn't
+        wait on the server. Notes are fetched in batches of one bridge call at the lowest download priority, see
+        pyani.core.mngr.core.AniCoreMngr.prefetch_server_data. Only assets with a notes file are fetched
+        """
+        stale_notes = list()
+        for asset_type in self._asset_info:
+            for asset_component in self._asset_info[asset_type]:
+                for asset_name, asset_info in self._asset_info[asset_type][asset_component].items():
+                    if not asset_info.get("notes path"):
+                        continue
+                    notes_stamp = self._get_release_notes_stamp_from_asset_info(asset_info)
+                    if self._get_cached_release_notes(asset_component, asset_name, notes_stamp) is None:
+                        stale_notes.append((asset_component, asset_name, notes_stamp))
+        if not stale_notes:
+            return
+
+        logger.info("Prefetching release notes of {0} assets.".format(len(stale_notes)))
+        batch_size = self.app_vars.cgt_prefetch_notes_batch_size
+        for batch_start in range(0, len(stale_notes), batch_size):
+            worker = pyani.core.ui.Worker(
+                self._prefetch_release_notes_batch, False, stale_notes[batch_start:batch_start + batch_size]
+            )
+            self.download_scheduler.submit(
+                worker, priority=AniDownloadScheduler.PRIORITY_PREFETCH, endpoint=self.app_vars.cgt_ip
+            )
+
+    def _prefetch_release_notes_batch(self, stale_notes):
+        """
+        Gets a batch of release notes from CGT in one bridge call and caches them, see prefetch_server_data. Errors
+        are only logged since nothing is waiting on the notes
+        :param stale_notes: a list of tuples (asset component, asset name, notes stamp)
+        """
+        results = self.call_bridge_api_batch(
+            [self._get_release_notes_command(asset_component, asset_name) for asset_component, asset_name, _ in
+             stale_notes]
+        )
+        release_notes = list()
+        for (asset_component, asset_name, notes_stamp), result in zip(stale_notes, results):
+            notes, error = self._read_release_notes_result(result, report_errors=False)
+            if error:
+                logger.warning("Could not prefetch release notes of {0}. Error is {1}".format(asset_name, error))
+                continue
+            release_notes.append((asset_component, asset_name, notes_stamp, notes))
+        if release_notes:
+            self._cache_release_notes(release_notes)
 
     def is_asset_publishable(self, asset_type, asset_component):
         """
@@ -558,6 +852,7 @@ class AniAssetMngr(AniCoreMngr):
 
         # reset progress
         self.init_progress_window("Sync Progress", "Updating Assets...")
+        self.take_local_cache_snapshot(update_data_dict)
 
         # update the local cache for the assets given
         self.server_build_local_cache(
@@ -569,10 +864,12 @@ class AniAssetMngr(AniCoreMngr):
         # downloads from the gui, which requires knowing which asset component was run
         self.server_download(update_data_dict, gui_mode=True)
 
-    def sync_local_cache_with_server(self, update_data_dict=None):
+    def sync_local_cache_with_server(self, update_data_dict=None, full_rebuild=False):
         """
-        Updates the cache on disk with the current server data. If no parameters are filled the entire cache will
-        be rebuilt.
+        Updates the cache on disk with the current server data. If no parameters are filled the entire cache is
+        synced with the server incrementally, only what changed since the last sync is listed, see
+        server_sync_local_cache_changes. The entire cache is rebuilt when full_rebuild is True or the cache can't be
+        synced incrementally.
         :param update_data_dict: a dict in format:
         {
             asset type: {
@@ -585,6 +882,8 @@ class AniAssetMngr(AniCoreMngr):
         There can be one or more asset types. Asset components and asset names are optional.
         Asset components require an asset type. Asset Names require both an asset type and asset component.
         a list of the type of asset(s) to update - see pyani.core.appvars.py for asset types and asset components
+        :param full_rebuild: True to rebuild the entire cache instead of syncing what changed, only used when no
+        update_data_dict is given
 
         :return: None if updated cache, an error string if couldn't update. Note for an entire cache rebuild, use
         the signal finished to check for errors, since its multi-threaded
@@ -594,16 +893,28 @@ class AniAssetMngr(AniCoreMngr):
         self.thread_total = 0.0
         self.threads_done = 0.0
 
-        # no asset types, so can't set any other values in data struct, so rebuild entire cache
+        # no asset types, so can't set any other values in data struct, so sync or rebuild entire cache
         if not update_data_dict:
-            self.server_build_local_cache()
+            self.start_local_cache_sync_with_lock(functools.partial(self._sync_entire_local_cache, full_rebuild))
         else:
+            self.take_local_cache_snapshot(update_data_dict)
             self.server_build_local_cache(
                 assets_dict=update_data_dict,
                 thread_callback=self._thread_server_sync_complete,
                 thread_callback_args=[self.active_asset_component, self.server_save_local_cache]
             )
 
+    def _sync_entire_local_cache(self, full_rebuild=False):
+        """
+        Syncs the entire cache with the server, incrementally when possible. Decided once the cache sync lock is
+        held, since another process may have synced the cache while waiting
+        :param full_rebuild: True to rebuild the entire cache instead of syncing what changed
+        """
+        if not full_rebuild and self.can_sync_local_cache_incrementally():
+            self.server_sync_local_cache_changes()
+        else:
+            self.server_build_local_cache()
+
     def server_download(self, assets_dict=None, gui_mode=False):
         """
         downloads files. If an asset list is provided only those assets will be downloaded, otherwise all assets are
@@ -622,6 +933,8 @@ class AniAssetMngr(AniCoreMngr):
         """
         # set number of threads to max - can do this since running per asset
         self.set_number_of_concurrent_threads()
+        # count files skipped because they haven't changed for this download only
+        self.reset_download_skip_stats()
 
         # if not in gui mode reset thread count and errors, otherwise don't because cache sync did this already
         if not gui_mode:
@@ -635,73 +948,110 @@ class AniAssetMngr(AniCoreMngr):
             # reset progress
             self.init_progress_window("Sync Progress", "Updating assets...")
 
+        download_jobs = self.prepare_download_jobs(assets_dict)
+        # the cache couldn't be loaded
+        if not isinstance(download_jobs, list):
+            self.send_thread_error(download_jobs)
+            return download_jobs
+
+        # now use multi-threading to download, order all the downloads before starting any
+        with self.download_scheduler:
+            for function, args, kwargs in download_jobs:
+                worker = pyani.core.ui.Worker(function, False, *args, **kwargs)
+                # jobs download a batch of files, see prepare_download_jobs. Progress counts files, not batches
+                server_file_paths, local_file_paths = args
+                self.thread_total += len(server_file_paths)
+
+                # slot that is called when a thread finishes
+                if gui_mode:
+                    # passes the active component so calling classes can know what was updated
+                    # and the save cache method so that when cache gets updated it can be saved
+                    worker.signals.finished.connect(
+                        functools.partial(
+                            self._thread_server_sync_complete,
+                            self.active_asset_component,
+                            self.server_save_local_cache,
+                            len(server_file_paths)
+                        )
+                    )
+                else:
+                    worker.signals.finished.connect(
+                        functools.partial(self._thread_server_download_complete, len(server_file_paths))
+                    )
+
+                worker.signals.error.connect(self.send_thread_error)
+
+                # a user is waiting on downloads started from the gui, otherwise its a background
+                # sync such as the nightly update
+                if gui_mode:
+                    priority = AniDownloadScheduler.PRIORITY_INTERACTIVE
+                else:
+                    priority = AniDownloadScheduler.PRIORITY_BACKGROUND
+                self.submit_download(worker, server_file_paths, local_file_paths, priority=priority)
+
+    def prepare_download_jobs(self, assets_dict=None):
+        """
+        Lists the downloads for assets and records the local files' modified times so updated assets can be found
+        after, see find_changed_assets. Files are grouped into batches that each download in one bridge call, see
+        get_download_batches. Used by server_download to start threads, and by pyani.core.mngr.server_ops to run the
+        downloads without a gui
+        :param assets_dict: optional assets to download, see server_download. All assets if not given
+        :return: a list of (function, args, kwargs) tuples, one per batch. args are the batch's server file paths
+        and local directories. Or error as string if the cache couldn't be loaded
+        """
         # make sure asset info is loaded
         if not self._asset_info:
             error = self.load_server_asset_info_cache()
             if error:
-                self.send_thread_error(error)
                 return error
 
         # check if assets to download were provided, if not download all assets
         if not assets_dict:
             assets_dict = self._asset_info
 
-        # now use multi-threading to download
+        file_paths = list()
         for asset_type in assets_dict:
             for asset_component in assets_dict[asset_type]:
                 for asset_name in assets_dict[asset_type][asset_component]:
                     # make sure asset exists, can't download non-existent asset
-                    if pyani.core.util.find_val_in_nested_dict(
+                    if not pyani.core.util.find_val_in_nested_dict(
                             self._asset_info,
                             [asset_type, asset_component, asset_name]
                     ):
-                        # possible no files, then skip, otherwise download
-                        file_names = self.get_asset_files(asset_type, asset_component, asset_name)
-                        if file_names:
-                            # could be more than one file
-                            for file_name in file_names:
-                                local_path = self.get_asset_local_dir_from_cache(asset_type, asset_component, asset_name)
-
-                                # get timestamps of tools being downloaded - create keys if needed
-                                if asset_type not in self._assets_timestamp_before_dl:
-                                    self._assets_timestamp_before_dl[asset_type] = dict()
-                                if asset_component not in self._assets_timestamp_before_dl[asset_type]:
-                                    self._assets_timestamp_before_dl[asset_type][asset_component] = dict()
-                                if asset_name not in self._assets_timestamp_before_dl[asset_type][asset_component]:
-                                    self._assets_timestamp_before_dl[asset_type][asset_component][asset_name] = dict()
-                                file_path = "{0}\\{1}".format(local_path, file_name.split("/")[-1])
-                                # file may not be on local machine, so try to get time, if can't set to 0
-                                try:
-                                    self._assets_timestamp_before_dl[asset_type][asset_component][asset_name][file_path] = os.path.getmtime(file_path)
-                                except WindowsError:
-                                    self._assets_timestamp_before_dl[asset_type][asset_component][asset_name][file_path] = 0.0
-
-                                # server_file_download expects a list of files, so pass list even though just one file
-                                worker = pyani.core.ui.Worker(
-                                    self.server_file_download,
-                                    False,
-                                    [file_name],
-                                    local_file_paths=[local_path],
-                                    update_local_version=True
-                                )
-                                self.thread_total += 1.0
-                                self.thread_pool.start(worker)
-
-                                # slot that is called when a thread finishes
-                                if gui_mode:
-                                    # passes the active component so calling classes can know what was updated
-                                    # and the save cache method so that when cache gets updated it can be saved
-                                    worker.signals.finished.connect(
-                                        functools.partial(
-                                            self._thread_server_sync_complete,
-                                            self.active_asset_component,
-                                            self.server_save_local_cache
-                                        )
-                                    )
-                                else:
-                                    worker.signals.finished.connect(self._thread_server_download_complete)
-
-                                worker.signals.error.connect(self.send_thread_error)
+                        continue
+                    # possible no files, then skip, otherwise download
+                    file_names = self.get_asset_files(asset_type, asset_component, asset_name)
+                    if not file_names:
+                        continue
+                    # could be more than one file
+                    for file_name in file_names:
+                        local_path = self.get_asset_local_dir_from_cache(asset_type, asset_component, asset_name)
+
+                        # get timestamps of tools being downloaded - create keys if needed
+                        if asset_type not in self._assets_timestamp_before_dl:
+                            self._assets_timestamp_before_dl[asset_type] = dict()
+                        if asset_component not in self._assets_timestamp_before_dl[asset_type]:
+                            self._assets_timestamp_before_dl[asset_type][asset_component] = dict()
+                        if asset_name not in self._assets_timestamp_before_dl[asset_type][asset_component]:
+                            self._assets_timestamp_before_dl[asset_type][asset_component][asset_name] = dict()
+                        file_path = "{0}\\{1}".format(local_path, file_name.split("/")[-1])
+                        # file may not be on local machine, so try to get time, if can't set to 0
+                        asset_timestamps = self._assets_timestamp_before_dl[asset_type][asset_component][asset_name]
+                        try:
+                            asset_timestamps[file_path] = os.path.getmtime(file_path)
+                        except (IOError, OSError):
+                            asset_timestamps[file_path] = 0.0
+
+                        file_paths.append((file_name, local_path))
+
+        return [
+            (
+                self.server_file_download_batch,
+                (server_file_paths, local_file_paths),
+                {"update_local_version": True}
+            )
+            for server_file_paths, local_file_paths in self.get_download_batches(file_paths)
+        ]
 
     def server_build_local_cache(self, assets_dict=None, thread_callback=None, thread_callback_args=None):
         """
@@ -725,6 +1075,9 @@ class AniAssetMngr(AniCoreMngr):
         self.set_number_of_concurrent_threads()
 
         self._reset_thread_counters()
+        # building a cache shouldn't use listings cached earlier in this process. Listings another process's sync made
+        # within the shared time to live are still used, see pyani.core.mngr.listing_cache.SharedListingStore
+        self.invalidate_server_listing_cache(shared=False)
 
         # if no thread callback then normal server cache creation so show progress, otherwise there should be
         # a progress window already running
@@ -732,6 +1085,20 @@ class AniAssetMngr(AniCoreMngr):
             # reset progress
             self.init_progress_window("Cache Progress", "Creating cache...")
 
+        for function, args, kwargs in self.prepare_cache_jobs(assets_dict):
+            # now use multi-threading to get file info for assets
+            worker = pyani.core.ui.Worker(function, False, *args, **kwargs)
+            self._start_cache_worker(worker, thread_callback, thread_callback_args)
+
+    def prepare_cache_jobs(self, assets_dict=None):
+        """
+        Lists the work to get asset info from the server for the cache. Resets the cache for the assets being
+        rebuilt, the jobs fill it back in. Used by server_build_local_cache to start threads, and by
+        pyani.core.mngr.server_ops to build the cache without a gui. Save the cache with server_save_local_cache
+        once every job is done
+        :param assets_dict: optional assets to update, see server_build_local_cache. Rebuilds all assets if not given
+        :return: a list of (function, args, kwargs) tuples
+        """
         # load existing cache if exists and store in a copy
         error = self.load_server_asset_info_cache()
         if not error:
@@ -742,9 +1109,12 @@ class AniAssetMngr(AniCoreMngr):
             asset_types = self.app_vars.asset_types
             # reset cache, doing a complete rebuild
             self._asset_info = dict()
+            self._cache_watermarks = dict()
+            self._asset_info_changed()
         else:
             asset_types = assets_dict.keys()
 
+        cache_jobs = list()
         for asset_type in asset_types:
             if asset_type not in self._asset_info:
                 self._asset_info[asset_type] = dict()
@@ -756,10 +1126,10 @@ class AniAssetMngr(AniCoreMngr):
                 # get asset components provided
                 asset_components = assets_dict[asset_type].keys()
 
-            # build path to asset types directory, ex /LongGong/asset/set
-            # do this here because all asset components share the same asset type root path, for example rig and
-            # model cache for sets are both /LongGong/asset/set
-            asset_type_root_path = self.app_vars.asset_types[asset_type][asset_components[0]]["root path"]
+            # components by their root path, ex /LongGong/asset/set. Components that share a root path, for example
+            # rig and model for sets, get their asset info from one listing of the root path, see
+            # server_get_asset_type_info
+            components_by_root_path = dict()
 
             for asset_component in asset_components:
                 if asset_component not in self._asset_info[asset_type]:
@@ -772,33 +1142,309 @@ class AniAssetMngr(AniCoreMngr):
                 else:
                     asset_names = None
 
-                # now use multi-threading to get file info for assets by component type
-                worker = pyani.core.ui.Worker(
-                    self.server_get_asset_info,
-                    False,
-                    asset_type_root_path,
-                    asset_type,
-                    asset_component,
-                    asset_names=asset_names
-                )
-                self.thread_total += 1.0
-                self.thread_pool.start(worker)
-                # reset error list
-                self.init_thread_error()
-                # slot that is called when a thread finishes, pass the call back function to call when its done
-                # check if thread callback is cache update or cache update with download, if no callback,
-                # use the default cache complete callback
-                if not thread_callback:
-                    worker.signals.finished.connect(
-                        functools.partial(self._thread_server_cache_complete, self.server_save_local_cache)
+                root_path = self.app_vars.asset_types[asset_type][asset_component]["root path"]
+                components_by_root_path.setdefault(root_path, dict())[asset_component] = asset_names
+
+            for root_path, root_path_components in components_by_root_path.items():
+                # one job lists the root path and gets file info for all its components. Only worth it for several
+                # components, the shared listing has every file under the root while a component's listing only has
+                # the files in its folders
+                if self.app_vars.cgt_share_asset_type_listing and len(root_path_components) > 1:
+                    cache_jobs.append(
+                        (
+                            self.server_get_asset_type_info,
+                            (root_path, asset_type, root_path_components),
+                            dict()
+                        )
                     )
-                else:
-                    active_asset_component = thread_callback_args[0]
-                    save_method = thread_callback_args[1]
-                    worker.signals.finished.connect(
-                        functools.partial(self._thread_server_sync_complete, active_asset_component, save_method)
+                    continue
+
+                # get file info for assets by component type
+                for asset_component, asset_names in root_path_components.items():
+                    cache_jobs.append(
+                        (
+                            self.server_get_asset_info,
+                            (root_path, asset_type, asset_component),
+                            {"asset_names": asset_names}
+                        )
                     )
-                worker.signals.error.connect(self.error_thread_signal)
+        return cache_jobs
+
+    def _start_cache_worker(self, worker, thread_callback=None, thread_callback_args=None):
+        """
+        Starts a thread that gets asset info for the cache, see server_build_local_cache
+        :param worker: a pyani.core.ui.Worker
+        :param thread_callback: a method to call as threads complete
+        :param thread_callback_args: any args to pass to thread callback
+        """
+        self.thread_total += 1.0
+        self.thread_pool.start(worker)
+        # reset error list
+        self.init_thread_error()
+        # slot that is called when a thread finishes, pass the call back function to call when its done
+        # check if thread callback is cache update or cache update with download, if no callback,
+        # use the default cache complete callback
+        if not thread_callback:
+            worker.signals.finished.connect(
+                functools.partial(self._thread_server_cache_complete, self.server_save_local_cache)
+            )
+        else:
+            active_asset_component = thread_callback_args[0]
+            save_method = thread_callback_args[1]
+            worker.signals.finished.connect(
+                functools.partial(self._thread_server_sync_complete, active_asset_component, save_method)
+            )
+        worker.signals.error.connect(self.error_thread_signal)
+
+    def server_sync_local_cache_changes(self):
+        """
+        Syncs the entire asset cache with the server without rebuilding it. For every asset type and component only
+        the files modified since the newest modified date in the cache (the watermark) are listed, the assets they
+        belong to are listed again, and assets that were removed from the server are removed from the cache. Uses
+        multi-threading, one thread per asset component. Check can_sync_local_cache_incrementally first, the cache
+        and watermarks must exist.
+        """
+        # set number of threads to max
+        self.set_number_of_concurrent_threads()
+
+        self._reset_thread_counters()
+        # syncing shouldn't use listings cached earlier in this process, see server_build_local_cache
+        self.invalidate_server_listing_cache(shared=False)
+
+        self.init_progress_window("Cache Progress", "Syncing cache...")
+
+        for function, args, kwargs in self.prepare_sync_jobs():
+            worker = pyani.core.ui.Worker(function, False, *args, **kwargs)
+            self._start_cache_worker(worker)
+
+    def prepare_sync_jobs(self):
+        """
+        Lists the work to sync the entire asset cache with the server incrementally, one
+        server_get_asset_info_changes call per asset type and component. Used by server_sync_local_cache_changes to
+        start threads, and by pyani.core.mngr.server_ops to sync without a gui. Check
+        can_sync_local_cache_incrementally first, and save the cache with server_save_local_cache once every job is
+        done
+        :return: a list of (function, args, kwargs) tuples
+        """
+        # the cache is updated in place, keep a copy to compare after the sync
+        self._existing_assets_before_sync = copy.deepcopy(self._asset_info)
+
+        sync_jobs = list()
+        for asset_type in self.app_vars.asset_types:
+            for asset_component in self.app_vars.asset_types[asset_type]:
+                sync_jobs.append(
+                    (
+                        self.server_get_asset_info_changes,
+                        (
+                            self.app_vars.asset_types[asset_type][asset_component]["root path"],
+                            asset_type,
+                            asset_component
+                        ),
+                        dict()
+                    )
+                )
+        return sync_jobs
+
+    def server_get_asset_info_changes(self, root_path, asset_type, asset_component):
+        """
+        gets file info for the assets of a component that changed on the cgt server since the component's watermark
+        and updates the asset info cache with them, see server_sync_local_cache_changes
+        :param root_path: the path to the asset names, for example /LongGong/asset/set/
+        :param asset_type: the type of asset, see pyani.core.appvars for asset types
+        :param asset_component: the asset component, see pyani.core.appvars for asset components
+        :return error message or none
+        """
+        watermark = self._cache_watermarks[asset_type][asset_component]
+        prefix = asset_type + "_" + asset_component.replace("/", "_")
+        json_temp_file_info_path = os.path.join(
+            self.app_vars.cgt_temp_file_cache_dir,
+            prefix + "_changes_" + self.app_vars.cgt_tmp_file_cache_filename
+        )
+
+        # get file info for what changed since the watermark. The listing includes files modified at the watermark
+        # since files modified in the same second as the last sync may have been missed, listing them again is harmless
+        error = self.server_get_file_listing_using_folder_filter(
+            root_path, asset_component, json_temp_file_info_path, modified_since=watermark
+        )
+        if error:
+            error_fmt = "Error getting changed file information from cgt server. Error is {0}".format(error)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        root_path_list = root_path.split("/")
+        changed_asset_names = set()
+        newest_modify_time = watermark
+        try:
+            for file_path in pyani.core.util.read_json_records(json_temp_file_info_path):
+                asset_name = self._get_asset_name_from_server_path(
+                    file_path["path"].rstrip("/").split("/"), root_path_list, asset_type
+                )
+                if asset_name:
+                    changed_asset_names.add(asset_name)
+                if file_path["modify_time"] > newest_modify_time:
+                    newest_modify_time = file_path["modify_time"]
+        except (IOError, OSError, ValueError) as e:
+            error_fmt = "Error loading temp cgt file listing cache. Error is: {0}".format(e)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        cached_assets = self._asset_info[asset_type][asset_component]
+
+        # removing an asset only changes the root path's modified date, which the listing doesn't include, so compare
+        # the cached assets with the asset folders on the server. Errors keep the assets
+        unchanged_asset_names = [asset_name for asset_name in cached_assets if asset_name not in changed_asset_names]
+        if unchanged_asset_names:
+            server_asset_names = self._server_get_asset_names(root_path, asset_type, unchanged_asset_names)
+            if server_asset_names is not None:
+                for asset_name in unchanged_asset_names:
+                    if asset_name not in server_asset_names:
+                        del cached_assets[asset_name]
+                        self._asset_info_changed()
+
+        if changed_asset_names:
+            asset_info_sorted = self._get_changed_asset_info(
+                root_path, json_temp_file_info_path, asset_type, asset_component, changed_asset_names
+            )
+            if not isinstance(asset_info_sorted, dict):
+                return asset_info_sorted
+
+            # changed assets that no longer have files for this component are dropped, same as a full rebuild
+            for asset_name in changed_asset_names:
+                if asset_name not in asset_info_sorted and asset_name in cached_assets:
+                    del cached_assets[asset_name]
+                    self._asset_info_changed()
+
+            self._create_asset_info_cache(
+                root_path,
+                json_temp_file_info_path,
+                asset_type,
+                asset_component,
+                asset_names=list(changed_asset_names),
+                asset_info_sorted=asset_info_sorted
+            )
+
+        self._cache_watermarks[asset_type][asset_component] = newest_modify_time
+        return None
+
+    def _server_get_asset_names(self, root_path, asset_type, asset_names):
+        """
+        Lists the asset folders on the server, for server_get_asset_info_changes. The root path is listed once, and for
+        shots each sequence with cached shots. Listings are cached, so components sharing a root path list it once
+        :param root_path: the path to the asset names, for example /LongGong/asset/set/
+        :param asset_type: the type of asset, see pyani.core.appvars for asset types
+        :param asset_names: the cached asset names to look for, for shots seq/shot
+        :return: a set of the asset names on the server, or None if they couldn't be listed
+        """
+        root_path = root_path.rstrip("/")
+        try:
+            root_names = self.server_get_dir_list(root_path, dirs_only=True)
+            if isinstance(root_names, basestring):
+                return None
+            root_names = set(root_names or list())
+            if not asset_type == "shot":
+                return root_names
+
+            server_asset_names = set()
+            for seq in set(asset_name.split("/")[0] for asset_name in asset_names):
+                if seq not in root_names:
+                    continue
+                shots = self.server_get_dir_list(root_path + "/" + seq, dirs_only=True)
+                if isinstance(shots, basestring):
+                    return None
+                server_asset_names.update("{0}/{1}".format(seq, shot) for shot in shots or list())
+            return server_asset_names
+        except pyani.core.util.CGTError as error:
+            logger.warning("Could not list the assets in {0}. Error is {1}".format(root_path, error))
+            return None
+
+    def _get_changed_asset_info(self, root_path, json_temp_file_info_path, asset_type, asset_component, asset_names):
+        """
+        Lists all the files of assets that changed, for server_get_asset_info_changes. A few assets are listed one at
+        a time, many assets with one listing of the component
+        :param root_path: the path to the asset names, for example /LongGong/asset/set/
+        :param json_temp_file_info_path: path to write the server file info to
+        :param asset_type: the type of asset, see pyani.core.appvars for asset types
+        :param asset_component: the asset component, see pyani.core.appvars for asset components
+        :param asset_names: the names of the assets that changed
+        :return: the assets' files grouped by asset, see _convert_cgt_file_info_to_asset_info, or an error as a string
+        """
+        if len(asset_names) > self.app_vars.cgt_incremental_sync_max_assets:
+            error = self.server_get_file_listing_using_folder_filter(
+                root_path, asset_component, json_temp_file_info_path
+            )
+            if error:
+                error_fmt = "Error getting file information from cgt server. Error is {0}".format(error)
+                self.send_thread_error(error_fmt)
+                return error_fmt
+            return self._convert_cgt_file_info_to_asset_info(
+                root_path, json_temp_file_info_path, asset_type, asset_component, asset_names=asset_names
+            )
+
+        asset_info_sorted = dict()
+        for asset_name in asset_names:
+            error = self.server_get_file_listing_using_folder_filter(
+                root_path.rstrip("/") + "/" + asset_name, asset_component, json_temp_file_info_path
+            )
+            if error:
+                error_fmt = "Error getting file information for {0} from cgt server. Error is {1}".format(
+                    asset_name, error
+                )
+                self.send_thread_error(error_fmt)
+                return error_fmt
+            # paths are still relative to the asset type root path, so the asset name is found the same way
+            asset_info = self._convert_cgt_file_info_to_asset_info(
+                root_path, json_temp_file_info_path, asset_type, asset_component, asset_names=[asset_name]
+            )
+            if not isinstance(asset_info, dict):
+                return asset_info
+            asset_info_sorted.update(asset_info)
+        return asset_info_sorted
+
+    def can_sync_local_cache_incrementally(self):
+        """
+        Checks if the asset cache can be synced with server_sync_local_cache_changes instead of being rebuilt. The
+        bridge must support listing files by modified date and the cache on disk must have a watermark for every
+        asset type and component
+        :return: True if it can, False if not
+        """
+        if not self.app_vars.cgt_modified_since_listings:
+            return False
+        if self.load_server_asset_info_cache():
+            return False
+        for asset_type in self.app_vars.asset_types:
+            for asset_component in self.app_vars.asset_types[asset_type]:
+                if asset_component not in self._asset_info.get(asset_type, dict()):
+                    return False
+                if asset_component not in self._cache_watermarks.get(asset_type, dict()):
+                    return False
+        return True
+
+    def _track_cache_watermark(self, files_in_path, asset_type, asset_component):
+        """
+        Passes server file info through while finding the newest modified date, which becomes the component's
+        watermark once all the file info has been read. Only use for listings of every asset of the component
+        :param files_in_path: an iterable of dicts with the keys path and modify_time, can be a generator
+        :param asset_type: the type of asset, see pyani.core.appvars for asset types
+        :param asset_component: the asset component, see pyani.core.appvars for asset components
+        :return: yields the file info dicts
+        """
+        newest_modify_time = ""
+        for file_path in files_in_path:
+            # dates in the format yyyy-mm-dd hh:mm:ss sort the same as strings
+            if file_path["modify_time"] > newest_modify_time:
+                newest_modify_time = file_path["modify_time"]
+            yield file_path
+        self._set_cache_watermark(asset_type, asset_component, newest_modify_time)
+
+    def _set_cache_watermark(self, asset_type, asset_component, modify_time):
+        """
+        Sets the newest modified date the cache has for an asset component, see server_get_asset_info_changes
+        :param asset_type: the type of asset, see pyani.core.appvars for asset types
+        :param asset_component: the asset component, see pyani.core.appvars for asset components
+        :param modify_time: the date as a string yyyy-mm-dd hh:mm:ss, empty if the component has no files so the next
+        sync lists everything
+        """
+        self._cache_watermarks.setdefault(asset_type, dict())[asset_component] = modify_time
 
     def server_get_asset_info(self, root_path, asset_type, asset_component, asset_names=None):
         """
@@ -833,7 +1479,85 @@ class AniAssetMngr(AniCoreMngr):
 
         return None
 
-    def _create_asset_info_cache(self, root_path, json_temp_file_info_path, asset_type, asset_component, asset_names=None):
+    def server_get_asset_type_info(self, root_path, asset_type, asset_components):
+        """
+        gets file info for several components of an asset type from cgt server and adds to asset info cache in
+        permanent dir. Same as calling server_get_asset_info for each component, but the asset type's root path is
+        listed once and the listing is split up by component as it is read
+        :param root_path: the path to the asset names, for example /LongGong/asset/set/
+        :param asset_type: the type of asset, see pyani.core.appvars for asset types
+        :param asset_components: a dict of asset component: list of asset names, or None for all assets
+        :return error message or none
+        """
+        # the file name to store file info from CGT, named by the components in case an asset type's components are
+        # under different root paths
+        json_temp_file_info_path = os.path.join(
+            self.app_vars.cgt_temp_file_cache_dir,
+            "{0}_{1}_{2}".format(
+                asset_type, "_".join(sorted(asset_components)), self.app_vars.cgt_tmp_file_cache_filename
+            )
+        )
+
+        # get file info for everything under the root path from CGT, an empty folder filter doesn't filter
+        error = self.server_get_file_listing_using_folder_filter(root_path, "", json_temp_file_info_path)
+        if error:
+            error_fmt = "Error getting file information from cgt server. Error is {0}".format(error)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        # give each component the files that its own folder filter would have listed
+        component_folders = dict(
+            (asset_component, "/{0}/".format(asset_component.strip("/"))) for asset_component in asset_components
+        )
+        asset_info_by_component = dict((asset_component, dict()) for asset_component in asset_components)
+        # newest modified date per component, the watermark for incremental syncs
+        newest_modify_times = dict((asset_component, "") for asset_component in asset_components)
+        root_path_list = root_path.split("/")
+        try:
+            for file_path in pyani.core.util.read_json_records(json_temp_file_info_path):
+                cgt_path = file_path["path"] + "/"
+                for asset_component, folder in component_folders.items():
+                    if folder in cgt_path:
+                        if file_path["modify_time"] > newest_modify_times[asset_component]:
+                            newest_modify_times[asset_component] = file_path["modify_time"]
+                        self._add_cgt_file_info_to_asset_info(
+                            asset_info_by_component[asset_component],
+                            file_path,
+                            root_path_list,
+                            asset_type,
+                            asset_component,
+                            asset_names=asset_components[asset_component]
+                        )
+        except (IOError, OSError, ValueError) as e:
+            error_fmt = "Error loading temp cgt file listing cache. Error is: {0}".format(e)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        # process and add cgt file info for assets to asset info cache
+        for asset_component, asset_info_sorted in asset_info_by_component.items():
+            # only a listing of every asset is complete up to its newest date
+            if not asset_components[asset_component]:
+                self._set_cache_watermark(asset_type, asset_component, newest_modify_times[asset_component])
+            self._create_asset_info_cache(
+                root_path,
+                json_temp_file_info_path,
+                asset_type,
+                asset_component,
+                asset_names=asset_components[asset_component],
+                asset_info_sorted=asset_info_sorted
+            )
+
+        return None
+
+    def _create_asset_info_cache(
+            self,
+            root_path,
+            json_temp_file_info_path,
+            asset_type,
+            asset_component,
+            asset_names=None,
+            asset_info_sorted=None
+    ):
         """
         creates the asset info cache stored in permanent data dir
         :param root_path: the path to the asset names, for example /LongGong/asset/set/
@@ -841,11 +1565,17 @@ class AniAssetMngr(AniCoreMngr):
         :param asset_type: the type of asset, see pyani.core.appvars for asset types
         :param asset_component: the asset component, see pyani.core.appvars for asset components
         :param asset_names: list of asset names
+        :param asset_info_sorted: optional, the server file info already grouped by asset, see
+        _convert_cgt_file_info_to_asset_info. When given the file info isn't read from json_temp_file_info_path
         """
 
-        asset_info_sorted = self._convert_cgt_file_info_to_asset_info(
-            root_path, json_temp_file_info_path, asset_type, asset_component, asset_names=asset_names
-        )
+        if asset_info_sorted is None:
+            asset_info_sorted = self._convert_cgt_file_info_to_asset_info(
+                root_path, json_temp_file_info_path, asset_type, asset_component, asset_names=asset_names
+            )
+        # error reading the file info
+        if not isinstance(asset_info_sorted, dict):
+            return asset_info_sorted
 
         # go through all folders under the root path
         for asset_name in asset_info_sorted:
@@ -914,7 +1644,35 @@ class AniAssetMngr(AniCoreMngr):
             # save the version and file name
             self._asset_info[asset_type][asset_component][asset_name]["version"] = version
             self._asset_info[asset_type][asset_component][asset_name]["files"] = file_list
+            # the version's release notes, if it has any
+            notes_path = self._find_release_notes_path(asset_component, asset_info_sorted[asset_name], version)
+            self._asset_info[asset_type][asset_component][asset_name]["notes path"] = notes_path
+            # server modified dates of the files and notes, so downloading them doesn't need to ask the server
+            file_modified_times = asset_info_sorted[asset_name].get('file modified times', dict())
+            self._asset_info[asset_type][asset_component][asset_name]["file modified times"] = dict(
+                (server_path, file_modified_times[server_path])
+                for server_path in file_list + [notes_path] if server_path in file_modified_times
+            )
+
+        self._asset_info_changed()
+        return None
 
+    def _find_release_notes_path(self, asset_component, asset_files, version):
+        """
+        Finds the release notes for an asset's version in its server files. Notes live directly under
+        approved/history or work/ and have the version in their name
+        :param asset_component: the asset component, see pyani.core.appvars for asset components
+        :param asset_files: the asset's files grouped by folder, see _convert_cgt_file_info_to_asset_info
+        :param version: the asset's version, ex: v003
+        :return: the notes' server path, or None if the version doesn't have notes
+        """
+        if not version or not self.asset_component_supports_release_notes(asset_component):
+            return None
+        for asset_folder in ("approved/history", "work"):
+            for file_path in sorted(asset_files.get(asset_folder, list())):
+                file_name = file_path.split("/")[-1]
+                if version in file_name and file_name.split(".")[-1] in self.app_vars.notes_format_supported:
+                    return file_path
         return None
 
     def server_save_local_cache(self):
@@ -938,8 +1696,16 @@ class AniAssetMngr(AniCoreMngr):
             error_fmt = "Could not save local assets cache. Error is {0}".format(error)
             self.send_thread_error(error_fmt)
             return error_fmt
-        else:
-            return None
+
+        # the watermarks for the next incremental sync
+        error = pyani.core.util.write_json(
+            self.app_vars.cgt_asset_info_watermark_path, self._cache_watermarks, indent=4
+        )
+        if error:
+            error_fmt = "Could not save local assets cache watermarks. Error is {0}".format(error)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+        return None
 
     def find_changed_assets(self):
         """
@@ -1012,100 +1778,174 @@ class AniAssetMngr(AniCoreMngr):
         :param asset_component: the asset component - see pyani.core.appvars.py for asset components
         :param asset_names: optional list of asset names to update rather than update all assets for a given asset type
         and component
-        :return: a dict of asset names and their associated files
+        :return: a dict of asset names and their associated files, or an error as a string
         """
 
-        # load the asset info retrieved from the server
-        files_in_path = pyani.core.util.load_json(json_temp_file_info_path)
-        if not isinstance(files_in_path, list):
-            error_fmt = "Error loading temp cgt file listing cache. Error is: {0}".format(files_in_path)
+        # the asset info retrieved from the server is read one file at a time, listings of large trees like
+        # sequences are too big to load at once
+        files_in_path = pyani.core.util.read_json_records(json_temp_file_info_path)
+        # only a listing of every asset is complete up to its newest date
+        if not asset_names:
+            files_in_path = self._track_cache_watermark(files_in_path, asset_type, asset_component)
+        try:
+            return self._group_cgt_file_info_by_asset(
+                files_in_path,
+                root_path,
+                asset_type,
+                asset_component,
+                asset_names=asset_names
+            )
+        except (IOError, OSError, ValueError) as e:
+            error_fmt = "Error loading temp cgt file listing cache. Error is: {0}".format(e)
             self.send_thread_error(error_fmt)
             return error_fmt
 
+    def _group_cgt_file_info_by_asset(self, files_in_path, root_path, asset_type, asset_component, asset_names=None):
+        """
+        groups server file info by asset for _convert_cgt_file_info_to_asset_info
+        :param files_in_path: an iterable of dicts with the keys path and modify_time, can be a generator
+        :param root_path: the path to the asset names, for example /LongGong/asset/set/
+        :param asset_type: the asset type - see pyani.core.appvars.py for asset components
+        :param asset_component: the asset component - see pyani.core.appvars.py for asset components
+        :param asset_names: optional list of asset names to update rather than update all assets for a given asset type
+        and component
+        :return: a dict of asset names and their associated files
+        """
         root_path_list = root_path.split("/")
 
         asset_info_sorted = dict()
 
         # go through all files under the root path
         for file_path in files_in_path:
-            cgt_path = unicode(file_path["path"])
-            # decompose the cgtw path into a list
-            cgt_path_list = cgt_path.rstrip("/").split("/")
-
-            # make sure path is not the root path
-            if len(cgt_path_list) > len(root_path_list):
-
-                # asset name for shot assets is different than show assets
-                if asset_type is "shot":
-                    asset_name = "{0}/{1}".format(
-                        cgt_path_list[len(root_path_list)], cgt_path_list[len(root_path_list)+1]
-                    )
-                else:
-                    asset_name = cgt_path_list[len(root_path_list)]
-
-                # check if asset names were provided and if asset names provided check if the current asset is in list.
-                # if not skip processing.
-                if asset_names and asset_name not in asset_names:
-                    continue
+            self._add_cgt_file_info_to_asset_info(
+                asset_info_sorted, file_path, root_path_list, asset_type, asset_component, asset_names=asset_names
+            )
 
-                # check if asset is published and goes through approval. Some asset components like rigs get approved
-                # and have approved and work folders. Others like gpu caches don't.
-                if self.is_asset_publishable(asset_type, asset_component):
-                    # loop through folders that have asset information we want
-                    for asset_folder in self.app_vars.asset_folder_list:
-                        # check if path has one of the folders we want
-                        if cgt_path.find("/" + asset_folder + "/") != -1:
-                            # check if the asset dict has the asset, if not add
-                            if asset_name not in asset_info_sorted:
-                                asset_info_sorted[asset_name] = dict()
-
-                            # check if the folder has been added, if not add
-                            if asset_folder not in asset_info_sorted[asset_name]:
-                                asset_info_sorted[asset_name][asset_folder] = list()
+        return asset_info_sorted
 
+    def _add_cgt_file_info_to_asset_info(
+            self,
+            asset_info_sorted,
+            file_path,
+            root_path_list,
+            asset_type,
+            asset_component,
+            asset_names=None
+    ):
+        """
+        adds one server file to the assets grouped by _group_cgt_file_info_by_asset
+        :param asset_info_sorted: the dict of asset names and their files to add to
+        :param file_path: a dict with the keys path and modify_time
+        :param root_path_list: the path to the asset names split at '/'
+        :param asset_type: the asset type - see pyani.core.appvars.py for asset components
+        :param asset_component: the asset component - see pyani.core.appvars.py for asset components
+        :param asset_names: optional list of asset names to update rather than update all assets for a given asset type
+        and component
+        """
+        cgt_path = unicode(file_path["path"])
+        # decompose the cgtw path into a list
+        cgt_path_list = cgt_path.rstrip("/").split("/")
+
+        # make sure path is not the root path
+        if len(cgt_path_list) > len(root_path_list):
+
+            asset_name = self._get_asset_name_from_server_path(cgt_path_list, root_path_list, asset_type)
+            if not asset_name:
+                return
+
+            # check if asset names were provided and if asset names provided check if the current asset is in list.
+            # if not skip processing.
+            if asset_names and asset_name not in asset_names:
+                return
+
+            # check if asset is published and goes through approval. Some asset components like rigs get approved
+            # and have approved and work folders. Others like gpu caches don't.
+            if self.is_asset_publishable(asset_type, asset_component):
+                # loop through folders that have asset information we want
+                for asset_folder in self.app_vars.asset_folder_list:
+                    # check if path has one of the folders we want
+                    if cgt_path.find("/" + asset_folder + "/") != -1:
+                        # check if the asset dict has the asset, if not add
+                        if asset_name not in asset_info_sorted:
+                            asset_info_sorted[asset_name] = dict()
+
+                        # check if the folder has been added, if not add
+                        if asset_folder not in asset_info_sorted[asset_name]:
+                            asset_info_sorted[asset_name][asset_folder] = list()
+
+                        # add root_path for component
+                        asset_info_sorted[asset_name]['component path'] = cgt_path.split(asset_folder)[0]
+
+                        # add modified time
+                        asset_info_sorted[asset_name]['modified time'] = file_path['modify_time']
+
+                        # make sure we don't grab nested folders beneath the folders we want, first split
+                        # at the folder
+                        cgt_path_folder_parts = cgt_path.split(asset_folder)
+                        # now split after the folder so we can see if there are nested folders
+                        cgt_path_parts_after_history = cgt_path_folder_parts[1].split("/")
+                        # there are nested folders if the count is > 2, so ignore. ie when split
+                        # at '/', get ['','file] or ['','nested folder1',...]
+                        if len(cgt_path_parts_after_history) <= 2:
+                            # append file name
+                            asset_info_sorted[asset_name][asset_folder].append(cgt_path)
+                            self._add_file_modified_time(asset_info_sorted[asset_name], file_path)
+
+                        # no need to continue processing, found one of the folders we want
+                        break
+            # asset isn't publishable
+            else:
+                # split the component into a list if its multi-part like model/cache
+                component_list = asset_component.rstrip("/").split("/")
+                component_index = self._server_path_contains_asset_component(component_list, cgt_path_list)
+                # component found in path
+                if component_index:
+                    start, end = component_index
+                    if len(cgt_path_list) - end == 2:
+                        # check for asset name
+                        if asset_name not in asset_info_sorted and (asset_names is None or asset_name in asset_names):
+                            asset_info_sorted[asset_name] = {'.': [cgt_path]}
                             # add root_path for component
-                            asset_info_sorted[asset_name]['component path'] = cgt_path.split(asset_folder)[0]
-
+                            asset_info_sorted[asset_name]['component path'] = '/'.join(cgt_path.split("/")[:-1])
                             # add modified time
                             asset_info_sorted[asset_name]['modified time'] = file_path['modify_time']
+                        # asset exists
+                        else:
+                            # check if any files have been added under the asset name
+                            if '.' not in asset_info_sorted[asset_name]:
+                                asset_info_sorted[asset_name]['.'] = []
+                            asset_info_sorted[asset_name]['.'].append(cgt_path)
+                        self._add_file_modified_time(asset_info_sorted[asset_name], file_path)
 
-                            # make sure we don't grab nested folders beneath the folders we want, first split
-                            # at the folder
-                            cgt_path_folder_parts = cgt_path.split(asset_folder)
-                            # now split after the folder so we can see if there are nested folders
-                            cgt_path_parts_after_history = cgt_path_folder_parts[1].split("/")
-                            # there are nested folders if the count is > 2, so ignore. ie when split
-                            # at '/', get ['','file] or ['','nested folder1',...]
-                            if len(cgt_path_parts_after_history) <= 2:
-                                # append file name
-                                asset_info_sorted[asset_name][asset_folder].append(cgt_path)
-
-                            # no need to continue processing, found one of the folders we want
-                            break
-                # asset isn't publishable
-                else:
-                    # split the component into a list if its multi-part like model/cache
-                    component_list = asset_component.rstrip("/").split("/")
-                    component_index = self._server_path_contains_asset_component(component_list, cgt_path_list)
-                    # component found in path
-                    if component_index:
-                        start, end = component_index
-                        if len(cgt_path_list) - end == 2:
-                            # check for asset name
-                            if asset_name not in asset_info_sorted and (asset_names is None or asset_name in asset_names):
-                                asset_info_sorted[asset_name] = {'.': [cgt_path]}
-                                # add root_path for component
-                                asset_info_sorted[asset_name]['component path'] = '/'.join(cgt_path.split("/")[:-1])
-                                # add modified time
-                                asset_info_sorted[asset_name]['modified time'] = file_path['modify_time']
-                            # asset exists
-                            else:
-                                # check if any files have been added under the asset name
-                                if '.' not in asset_info_sorted[asset_name]:
-                                    asset_info_sorted[asset_name]['.'] = []
-                                asset_info_sorted[asset_name]['.'].append(cgt_path)
+    @staticmethod
+    def _add_file_modified_time(asset_files, file_path):
+        """
+        Remembers a file's server modified date with the asset's files, so downloads know it without asking the server.
+        See get_known_server_modified_dates
+        :param asset_files: an asset's files grouped by folder, see _convert_cgt_file_info_to_asset_info
+        :param file_path: a dict with the keys path and modify_time
+        """
+        if 'file modified times' not in asset_files:
+            asset_files['file modified times'] = dict()
+        asset_files['file modified times'][unicode(file_path["path"])] = file_path['modify_time']
 
-        return asset_info_sorted
+    @staticmethod
+    def _get_asset_name_from_server_path(cgt_path_list, root_path_list, asset_type):
+        """
+        Gets the asset name from a server path under the asset type's root path
+        :param cgt_path_list: the server path split at '/'
+        :param root_path_list: the path to the asset names split at '/'
+        :param asset_type: the asset type - see pyani.core.appvars.py for asset components
+        :return: the asset name, or None if the path is the root path or above the asset
+        """
+        # asset name for shot assets is different than show assets, its the sequence and shot
+        if asset_type == "shot":
+            if len(cgt_path_list) <= len(root_path_list) + 1:
+                return None
+            return "{0}/{1}".format(cgt_path_list[len(root_path_list)], cgt_path_list[len(root_path_list)+1])
+        if len(cgt_path_list) <= len(root_path_list):
+            return None
+        return cgt_path_list[len(root_path_list)]
 
     @staticmethod
     def _server_path_contains_asset_component(component_list, cgt_path):
@@ -1186,6 +2026,8 @@ class AniAssetMngr(AniCoreMngr):
             "shot",
             "audio"
         )
+        if not isinstance(audio_server_file_info, dict):
+            return audio_server_file_info
 
         # set number of threads to max - can do this since running per asset
         self.set_number_of_concurrent_threads()
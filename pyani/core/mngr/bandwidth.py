@@ -0,0 +1,338 @@
+import time
+import logging
+import threading
+import contextlib
+
+
+logger = logging.getLogger()
+
+
+class TokenBucket(object):
+    """
+    Limits a flow of bytes to a rate. The bucket fills with rate bytes a second up to rate * burst_seconds, and each
+    transfer takes its bytes out first, waiting for them when the bucket is short. A transfer bigger than the bucket
+    waits for a full bucket and leaves it in debt, so the transfers after it wait longer and the average stays at the
+    rate.
+
+    Thread safe, threads sharing a bucket share its rate.
+    """
+
+    def __init__(self, rate=0, burst_seconds=2.0):
+        """
+        :param rate: bytes per second, 0 is no limit
+        :param burst_seconds: seconds of the rate the bucket holds
+        """
+        self.burst_seconds = burst_seconds
+        self._rate = 0
+        self._tokens = 0.0
+        self._last_fill = time.time()
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+
+    def get_rate(self):
+        """
+        :return: bytes per second, 0 is no limit
+        """
+        with self._lock:
+            return self._rate
+
+    def set_rate(self, rate):
+        """
+        :param rate: bytes per second, 0 is no limit
+        """
+        with self._lock:
+            if rate == self._rate:
+                return
+            self._fill()
+            # a bucket starts full, and debt from a previous rate is forgiven when there's no limit
+            if not self._rate or not rate:
+                self._tokens = rate * self.burst_seconds
+            self._rate = rate
+            self._tokens = min(self._tokens, self._get_capacity())
+
+    def consume(self, num_bytes):
+        """
+        Takes bytes out of the bucket, waiting until it has them
+        :param num_bytes: the bytes about to be transferred
+        :return: the seconds waited
+        """
+        start_time = time.time()
+        while True:
+            with self._lock:
+                if not self._rate or num_bytes <= 0:
+                    return time.time() - start_time
+                self._fill()
+                # big transfers only wait for a full bucket, see the class description
+                needed = min(num_bytes, self._get_capacity())
+                if self._tokens >= needed:
+                    self._tokens -= num_bytes
+                    return time.time() - start_time
+                wait_seconds = (needed - self._tokens) / float(self._rate)
+            # wake up at least once a second in case the rate changed
+            time.sleep(min(wait_seconds, 1.0))
+
+    def try_consume(self, num_bytes):
+        """
+        Takes bytes out of the bucket if it has them, without waiting
+        :param num_bytes: the bytes about to be transferred
+        :return: 0.0 if the bytes were taken, otherwise the seconds until the bucket has them
+        """
+        with self._lock:
+            if not self._rate or num_bytes <= 0:
+                return 0.0
+            self._fill()
+            # big transfers only wait for a full bucket, see the class description
+            needed = min(num_bytes, self._get_capacity())
+            if self._tokens >= needed:
+                self._tokens -= num_bytes
+                return 0.0
+            return (needed - self._tokens) / float(self._rate)
+
+    def adjust(self, num_bytes):
+        """
+        Corrects the bucket without waiting, ex: when a transfer moved more or fewer bytes than it took
+        :param num_bytes: bytes to take out, negative gives bytes back
+        """
+        with self._lock:
+            if not self._rate:
+                return
+            self._fill()
+            self._tokens = min(self._tokens - num_bytes, self._get_capacity())
+
+    def _get_capacity(self):
+        """
+        Call with the lock held
+        :return: the most bytes the bucket holds
+        """
+        return self._rate * self.burst_seconds
+
+    def _fill(self):
+        """
+        Adds the bytes earned since the last fill. Call with the lock held
+        """
+        now = time.time()
+        if self._rate:
+            self._tokens = min(self._tokens + (now - self._last_fill) * self._rate, self._get_capacity())
+        self._last_fill = now
+
+
+class BandwidthLimiter(object):
+    """
+    Limits download traffic for the process, with separate budgets for downloads a user is waiting on and background
+    downloads like the nightly update. The budgets change with the time of day from a schedule, a list of periods:
+        [
+            {
+                "start": start time as h:mm AM/PM, ex: "9:00 AM",
+                "end": end time, before the start for periods over midnight,
+                "background": megabytes per second for background downloads, 0 is no limit,
+                "interactive": megabytes per second for interactive downloads, 0 is no limit
+            },
+            ...
+        ]
+    Outside the periods downloads aren't limited.
+
+    Downloads call consume() with their size before they start, and adjust() with the difference once they know the
+    actual size. Each budget is one TokenBucket shared by every thread, so the limit is for all downloads in the
+    process together. Downloads are one of the two traffic classes, set per thread with traffic_class(). Threads
+    that don't set one are background.
+
+    A download scheduler can take the budget before it starts a download with try_consume(), so downloads don't wait
+    for it while holding a download slot, and run the download in a prepaid() block so consume() doesn't take the
+    bytes twice.
+
+    Thread safe, one is shared by all managers in the process, see get_shared_bandwidth_limiter().
+    """
+
+    CLASS_INTERACTIVE = "interactive"
+    CLASS_BACKGROUND = "background"
+
+    def __init__(self, schedule=None, burst_seconds=2.0):
+        """
+        :param schedule: optional schedule of budgets, see the class description. No limits when not given
+        :param burst_seconds: seconds of a budget that can be sent at once
+        """
+        self._buckets = dict(
+            (traffic_class, TokenBucket(burst_seconds=burst_seconds))
+            for traffic_class in (self.CLASS_INTERACTIVE, self.CLASS_BACKGROUND)
+        )
+        # list of (start minute of the day, end minute, {traffic class: bytes per second})
+        self._periods = list()
+        self._lock = threading.Lock()
+        self.set_schedule(schedule)
+
+    def set_schedule(self, schedule):
+        """
+        Replaces the schedule, periods that can't be read are logged and skipped
+        :param schedule: the schedule of budgets, see the class description
+        """
+        periods = list()
+        for period in schedule or list():
+            try:
+                periods.append(
+                    (
+                        self._parse_time(period["start"]),
+                        self._parse_time(period["end"]),
+                        dict(
+                            (
+                                traffic_class,
+                                max(0, int(float(period.get(traffic_class) or 0) * 1024 * 1024))
+                            )
+                            for traffic_class in self._buckets
+                        )
+                    )
+                )
+            except (KeyError, TypeError, ValueError, AttributeError) as error:
+                logger.warning("Skipping bandwidth schedule period {0}. Error is {1}".format(period, error))
+        with self._lock:
+            self._periods = periods
+
+    def get_rate(self, traffic_class, now=None):
+        """
+        :param traffic_class: CLASS_INTERACTIVE or CLASS_BACKGROUND
+        :param now: optional time as seconds since the epoch, defaults to now
+        :return: the budget in bytes per second at the time, 0 is no limit
+        """
+        local_time = time.localtime(now if now is not None else time.time())
+        minute = local_time.tm_hour * 60 + local_time.tm_min
+        with self._lock:
+            periods = self._periods
+        for start, end, rates in periods:
+            if start <= end:
+                in_period = start <= minute < end
+            else:
+                in_period = minute >= start or minute < end
+            if in_period:
+                return rates.get(traffic_class, 0)
+        return 0
+
+    def consume(self, num_bytes, traffic_class=None):
+        """
+        Waits until the budget allows the bytes to be downloaded
+        :param num_bytes: the bytes about to be downloaded
+        :param traffic_class: optional CLASS_INTERACTIVE or CLASS_BACKGROUND, defaults to the thread's class
+        :return: the seconds waited
+        """
+        bucket = self._get_bucket(traffic_class)
+        # bytes taken before the download started, see prepaid()
+        prepaid_bytes = min(max(num_bytes, 0), getattr(_thread_state, "prepaid_bytes", 0))
+        if prepaid_bytes:
+            _thread_state.prepaid_bytes -= prepaid_bytes
+            num_bytes -= prepaid_bytes
+        waited = bucket.consume(num_bytes)
+        if waited >= 1.0:
+            logger.info(
+                "Waited {0:.1f} seconds for {1} bytes of download bandwidth at {2} bytes per second.".format(
+                    waited, num_bytes, bucket.get_rate()
+                )
+            )
+        return waited
+
+    def try_consume(self, num_bytes, traffic_class=None):
+        """
+        Takes the bytes from the budget if it allows them now, see TokenBucket.try_consume
+        :param num_bytes: the bytes about to be downloaded
+        :param traffic_class: optional CLASS_INTERACTIVE or CLASS_BACKGROUND, defaults to the thread's class
+        :return: 0.0 if the bytes were taken, otherwise the seconds until the budget allows them
+        """
+        return self._get_bucket(traffic_class).try_consume(num_bytes)
+
+    def adjust(self, num_bytes, traffic_class=None):
+        """
+        Corrects the budget once a download knows how many bytes it moved, see TokenBucket.adjust
+        :param num_bytes: bytes downloaded beyond what was consumed, negative when fewer were downloaded
+        :param traffic_class: optional CLASS_INTERACTIVE or CLASS_BACKGROUND, defaults to the thread's class
+        """
+        self._get_bucket(traffic_class).adjust(num_bytes)
+
+    def _get_bucket(self, traffic_class):
+        """
+        :param traffic_class: CLASS_INTERACTIVE, CLASS_BACKGROUND, or None for the thread's class
+        :return: the class's TokenBucket, with its rate set from the schedule
+        """
+        if traffic_class is None:
+            traffic_class = get_thread_traffic_class()
+        bucket = self._buckets[traffic_class]
+        bucket.set_rate(self.get_rate(traffic_class))
+        return bucket
+
+    @staticmethod
+    def _parse_time(time_text):
+        """
+        :param time_text: time of day as h:mm AM/PM
+        :return: minutes since midnight
+        """
+        parsed_time = time.strptime(time_text.strip(), "%I:%M %p")
+        return parsed_time.tm_hour * 60 + parsed_time.tm_min
+
+
+# the traffic class of the download running in each thread
+_thread_state = threading.local()
+
+
+def get_thread_traffic_class():
+    """
+    :return: the traffic class of the current thread's downloads, background unless set with traffic_class()
+    """
+    return getattr(_thread_state, "traffic_class", BandwidthLimiter.CLASS_BACKGROUND)
+
+
+@contextlib.contextmanager
+def traffic_class(download_class):
+    """
+    Sets the traffic class of the current thread's downloads while in the with block:
+        with traffic_class(BandwidthLimiter.CLASS_INTERACTIVE):
+            mngr.server_file_download(...)
+    :param download_class: CLASS_INTERACTIVE or CLASS_BACKGROUND
+    """
+    previous_class = getattr(_thread_state, "traffic_class", None)
+    _thread_state.traffic_class = download_class
+    try:
+        yield
+    finally:
+        if previous_class is None:
+            del _thread_state.traffic_class
+        else:
+            _thread_state.traffic_class = previous_class
+
+
+@contextlib.contextmanager
+def prepaid(limiter, num_bytes, download_class):
+    """
+    Runs the with block with bytes already taken from a budget with try_consume(), consume() calls in the block use
+    them up before taking more. Bytes the block didn't use are given back at the end
+        if not limiter.try_consume(size, BandwidthLimiter.CLASS_BACKGROUND):
+            with prepaid(limiter, size, BandwidthLimiter.CLASS_BACKGROUND):
+                mngr.server_file_download(...)
+    :param limiter: the BandwidthLimiter the bytes were taken from
+    :param num_bytes: the bytes taken
+    :param download_class: CLASS_INTERACTIVE or CLASS_BACKGROUND, the budget the bytes were taken from
+    """
+    previous_bytes = getattr(_thread_state, "prepaid_bytes", 0)
+    _thread_state.prepaid_bytes = num_bytes
+    try:
+        yield
+    finally:
+        unused_bytes = _thread_state.prepaid_bytes
+        _thread_state.prepaid_bytes = previous_bytes
+        if unused_bytes > 0:
+            limiter.adjust(-unused_bytes, download_class)
+
+
+# one for the process, so the budgets cover every manager's downloads
+_shared_bandwidth_limiter = None
+_shared_bandwidth_limiter_lock = threading.Lock()
+
+
+def get_shared_bandwidth_limiter(app_vars):
+    """
+    Gets the bandwidth limiter shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object, the default schedule and burst are taken from it
+    :return: the BandwidthLimiter
+    """
+    global _shared_bandwidth_limiter
+    with _shared_bandwidth_limiter_lock:
+        if _shared_bandwidth_limiter is None:
+            _shared_bandwidth_limiter = BandwidthLimiter(
+                schedule=app_vars.cgt_bandwidth_schedule, burst_seconds=app_vars.cgt_bandwidth_burst_seconds
+            )
+        return _shared_bandwidth_limiter
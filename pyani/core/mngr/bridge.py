@@ -0,0 +1,719 @@
+import os
+import sys
+import json
+import time
+import Queue
+import atexit
+import logging
+import threading
+import subprocess
+import pyani.core.util
+
+
+logger = logging.getLogger()
+
+
+class CGTBridgeWorker(object):
+    """
+    Client for a long lived CGT python process that runs the app bridge scripts. Instead of starting CGT's python,
+    importing the bridge and logging in for every server call, the process is started once and bridge commands are
+    sent to it over stdin / stdout. See pyani.core.mngr.cgt_bridge_worker for the process side and the protocol.
+
+    Commands are the same lists passed to pyani.core.util.call_ext_py_api and results are reported the same way, so
+    call sites can switch between the two without changing their results:
+        output, error = worker.call_ext_py_api(["cgt_file_info.py", ip, user, password, path])
+
+    The process is started on first use and restarted automatically if it dies. Requests are handled one at a time,
+    threads calling the same worker wait their turn. A request that doesn't answer within its timeout, ex: a script
+    stuck logging in to CGT, fails and the process is killed, so it doesn't hold up the requests waiting behind it.
+    The next request starts a new process.
+    """
+
+    def __init__(self, interpreter, worker_script, bridge_dir, log_path=None, timeout=None, download_timeout=None):
+        """
+        :param interpreter: the python interpreter that runs the bridge, i.e. CGT's python.exe
+        :param worker_script: path to cgt_bridge_worker.py
+        :param bridge_dir: the app bridge directory holding the cgt scripts
+        :param log_path: optional file to write the worker's stderr to, otherwise discarded
+        :param timeout: optional seconds to wait for the process to start or answer a request, None waits forever
+        :param download_timeout: optional seconds to wait for a request that downloads, defaults to timeout
+        """
+        self.interpreter = interpreter
+        self.worker_script = worker_script
+        self.bridge_dir = bridge_dir
+        self.log_path = log_path
+        self.timeout = timeout
+        self.download_timeout = download_timeout if download_timeout else timeout
+
+        self._process = None
+        self._log_file = None
+        # lines the process writes, read by a thread so reads can time out, see _read_message
+        self._output_lines = None
+        # one request / response at a time
+        self._lock = threading.Lock()
+        self._request_id = 0
+
+        # seconds spent starting the process that haven't been reported to a call's timing yet
+        self._unreported_spawn_seconds = 0.0
+
+        # stats, useful for logging and debugging
+        self.start_count = 0
+        self.requests_served = 0
+        # requests since the process started, see CGTBridgeWorkerPool for recycling
+        self.requests_since_start = 0
+        # when the last request finished, seconds since the epoch
+        self.last_used = time.time()
+
+    def is_running(self):
+        """
+        :return: True if the worker process is alive, False if not
+        """
+        return self._process is not None and self._process.poll() is None
+
+    def is_available(self):
+        """
+        Starts the worker if it isn't running
+        :return: True if the worker is running and can take requests, False if it can't be started
+        """
+        with self._lock:
+            if self.is_running():
+                return True
+            return self._start() is None
+
+    def stop(self):
+        """
+        Stops the worker process if its running
+        """
+        with self._lock:
+            self._stop()
+
+    def ping(self):
+        """
+        Checks a running worker still answers requests. A worker that doesn't is stopped, and restarted by the next
+        request
+        :return: True if the worker answered or isn't running, False if it was stopped
+        """
+        with self._lock:
+            if not self.is_running():
+                return True
+            try:
+                response = self._exchange({"ping": True}, self.timeout)
+            except (IOError, OSError, ValueError) as e:
+                logger.error("Bridge worker stopped responding. Error is {0}".format(e))
+                self._stop()
+                return False
+            if not response.get("pong"):
+                logger.error("Bridge worker gave an unexpected answer to a health check: {0}".format(response))
+                self._stop()
+                return False
+            self.last_used = time.time()
+            return True
+
+    def call_ext_py_api(self, command, timing=None):
+        """
+        Runs a bridge script in the worker. Same arguments and results as pyani.core.util.call_ext_py_api
+        :param command: External python file to run with any arguments. Must be a list:
+        ["script.py", "arg1", ...., "arg n"]
+        :param timing: optional dict, filled with the seconds spent in each phase of the call, see
+        pyani.core.mngr.telemetry for the phases
+        :return: the output from the script and any errors (from subprocess, not CGT) encountered.
+        If no output returns None and if no errors (from subprocess not CGT) returns None
+        :raises: CGTError: means an error occurred connecting or accessing CGT, contains the error
+        """
+        if not isinstance(command, list):
+            # no output, but an error
+            return None, "Invalid command format. Should be a list."
+        logger.info("Bridge worker command is: {0}".format(' '.join(command)))
+
+        response = None
+        error = None
+        wait_start = time.time()
+        with self._lock:
+            wait_seconds = time.time() - wait_start
+            # try twice, if the worker died since the last request it gets restarted and the request re-sent
+            for _ in range(2):
+                if not self.is_running():
+                    error = self._start()
+                    if error:
+                        return None, error
+                try:
+                    response = self._exchange({"command": command}, self._get_timeout([command]))
+                    break
+                except BridgeTimeoutError as e:
+                    # don't send it again, it would likely hang again
+                    error = "Bridge worker timed out. Error is {0}".format(e)
+                    logger.error(error)
+                    self._stop()
+                    break
+                except (IOError, OSError, ValueError) as e:
+                    error = "Bridge worker stopped responding. Error is {0}".format(e)
+                    logger.error(error)
+                    self._stop()
+            spawn_seconds = self._take_spawn_seconds()
+
+        if response is None:
+            return None, error
+
+        if timing is not None:
+            timing.update(self._get_phases(response.get("timing"), wait_seconds, spawn_seconds))
+
+        self.requests_served += 1
+        self.requests_since_start += 1
+        self.last_used = time.time()
+        return pyani.core.util.check_ext_py_api_output(
+            command,
+            response["returncode"],
+            self._to_str(response["output"]),
+            self._to_str(response["error"])
+        )
+
+    def call_ext_py_api_batch(self, commands, timings=None):
+        """
+        Runs several bridge scripts in one round trip to the worker. A CGT error in one command doesn't stop the
+        others.
+        :param commands: a list of commands, each in the format call_ext_py_api takes
+        :param timings: optional list of dicts, one per command, filled like call_ext_py_api's timing. Time spent
+        starting the worker and waiting for it is counted against the first command
+        :return: a list in the same order as commands. Each item is either the (output, error) tuple call_ext_py_api
+        returns, or the pyani.core.util.CGTError the command would have raised
+        """
+        if not commands:
+            return list()
+        for command in commands:
+            logger.info("Bridge worker batch command is: {0}".format(' '.join(command)))
+
+        response = None
+        error = None
+        wait_start = time.time()
+        with self._lock:
+            wait_seconds = time.time() - wait_start
+            # try twice, if the worker died since the last request it gets restarted and the request re-sent
+            for _ in range(2):
+                if not self.is_running():
+                    error = self._start()
+                    if error:
+                        return [(None, error) for _ in commands]
+                try:
+                    response = self._exchange({"batch": commands}, self._get_timeout(commands))
+                    break
+                except BridgeTimeoutError as e:
+                    # don't send it again, it would likely hang again
+                    error = "Bridge worker timed out. Error is {0}".format(e)
+                    logger.error(error)
+                    self._stop()
+                    break
+                except (IOError, OSError, ValueError) as e:
+                    error = "Bridge worker stopped responding. Error is {0}".format(e)
+                    logger.error(error)
+                    self._stop()
+            spawn_seconds = self._take_spawn_seconds()
+
+        if response is None:
+            return [(None, error) for _ in commands]
+
+        if timings is not None:
+            for index, (timing, result) in enumerate(zip(timings, response["results"])):
+                if index == 0:
+                    timing.update(self._get_phases(result.get("timing"), wait_seconds, spawn_seconds))
+                else:
+                    timing.update(self._get_phases(result.get("timing"), 0.0, 0.0))
+
+        self.requests_served += 1
+        self.requests_since_start += 1
+        self.last_used = time.time()
+        results = list()
+        for command, result in zip(commands, response["results"]):
+            try:
+                results.append(
+                    pyani.core.util.check_ext_py_api_output(
+                        command,
+                        result["returncode"],
+                        self._to_str(result["output"]),
+                        self._to_str(result["error"])
+                    )
+                )
+            except pyani.core.util.CGTError as cgt_error:
+                results.append(cgt_error)
+        return results
+
+    def _start(self):
+        """
+        Starts the worker process and waits for it to say its ready. Call with the lock held.
+        :return: None if started, error as string if not
+        """
+        self._stop()
+
+        py_command = [self.interpreter, "-u", self.worker_script, self.bridge_dir]
+        logger.info("Starting bridge worker: {0}".format(' '.join(py_command)))
+        start_time = time.time()
+
+        try:
+            if self.log_path:
+                self._log_file = open(self.log_path, "a")
+                stderr = self._log_file
+            else:
+                self._log_file = open(os.devnull, "w")
+                stderr = self._log_file
+            self._process = subprocess.Popen(
+                py_command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                universal_newlines=True
+            )
+            self._output_lines = self._start_output_reader(self._process.stdout)
+            message = self._read_message(self.timeout)
+        except (IOError, OSError, ValueError) as e:
+            self._stop()
+            error = "Could not start the bridge worker. Error is {0}".format(e)
+            logger.error(error)
+            return error
+
+        if not message.get("ready"):
+            self._stop()
+            error = "Bridge worker did not start correctly, received {0}".format(message)
+            logger.error(error)
+            return error
+
+        self.start_count += 1
+        self.requests_since_start = 0
+        self._unreported_spawn_seconds += time.time() - start_time
+        return None
+
+    @staticmethod
+    def _start_output_reader(stream):
+        """
+        Reads the process' output on a thread, so waiting for a message can time out
+        :param stream: the process' stdout
+        :return: a Queue.Queue the lines are put on, None is put when the output closes
+        """
+        output_lines = Queue.Queue()
+
+        def read_lines():
+            try:
+                for line in iter(stream.readline, ""):
+                    output_lines.put(line)
+            except (IOError, OSError, ValueError):
+                # closed when the process was stopped
+                pass
+            output_lines.put(None)
+
+        reader = threading.Thread(target=read_lines)
+        reader.daemon = True
+        reader.start()
+        return output_lines
+
+    def _get_timeout(self, commands):
+        """
+        :param commands: the commands of a request
+        :return: seconds to wait for the request, None to wait forever
+        """
+        if any(is_download_command(command) for command in commands):
+            return self.download_timeout
+        return self.timeout
+
+    def _take_spawn_seconds(self):
+        """
+        Gets the time spent starting the process since the last call reported it. Call with the lock held.
+        :return: seconds
+        """
+        spawn_seconds = self._unreported_spawn_seconds
+        self._unreported_spawn_seconds = 0.0
+        return spawn_seconds
+
+    @staticmethod
+    def _get_phases(script_timing, wait_seconds, spawn_seconds):
+        """
+        Splits a call's time into phases, see pyani.core.mngr.telemetry
+        :param script_timing: the timing the worker sent for the script, see pyani.core.mngr.cgt_bridge_worker.
+        None when the worker doesn't report timing
+        :param wait_seconds: seconds waiting for the worker to finish other calls
+        :param spawn_seconds: seconds starting the worker
+        :return: dict of phase: seconds
+        """
+        phases = {"wait": wait_seconds, "spawn": spawn_seconds}
+        if script_timing:
+            login_seconds = script_timing["login"]
+            script_seconds = script_timing["script"]
+            transfer_start = script_timing["transfer start"]
+            phases["login"] = login_seconds
+            # downloads print progress once bytes start moving, everything before that is finding the files
+            if transfer_start is None:
+                phases["listing"] = max(0.0, script_seconds - login_seconds)
+            else:
+                phases["listing"] = max(0.0, transfer_start - login_seconds)
+                phases["transfer"] = max(0.0, script_seconds - transfer_start)
+        return phases
+
+    def _stop(self):
+        """
+        Stops the worker process. Call with the lock held.
+        """
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    self._process.stdin.write(json.dumps({"quit": True}) + "\n")
+                    self._process.stdin.flush()
+                    self._process.stdin.close()
+                except (IOError, OSError, ValueError):
+                    pass
+                # give it a moment to exit on its own, then kill
+                for _ in range(20):
+                    if self._process.poll() is not None:
+                        break
+                    time.sleep(0.05)
+                if self._process.poll() is None:
+                    try:
+                        self._process.kill()
+                    except OSError:
+                        pass
+            try:
+                self._process.stdout.close()
+            except (IOError, OSError, ValueError):
+                pass
+            self._process = None
+            self._output_lines = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def _exchange(self, request, timeout=None):
+        """
+        Sends a request and waits for its response. Call with the lock held.
+        :param request: a json serializable dict
+        :param timeout: optional seconds to wait for the response, None waits forever
+        :return: the response as a dict
+        :raises: IOError if the worker died or closed its output, BridgeTimeoutError if the timeout passed
+        """
+        self._request_id += 1
+        request["id"] = self._request_id
+        self._process.stdin.write(json.dumps(request) + "\n")
+        self._process.stdin.flush()
+
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            response = self._read_message(deadline - time.time() if deadline else None)
+            if response.get("id") == request["id"]:
+                return response
+
+    def _read_message(self, timeout=None):
+        """
+        Reads the next protocol message from the worker. Anything that isn't json, for example output a bridge
+        script wrote directly to the process' stdout, is logged and skipped.
+        :param timeout: optional seconds to wait for the message, None waits forever
+        :return: the message as a dict
+        :raises: IOError if the worker closed its output, BridgeTimeoutError if the timeout passed
+        """
+        # a timer puts a marker on the queue at the deadline. Queue.get(timeout=...) would do too, but it polls in
+        # python 2 and delays every answer by up to 50 milliseconds
+        timeout_marker = None
+        timer = None
+        if timeout is not None:
+            timeout_marker = _ReadTimeout()
+            timer = threading.Timer(max(0.0, timeout), self._output_lines.put, args=(timeout_marker,))
+            timer.daemon = True
+            timer.start()
+        try:
+            while True:
+                line = self._output_lines.get()
+                if isinstance(line, _ReadTimeout):
+                    if line is timeout_marker:
+                        raise BridgeTimeoutError("Bridge worker didn't answer within {0:.0f} seconds.".format(timeout))
+                    # left by an earlier read that finished just before its deadline
+                    continue
+                if not line:
+                    raise IOError("Bridge worker closed its output, the process exited or crashed.")
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.info("Bridge worker output: {0}".format(line.rstrip()))
+                    continue
+                if isinstance(message, dict):
+                    return message
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    @staticmethod
+    def _to_str(text):
+        """
+        json gives unicode in python 2, call sites expect the same str that subprocess returns
+        :param text: the text
+        :return: text as a str
+        """
+        if sys.version_info[0] < 3 and isinstance(text, unicode):
+            return text.encode("utf-8")
+        return text
+
+
+class CGTBridgeWorkerPool(object):
+    """
+    Pool of CGTBridgeWorker processes, so server calls from different threads run in parallel instead of waiting on
+    one process. Each call is handed to an idle worker, workers are started as needed up to the pool size and calls
+    wait when all of them are busy. The pool size is separate from the managers' thread pool, which only decides how
+    many threads make calls.
+
+    Downloads can hold a worker for minutes, so when the pool has more than one worker downloads use all but one of
+    them, leaving a worker free for listings and file info.
+
+    Workers that have been idle a while are health checked before use, see CGTBridgeWorker.ping, and workers are
+    recycled - stopped and started fresh on their next request - after a number of requests so leaks in CGT's
+    modules don't build up in a process that runs all night.
+
+    Same interface as CGTBridgeWorker, call sites can use either.
+    """
+
+    def __init__(
+            self,
+            interpreter,
+            worker_script,
+            bridge_dir,
+            size=4,
+            max_requests=500,
+            health_check_seconds=60.0,
+            log_path=None,
+            timeout=None,
+            download_timeout=None
+    ):
+        """
+        :param interpreter: the python interpreter that runs the bridge, i.e. CGT's python.exe
+        :param worker_script: path to cgt_bridge_worker.py
+        :param bridge_dir: the app bridge directory holding the cgt scripts
+        :param size: most worker processes to run
+        :param max_requests: a worker is restarted after this many requests, 0 to never restart
+        :param health_check_seconds: a worker idle for longer than this is health checked before its next request
+        :param log_path: optional file to write the workers' stderr to, otherwise discarded
+        :param timeout: optional seconds a worker waits for a request, see CGTBridgeWorker
+        :param download_timeout: optional seconds a worker waits for a request that downloads, see CGTBridgeWorker
+        """
+        self.interpreter = interpreter
+        self.worker_script = worker_script
+        self.bridge_dir = bridge_dir
+        self.size = max(1, size)
+        self.max_requests = max_requests
+        self.health_check_seconds = health_check_seconds
+        self.log_path = log_path
+        self.timeout = timeout
+        self.download_timeout = download_timeout
+
+        # all workers, and the idle ones with the most recently used last
+        self._workers = list()
+        self._idle_workers = list()
+        self._busy_downloads = 0
+        self._condition = threading.Condition()
+
+    def is_running(self):
+        """
+        :return: True if any worker process is alive, False if not
+        """
+        with self._condition:
+            return any(worker.is_running() for worker in self._workers)
+
+    def is_available(self):
+        """
+        Starts a worker if none are running
+        :return: True if a worker is running and can take requests, False if one can't be started
+        """
+        if self.is_running():
+            return True
+        worker, _ = self._acquire(is_download=False)
+        try:
+            return worker.is_available()
+        finally:
+            self._release(worker, is_download=False)
+
+    def stop(self):
+        """
+        Stops all worker processes, workers busy with a call stop when it finishes
+        """
+        with self._condition:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
+
+    def call_ext_py_api(self, command, timing=None):
+        """
+        Runs a bridge script in an idle worker, see CGTBridgeWorker.call_ext_py_api
+        :param command: External python file to run with any arguments. Must be a list:
+        ["script.py", "arg1", ...., "arg n"]
+        :param timing: optional dict, filled with the seconds spent in each phase of the call. Time waiting for an
+        idle worker is counted as wait
+        :return: the output from the script and any errors (from subprocess, not CGT) encountered.
+        :raises: CGTError: means an error occurred connecting or accessing CGT, contains the error
+        """
+        if not isinstance(command, list):
+            # no output, but an error
+            return None, "Invalid command format. Should be a list."
+        is_download = is_download_command(command)
+        worker, wait_seconds = self._acquire(is_download)
+        try:
+            result = worker.call_ext_py_api(command, timing=timing)
+        finally:
+            self._release(worker, is_download)
+        if timing is not None:
+            timing["wait"] = timing.get("wait", 0.0) + wait_seconds
+        return result
+
+    def call_ext_py_api_batch(self, commands, timings=None):
+        """
+        Runs several bridge scripts in one round trip to an idle worker, see CGTBridgeWorker.call_ext_py_api_batch
+        :param commands: a list of commands, each in the format call_ext_py_api takes
+        :param timings: optional list of dicts, one per command, filled like call_ext_py_api's timing
+        :return: a list in the same order as commands of (output, error) tuples or pyani.core.util.CGTError
+        """
+        if not commands:
+            return list()
+        is_download = any(is_download_command(command) for command in commands)
+        worker, wait_seconds = self._acquire(is_download)
+        try:
+            results = worker.call_ext_py_api_batch(commands, timings=timings)
+        finally:
+            self._release(worker, is_download)
+        if timings:
+            timings[0]["wait"] = timings[0].get("wait", 0.0) + wait_seconds
+        return results
+
+    def _acquire(self, is_download):
+        """
+        Waits for an idle worker, creating one if the pool isn't full. Workers that have been idle longer than the
+        health check time are health checked
+        :param is_download: True if the worker is for a download
+        :return: a tuple of the worker and the seconds spent waiting for it
+        """
+        wait_start = time.time()
+        # leave a worker for calls that aren't downloads
+        download_limit = max(1, self.size - 1)
+        with self._condition:
+            while True:
+                if not is_download or self._busy_downloads < download_limit:
+                    if self._idle_workers:
+                        # a running worker doesn't have to start up
+                        running_workers = [worker for worker in self._idle_workers if worker.is_running()]
+                        worker = running_workers[-1] if running_workers else self._idle_workers[-1]
+                        self._idle_workers.remove(worker)
+                        break
+                    if len(self._workers) < self.size:
+                        worker = CGTBridgeWorker(
+                            self.interpreter,
+                            self.worker_script,
+                            self.bridge_dir,
+                            log_path=self.log_path,
+                            timeout=self.timeout,
+                            download_timeout=self.download_timeout
+                        )
+                        self._workers.append(worker)
+                        logger.info("Bridge worker pool has {0} of {1} workers.".format(len(self._workers), self.size))
+                        break
+                self._condition.wait()
+            if is_download:
+                self._busy_downloads += 1
+        wait_seconds = time.time() - wait_start
+
+        if worker.is_running() and time.time() - worker.last_used > self.health_check_seconds:
+            if not worker.ping():
+                logger.warning("Bridge worker failed its health check, it will be restarted.")
+        return worker, wait_seconds
+
+    def _release(self, worker, is_download):
+        """
+        Returns a worker to the pool, recycling it if it has served enough requests
+        :param worker: the worker from _acquire
+        :param is_download: True if the worker was acquired for a download
+        """
+        if self.max_requests and worker.requests_since_start >= self.max_requests:
+            logger.info("Recycling bridge worker after {0} requests.".format(worker.requests_since_start))
+            worker.stop()
+        with self._condition:
+            if is_download:
+                self._busy_downloads -= 1
+            self._idle_workers.append(worker)
+            self._condition.notify_all()
+
+
+class BridgeTimeoutError(IOError):
+    """
+    A bridge worker didn't answer a request in time
+    """
+    pass
+
+
+class _ReadTimeout(object):
+    """
+    Put on a worker's output queue when a read's deadline passes, see CGTBridgeWorker._read_message
+    """
+    pass
+
+
+def is_download_command(command):
+    """
+    :param command: a bridge command, the script followed by its arguments
+    :return: True if the command downloads files
+    """
+    return os.path.basename(command[0]).replace(".py", "") == "cgt_download"
+
+
+# worker pools shared by every manager in the process, keyed by (interpreter, worker script, bridge dir)
+_shared_workers = dict()
+_shared_workers_lock = threading.Lock()
+
+
+def find_worker_script(app_vars):
+    """
+    Finds cgt_bridge_worker.py, looks in the app bridge folder first then next to this module
+    :param app_vars: a pyani.core.appvars.AppVars object
+    :return: the path to the worker script or None if it can't be found
+    """
+    script_paths = [
+        os.path.join(app_vars.cgt_bridge_api_path, app_vars.cgt_bridge_worker_script),
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), app_vars.cgt_bridge_worker_script)
+    ]
+    for script_path in script_paths:
+        if os.path.exists(script_path):
+            return script_path
+    return None
+
+
+def get_shared_worker_pool(app_vars):
+    """
+    Gets the bridge worker pool for the app bridge in app vars, creating it if needed. Processes aren't started until
+    requests need them.
+    :param app_vars: a pyani.core.appvars.AppVars object
+    :return: a CGTBridgeWorkerPool or None if the worker script can't be found
+    """
+    worker_script = find_worker_script(app_vars)
+    if not worker_script:
+        return None
+
+    key = (app_vars.cgt_python_exe, worker_script, app_vars.cgt_bridge_api_path)
+    with _shared_workers_lock:
+        if key not in _shared_workers:
+            error = pyani.core.util.make_all_dir_in_path(app_vars.cgt_temp_file_cache_dir)
+            if error:
+                log_path = None
+            else:
+                log_path = os.path.join(app_vars.cgt_temp_file_cache_dir, "cgt_bridge_worker_log.txt")
+            _shared_workers[key] = CGTBridgeWorkerPool(
+                app_vars.cgt_python_exe,
+                worker_script,
+                app_vars.cgt_bridge_api_path,
+                size=app_vars.cgt_bridge_pool_size,
+                max_requests=app_vars.cgt_bridge_worker_max_requests,
+                health_check_seconds=app_vars.cgt_bridge_health_check_seconds,
+                log_path=log_path,
+                timeout=app_vars.cgt_bridge_timeout,
+                download_timeout=app_vars.cgt_bridge_download_timeout
+            )
+        return _shared_workers[key]
+
+
+def stop_shared_workers():
+    """
+    Stops all shared worker processes, called automatically at exit
+    """
+    with _shared_workers_lock:
+        for worker_pool in _shared_workers.values():
+            worker_pool.stop()
+        _shared_workers.clear()
+
+
+atexit.register(stop_shared_workers)
@@ -0,0 +1,88 @@
+"""
+Emulated cgt_download.py, see cgt_emulator.py.
+
+Usage:
+    python cgt_download.py server_paths local_paths ip user password [True]
+
+server_paths and local_paths are separated by commas. Each server path, a file or a directory, is downloaded into the
+local directory at the same position. When only one local directory is given, everything downloads there.
+Directories download with their contents. Pass True as the last argument to also print the local folders and files
+being downloaded so stale local files can be removed, see pyani.core.ui.CGTDownloadMonitor.
+
+Prints progress the same way as the real bridge:
+    file_total:{number of files}
+    -->file_size:{bytes}
+    -->progress: {percent} %
+"""
+from __future__ import print_function
+
+import os
+import sys
+import cgt_emulator
+
+
+def get_files_to_download(server_paths, local_dirs):
+    """
+    Pairs every server file with the local file it downloads to, expanding directories
+    :param server_paths: list of server files and directories
+    :param local_dirs: list of local directories, one per server path or a single directory for all
+    :return: a list of tuples (file in emulator tree, local file path)
+    :raises: CGTEmulatorError if a server path doesn't exist
+    """
+    files = list()
+    for index, server_path in enumerate(server_paths):
+        local_dir = local_dirs[index] if len(local_dirs) > 1 else local_dirs[0]
+        emulated_path = cgt_emulator.to_local_path(server_path)
+
+        if not os.path.exists(emulated_path):
+            raise cgt_emulator.CGTEmulatorError("{0} doesn't exist".format(server_path))
+
+        if os.path.isfile(emulated_path):
+            files.append((emulated_path, os.path.join(local_dir, os.path.basename(emulated_path))))
+            continue
+
+        for root, _, file_names in os.walk(emulated_path):
+            relative_dir = os.path.relpath(root, emulated_path)
+            for file_name in sorted(file_names):
+                local_path = os.path.normpath(os.path.join(local_dir, relative_dir, file_name))
+                files.append((os.path.join(root, file_name), local_path))
+    return files
+
+
+def print_progress(percent):
+    """
+    :param percent: percent of the current file downloaded
+    """
+    print("-->progress: {0:.1f} %".format(percent))
+    sys.stdout.flush()
+
+
+def main():
+    server_paths = sys.argv[1].split(",")
+    local_dirs = sys.argv[2].split(",")
+    # 3, 4, and 5 are ip, user and password
+    print_file_list = len(sys.argv) > 6 and sys.argv[6] == "True"
+
+    try:
+        cgt_emulator.begin_call()
+        files = get_files_to_download(server_paths, local_dirs)
+
+        if print_file_list:
+            print(
+                "file_dirs_to_dl#{0}@file_names#{1}".format(
+                    ",".join(local_dirs), ",".join(local_path for _, local_path in files)
+                )
+            )
+
+        print("file_total:{0}".format(len(files)))
+        for emulated_path, local_path in files:
+            print("-->file_size:{0}".format(os.path.getsize(emulated_path)))
+            cgt_emulator.copy_file(emulated_path, local_path, progress_callback=print_progress)
+    except cgt_emulator.CGTEmulatorError as error:
+        print("CGT Error: {0}".format(error))
+    except (IOError, OSError) as error:
+        print("CGT Error: download failed, {0}".format(error))
+
+
+if __name__ == "__main__":
+    main()
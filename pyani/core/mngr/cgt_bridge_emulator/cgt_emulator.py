@@ -0,0 +1,154 @@
+"""
+CGT bridge emulator. Stands in for the app bridge (cgt_file_info.py, cgt_download.py, cgt_show_info.py and
+cgt_get_notes.py) using a local directory tree instead of the CGT cloud, so the managers in pyani.core.mngr can be
+run, profiled and debugged without a connection to CGT. The scripts in this folder take the same arguments and
+print the same output as the real app bridge scripts.
+
+Like cgt_bridge_worker.py this only uses the standard library, and works with python 2 and 3.
+
+To use, set the environment variable PYANI_CGT_BRIDGE_API_PATH to this folder. pyani.core.appvars.AppVars then uses
+it as the app bridge, and runs it with the current python instead of CGT's. The emulator is configured with
+environment variables:
+
+    PYANI_CGT_EMULATOR_ROOT - the local directory that stands in for the CGT cloud. The server path
+                              /LongGong/assets/char is {root}/LongGong/assets/char. Defaults to the working directory
+    PYANI_CGT_EMULATOR_LATENCY - seconds added to every call, either one number or a range as min,max. Default 0
+    PYANI_CGT_EMULATOR_FAILURE_RATE - chance from 0.0 to 1.0 that a call fails with a CGT error. Default 0
+    PYANI_CGT_EMULATOR_BANDWIDTH - download speed in bytes per second, 0 is unlimited. Default 0
+    PYANI_CGT_EMULATOR_SEED - seeds the latency and failures so runs can be repeated
+
+The options the emulator supports beyond the original app bridge's are listed in cgt_bridge_capabilities.json, which
+pyani.core.appvars.AppVars reads to turn on the features that need them. The real app bridge ships the same file once
+its scripts support the options.
+
+Data the file tree can't hold:
+    {root}/cgt_show_info.json - sequence and shot info in the format cgt_show_info.py writes. When missing the
+                                sequences and shots are taken from the folders in {root}/LongGong/sequences
+    {root}/cgt_notes/{Component}/{asset name}.txt - release notes returned by cgt_get_notes.py
+"""
+
+import os
+import time
+import random
+from datetime import datetime
+
+
+# the date format cgt uses for modified dates, in UTC
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# frame range used when the show info isn't provided
+DEFAULT_FRAME_RANGE = (1001, 1100)
+# how much of a file to copy at a time when downloading
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class CGTEmulatorError(Exception):
+    """
+    An emulated CGT error. Scripts print these the way the real bridge prints CGT errors, so that pyani raises a
+    pyani.core.util.CGTError
+    """
+    pass
+
+
+def _get_float_env(name, default=0.0):
+    """
+    :param name: the environment variable name
+    :param default: value to use if the variable isn't set or isn't a number
+    :return: the variable's value as a float
+    """
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# module level so that the persistent worker, which imports this once, keeps the same random sequence across calls
+_random = random.Random(os.environ.get("PYANI_CGT_EMULATOR_SEED"))
+
+
+def get_root():
+    """
+    :return: the local directory that stands in for the CGT cloud
+    """
+    return os.path.abspath(os.environ.get("PYANI_CGT_EMULATOR_ROOT", os.getcwd()))
+
+
+def to_local_path(server_path):
+    """
+    Converts a server path to a path in the emulator's directory tree
+    :param server_path: a cgt path like /LongGong/assets/char
+    :return: the path on disk
+    """
+    parts = [part for part in server_path.replace("\\", "/").split("/") if part]
+    return os.path.join(get_root(), *parts)
+
+
+def to_server_path(local_path):
+    """
+    Converts a path in the emulator's directory tree to a server path
+    :param local_path: a path under the emulator root
+    :return: the cgt path like /LongGong/assets/char
+    """
+    relative_path = os.path.relpath(local_path, get_root())
+    return "/" + "/".join(relative_path.split(os.sep))
+
+
+def format_modified_date(local_path):
+    """
+    :param local_path: a path under the emulator root
+    :return: the last modified date in UTC as a string in the format cgt uses, pyani parses server dates as UTC, see
+    pyani.core.mngr.core.AniCoreMngr._is_mirror_copy_current
+    """
+    return datetime.utcfromtimestamp(os.path.getmtime(local_path)).strftime(DATE_FORMAT)
+
+
+def begin_call():
+    """
+    Call at the start of every script. Waits for the configured latency and randomly fails at the configured rate
+    :raises: CGTEmulatorError when the call should fail
+    """
+    latency = os.environ.get("PYANI_CGT_EMULATOR_LATENCY", "0")
+    try:
+        if "," in latency:
+            low, high = [float(value) for value in latency.split(",")]
+            seconds = _random.uniform(low, high)
+        else:
+            seconds = float(latency)
+    except ValueError:
+        seconds = 0.0
+    if seconds > 0.0:
+        time.sleep(seconds)
+
+    if _random.random() < _get_float_env("PYANI_CGT_EMULATOR_FAILURE_RATE"):
+        raise CGTEmulatorError("emulated connection failure")
+
+
+def copy_file(local_src, local_dst, progress_callback=None):
+    """
+    Copies a file in chunks, throttled to the configured bandwidth
+    :param local_src: the file in the emulator's tree
+    :param local_dst: where to copy it
+    :param progress_callback: optional function called with the percent copied after each chunk
+    """
+    bandwidth = _get_float_env("PYANI_CGT_EMULATOR_BANDWIDTH")
+    file_size = os.path.getsize(local_src)
+    bytes_copied = 0
+
+    dst_dir = os.path.dirname(local_dst)
+    if dst_dir and not os.path.exists(dst_dir):
+        os.makedirs(dst_dir)
+
+    with open(local_src, "rb") as src, open(local_dst, "wb") as dst:
+        while True:
+            chunk = src.read(DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            dst.write(chunk)
+            bytes_copied += len(chunk)
+            if bandwidth > 0.0:
+                time.sleep(len(chunk) / bandwidth)
+            if progress_callback:
+                progress_callback(100.0 * bytes_copied / file_size)
+
+    # empty files never enter the loop
+    if progress_callback and not file_size:
+        progress_callback(100.0)
@@ -0,0 +1,148 @@
+"""
+Emulated cgt_file_info.py, see cgt_emulator.py.
+
+Usage:
+    python cgt_file_info.py ip user password server_path [options]
+
+Options:
+    --no_walk=True - only list the path's contents, don't walk sub directories
+    --file_mode=files|dirs|files_and_dirs - what to list, defaults to files
+    --is_file=True - prints True if the path is a file, False if its a directory
+    --path_exists=True - prints True if the path exists, False if not
+    --modified_date=True - prints the last modified date in the format yyyy-mm-dd hh:mm:ss
+    --file_size=True - prints the file size in bytes
+    --folder_filter=folder --temp_file=path - writes json file info, a list of dicts with the keys path and
+    modify_time, for every file and folder under the server path that has the folder in its path
+    an empty folder filter writes file info for everything under the server path
+    --line_delimited=True - with --folder_filter, writes one json dict per line instead of a json list
+    --modified_since="yyyy-mm-dd hh:mm:ss" - with --folder_filter, only writes file info for files and folders
+    modified at or after the date
+
+Listings are printed as server paths separated by commas.
+"""
+from __future__ import print_function
+
+import os
+import json
+import argparse
+import cgt_emulator
+
+
+def list_path(local_path, file_mode, walk):
+    """
+    Lists a directory in the emulator's tree
+    :param local_path: the directory on disk
+    :param file_mode: files, dirs, or files_and_dirs
+    :param walk: True to include sub directories' contents
+    :return: a sorted list of server paths
+    """
+    paths = list()
+    for root, dir_names, file_names in os.walk(local_path):
+        if file_mode in ("dirs", "files_and_dirs"):
+            paths.extend(os.path.join(root, dir_name) for dir_name in dir_names)
+        if file_mode in ("files", "files_and_dirs"):
+            paths.extend(os.path.join(root, file_name) for file_name in file_names)
+        if not walk:
+            break
+    return sorted(cgt_emulator.to_server_path(path) for path in paths)
+
+
+def iter_filtered_file_info(local_path, folder_filter, modified_since=None):
+    """
+    Walks the path for file info of everything that has the folder in its path
+    :param local_path: the directory on disk
+    :param folder_filter: the folder to look for, ex: rig or model/cache. An empty string matches everything
+    :param modified_since: optional date as a string yyyy-mm-dd hh:mm:ss, skips anything modified before it
+    :return: yields a dict with the keys path and modify_time
+    """
+    folder = "/{0}/".format(folder_filter.strip("/")) if folder_filter.strip("/") else "/"
+    for root, dir_names, file_names in os.walk(local_path):
+        dir_names.sort()
+        for name in dir_names + sorted(file_names):
+            path = os.path.join(root, name)
+            server_path = cgt_emulator.to_server_path(path)
+            if folder in server_path + "/":
+                modify_time = cgt_emulator.format_modified_date(path)
+                # dates in this format sort the same as strings
+                if modified_since and modify_time < modified_since:
+                    continue
+                yield {
+                    "path": server_path,
+                    "modify_time": modify_time
+                }
+
+
+def write_filtered_file_info(local_path, folder_filter, temp_file, line_delimited=False, modified_since=None):
+    """
+    Writes file info for everything under the path that has the folder in its path
+    :param local_path: the directory on disk
+    :param folder_filter: the folder to look for, ex: rig or model/cache
+    :param temp_file: the json file to write
+    :param line_delimited: True writes one json dict per line as the tree is walked, False writes a json list
+    :param modified_since: optional date as a string yyyy-mm-dd hh:mm:ss, skips anything modified before it
+    """
+    file_info_records = iter_filtered_file_info(local_path, folder_filter, modified_since=modified_since)
+    temp_dir = os.path.dirname(temp_file)
+    if temp_dir and not os.path.exists(temp_dir):
+        os.makedirs(temp_dir)
+    with open(temp_file, "w") as json_file:
+        if line_delimited:
+            for file_info in file_info_records:
+                json_file.write(json.dumps(file_info) + "\n")
+        else:
+            json.dump(list(file_info_records), json_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulated CGT file information.")
+    parser.add_argument("ip")
+    parser.add_argument("user")
+    parser.add_argument("password")
+    parser.add_argument("server_path")
+    parser.add_argument("--no_walk", default="False")
+    parser.add_argument("--file_mode", default="files")
+    parser.add_argument("--is_file", default="False")
+    parser.add_argument("--path_exists", default="False")
+    parser.add_argument("--modified_date", default="False")
+    parser.add_argument("--file_size", default="False")
+    parser.add_argument("--folder_filter", default=None)
+    parser.add_argument("--temp_file", default=None)
+    parser.add_argument("--line_delimited", default="False")
+    parser.add_argument("--modified_since", default=None)
+    args = parser.parse_args()
+
+    try:
+        cgt_emulator.begin_call()
+        local_path = cgt_emulator.to_local_path(args.server_path)
+
+        if args.path_exists == "True":
+            print(os.path.exists(local_path))
+            return
+
+        if not os.path.exists(local_path):
+            raise cgt_emulator.CGTEmulatorError("{0} doesn't exist".format(args.server_path))
+
+        if args.is_file == "True":
+            print(os.path.isfile(local_path))
+        elif args.modified_date == "True":
+            print(cgt_emulator.format_modified_date(local_path))
+        elif args.file_size == "True":
+            print(os.path.getsize(local_path))
+        elif args.folder_filter is not None and args.temp_file:
+            write_filtered_file_info(
+                local_path,
+                args.folder_filter,
+                args.temp_file,
+                line_delimited=args.line_delimited == "True",
+                modified_since=args.modified_since
+            )
+        else:
+            paths = list_path(local_path, args.file_mode, walk=not args.no_walk == "True")
+            if paths:
+                print(",".join(paths))
+    except cgt_emulator.CGTEmulatorError as error:
+        print("CGT Error: {0}".format(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Emulated cgt_get_notes.py, see cgt_emulator.py.
+
+Usage:
+    python cgt_get_notes.py Component asset_name ip user password
+
+Prints the release notes stored in {emulator root}/cgt_notes/{Component}/{asset_name}.txt, prints nothing when the
+asset has no notes.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import cgt_emulator
+
+
+def main():
+    asset_component = sys.argv[1]
+    asset_name = sys.argv[2]
+    # 3, 4, and 5 are ip, user and password
+
+    try:
+        cgt_emulator.begin_call()
+        notes_path = os.path.join(cgt_emulator.get_root(), "cgt_notes", asset_component, asset_name + ".txt")
+        if os.path.exists(notes_path):
+            with open(notes_path, "r") as notes_file:
+                sys.stdout.write(notes_file.read())
+    except cgt_emulator.CGTEmulatorError as error:
+        print("CGT Error: {0}".format(error))
+    except (IOError, OSError) as error:
+        print("CGT Error: could not read notes, {0}".format(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Emulated cgt_show_info.py, see cgt_emulator.py.
+
+Usage:
+    python cgt_show_info.py json_out_path ip user password
+
+Writes the show's sequences and shots to json_out_path in the format:
+    {
+        "seq040": [
+            {"shot": "shot010", "first_frame": 1001, "last_frame": 1100},
+            ...
+        ],
+        ...
+    }
+
+Uses {emulator root}/cgt_show_info.json when it exists, otherwise every sequence and shot folder under
+/LongGong/sequences with a default frame range.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import json
+import cgt_emulator
+
+
+def get_show_info():
+    """
+    :return: the sequences and shots as a dict, see module doc for format
+    """
+    show_info_path = os.path.join(cgt_emulator.get_root(), "cgt_show_info.json")
+    if os.path.exists(show_info_path):
+        with open(show_info_path, "r") as json_file:
+            return json.load(json_file)
+
+    show_info = dict()
+    sequences_path = cgt_emulator.to_local_path("/LongGong/sequences")
+    if not os.path.isdir(sequences_path):
+        return show_info
+
+    first_frame, last_frame = cgt_emulator.DEFAULT_FRAME_RANGE
+    for seq in sorted(os.listdir(sequences_path)):
+        seq_path = os.path.join(sequences_path, seq)
+        if not seq.startswith("seq") or not os.path.isdir(seq_path):
+            continue
+        show_info[seq] = [
+            {"shot": shot, "first_frame": first_frame, "last_frame": last_frame}
+            for shot in sorted(os.listdir(seq_path))
+            if shot.startswith("shot") and os.path.isdir(os.path.join(seq_path, shot))
+        ]
+    return show_info
+
+
+def main():
+    json_out_path = sys.argv[1]
+    # 2, 3, and 4 are ip, user and password
+
+    try:
+        cgt_emulator.begin_call()
+        show_info = get_show_info()
+
+        out_dir = os.path.dirname(json_out_path)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        with open(json_out_path, "w") as json_file:
+            json.dump(show_info, json_file, indent=4)
+    except cgt_emulator.CGTEmulatorError as error:
+        print("CGT Error: {0}".format(error))
+    except (IOError, OSError, ValueError) as error:
+        print("CGT Error: could not get show info, {0}".format(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Persistent CGT bridge worker. Runs inside the CGT python interpreter and executes the app bridge scripts
+(cgt_file_info.py, cgt_download.py, ...) in process, so the interpreter start up, module imports and CGT login
+only happen once instead of once per server call.
+
+This file is standalone on purpose - it only uses the standard library so that it can be run by CGT's python
+without pyani on the path. See pyani.core.mngr.bridge for the client side.
+
+Usage:
+    python.exe -u cgt_bridge_worker.py {path to app bridge directory}
+
+Protocol - one json object per line over stdin / stdout:
+    worker sends on start up:
+        {"ready": true}
+    request:
+        {"id": 1, "command": ["cgt_file_info.py", "arg1", ... "arg n"]}
+    response:
+        {"id": 1, "returncode": 0, "output": "whatever the script printed", "error": "whatever went to stderr",
+         "timing": {"script": seconds the script ran, "login": seconds of that spent logging in to CGT,
+                    "transfer start": seconds until the script printed its first progress line, or null}}
+    several commands in one round trip, results are in the same order as the commands:
+        {"id": 2, "batch": [["cgt_file_info.py", "arg1", ...], ["cgt_file_info.py", "arg1", ...], ...]}
+        {"id": 2, "results": [{"returncode": 0, "output": "...", "error": "..."}, ...]}
+    to check the worker is healthy, it answers without running a script:
+        {"id": 3, "ping": true}
+        {"id": 3, "pong": true}
+    to stop the worker send:
+        {"id": 4, "quit": true}
+"""
+
+import os
+import sys
+import json
+import time
+import runpy
+import importlib
+import threading
+import traceback
+
+try:
+    # python 2, accepts both str and unicode
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+# seconds spent logging in to CGT since the worker started, see make_cached_login
+login_seconds = [0.0]
+# the cached logins the running script used, as (sessions dict, key), so they can be dropped if it fails. Scripts
+# run one at a time, see run_script
+script_logins = list()
+
+# the CGT modules with a login class, see cache_cgt_logins
+CGT_MODULE_NAMES = ("cgtw2", "cgtw")
+
+
+class TimedOutput(StringIO):
+    """
+    Captures a script's output and notes when it printed its first progress line (starting with -->), which is
+    when a download starts moving bytes
+    """
+
+    def __init__(self):
+        StringIO.__init__(self)
+        self.first_progress_time = None
+
+    def write(self, text):
+        if self.first_progress_time is None and "-->" in text:
+            self.first_progress_time = time.time()
+        StringIO.write(self, text)
+
+
+def make_cached_login(login_class):
+    """
+    Makes a replacement for a CGT login class that returns the same session for the same login arguments. Sessions
+    a failing script used are dropped, see drop_script_logins
+    :param login_class: CGT's login class, ex: cgtw2.tw
+    :return: a function that takes the same arguments as the login class
+    """
+    sessions = dict()
+    # a lock per login, so a slow login only holds up scripts logging in with the same arguments
+    login_locks = dict()
+    login_locks_lock = threading.Lock()
+
+    def cached_login(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        script_logins.append((sessions, key))
+        session = sessions.get(key)
+        if session is not None:
+            return session
+        with login_locks_lock:
+            login_lock = login_locks.setdefault(key, threading.Lock())
+        with login_lock:
+            if key not in sessions:
+                start_time = time.time()
+                sessions[key] = login_class(*args, **kwargs)
+                login_seconds[0] += time.time() - start_time
+        return sessions[key]
+
+    cached_login.pyani_cached = True
+    return cached_login
+
+
+def drop_script_logins():
+    """
+    Forgets the cached sessions the running script used, so the next script logs in again. Called when a script
+    fails, its session may have timed out on the CGT server
+    """
+    for sessions, key in script_logins:
+        sessions.pop(key, None)
+
+
+def has_cgt_error(output):
+    """
+    :param output: what a script printed
+    :return: True if the script printed a CGT error, checked the same way as pyani.core.util.check_ext_py_api_output
+    """
+    for line in output.split("\n"):
+        if ("Error" in line or "error" in line) and ("cgt" in line or "CGT" in line):
+            return True
+    return False
+
+
+def cache_module_logins(module):
+    """
+    Wraps a CGT module's login class with make_cached_login, if it isn't already
+    :param module: the imported cgtw2 or cgtw module
+    """
+    login_class = getattr(module, "tw", None)
+    # not a login class or already wrapped
+    if login_class is None or getattr(login_class, "pyani_cached", False):
+        return
+    module.tw = make_cached_login(login_class)
+
+
+class CGTLoginImportHook(object):
+    """
+    Wraps CGT's login class as soon as a bridge script imports the CGT module. The scripts add CGT's folders to
+    sys.path themselves before importing it, so the module can't be imported and wrapped when the worker starts.
+    Uses the finder / loader api of sys.meta_path that both python 2 and CGT's python 3 support.
+    """
+
+    def __init__(self):
+        # modules being imported by the hook, so the import it does itself isn't handled again
+        self._importing = set()
+
+    def find_module(self, fullname, path=None):
+        if fullname in CGT_MODULE_NAMES and fullname not in self._importing:
+            return self
+        return None
+
+    def load_module(self, fullname):
+        module = sys.modules.get(fullname)
+        if module is None:
+            self._importing.add(fullname)
+            try:
+                module = importlib.import_module(fullname)
+            finally:
+                self._importing.discard(fullname)
+        cache_module_logins(module)
+        return module
+
+
+def cache_cgt_logins():
+    """
+    Wraps CGT's login class so that repeated logins with the same ip, user and password reuse the first session
+    instead of logging in again. The bridge scripts log in every time they run, this makes that free after the
+    first request. CGT modules already imported are wrapped now, the others when a script imports them, see
+    CGTLoginImportHook
+    """
+    if not any(isinstance(finder, CGTLoginImportHook) for finder in sys.meta_path):
+        sys.meta_path.insert(0, CGTLoginImportHook())
+    for module_name in CGT_MODULE_NAMES:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            cache_module_logins(module)
+
+
+def run_script(bridge_dir, command):
+    """
+    Runs a bridge script in this interpreter as if it was called from the command line
+    :param bridge_dir: the app bridge directory, used when the script path is not absolute
+    :param command: a list, the script followed by its arguments
+    :return: a dict with the return code, whatever the script wrote to stdout and stderr, and the script's timing
+    """
+    script = command[0]
+    if not os.path.isabs(script):
+        script = os.path.join(bridge_dir, script)
+
+    old_argv = sys.argv
+    old_stdout = sys.stdout
+    old_stderr = sys.stderr
+    output = TimedOutput()
+    error = StringIO()
+    returncode = 0
+    start_time = time.time()
+    login_seconds_before = login_seconds[0]
+    del script_logins[:]
+
+    sys.argv = [script] + [str(arg) for arg in command[1:]]
+    sys.stdout = output
+    sys.stderr = error
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        # mimic the interpreter's handling of sys.exit()
+        if e.code is None:
+            returncode = 0
+        elif isinstance(e.code, int):
+            returncode = e.code
+        else:
+            error.write(str(e.code))
+            returncode = 1
+    except Exception:
+        error.write(traceback.format_exc())
+        returncode = 1
+    finally:
+        sys.argv = old_argv
+        sys.stdout = old_stdout
+        sys.stderr = old_stderr
+        # in case the script imported CGT in a way the import hook didn't see, ex: from a zip
+        cache_cgt_logins()
+
+    # the bridge scripts catch CGT's errors and print them, so a printed CGT error counts as failing too
+    if returncode or has_cgt_error(output.getvalue()):
+        drop_script_logins()
+    del script_logins[:]
+
+    if output.first_progress_time is None:
+        transfer_start = None
+    else:
+        transfer_start = output.first_progress_time - start_time
+
+    return {
+        "returncode": returncode,
+        "output": output.getvalue(),
+        "error": error.getvalue(),
+        "timing": {
+            "script": time.time() - start_time,
+            "login": login_seconds[0] - login_seconds_before,
+            "transfer start": transfer_start
+        }
+    }
+
+
+def send(stream, message):
+    """
+    writes one message to the protocol stream
+    :param stream: the stream to write to, the real stdout
+    :param message: a json serializable dict
+    """
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def main():
+    bridge_dir = os.path.normpath(sys.argv[1])
+    # so bridge scripts can import their helper modules
+    if bridge_dir not in sys.path:
+        sys.path.insert(0, bridge_dir)
+
+    # keep references to the real streams, scripts get their own while running
+    protocol_in = sys.stdin
+    protocol_out = sys.stdout
+
+    cache_cgt_logins()
+
+    send(protocol_out, {"ready": True})
+
+    while True:
+        line = protocol_in.readline()
+        # client closed the pipe
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            send(protocol_out, {"id": None, "returncode": 1, "output": "", "error": "Invalid request: {0}".format(e)})
+            continue
+
+        if request.get("quit"):
+            break
+
+        if request.get("ping"):
+            send(protocol_out, {"id": request.get("id"), "pong": True})
+            continue
+
+        if "batch" in request:
+            response = {"results": [run_script(bridge_dir, command) for command in request["batch"]]}
+        else:
+            response = run_script(bridge_dir, request["command"])
+        response["id"] = request.get("id")
+        send(protocol_out, response)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import pyani.core.util
+
+
+logger = logging.getLogger()
+
+
+class AdaptiveConcurrencyController(object):
+    """
+    Picks how many server calls to run at once from how the server calls are doing, rather than the number of cores.
+    Every server call reports its operation, its time and whether it failed, see AniCoreMngr.call_bridge_api, and
+    downloads report their bytes. A call's time doesn't include time spent queued for a bridge worker, only the
+    server's share. Calls are grouped into rounds of about one call per running thread, and after each round the
+    level is adjusted additive increase / multiplicative decrease style:
+        - a round with failed calls, or an operation whose calls are much slower than its baseline (the fastest
+          rounds seen for that operation), means the server or network is overloaded, so the level is cut by the
+          decrease factor
+        - otherwise the level goes up by one, as long as the last increase got more throughput. When it didn't,
+          the level stays put since more threads aren't helping
+
+    Each operation has its own baseline, since a download normally takes much longer than a listing or file info
+    call and a round that is mostly downloads isn't slow.
+
+    The level and the baseline call times are saved so the next run starts where this one left off.
+
+    Thread safe, one controller is shared by all managers in the process, see get_shared_concurrency_controller().
+    """
+
+    def __init__(
+            self,
+            state_path,
+            start_level=3,
+            min_level=1,
+            max_level=16,
+            decrease_factor=0.5,
+            latency_factor=2.0,
+            min_gain=0.05
+    ):
+        """
+        :param state_path: json file the level is saved to
+        :param start_level: the level to use when there isn't a saved level
+        :param min_level: least calls to run at once
+        :param max_level: most calls to run at once
+        :param decrease_factor: the level is multiplied by this when the server is overloaded
+        :param latency_factor: a round whose median call time is this many times the baseline is overloaded
+        :param min_gain: fraction more throughput an increase must get to keep increasing
+        """
+        self.state_path = state_path
+        self.min_level = min_level
+        self.max_level = max_level
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.min_gain = min_gain
+
+        self._lock = threading.Lock()
+        self._changed = False
+        # median call time of the fastest rounds in seconds per operation, {operation: seconds}
+        self._baseline_latencies = dict()
+        self._level = start_level
+        self._load()
+        self._level = max(self.min_level, min(self.max_level, self._level))
+
+        # the current round
+        self._round_start = time.time()
+        self._round_latencies = list()
+        self._round_errors = 0
+        self._round_bytes = 0
+        # throughput of the last round, None after a decrease
+        self._last_throughput = None
+
+    def get_level(self):
+        """
+        :return: how many server calls to run at once
+        """
+        with self._lock:
+            return self._level
+
+    def record(self, duration, succeeded=True, operation=None):
+        """
+        Records a finished server call
+        :param duration: seconds the call took, not counting time queued for a bridge worker
+        :param succeeded: False if the call failed
+        :param operation: the kind of call, ex: download, see pyani.core.mngr.telemetry.TransferTelemetry. Calls are
+        compared to the baseline of their operation
+        :return: the level, which changes when this call ends a round
+        """
+        with self._lock:
+            self._round_latencies.append((operation, duration))
+            if not succeeded:
+                self._round_errors += 1
+            if len(self._round_latencies) >= max(self._level, 4):
+                self._end_round()
+            return self._level
+
+    def record_bytes(self, num_bytes):
+        """
+        Records bytes downloaded, used to measure throughput
+        :param num_bytes: the number of bytes
+        """
+        with self._lock:
+            self._round_bytes += num_bytes
+
+    def save(self):
+        """
+        Saves the level to disk if it changed
+        :return: None or error as string
+        """
+        with self._lock:
+            if not self._changed:
+                return None
+            state_dir = os.path.dirname(self.state_path)
+            if state_dir and not os.path.exists(state_dir):
+                error = pyani.core.util.make_all_dir_in_path(state_dir)
+                if error:
+                    return error
+            error = pyani.core.util.write_json(
+                self.state_path,
+                {"level": self._level, "baseline latencies": self._baseline_latencies},
+                indent=1
+            )
+            if not error:
+                self._changed = False
+            return error
+
+    def _end_round(self):
+        """
+        Adjusts the level from the round's calls and starts a new round. Call with the lock held.
+        """
+        round_time = max(time.time() - self._round_start, 0.001)
+        # {operation: median seconds of the round's calls}
+        operation_latencies = dict()
+        for operation, duration in self._round_latencies:
+            operation_latencies.setdefault(operation, list()).append(duration)
+        median_latencies = dict(
+            (operation, sorted(latencies)[len(latencies) // 2]) for operation, latencies in operation_latencies.items()
+        )
+        # the operations slower than their baseline, as (operation, median, baseline)
+        slow_operations = [
+            (operation, median_latency, self._baseline_latencies[operation])
+            for operation, median_latency in sorted(median_latencies.items())
+            if self._baseline_latencies.get(operation) and
+            median_latency > self._baseline_latencies[operation] * self.latency_factor
+        ]
+        # bytes per second when downloading, otherwise calls per second
+        if self._round_bytes:
+            throughput = self._round_bytes / round_time
+        else:
+            throughput = len(self._round_latencies) / round_time
+
+        old_level = self._level
+        if self._round_errors:
+            self._decrease("{0} of {1} calls failed".format(self._round_errors, len(self._round_latencies)))
+        elif slow_operations:
+            operation, median_latency, baseline_latency = slow_operations[0]
+            self._decrease(
+                "{0} calls took {1:.2f}s, usually {2:.2f}s".format(operation, median_latency, baseline_latency)
+            )
+        elif self._last_throughput is None or throughput > self._last_throughput * (1.0 + self.min_gain):
+            self._level = min(self.max_level, self._level + 1)
+
+        # the baselines follow the fastest rounds, and drift slowly towards slower ones so a lucky fast round, or a
+        # server that got slower for good, doesn't keep the level down forever
+        if not self._round_errors:
+            for operation, median_latency in median_latencies.items():
+                baseline_latency = self._baseline_latencies.get(operation)
+                if baseline_latency is None or median_latency < baseline_latency:
+                    self._baseline_latencies[operation] = median_latency
+                else:
+                    self._baseline_latencies[operation] += (median_latency - baseline_latency) * 0.1
+            self._changed = True
+        if not self._level == old_level:
+            logger.info("Running {0} server calls at once, was {1}.".format(self._level, old_level))
+            self._changed = True
+
+        # throughput at a lower level isn't comparable, so the next round can increase again
+        if self._level < old_level:
+            self._last_throughput = None
+        else:
+            self._last_throughput = throughput
+        self._round_start = time.time()
+        self._round_latencies = list()
+        self._round_errors = 0
+        self._round_bytes = 0
+
+    def _decrease(self, reason):
+        """
+        Cuts the level because the server is overloaded. Call with the lock held.
+        :param reason: why, for the log
+        """
+        logger.warning("Server calls are struggling, {0}. Running fewer at once.".format(reason))
+        self._level = max(self.min_level, int(self._level * self.decrease_factor))
+
+    def _load(self):
+        """
+        Loads the saved level and baseline call times
+        """
+        if not os.path.exists(self.state_path):
+            return
+        state = pyani.core.util.load_json(self.state_path)
+        if not isinstance(state, dict):
+            return
+        if isinstance(state.get("level"), int):
+            self._level = state["level"]
+        if isinstance(state.get("baseline latencies"), dict):
+            self._baseline_latencies = dict(
+                (operation, latency) for operation, latency in state["baseline latencies"].items()
+                if isinstance(latency, float)
+            )
+
+
+# one controller for the process, all managers call the same server
+_shared_controller = None
+_shared_controller_lock = threading.Lock()
+
+
+def get_shared_concurrency_controller(app_vars):
+    """
+    Gets the concurrency controller shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object, the settings are taken from it
+    :return: the AdaptiveConcurrencyController
+    """
+    global _shared_controller
+    with _shared_controller_lock:
+        if _shared_controller is None:
+            # threads above the server's download limit would only wait in the download scheduler, see
+            # pyani.core.mngr.core.AniDownloadScheduler
+            max_level = app_vars.cgt_concurrency_max
+            endpoint_limit = app_vars.cgt_download_endpoint_limits.get(app_vars.cgt_ip)
+            if endpoint_limit:
+                max_level = max(app_vars.cgt_concurrency_min, min(max_level, endpoint_limit))
+            _shared_controller = AdaptiveConcurrencyController(
+                app_vars.cgt_concurrency_state_path,
+                start_level=app_vars.cgt_concurrency_start,
+                min_level=app_vars.cgt_concurrency_min,
+                max_level=max_level
+            )
+        return _shared_controller
+
+
+def save_shared_concurrency_controller():
+    """
+    Saves the shared controller's level if one was created, called automatically at exit
+    """
+    if _shared_controller is not None:
+        error = _shared_controller.save()
+        if error:
+            logger.error("Could not save the server concurrency level. Error is {0}".format(error))
+
+
+atexit.register(save_shared_concurrency_controller)
@@ -0,0 +1,227 @@
+import os
+import atexit
+import hashlib
+import logging
+import threading
+import pyani.core.util
+import pyani.core.mngr.machine_lock
+
+
+logger = logging.getLogger()
+
+
+class ContentStore(object):
+    """
+    Index of downloaded files by their content, so when a file's content is already on disk under another path it
+    can be hard linked or copied instead of downloaded again. The same audio, camera and rig files are often on the
+    server under several shot or asset paths, with the store only the first one is downloaded.
+
+    Content is identified by a key made from the server's size and modified date and the server path, see get_key().
+    The name, size and modified second alone aren't enough, different files can share them. CGT doesn't give
+    checksums, so the same file under several server paths is only found when a checksum is passed instead. The
+    downloaded files themselves are the store, no extra copy is kept. Stored on disk as json in the format:
+        {
+            content key: [
+                {
+                    "local path": a downloaded file with the content,
+                    "size": its size in bytes,
+                    "local modify time": its modified time on disk, seconds since the epoch
+                },
+                ...
+            ]
+        }
+
+    A file is only used if it still has the recorded size and modified time, so local files that were deleted or
+    edited are skipped and forgotten.
+
+    Thread safe. Changes are kept in memory until save() is called, and saved automatically at exit. Processes share
+    the index file, save() merges this process's changes with the index on disk while holding a lock file, so
+    processes saving at the same time keep each other's entries.
+    """
+
+    def __init__(self, index_path, max_copies=4, lock_timeout=10.0):
+        """
+        :param index_path: the json file holding the index
+        :param max_copies: most local files to remember per key, the oldest are forgotten first
+        :param lock_timeout: seconds save() waits for another process saving the index
+        """
+        self.index_path = index_path
+        self.max_copies = max_copies
+        self.lock_timeout = lock_timeout
+        self._entries = None
+        # keys changed since the last save
+        self._changed_keys = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(server_path, modify_time, size, checksum=None):
+        """
+        Makes the content key for a server file
+        :param server_path: the file's server path
+        :param modify_time: the server's modified date as a string, yyyy-mm-dd hh:mm:ss
+        :param size: the server's size in bytes
+        :param checksum: optional checksum of the content, used instead of the other values when given
+        :return: the key as a string
+        """
+        if checksum:
+            return "checksum:{0}".format(checksum)
+        path_hash = hashlib.sha1(server_path.lower().encode("utf-8")).hexdigest()
+        return "{0}:{1}:{2}".format(size, modify_time, path_hash)
+
+    def find(self, key, exclude_path=None):
+        """
+        Finds a local file with the content
+        :param key: the content key, see get_key()
+        :param exclude_path: optional local path to ignore, ex: the file being replaced
+        :return: the local file path, or None if no current copy is on disk
+        """
+        with self._lock:
+            copies = self._get_entries().get(key)
+            if not copies:
+                return None
+            current_copies = [copy_info for copy_info in copies if self._is_unchanged(copy_info)]
+            if not len(current_copies) == len(copies):
+                self._set_copies(key, current_copies)
+        for copy_info in current_copies:
+            if exclude_path and os.path.normpath(copy_info["local path"]) == os.path.normpath(exclude_path):
+                continue
+            return copy_info["local path"]
+        return None
+
+    def add(self, key, local_path):
+        """
+        Records a local file with the content
+        :param key: the content key, see get_key()
+        :param local_path: the local file path
+        """
+        try:
+            size = os.path.getsize(local_path)
+            local_modify_time = os.path.getmtime(local_path)
+        except (IOError, OSError):
+            # nothing to record
+            return
+        with self._lock:
+            copies = [
+                copy_info for copy_info in self._get_entries().get(key, list())
+                if not os.path.normpath(copy_info["local path"]) == os.path.normpath(local_path)
+            ]
+            copies.append({"local path": local_path, "size": size, "local modify time": local_modify_time})
+            self._set_copies(key, copies[-self.max_copies:])
+
+    def save(self):
+        """
+        Merges the changes into the index on disk, if there are any
+        :return: None or error as string
+        """
+        with self._lock:
+            if not self._changed_keys:
+                return None
+            index_dir = os.path.dirname(self.index_path)
+            if not os.path.exists(index_dir):
+                error = pyani.core.util.make_all_dir_in_path(index_dir)
+                if error:
+                    return error
+
+            lock = pyani.core.mngr.machine_lock.MachineLock(
+                self.index_path + ".lock", name="content store", stale_seconds=self.lock_timeout * 3
+            )
+            if not lock.acquire(timeout=self.lock_timeout):
+                return "Could not save {0}, another process held it for {1} seconds.".format(
+                    self.index_path, self.lock_timeout
+                )
+            try:
+                # another process may have saved entries since the index was loaded
+                entries = self._load_index()
+                for key in self._changed_keys:
+                    copies = self._entries.get(key)
+                    if not copies:
+                        entries.pop(key, None)
+                        continue
+                    local_paths = set(os.path.normpath(copy_info["local path"]) for copy_info in copies)
+                    other_copies = [
+                        copy_info for copy_info in entries.get(key, list())
+                        if not os.path.normpath(copy_info["local path"]) in local_paths and
+                        self._is_unchanged(copy_info)
+                    ]
+                    entries[key] = (other_copies + copies)[-self.max_copies:]
+                error = pyani.core.util.write_json(self.index_path, entries, indent=1)
+            finally:
+                lock.release()
+            if not error:
+                self._entries = entries
+                self._changed_keys = set()
+            return error
+
+    @staticmethod
+    def _is_unchanged(copy_info):
+        """
+        :param copy_info: a local file's entry in the index
+        :return: True if the file is on disk with the recorded size and modified time, False if not
+        """
+        try:
+            return os.path.getsize(copy_info["local path"]) == copy_info["size"] and \
+                os.path.getmtime(copy_info["local path"]) == copy_info["local modify time"]
+        except (IOError, OSError):
+            return False
+
+    def _set_copies(self, key, copies):
+        """
+        Sets the local files for a key. Call with the lock held.
+        :param key: the content key
+        :param copies: list of local file entries, the key is removed when empty
+        """
+        if copies:
+            self._entries[key] = copies
+        else:
+            self._entries.pop(key, None)
+        self._changed_keys.add(key)
+
+    def _get_entries(self):
+        """
+        Loads the index off disk the first time its needed. Call with the lock held.
+        :return: the entries as a dict
+        """
+        if self._entries is None:
+            self._entries = self._load_index()
+        return self._entries
+
+    def _load_index(self):
+        """
+        :return: the index on disk as a dict, empty if it doesn't exist or can't be read
+        """
+        if os.path.exists(self.index_path):
+            data = pyani.core.util.load_json(self.index_path)
+        else:
+            data = None
+        return data if isinstance(data, dict) else dict()
+
+
+# one store for the process, managers share the same file
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_content_store(app_vars):
+    """
+    Gets the content store shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object
+    :return: the ContentStore
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ContentStore(app_vars.cgt_content_store_path)
+        return _shared_store
+
+
+def save_shared_content_store():
+    """
+    Saves the shared store if one was created, called automatically at exit
+    """
+    if _shared_store is not None:
+        error = _shared_store.save()
+        if error:
+            logger.error("Could not save the download content store. Error is {0}".format(error))
+
+
+atexit.register(save_shared_content_store)
@@ -1,8 +1,17 @@
 import os
+import json
+import shutil
 import logging
 import re
 import mmap
+import fnmatch
 import time
+import heapq
+import calendar
+import itertools
+import functools
+import threading
+import collections
 from datetime import datetime
 # need to import _strptime for multi-threading, a known python 2.7 bug
 import _strptime
@@ -10,6 +19,17 @@ import pyani.core.appvars
 import pyani.core.anivars
 import pyani.core.ui
 import pyani.core.util
+import pyani.core.mngr.bridge
+import pyani.core.mngr.listing_cache
+import pyani.core.mngr.download_manifest
+import pyani.core.mngr.download_journal
+import pyani.core.mngr.content_store
+import pyani.core.mngr.concurrency
+import pyani.core.mngr.telemetry
+import pyani.core.mngr.machine_lock
+import pyani.core.mngr.path_map
+import pyani.core.mngr.bandwidth
+import pyani.core.mngr.server_ops
 
 # set the environment variable to use a specific wrapper
 # it can be set to pyqt, pyqt5, pyside or pyside2 (not implemented yet)
@@ -23,6 +43,294 @@ from PyQt4.QtCore import pyqtSignal
 logger = logging.getLogger()
 
 
+class AniDownloadScheduler(object):
+    """
+    Orders and limits download workers. Instead of starting every download worker on the thread pool at once, in
+    whatever order they were created, workers are queued here and started in priority order while staying under a
+    global limit and a limit per endpoint (the server a download comes from).
+
+    Priority classes, highest first:
+        PRIORITY_METADATA - small files other work depends on, ex: cgt_metadata.json
+        PRIORITY_INTERACTIVE - downloads a user is waiting on in a gui
+        PRIORITY_BACKGROUND - unattended syncs, ex: the nightly update or review download
+        PRIORITY_PREFETCH - files and data nothing is waiting on yet, ex: release notes, see
+        AniCoreMngr.prefetch_server_files and AniCoreMngr.prefetch_server_data
+
+    Within a class, jobs run smallest first (ORDER_SMALLEST_FIRST) or earliest deadline first (ORDER_DEADLINE). Jobs
+    without a size or deadline run after the ones that have one, in the order they were submitted.
+
+    Usage - make the worker and connect its signals, then submit instead of calling thread_pool.start():
+        worker = pyani.core.ui.Worker(...)
+        worker.signals.finished.connect(...)
+        scheduler.submit(worker, priority=AniDownloadScheduler.PRIORITY_INTERACTIVE, size=1024)
+
+    When submitting several downloads at once, submit them in a with block, which calls hold() and release(), so the
+    whole batch is ordered before any of it starts, and the scheduler isn't left held if a submit raises:
+        with scheduler:
+            for worker, size in downloads:
+                scheduler.submit(worker, size=size)
+
+    With a bandwidth limiter, a job with a size only starts once its traffic class's budget has the bytes, see
+    pyani.core.mngr.bandwidth. Waiting for the budget happens in the queue, so a throttled background download doesn't
+    hold a download slot that a metadata or interactive download could use.
+
+    get_queue_depth(), get_eta() and get_status_text() report progress for progress windows. Thread safe.
+    """
+
+    PRIORITY_METADATA = 0
+    PRIORITY_INTERACTIVE = 1
+    PRIORITY_BACKGROUND = 2
+    PRIORITY_PREFETCH = 3
+
+    ORDER_SMALLEST_FIRST = "smallest first"
+    ORDER_DEADLINE = "deadline"
+
+    def __init__(
+            self,
+            thread_pool,
+            max_concurrent=None,
+            endpoint_limits=None,
+            order=ORDER_SMALLEST_FIRST,
+            bandwidth_limiter=None
+    ):
+        """
+        :param thread_pool: the QThreadPool to run workers on
+        :param max_concurrent: the most downloads to run at once across all endpoints. Defaults to, and is never
+        more than, the thread pool's max thread count
+        :param endpoint_limits: dict of {endpoint: most downloads to run at once from that endpoint}. Endpoints not
+        in the dict are only limited by max_concurrent
+        :param order: ORDER_SMALLEST_FIRST or ORDER_DEADLINE, how jobs are ordered within a priority class
+        :param bandwidth_limiter: optional pyani.core.mngr.bandwidth.BandwidthLimiter, jobs wait in the queue for
+        their bytes
+        """
+        self.thread_pool = thread_pool
+        self.max_concurrent = max_concurrent
+        self.endpoint_limits = endpoint_limits if endpoint_limits else dict()
+        self.order = order
+        self.bandwidth_limiter = bandwidth_limiter
+
+        # heap of (sort key, job)
+        self._queue = list()
+        # endpoint: number of downloads running
+        self._running = collections.defaultdict(int)
+        self._running_total = 0
+        # ties within a class run in submission order
+        self._job_counter = itertools.count()
+        self._lock = threading.Lock()
+        # while held, submitted jobs are queued but not started, see hold()
+        self._hold_count = 0
+        # starts jobs waiting for the bandwidth budget once it has their bytes, see _dispatch()
+        self._bandwidth_timer = None
+
+        # recent job run times in seconds, used to estimate time left
+        self._job_times = collections.deque(maxlen=50)
+
+    def submit(self, worker, priority=PRIORITY_BACKGROUND, size=None, endpoint=None, deadline=None):
+        """
+        Queues a download worker, it starts as soon as limits allow
+        :param worker: a pyani.core.ui.Worker that downloads, connect its signals before submitting
+        :param priority: one of the PRIORITY class variables
+        :param size: optional, the download size in bytes, used for smallest first ordering
+        :param endpoint: optional, the server the download comes from, used for per endpoint limits
+        :param deadline: optional, time from time.time() the download should be done by, used for deadline ordering
+        """
+        job = _DownloadJob(worker, priority, size, endpoint, deadline, self._get_traffic_class(priority))
+        # free the job's slot when the download function returns, in the worker's thread, so the next job starts
+        # without waiting on the gui event loop
+        worker.fn = self._make_job_function(job, worker.fn)
+
+        if self.order == self.ORDER_DEADLINE:
+            order_value = deadline
+        else:
+            order_value = size
+        # jobs without a size or deadline go last in their class
+        sort_key = (priority, order_value is None, order_value, next(self._job_counter))
+
+        with self._lock:
+            heapq.heappush(self._queue, (sort_key, job))
+            self._dispatch()
+
+    def hold(self):
+        """
+        Stops queued jobs from starting until release() is called, jobs already running aren't affected
+        """
+        with self._lock:
+            self._hold_count += 1
+
+    def release(self):
+        """
+        Undoes a hold() and starts queued jobs if there are no other holds
+        """
+        with self._lock:
+            self._hold_count = max(0, self._hold_count - 1)
+            self._dispatch()
+
+    def __enter__(self):
+        self.hold()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.release()
+
+    def get_queue_depth(self):
+        """
+        :return: the number of downloads waiting to start
+        """
+        with self._lock:
+            return len(self._queue)
+
+    def get_running_count(self):
+        """
+        :return: the number of downloads running
+        """
+        with self._lock:
+            return self._running_total
+
+    def get_eta(self):
+        """
+        Estimates the time left for queued and running downloads from the run time of recent downloads
+        :return: seconds left as a float, or None if no downloads have finished yet to estimate from
+        """
+        with self._lock:
+            if not self._job_times:
+                return None
+            jobs_left = len(self._queue) + self._running_total
+            average_time = sum(self._job_times) / len(self._job_times)
+            return average_time * jobs_left / float(self._get_job_capacity())
+
+    def get_status_text(self):
+        """
+        :return: the queue depth and time left as a string for progress windows, empty string if nothing is queued
+        """
+        queue_depth = self.get_queue_depth()
+        if not queue_depth:
+            return ""
+        status = "{0} downloads queued".format(queue_depth)
+        eta = self.get_eta()
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            status += ", about {0}m {1:02d}s left".format(minutes, seconds)
+        return status
+
+    def _get_max_concurrent(self):
+        """
+        :return: the most downloads that can run at once
+        """
+        pool_max = self.thread_pool.maxThreadCount()
+        if self.max_concurrent:
+            return max(1, min(self.max_concurrent, pool_max))
+        return max(1, pool_max)
+
+    def _get_job_capacity(self):
+        """
+        The most downloads that can run at once for the jobs queued and running, the global limit or, when all jobs
+        come from endpoints with limits, the sum of those limits if less. Call with the lock held.
+        :return: the number of downloads
+        """
+        max_concurrent = self._get_max_concurrent()
+        endpoints = set(job.endpoint for _, job in self._queue)
+        endpoints.update(endpoint for endpoint, running in self._running.items() if running)
+        endpoint_capacity = 0
+        for endpoint in endpoints:
+            endpoint_capacity += self.endpoint_limits.get(endpoint) or max_concurrent
+        if not endpoint_capacity:
+            return max_concurrent
+        return max(1, min(max_concurrent, endpoint_capacity))
+
+    def _dispatch(self):
+        """
+        Starts queued jobs while under the limits, highest priority first. Jobs whose endpoint is at its limit stay
+        queued without holding up jobs for other endpoints. Jobs whose bandwidth budget is short stay queued too,
+        along with the rest of their traffic class so smaller jobs don't keep using up the budget a bigger job is
+        waiting for, and are dispatched again once the budget has their bytes. Call with the lock held.
+        """
+        if self._hold_count:
+            return
+        blocked = list()
+        # traffic class: seconds until its budget has the bytes for the job waiting
+        bandwidth_waits = dict()
+        while self._queue and self._running_total < self._get_max_concurrent():
+            sort_key, job = heapq.heappop(self._queue)
+            limit = self.endpoint_limits.get(job.endpoint)
+            if (limit and self._running[job.endpoint] >= limit) or job.traffic_class in bandwidth_waits:
+                blocked.append((sort_key, job))
+                continue
+            if self.bandwidth_limiter and job.size:
+                wait_seconds = self.bandwidth_limiter.try_consume(job.size, job.traffic_class)
+                if wait_seconds > 0:
+                    bandwidth_waits[job.traffic_class] = wait_seconds
+                    blocked.append((sort_key, job))
+                    continue
+                job.prepaid_bytes = job.size
+            self._running[job.endpoint] += 1
+            self._running_total += 1
+            self.thread_pool.start(job.worker)
+
+        for item in blocked:
+            heapq.heappush(self._queue, item)
+
+        if bandwidth_waits and self._bandwidth_timer is None:
+            self._bandwidth_timer = threading.Timer(min(bandwidth_waits.values()), self._dispatch_after_bandwidth_wait)
+            self._bandwidth_timer.daemon = True
+            self._bandwidth_timer.start()
+
+    def _dispatch_after_bandwidth_wait(self):
+        """
+        Starts jobs that were waiting for the bandwidth budget, runs on a timer thread
+        """
+        with self._lock:
+            self._bandwidth_timer = None
+            self._dispatch()
+
+    def _get_traffic_class(self, priority):
+        """
+        :param priority: one of the PRIORITY class variables
+        :return: the bandwidth traffic class of a job with the priority, downloads a user is waiting on use the
+        interactive budget, see pyani.core.mngr.bandwidth
+        """
+        if priority <= self.PRIORITY_INTERACTIVE:
+            return pyani.core.mngr.bandwidth.BandwidthLimiter.CLASS_INTERACTIVE
+        return pyani.core.mngr.bandwidth.BandwidthLimiter.CLASS_BACKGROUND
+
+    def _make_job_function(self, job, fn):
+        """
+        Wraps a worker's function so the job's slot is freed and the next job started when it returns
+        :param job: the _DownloadJob
+        :param fn: the worker's function
+        :return: the wrapped function
+        """
+        def run_job(*args, **kwargs):
+            start_time = time.time()
+            try:
+                # the bytes taken from the budget when the job was dispatched aren't taken again by the download
+                with pyani.core.mngr.bandwidth.traffic_class(job.traffic_class), \
+                        pyani.core.mngr.bandwidth.prepaid(self.bandwidth_limiter, job.prepaid_bytes, job.traffic_class):
+                    return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._job_times.append(time.time() - start_time)
+                    self._running[job.endpoint] -= 1
+                    self._running_total -= 1
+                    self._dispatch()
+        return run_job
+
+
+class _DownloadJob(object):
+    """
+    A download waiting in or run by AniDownloadScheduler
+    """
+
+    def __init__(self, worker, priority, size, endpoint, deadline, traffic_class):
+        self.worker = worker
+        self.priority = priority
+        self.size = size
+        self.endpoint = endpoint
+        self.deadline = deadline
+        self.traffic_class = traffic_class
+        # bytes taken from the bandwidth budget when dispatched, see AniDownloadScheduler._dispatch
+        self.prepaid_bytes = 0
+
+
 class AniCoreMngr(QtCore.QObject):
     """
     Class to manage getting server data. Currently configured to connect to CGT and use
@@ -50,6 +358,18 @@ class AniCoreMngr(QtCore.QObject):
     finished_tracking = pyqtSignal(object)
     # error message for other classes to receive when doing any local file operations
     error_thread_signal = pyqtSignal(object)
+    # signal that lets other objects know a background refresh of the local cache finished, passes None or the error,
+    # see revalidate_local_cache
+    cache_revalidated_signal = pyqtSignal(object)
+    # hands a finished revalidation from the server thread to the gui thread
+    _cache_revalidation_done_signal = pyqtSignal(object)
+    # signal that passes what changed in the local cache when a sync finishes, see get_local_cache_changes
+    cache_changes_signal = pyqtSignal(object)
+
+    # download temp folders: the number of downloads in the process using them, shared by every manager, see
+    # _hold_download_temp_dirs
+    _download_temp_dir_users = collections.Counter()
+    _download_temp_dir_lock = threading.Lock()
 
     def __init__(self):
         QtCore.QObject.__init__(self)
@@ -63,25 +383,208 @@ class AniCoreMngr(QtCore.QObject):
         self.threads_done = 0.0
         self.thread_error_occurred = False
 
+        # server listings shared by all managers, see server_get_dir_list
+        self.listing_cache = pyani.core.mngr.listing_cache.get_shared_listing_cache(self.app_vars)
+        # files already downloaded and unchanged on the server are skipped, see server_file_download
+        self.download_manifest = pyani.core.mngr.download_manifest.get_shared_download_manifest(self.app_vars)
+        # downloads in progress, so an interrupted download can be resumed, see server_file_download
+        self.download_journal = pyani.core.mngr.download_journal.get_shared_download_journal(self.app_vars)
+        self._recover_interrupted_downloads()
+        # downloaded files by content, so the same file under another server path isn't downloaded twice, see
+        # server_file_download
+        self.content_store = pyani.core.mngr.content_store.get_shared_content_store(self.app_vars)
+        # how many files and bytes were skipped, for reports. Reset with reset_download_skip_stats()
+        self.download_skip_stats = self._new_download_skip_stats()
+        self._download_skip_stats_lock = threading.Lock()
+        # download bandwidth budgets, see server_file_download
+        self.bandwidth_limiter = pyani.core.mngr.bandwidth.get_shared_bandwidth_limiter(self.app_vars)
+        self.load_bandwidth_schedule()
+        # orders and limits download threads, see submit_download()
+        self.download_scheduler = AniDownloadScheduler(
+            self.thread_pool,
+            max_concurrent=self.app_vars.cgt_download_max_concurrent,
+            endpoint_limits=self.app_vars.cgt_download_endpoint_limits,
+            order=self.app_vars.cgt_download_order,
+            bandwidth_limiter=self.bandwidth_limiter
+        )
+        # picks the thread count from how server calls are doing, see set_number_of_concurrent_threads
+        self.concurrency_controller = pyani.core.mngr.concurrency.get_shared_concurrency_controller(self.app_vars)
+        # True when the thread count follows the concurrency controller, False when a caller set a count
+        self._use_adaptive_concurrency = False
+        # times and sizes of server calls, see call_bridge_api
+        self.telemetry = pyani.core.mngr.telemetry.get_shared_telemetry()
+        # server to local path conversions, see convert_server_path_to_local_server_representation
+        self.path_map = pyani.core.mngr.path_map.get_shared_path_map(self.app_vars)
+        # label shown in the progress window, download status is added below it
+        self.progress_label = ""
+        # the manager syncing the local cache in the background, None when not revalidating, see
+        # revalidate_local_cache
+        self._revalidation_mngr = None
+        self._cache_revalidation_done_signal.connect(self._cache_revalidation_done)
+        # the machine wide lock held while this manager syncs its cache, see start_local_cache_sync_with_lock
+        self._cache_sync_lock = None
+        # the cache before a sync and the keys the sync updates, see take_local_cache_snapshot
+        self._cache_snapshot = None
+        self._cache_sync_updated_keys = list()
+
         # this allows the ui time to display info about this task. Some tasks/methods run very fast, and never
         # show in ui as being run. This is purely cosmetic, so user sees the task running. The time below is in
         # seconds
         self.time_to_pause_for_ui = 1.0
 
-        # for reporting progress
-        self.progress_win = QtWidgets.QProgressDialog()
-        self.progress_win.hide()
+        # for reporting progress, made the first time it's used so managers used without a gui, ex: by
+        # pyani.core.mngr.server_ops, don't need a QApplication
+        self._progress_win = None
+
+    @property
+    def progress_win(self):
+        """
+        :return: the QProgressDialog the gui methods report progress in
+        """
+        if self._progress_win is None:
+            self._progress_win = QtWidgets.QProgressDialog()
+            self._progress_win.hide()
+        return self._progress_win
 
     def set_number_of_concurrent_threads(self, thread_num=None):
         """
-        Sets the pyqt thread count. Caps at the pyqt thread max count, which is number of cores on machine.
+        Sets the pyqt thread count. When no count is given, the count comes from the concurrency controller and
+        changes as server calls finish, see pyani.core.mngr.concurrency. The controller's count is capped by its
+        maximum rather than the number of cores, since threads spend their time waiting on the server.
         :param thread_num: an integer number for the amount of threads to run concurrently
         """
-        if not thread_num or thread_num > self.thread_pool.maxThreadCount():
-            self.thread_pool.setMaxThreadCount(self.thread_pool.maxThreadCount())
+        if not thread_num:
+            self._use_adaptive_concurrency = True
+            self.thread_pool.setMaxThreadCount(self.concurrency_controller.get_level())
             logger.info("Multi-threading with %d threads" % self.thread_pool.maxThreadCount())
         else:
-            self.thread_pool.setMaxThreadCount(thread_num)
+            self._use_adaptive_concurrency = False
+            self.thread_pool.setMaxThreadCount(min(thread_num, QtCore.QThread.idealThreadCount()))
+
+    def _record_server_call(self, start_time, succeeded, operation, wait_seconds=0.0, num_calls=1):
+        """
+        Reports a finished server call to the concurrency controller, and follows the controller's new thread count
+        if it changed
+        :param start_time: the time.time() the call started
+        :param succeeded: False if the call failed
+        :param operation: the kind of call, see pyani.core.mngr.telemetry.TransferTelemetry.get_operation_name
+        :param wait_seconds: seconds the call was queued for a bridge worker, not counted as the call's time
+        :param num_calls: for a batch, the number of calls in it. The time per call is recorded so batches of any
+        size compare to the same baseline
+        """
+        duration = max(time.time() - start_time - wait_seconds, 0.0) / max(num_calls, 1)
+        level = self.concurrency_controller.record(duration, succeeded=succeeded, operation=operation)
+        if self._use_adaptive_concurrency and not level == self.thread_pool.maxThreadCount():
+            self.thread_pool.setMaxThreadCount(level)
+
+    def call_bridge_api(self, command):
+        """
+        Runs an app bridge script. Uses the pool of long lived bridge workers shared by all managers when it's enabled
+        and can be started, otherwise starts a new CGT python process for the call. See pyani.core.mngr.bridge. The call
+        is timed for the concurrency controller and the transfer telemetry, see pyani.core.mngr.telemetry
+        :param command: the bridge script followed by its arguments, see pyani.core.util.call_ext_py_api
+        :return: the output from the script and any errors (from subprocess, not CGT) encountered.
+        If no output returns None and if no errors (from subprocess not CGT) returns None
+        :raises: CGTError: means an error occurred connecting or accessing CGT, contains the error
+        """
+        start_time = time.time()
+        succeeded = False
+        # phases of the call, only the bridge worker reports them
+        timing = dict()
+        try:
+            if self.app_vars.cgt_use_persistent_bridge:
+                worker = pyani.core.mngr.bridge.get_shared_worker_pool(self.app_vars)
+                if worker and worker.is_available():
+                    output, error = worker.call_ext_py_api(command, timing=timing)
+                    succeeded = not error
+                    return output, error
+                logger.warning("Bridge worker unavailable, starting a new process for the call.")
+            output, error = pyani.core.util.call_ext_py_api(command, interpreter=self.app_vars.cgt_python_exe)
+            succeeded = not error
+            return output, error
+        except pyani.core.util.CGTError as error:
+            # asking about a file that isn't there is an answer, not a failed call
+            succeeded = self._is_missing_file_error(error)
+            raise
+        finally:
+            self._record_server_call(
+                start_time, succeeded, self.telemetry.get_operation_name(command), wait_seconds=timing.get("wait", 0.0)
+            )
+            self.telemetry.record(
+                self.telemetry.get_operation_name(command),
+                time.time() - start_time,
+                phases=timing,
+                succeeded=succeeded
+            )
+
+    def call_bridge_api_batch(self, commands):
+        """
+        Runs several app bridge scripts in one round trip to the bridge worker. Falls back to a new CGT python
+        process per command when the worker is disabled or can't be started. Each command is recorded in the
+        transfer telemetry on its own
+        :param commands: a list of commands, each in the format call_bridge_api takes
+        :return: a list in the same order as commands. Each item is either the (output, error) tuple call_bridge_api
+        returns, or the pyani.core.util.CGTError the command would have raised
+        """
+        start_time = time.time()
+        results = list()
+        timings = [dict() for _ in commands]
+        # seconds each command took, when run one at a time
+        seconds = list()
+        try:
+            if self.app_vars.cgt_use_persistent_bridge:
+                worker = pyani.core.mngr.bridge.get_shared_worker_pool(self.app_vars)
+                if worker and worker.is_available():
+                    results = worker.call_ext_py_api_batch(commands, timings=timings)
+                    return results
+                logger.warning("Bridge worker unavailable, starting a new process for each call in the batch.")
+
+            for command in commands:
+                command_start_time = time.time()
+                try:
+                    results.append(pyani.core.util.call_ext_py_api(command, interpreter=self.app_vars.cgt_python_exe))
+                except pyani.core.util.CGTError as error:
+                    results.append(error)
+                seconds.append(time.time() - command_start_time)
+            return results
+        finally:
+            succeeded_list = [
+                self._is_missing_file_error(result) if isinstance(result, pyani.core.util.CGTError) else not result[1]
+                for result in results
+            ]
+            # a batch is one server call, it failed if any command failed for a reason other than a missing file.
+            # Batches are their own operation, a batch call has overhead single calls don't
+            operations = set(self.telemetry.get_operation_name(command) for command in commands)
+            self._record_server_call(
+                start_time,
+                len(results) == len(commands) and all(succeeded_list),
+                "{0} batch".format(operations.pop() if len(operations) == 1 else "mixed"),
+                wait_seconds=sum(timing.get("wait", 0.0) for timing in timings),
+                num_calls=len(commands)
+            )
+
+            batch_seconds = time.time() - start_time
+            for index, (command, succeeded) in enumerate(zip(commands, succeeded_list)):
+                if index < len(seconds):
+                    command_seconds = seconds[index]
+                elif timings[index]:
+                    command_seconds = sum(timings[index].values())
+                else:
+                    command_seconds = batch_seconds / len(commands)
+                self.telemetry.record(
+                    self.telemetry.get_operation_name(command),
+                    command_seconds,
+                    phases=timings[index],
+                    succeeded=succeeded
+                )
+
+    @staticmethod
+    def _is_missing_file_error(error):
+        """
+        :param error: a pyani.core.util.CGTError
+        :return: True if the error is CGT saying a file doesn't exist
+        """
+        return not str(error).find("doesn't exist") == -1
 
     def reset_thread_counters(self):
         """
@@ -92,6 +595,42 @@ class AniCoreMngr(QtCore.QObject):
         self.thread_total = 0.0
         self.threads_done = 0.0
 
+    def save_transfer_telemetry(self, file_path):
+        """
+        Saves the times and sizes of this process' server calls to a json file, see pyani.core.mngr.telemetry.
+        Telemetry is only for troubleshooting, so a failed save is logged rather than reported
+        :param file_path: the json file
+        """
+        error = self.telemetry.save(file_path)
+        if error:
+            logger.error("Could not save the transfer telemetry. Error is {0}".format(error))
+        else:
+            logger.info("Saved transfer telemetry to {0}".format(file_path))
+
+    def reset_download_skip_stats(self):
+        """
+        resets the count of files and bytes skipped because they were unchanged, already on disk under another
+        path or copied from the local server mirror, see server_file_download
+        """
+        with self._download_skip_stats_lock:
+            self.download_skip_stats = self._new_download_skip_stats()
+
+    @staticmethod
+    def _new_download_skip_stats():
+        """
+        :return: the download skip stats with nothing skipped. files and bytes are for unchanged files, deduplicated
+        files and bytes for files linked or copied from another download, mirror files and bytes for files copied
+        from the local server mirror
+        """
+        return {
+            "files": 0,
+            "bytes": 0,
+            "deduplicated files": 0,
+            "deduplicated bytes": 0,
+            "mirror files": 0,
+            "mirror bytes": 0
+        }
+
     def get_preference(self, app, category, pref_name):
         """
         Get's preference value if exists, otherwise creates preference file with default preference values
@@ -173,6 +712,21 @@ class AniCoreMngr(QtCore.QObject):
 
         return None
 
+    def load_bandwidth_schedule(self):
+        """
+        Sets the download bandwidth budgets from the schedule in the preferences, see pyani.core.mngr.bandwidth. The
+        default schedule in AppVars cgt_bandwidth_schedule is kept when the preferences don't have one
+        """
+        # don't create the preferences file, managers are made by tools that don't use preferences
+        if not os.path.exists(self.app_vars.preferences_filename):
+            return
+        pref_data = self._load_preferences()
+        if not pref_data:
+            return
+        schedule = pyani.core.util.find_val_in_nested_dict(pref_data, ["downloads", "bandwidth", "schedule"])
+        if isinstance(schedule, list):
+            self.bandwidth_limiter.set_schedule(schedule)
+
     def _create_preferences(self):
         """
         Creates the preference file when it doesn't exist
@@ -524,7 +1078,7 @@ class AniCoreMngr(QtCore.QObject):
             self.app_vars.cgt_pass
         ]
         try:
-            output, error = pyani.core.util.call_ext_py_api(dl_command)
+            output, error = self.call_bridge_api(dl_command)
             # error from trying to open subprocess
             if error:
                 error_fmt = "Error occurred launching subprocess. Error is {0}".format(error)
@@ -654,6 +1208,310 @@ class AniCoreMngr(QtCore.QObject):
         """
         print ("virutal method, implement")
 
+    def get_local_cache_path(self):
+        """
+        :return: the path of the manager's cache of server data, None when the manager doesn't keep one. Managers
+        with a cache override this
+        """
+        return None
+
+    def load_local_cache(self):
+        """
+        Loads the manager's cache off disk. Managers with a cache override this
+        :return: None or error as string
+        """
+        return None
+
+    def start_local_cache_sync(self, server_ops):
+        """
+        Syncs the manager's cache with the server and saves it without a gui, see revalidate_local_cache. Managers
+        with a cache override this
+        :param server_ops: a pyani.core.mngr.server_ops.ServerOperations
+        :return: a pyani.core.mngr.server_ops.ServerFuture for a list of errors, already finished with an error for
+        managers without a cache
+        """
+        future = pyani.core.mngr.server_ops.ServerFuture()
+        future.set_result(["{0} doesn't keep a local cache.".format(self.__class__.__name__)])
+        return future
+
+    def get_local_cache_data(self):
+        """
+        :return: the manager's cache of server data as a dict in the format {type: {sub type: {name: info}}}, ex: for
+        assets {asset type: {asset component: {asset name: asset info}}}. An empty dict when the manager doesn't keep
+        a cache. Managers with a cache override this
+        """
+        return dict()
+
+    def get_local_cache_snapshot(self):
+        """
+        :return: a dict of (type, sub type, name) key: a hash of the key's info in the cache, see get_local_cache_data
+        """
+        snapshot = dict()
+        cache_data = self.get_local_cache_data()
+        for data_type in cache_data:
+            for sub_type in cache_data[data_type]:
+                for name, info in cache_data[data_type][sub_type].items():
+                    snapshot[(data_type, sub_type, name)] = hash(json.dumps(info, sort_keys=True))
+        return snapshot
+
+    def get_local_cache_keys(self, update_data_dict):
+        """
+        Expands a dict of what to update into the cache keys it covers
+        :param update_data_dict: a dict in the format {type: {sub type: [names]}}, sub types and names are optional
+        :return: a list of (type, sub type, name) keys
+        """
+        keys = list()
+        cache_data = self.get_local_cache_data()
+        for data_type in update_data_dict:
+            sub_types = update_data_dict[data_type] or cache_data.get(data_type, dict())
+            for sub_type in sub_types:
+                names = None
+                if isinstance(sub_types, dict):
+                    names = sub_types[sub_type]
+                if not names:
+                    names = cache_data.get(data_type, dict()).get(sub_type, dict())
+                keys.extend((data_type, sub_type, name) for name in names)
+        return keys
+
+    def take_local_cache_snapshot(self, update_data_dict=None):
+        """
+        Remembers the cache before a sync, so what the sync changed can be sent with cache_changes_signal. See
+        get_local_cache_changes
+        :param update_data_dict: optional dict of what the sync updates and downloads, in the format
+        {type: {sub type: [names]}}. These are always sent as changed, their downloaded files changed even when the
+        cache didn't
+        """
+        self._cache_snapshot = self.get_local_cache_snapshot()
+        self._cache_sync_updated_keys = self.get_local_cache_keys(update_data_dict) if update_data_dict else list()
+
+    def get_local_cache_changes(self):
+        """
+        Compares the cache to the snapshot taken before the sync, see take_local_cache_snapshot. The snapshot is
+        replaced with the current cache
+        :return: a dict in the format:
+            {
+                "added": [(type, sub type, name), ...],
+                "removed": [(type, sub type, name), ...],
+                "changed": [(type, sub type, name), ...]
+            }
+        or None if no snapshot was taken, then anything may have changed
+        """
+        snapshot = self.get_local_cache_snapshot()
+        previous_snapshot = self._cache_snapshot
+        updated_keys = self._cache_sync_updated_keys
+        self._cache_snapshot = snapshot
+        self._cache_sync_updated_keys = list()
+        if previous_snapshot is None:
+            return None
+
+        changes = {
+            "added": sorted(set(snapshot) - set(previous_snapshot)),
+            "removed": sorted(set(previous_snapshot) - set(snapshot)),
+            "changed": sorted(
+                set(
+                    key for key in snapshot
+                    if key in previous_snapshot and not snapshot[key] == previous_snapshot[key]
+                ) | set(key for key in updated_keys if key in snapshot and key in previous_snapshot)
+            )
+        }
+        logger.info(
+            "Cache sync added {0}, removed {1} and changed {2}.".format(
+                len(changes["added"]), len(changes["removed"]), len(changes["changed"])
+            )
+        )
+        return changes
+
+    def _emit_local_cache_changes(self):
+        """
+        Sends what the sync changed in the cache with cache_changes_signal
+        """
+        self.cache_changes_signal.emit(self.get_local_cache_changes())
+
+    def get_local_cache_time(self):
+        """
+        :return: when the cache was last synced with the server, the cache file's modified time as a datetime. None
+        when there's no cache on disk
+        """
+        cache_path = self.get_local_cache_path()
+        if not cache_path:
+            return None
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(cache_path))
+        except (IOError, OSError):
+            return None
+
+    def get_local_cache_age(self):
+        """
+        :return: seconds since the cache was last synced with the server, None when there's no cache on disk
+        """
+        cache_path = self.get_local_cache_path()
+        if not cache_path:
+            return None
+        try:
+            return max(0.0, time.time() - os.path.getmtime(cache_path))
+        except (IOError, OSError):
+            return None
+
+    def is_local_cache_stale(self):
+        """
+        :return: True if the cache is older than AppVars cgt_cache_max_age, or missing. False if its current
+        """
+        cache_age = self.get_local_cache_age()
+        return cache_age is None or cache_age > self.app_vars.cgt_cache_max_age
+
+    def is_revalidating_local_cache(self):
+        """
+        :return: True while a background refresh of the cache runs, see revalidate_local_cache
+        """
+        return self._revalidation_mngr is not None
+
+    def revalidate_local_cache(self, server_ops):
+        """
+        Refreshes the cache from the server in the background while this manager keeps using the cached data, so
+        guis open right away even when the server is slow or can't be reached. A new manager syncs and saves the
+        cache, so this manager's data doesn't change while a gui reads it. When the sync finishes this manager loads
+        the new cache and cache_revalidated_signal is emitted with None. When it fails the cached data is kept and
+        the signal is emitted with the error, use get_local_cache_time for how old the data is.
+        :param server_ops: a pyani.core.mngr.server_ops.ServerOperations that runs the server calls
+        :return: True if the refresh started, False if one is already running
+        """
+        if self.is_revalidating_local_cache():
+            return False
+        logger.info(
+            "Revalidating {0} cache from {1} in the background.".format(
+                self.__class__.__name__, self.get_local_cache_time()
+            )
+        )
+        self._revalidation_mngr = self.__class__()
+        future = self._revalidation_mngr.start_local_cache_sync(server_ops)
+        future.add_done_callback(self._cache_revalidation_future_done)
+        return True
+
+    def _cache_revalidation_future_done(self, future):
+        """
+        Called in a server thread when the cache sync finishes, passes the errors to the gui thread
+        :param future: the sync's ServerFuture
+        """
+        error = future.exception()
+        if error:
+            errors = [str(error)]
+        else:
+            errors = future.result()
+        self._cache_revalidation_done_signal.emit(errors)
+
+    def _cache_revalidation_done(self, errors):
+        """
+        Loads the refreshed cache, or keeps the cached data if the sync failed, and emits cache_revalidated_signal
+        :param errors: a list of errors from the sync
+        """
+        self._revalidation_mngr = None
+        if errors:
+            error = ", ".join(errors)
+            logger.warning("Could not revalidate the cache, using the cached data. Error is {0}".format(error))
+            self.cache_revalidated_signal.emit(error)
+            return
+        self.take_local_cache_snapshot()
+        error = self.load_local_cache()
+        if error:
+            logger.error("Could not load the revalidated cache. Error is {0}".format(error))
+        else:
+            self._emit_local_cache_changes()
+        self.cache_revalidated_signal.emit(error)
+
+    def start_local_cache_sync_with_lock(self, sync_function):
+        """
+        Runs a sync of the entire cache while holding the machine wide lock for the cache, so the nightly update and
+        an open asset manager don't sync the same cache at once, see pyani.core.mngr.machine_lock. When another
+        process holds the lock it is checked for from the gui thread, up to AppVars cgt_sync_lock_wait_seconds. If
+        that process saved the cache while waiting, its cache is loaded and finished_cache_build_signal emitted
+        instead of syncing again. The lock is released when the sync finishes or fails.
+        :param sync_function: the function that starts the sync's threads, called without arguments. Its threads
+        must finish with _thread_server_cache_complete
+        """
+        lock = pyani.core.mngr.machine_lock.get_cache_sync_lock(self.app_vars, self.get_local_cache_path())
+        self.take_local_cache_snapshot()
+        if lock.acquire(timeout=0):
+            self._cache_sync_lock = lock
+            self._start_locked_cache_sync(sync_function)
+            return
+
+        self.progress_win.setLabelText("Waiting for another sync of the cache to finish...")
+        self._wait_for_cache_sync_lock(lock, sync_function, time.time())
+
+    def _wait_for_cache_sync_lock(self, lock, sync_function, wait_start):
+        """
+        Checks if the cache sync lock is free, and checks again later if not. Runs in the gui thread with a timer so
+        waiting doesn't hold one of the thread pool's threads
+        :param lock: the MachineLock
+        :param sync_function: the function that starts the sync's threads
+        :param wait_start: when the wait started, seconds since the epoch
+        """
+        if lock.acquire(timeout=0):
+            self._cache_sync_lock_acquired(lock, sync_function, wait_start)
+            return
+        if time.time() - wait_start > self.app_vars.cgt_sync_lock_wait_seconds:
+            error_fmt = "Another sync of the cache by {0} didn't finish in {1} seconds, try again later.".format(
+                lock.get_owner() or "another process", int(self.app_vars.cgt_sync_lock_wait_seconds)
+            )
+            logger.error(error_fmt)
+            self.send_thread_error(error_fmt)
+            return
+        QtCore.QTimer.singleShot(
+            int(lock.poll_seconds * 1000),
+            functools.partial(self._wait_for_cache_sync_lock, lock, sync_function, wait_start)
+        )
+
+    def _cache_sync_lock_acquired(self, lock, sync_function, wait_start):
+        """
+        Called when the cache sync lock is free after waiting for another sync. Uses the other sync's cache when it
+        was saved while waiting, otherwise starts the sync
+        :param lock: the acquired MachineLock
+        :param sync_function: the function that starts the sync's threads
+        :param wait_start: when the wait started, seconds since the epoch
+        """
+        self._cache_sync_lock = lock
+        cache_age = self.get_local_cache_age()
+        if cache_age is None or cache_age > time.time() - wait_start:
+            self._start_locked_cache_sync(sync_function)
+            return
+
+        logger.info("The cache was synced by {0} while waiting, using it.".format(lock.get_owner() or "another sync"))
+        self._release_cache_sync_lock()
+        error = self.load_local_cache()
+        if error:
+            self.send_thread_error(error)
+            return
+        self.progress_win.setValue(100)
+        self._emit_local_cache_changes()
+        self.finished_cache_build_signal.emit(None)
+
+    def _start_locked_cache_sync(self, sync_function):
+        """
+        Starts the sync once the cache sync lock is held. The lock is released by the sync's threads when they
+        finish, so it is released here when the sync raises an error or doesn't start any threads
+        :param sync_function: the function that starts the sync's threads
+        """
+        self.thread_total = 0.0
+        try:
+            sync_function()
+        except Exception as error:
+            self._release_cache_sync_lock()
+            error_fmt = "Could not start the cache sync. Error is {0}".format(error)
+            logger.error(error_fmt)
+            self.send_thread_error(error_fmt)
+            return
+        if not self.thread_total:
+            self._release_cache_sync_lock()
+
+    def _release_cache_sync_lock(self):
+        """
+        Releases the cache sync lock if this manager holds it
+        """
+        lock = self._cache_sync_lock
+        self._cache_sync_lock = None
+        if lock is not None:
+            lock.release()
+
     @staticmethod
     def load_server_local_cache(file_path):
         """
@@ -662,18 +1520,70 @@ class AniCoreMngr(QtCore.QObject):
         """
         return pyani.core.util.load_json(file_path)
 
-    def server_get_file_listing_using_folder_filter(self, server_path, folder_filter, temp_file_name):
+    def server_get_file_listing_using_folder_filter(
+            self, server_path, folder_filter, temp_file_name, modified_since=None
+    ):
         """
         Called to get a file information for a given path. Gets all files under the folder provided (folder_filter) and
         ignores files that don't have the folder in the path.
-        Writes the data to the temp file given.
+        Writes the data to the temp file given, read it with pyani.core.util.read_json_records. The listing is cached,
+        see server_get_dir_list
         :param server_path: the path to the data
         :param folder_filter: a folder to limit file listing to, for example, 'rig' only grabs file info for
         files under the rig folder
         :param temp_file_name: where to write the file info to
+        :param modified_since: optional date as a string yyyy-mm-dd hh:mm:ss, only list files and folders modified
+        at or after it. Needs a bridge that supports it, see AppVars.cgt_modified_since_listings
         :return: an error string or None
         :exception: CGTError if can't connect or CGT returns an error
         """
+        key = (server_path.rstrip("/"), "folder filter", folder_filter, modified_since)
+        file_info = self.listing_cache.get(
+            key,
+            lambda: self._server_get_file_listing_using_folder_filter(
+                server_path, folder_filter, key, modified_since=modified_since
+            ),
+            is_cacheable=lambda result: isinstance(result, dict)
+        )
+        # error
+        if not isinstance(file_info, dict):
+            return file_info
+
+        # the listing is in a file the cache owns, copy it to ours. Callers reuse a temp file for different listings,
+        # so the cache can't point at a caller's file. The file is copied rather than kept in memory since listings of
+        # large trees like sequences can be hundreds of megabytes
+        try:
+            shutil.copyfile(file_info["temp file"], temp_file_name)
+        except (IOError, OSError) as e:
+            error_fmt = "Could not write file listing to {0}. Error is {1}".format(temp_file_name, e)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        return None
+
+    def _server_get_file_listing_using_folder_filter(self, server_path, folder_filter, key, modified_since=None):
+        """
+        Gets file information from the server for server_get_file_listing_using_folder_filter, bypassing the cache.
+        The listing is written to a file for the key in AppVars cgt_listing_cache_dir
+        :param server_path: the path to the data
+        :param folder_filter: a folder to limit file listing to
+        :param key: the listing's ServerListingCache key
+        :param modified_since: optional date as a string yyyy-mm-dd hh:mm:ss, only list what changed since
+        :return: a dict {"temp file": the listing's file} or an error string
+        """
+        listing_file_name = os.path.join(
+            self.app_vars.cgt_listing_cache_dir, pyani.core.mngr.listing_cache.get_key_file_name(key) + ".listing"
+        )
+        # written to a name of its own and renamed into place, in case another thread is copying an earlier listing
+        # of the key
+        temp_file_name = "{0}.{1}.{2}.tmp".format(listing_file_name, os.getpid(), threading.current_thread().ident)
+        if not os.path.exists(self.app_vars.cgt_listing_cache_dir):
+            error = pyani.core.util.make_all_dir_in_path(self.app_vars.cgt_listing_cache_dir)
+            if error:
+                error_fmt = "Could not create the listing folder. Error is {0}".format(error)
+                self.send_thread_error(error_fmt)
+                return error_fmt
+
         # the python script to call that connects to cgt
         py_script = os.path.join(self.app_vars.cgt_bridge_api_path, "cgt_file_info.py")
         # the command that subprocess will execute
@@ -686,9 +1596,14 @@ class AniCoreMngr(QtCore.QObject):
             "--folder_filter=" + folder_filter,
             "--temp_file=" + temp_file_name
         ]
+        # one record per line so the listing can be read without loading it all, see read_json_records
+        if self.app_vars.cgt_line_delimited_listings:
+            command.append("--line_delimited=True")
+        if modified_since:
+            command.append("--modified_since=" + modified_since)
 
         try:
-            output, error = pyani.core.util.call_ext_py_api(command)
+            output, error = self.call_bridge_api(command)
 
             # check for subprocess errors
             if error:
@@ -702,7 +1617,19 @@ class AniCoreMngr(QtCore.QObject):
             self.send_thread_error(error_fmt)
             return error_fmt
 
-        return None
+        if not os.path.exists(temp_file_name):
+            error_fmt = "Could not read file listing {0}. The file was not written".format(temp_file_name)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        error = pyani.core.util.replace_file(temp_file_name, listing_file_name)
+        if error:
+            error_fmt = "Could not write file listing {0}. Error is {1}".format(listing_file_name, error)
+            self.send_thread_error(error_fmt)
+            return error_fmt
+
+        # keep where the listing is so requests for it copy it to their own temp file
+        return {"temp file": listing_file_name}
 
     def server_get_dir_list(self,
                             server_path,
@@ -713,7 +1640,9 @@ class AniCoreMngr(QtCore.QObject):
                             absolute_paths=False
                             ):
         """
-        Called to get a list of files and/or directories for a given path
+        Called to get a list of files and/or directories for a given path. Listings are cached for a short time,
+        see pyani.core.mngr.listing_cache, so repeated calls for the same path and options don't go to the server.
+        Use invalidate_server_listing_cache() to force a new listing.
         :param server_path: the path to the data
         :param dirs_only: only return directories
         :param files_only: only return files
@@ -723,6 +1652,33 @@ class AniCoreMngr(QtCore.QObject):
         :return: a list of files or directories, or an error string
         :exception: CGTError if can't connect or CGT returns an error
         """
+        # absolute paths is left out of the key, it only changes how the listing is returned
+        key = (server_path.rstrip("/"), "dir list", dirs_only, files_only, files_and_dirs, walk_dirs)
+        file_list = self.listing_cache.get(
+            key,
+            lambda: self._server_get_dir_list(server_path, dirs_only, files_only, files_and_dirs, walk_dirs),
+            is_cacheable=lambda result: result is None or isinstance(result, list)
+        )
+
+        # error or no files
+        if not isinstance(file_list, list):
+            return file_list
+
+        if not absolute_paths:
+            return [file_path.split("/")[-1] for file_path in file_list]
+        # copy so callers can't modify the cached listing
+        return list(file_list)
+
+    def _server_get_dir_list(self, server_path, dirs_only, files_only, files_and_dirs, walk_dirs):
+        """
+        Gets a listing from the server for server_get_dir_list, bypassing the cache
+        :param server_path: the path to the data
+        :param dirs_only: only return directories
+        :param files_only: only return files
+        :param files_and_dirs: return files and directories
+        :param walk_dirs: whether to walk sub directories
+        :return: a list of absolute paths, None if nothing was found, or an error string
+        """
         # the python script to call that connects to cgt
         py_script = os.path.join(self.app_vars.cgt_bridge_api_path, "cgt_file_info.py")
         # the command that subprocess will execute
@@ -749,7 +1705,7 @@ class AniCoreMngr(QtCore.QObject):
             command.append("--file_mode=dirs")
 
         try:
-            output, error = pyani.core.util.call_ext_py_api(command)
+            output, error = self.call_bridge_api(command)
             # check for subprocess errors
             if error:
                 error_fmt = "Error occurred launching subprocess. Error is {0}".format(error)
@@ -759,21 +1715,23 @@ class AniCoreMngr(QtCore.QObject):
             # check for output
             if output:
                 file_list = output.split(",")
-                if not absolute_paths:
-                    file_paths = [
-                        file_path.split("/")[-1].replace("\n", "").replace("\r", "") for file_path in file_list
-                    ]
-                else:
-                    file_paths = [
-                        file_path.replace("\n", "").replace("\r", "") for file_path in file_list
-                    ]
-                return file_paths
+                return [file_path.replace("\n", "").replace("\r", "") for file_path in file_list]
         # CGT errors
         except pyani.core.util.CGTError as error:
             error_fmt = "Error occurred connecting to CGT. Error is {0}".format(error)
             self.send_thread_error(error_fmt)
             return error_fmt
 
+    def invalidate_server_listing_cache(self, server_path=None, shared=True):
+        """
+        Removes cached server listings so the next listing comes from the server
+        :param server_path: optional, only remove listings for this path and paths under it. Removes all listings if
+        not given
+        :param shared: True to remove the listings for every process on the machine, False for only this process,
+        see pyani.core.mngr.listing_cache.ServerListingCache.invalidate
+        """
+        self.listing_cache.invalidate(server_path, shared=shared)
+
     def server_is_file(self, server_path):
         """
         Checks if the path on the server is a file or a directory
@@ -795,7 +1753,7 @@ class AniCoreMngr(QtCore.QObject):
         command.append("--is_file=True")
 
         try:
-            output, error = pyani.core.util.call_ext_py_api(command)
+            output, error = self.call_bridge_api(command)
 
             # check for subprocess errors
             if error:
@@ -836,7 +1794,7 @@ class AniCoreMngr(QtCore.QObject):
         command.append("--path_exists=True")
 
         try:
-            output, error = pyani.core.util.call_ext_py_api(command)
+            output, error = self.call_bridge_api(command)
 
             # check for subprocess errors
             if error:
@@ -877,7 +1835,7 @@ class AniCoreMngr(QtCore.QObject):
         command.append("--modified_date=True")
 
         try:
-            output, error = pyani.core.util.call_ext_py_api(command)
+            output, error = self.call_bridge_api(command)
 
             # check for subprocess errors
             if error:
@@ -900,11 +1858,185 @@ class AniCoreMngr(QtCore.QObject):
             self.send_thread_error(error_fmt)
             return error_fmt
 
-    def server_file_download_mt(self, file_paths, thread_count=1):
+    def server_is_file_batch(self, server_paths):
+        """
+        Checks if paths on the server are files or directories. All paths are checked in one bridge call instead of
+        one call per path
+        :param server_paths: a list of paths on the server
+        :return: a dict in format {server path: True if a file, False if its a directory, or error as string}
+        """
+        results = dict()
+        for server_path, (output, error) in self._server_file_info_batch(server_paths, "--is_file=True").items():
+            if error:
+                results[server_path] = error
+            else:
+                results[server_path] = bool(output) and output.strip() == "True"
+        return results
+
+    def server_file_exists_batch(self, server_paths):
+        """
+        Checks if the file paths on the server exist. All paths are checked in one bridge call instead of
+        one call per path
+        :param server_paths: a list of paths on the server
+        :return: a dict in format {server path: True if exists, False if not, or error as string}
+        """
+        results = dict()
+        for server_path, (output, error) in self._server_file_info_batch(server_paths, "--path_exists=True").items():
+            if error:
+                results[server_path] = error
+            else:
+                results[server_path] = bool(output) and output.strip() == "True"
+        return results
+
+    def server_file_modified_date_batch(self, server_paths, report_errors=True):
+        """
+        Get the last modified date for files from the server. All paths are checked in one bridge call instead of
+        one call per path
+        :param server_paths: a list of paths on the server
+        :param report_errors: whether to send errors to listening objects via send_thread_error. Errors are returned
+        either way
+        :return: a dict in format {server path: a date/time object, None if no date returned, or error as string}
+        """
+        results = dict()
+        file_info = self._server_file_info_batch(server_paths, "--modified_date=True", report_errors=report_errors)
+        for server_path, (output, error) in file_info.items():
+            results[server_path] = error if error else self._parse_server_modified_date(output)
+        return results
+
+    def server_file_size_batch(self, server_paths, report_errors=True):
+        """
+        Get the size of files from the server. All paths are checked in one bridge call. Needs a bridge that supports
+        --file_size, see AppVars.cgt_file_size_info
+        :param server_paths: a list of paths on the server
+        :param report_errors: whether to send errors to listening objects via send_thread_error. Errors are returned
+        either way
+        :return: a dict in format {server path: the size in bytes as an int, None if no size returned, or error as
+        string}
+        """
+        results = dict()
+        file_info = self._server_file_info_batch(server_paths, "--file_size=True", report_errors=report_errors)
+        for server_path, (output, error) in file_info.items():
+            results[server_path] = error if error else self._parse_server_file_size(output)
+        return results
+
+    def server_file_modified_date_and_size_batch(self, date_server_paths, size_server_paths, report_errors=True):
+        """
+        Gets modified dates for some files and sizes for others in one bridge call, see
+        server_file_modified_date_batch and server_file_size_batch
+        :param date_server_paths: a list of paths on the server to get the modified date of
+        :param size_server_paths: a list of paths on the server to get the size of
+        :param report_errors: whether to send errors to listening objects via send_thread_error. Errors are returned
+        either way
+        :return: a tuple of dicts ({server path: date}, {server path: size}), in the same formats as
+        server_file_modified_date_batch and server_file_size_batch
+        """
+        file_info = self._server_file_info_requests(
+            [(server_path, "--modified_date=True") for server_path in date_server_paths] +
+            [(server_path, "--file_size=True") for server_path in size_server_paths],
+            report_errors=report_errors
+        )
+        modified_dates = dict()
+        sizes = dict()
+        for (server_path, file_info_option), (output, error) in file_info.items():
+            if file_info_option == "--modified_date=True":
+                modified_dates[server_path] = error if error else self._parse_server_modified_date(output)
+            else:
+                sizes[server_path] = error if error else self._parse_server_file_size(output)
+        return modified_dates, sizes
+
+    @staticmethod
+    def _parse_server_modified_date(output):
+        """
+        :param output: the output of cgt_file_info.py --modified_date=True
+        :return: a date/time object, None if no date returned, or error as string
+        """
+        if not output:
+            return None
+        try:
+            # remove newlines
+            date_str = output.strip("\n")
+            return datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+        except ValueError as e:
+            return str(e)
+
+    @staticmethod
+    def _parse_server_file_size(output):
+        """
+        :param output: the output of cgt_file_info.py --file_size=True
+        :return: the size in bytes as an int, None if no size returned, or error as string
+        """
+        if not output:
+            return None
+        try:
+            return int(output.strip())
+        except ValueError as e:
+            return str(e)
+
+    def _server_file_info_batch(self, server_paths, file_info_option, report_errors=True):
+        """
+        Runs cgt_file_info.py for every path with the same option, using one bridge call
+        :param server_paths: a list of paths on the server
+        :param file_info_option: the cgt_file_info.py option, for example --is_file=True
+        :param report_errors: whether to send errors to listening objects via send_thread_error
+        :return: a dict in format {server path: (output, error)}, error is None if the call succeeded
+        """
+        file_info = self._server_file_info_requests(
+            [(server_path, file_info_option) for server_path in server_paths], report_errors=report_errors
+        )
+        return dict((server_path, result) for (server_path, _), result in file_info.items())
+
+    def _server_file_info_requests(self, requests, report_errors=True):
+        """
+        Runs cgt_file_info.py for every request, using one bridge call
+        :param requests: a list of tuples (server path, cgt_file_info.py option), for example
+        [("/LongGong/assets/char/charA/rig/approved/charA_rig.mb", "--file_size=True"), ...]
+        :param report_errors: whether to send errors to listening objects via send_thread_error
+        :return: a dict in format {(server path, option): (output, error)}, error is None if the call succeeded
+        """
+        # the python script to call that connects to cgt
+        py_script = os.path.join(self.app_vars.cgt_bridge_api_path, "cgt_file_info.py")
+        # one command per request, same format as the single path methods
+        commands = [
+            [
+                py_script,
+                self.app_vars.cgt_ip,
+                self.app_vars.cgt_user,
+                self.app_vars.cgt_pass,
+                server_path,
+                file_info_option
+            ]
+            for server_path, file_info_option in requests
+        ]
+
+        results = dict()
+        for request, result in zip(requests, self.call_bridge_api_batch(commands)):
+            # CGT errors
+            if isinstance(result, pyani.core.util.CGTError):
+                error_fmt = "Error occurred connecting to CGT. Error is {0}".format(result)
+                if report_errors:
+                    self.send_thread_error(error_fmt)
+                results[request] = (None, error_fmt)
+                continue
+
+            output, error = result
+            # check for subprocess errors
+            if error:
+                error_fmt = "Error occurred launching subprocess. Error is {0}".format(error)
+                if report_errors:
+                    self.send_thread_error(error_fmt)
+                results[request] = (None, error_fmt)
+                continue
+
+            results[request] = (output, None)
+        return results
+
+    def server_file_download_mt(self, file_paths, thread_count=None, priority=AniDownloadScheduler.PRIORITY_BACKGROUND):
         """
         downloads files from the server with mult-thread support.
         :param file_paths: a list of tuples where the tuple is (server path, local path)
-        :param thread_count: set the number of concurrent downloads, defaults to 1 or single threaded
+        :param thread_count: optional, the number of threads. Defaults to the thread pool's max, concurrent downloads
+        are also limited per server by the download scheduler, see submit_download()
+        :param priority: the download priority, see AniDownloadScheduler
         """
 
         if file_paths:
@@ -920,28 +2052,87 @@ class AniCoreMngr(QtCore.QObject):
                 # reset progress
                 self.init_progress_window("Download Progress", "Downloading Files..")
 
-            for server_file_path, local_file_path in file_paths:
-                # server_file_download expects a list of files, so pass list even though just one file
-                worker = pyani.core.ui.Worker(
-                    self.server_file_download,
-                    False,
-                    [server_file_path],
-                    local_file_paths=[local_file_path],
-                    update_local_version=False
-                )
-                self.thread_total += 1.0
-                self.thread_pool.start(worker)
+            # order all the downloads before starting any
+            with self.download_scheduler:
+                for server_file_paths, local_file_paths in self.get_download_batches(file_paths):
+                    worker = pyani.core.ui.Worker(
+                        self.server_file_download_batch,
+                        False,
+                        server_file_paths,
+                        local_file_paths,
+                        update_local_version=False
+                    )
+                    # progress counts files, not batches
+                    self.thread_total += len(server_file_paths)
+
+                    worker.signals.finished.connect(
+                        functools.partial(self._thread_server_download_complete, len(server_file_paths))
+                    )
+                    worker.signals.error.connect(self.send_thread_error)
+
+                    self.submit_download(worker, server_file_paths, local_file_paths, priority=priority)
+
+    def submit_download(self, worker, server_file_path, local_dir, priority=AniDownloadScheduler.PRIORITY_BACKGROUND):
+        """
+        Queues a download worker with the download scheduler. Use instead of starting download workers on the
+        thread pool directly. Connect the worker's signals before calling.
+        :param worker: a pyani.core.ui.Worker that calls server_file_download or server_file_download_batch
+        :param server_file_path: the server file the worker downloads, or a list of them for a batch. Used to estimate
+        the download size
+        :param local_dir: the local directory the file downloads to, or a list of them for a batch
+        :param priority: see AniDownloadScheduler, metadata files are always given metadata priority
+        """
+        if not isinstance(server_file_path, list):
+            server_file_path = [server_file_path]
+            local_dir = [local_dir]
+
+        if all(file_path.split("/")[-1] == self.app_vars.cgt_metadata_filename for file_path in server_file_path):
+            priority = AniDownloadScheduler.PRIORITY_METADATA
+
+        # the batch size when every file's size is known
+        sizes = [
+            self._estimate_download_size(file_path, dl_dir) for file_path, dl_dir in zip(server_file_path, local_dir)
+        ]
+        size = None if None in sizes else sum(sizes)
+
+        self.download_scheduler.submit(
+            worker,
+            priority=priority,
+            size=size,
+            endpoint=self.app_vars.cgt_ip
+        )
 
-                worker.signals.finished.connect(self._thread_server_download_complete)
-                worker.signals.error.connect(self.send_thread_error)
+    def _estimate_download_size(self, server_file_path, local_dir):
+        """
+        Estimates a file's download size without asking the server, from the size recorded when last downloaded or
+        the size of the local copy
+        :param server_file_path: the server file path
+        :param local_dir: the local directory the file downloads to
+        :return: size in bytes, or None if unknown
+        """
+        size = self.download_manifest.get_recorded_size(server_file_path)
+        if size is not None:
+            return size
+        try:
+            return os.path.getsize(os.path.join(local_dir, server_file_path.split("/")[-1]))
+        except (IOError, OSError):
+            return None
 
-    def server_file_download(self, server_file_paths, local_file_paths=None, update_local_version=False):
+    def server_file_download(
+            self,
+            server_file_paths,
+            local_file_paths=None,
+            update_local_version=False,
+            report_errors=True
+    ):
         """
         Downloads files from server
         :param server_file_paths: a list of server file paths
         :param local_file_paths: a list of the local file paths where cgt files stored
         :param update_local_version: a boolean indicating whether the version file on disk should be updated after
         a successful download
+        :param report_errors: False to only return and log errors, not send them with send_thread_error, for callers
+        that handle the error themselves, see server_file_download_batch
         :return: error as string or None
         :exception: CGTError if can't connect or CGT returns an error
         """
@@ -968,24 +2159,132 @@ class AniCoreMngr(QtCore.QObject):
                 download_dir = "/".join(cgt_file_path.split("/")[:-1])
                 local_dl_paths.append(self.convert_server_path_to_local_server_representation(download_dir))
 
+        # pair each file with its download directory, a single directory is used for all files
+        if len(local_dl_paths) == 1:
+            local_dl_paths = local_dl_paths * len(server_file_paths)
+
+        # the temp folders the files download to are removed once no download in the process uses them
+        temp_dl_paths = self._hold_download_temp_dirs(local_dl_paths)
+        try:
+            return self._server_file_download(
+                py_script, server_file_paths, local_file_paths, local_dl_paths, update_local_version, report_errors
+            )
+        finally:
+            self._release_download_temp_dirs(temp_dl_paths)
+
+    def _server_file_download(
+            self,
+            py_script,
+            server_file_paths,
+            local_file_paths,
+            local_dl_paths,
+            update_local_version,
+            report_errors
+    ):
+        """
+        Downloads files from server for server_file_download, once the download directories are known
+        :param py_script: the bridge's download script
+        :param server_file_paths: a list of server file paths
+        :param local_file_paths: the local file paths given to server_file_download
+        :param local_dl_paths: a list of the local directories the files download to, one per file
+        :param update_local_version: True to update the version file on disk after a successful download
+        :param report_errors: False to only return and log errors, not send them with send_thread_error
+        :return: error as string or None
+        :exception: CGTError if can't connect or CGT returns an error
+        """
+        # server modified dates and sizes, at most one bridge call is made for them
+        modified_dates, server_sizes = self._get_download_file_info(server_file_paths)
+
+        # skip files that haven't changed since they were last downloaded
+        if self.app_vars.cgt_skip_unchanged_downloads:
+            dl_server_paths, dl_local_paths = self._remove_unchanged_downloads(
+                server_file_paths, local_dl_paths, modified_dates
+            )
+        else:
+            dl_server_paths, dl_local_paths = server_file_paths, local_dl_paths
+
+        # files an interrupted download already finished only need to be moved into place
+        dl_server_paths, dl_local_paths, staged_files = self._find_staged_downloads(
+            dl_server_paths, dl_local_paths, modified_dates
+        )
+
+        # files are taken from the closest source that has a current copy - another download on disk, then the local
+        # server mirror over the LAN, then CGT. Both need the server size, when the dates were known without asking
+        # the server the sizes weren't fetched yet, get them for the files left to download. A failed lookup isn't
+        # an error for the download, the file is just downloaded
+        if (self.app_vars.cgt_dedupe_downloads or self.app_vars.cgt_mirror_downloads) and dl_server_paths:
+            size_server_paths = [
+                server_file_path for server_file_path in dl_server_paths
+                if server_file_path in modified_dates and server_file_path not in server_sizes
+            ]
+            if size_server_paths:
+                server_sizes.update(self.server_file_size_batch(size_server_paths, report_errors=False))
+
+        # files whose content was already downloaded to another path are linked or copied from there
+        content_keys = dict()
+        if self.app_vars.cgt_dedupe_downloads and dl_server_paths:
+            dl_server_paths, dl_local_paths, content_keys = self._copy_downloads_from_content_store(
+                dl_server_paths, dl_local_paths, modified_dates, server_sizes, staged_files
+            )
+
+        # files the local server mirror has a current copy of are copied from there
+        if self.app_vars.cgt_mirror_downloads and dl_server_paths:
+            dl_server_paths, dl_local_paths = self._copy_downloads_from_mirror(
+                dl_server_paths, dl_local_paths, modified_dates, server_sizes, staged_files
+            )
+
+        # files download to a temp folder in their download directory and are renamed into place once complete, so
+        # an interrupted download never leaves a partial file behind. Journal the download so the next run knows
+        # what was in progress
+        temp_dl_paths = list()
+        for server_file_path, local_dl_path in zip(dl_server_paths, dl_local_paths):
+            temp_dl_path = self._get_download_temp_dir(local_dl_path)
+            temp_dl_paths.append(temp_dl_path)
+            file_name = server_file_path.split("/")[-1]
+            temp_file_path = os.path.join(temp_dl_path, file_name)
+            self.download_journal.add(
+                server_file_path,
+                os.path.join(local_dl_path, file_name),
+                temp_file_path,
+                modified_dates.get(server_file_path),
+                self.download_journal.STATE_STARTED,
+                self._get_download_size(temp_file_path)
+            )
+
         # download command - convert lists to strings separated by comma so that they can be passed as command
         # line arguments
         dl_command = [
             py_script,
-            ",".join(server_file_paths),
-            ",".join(local_dl_paths),
+            ",".join(dl_server_paths),
+            ",".join(temp_dl_paths),
             self.app_vars.cgt_ip,
             self.app_vars.cgt_user,
             self.app_vars.cgt_pass
         ]
 
+        # wait for the bandwidth budget. The bridge downloads in its own process, so the expected bytes are taken
+        # before the download and corrected with the downloaded bytes after
+        expected_bytes = 0
+        if dl_server_paths:
+            expected_bytes = self._get_expected_download_bytes(dl_server_paths, dl_local_paths, server_sizes)
+            waited = self.bandwidth_limiter.consume(expected_bytes)
+            if waited > 0:
+                self.telemetry.record("bandwidth wait", waited)
+
         try:
-            output, error = pyani.core.util.call_ext_py_api(dl_command)
+            # everything is current, nothing to download
+            dl_start_time = time.time()
+            if dl_server_paths:
+                output, error = self.call_bridge_api(dl_command)
+            else:
+                output, error = None, None
+            dl_seconds = time.time() - dl_start_time
 
             # error from trying to open subprocess
             if error:
                 error_fmt = "Error occurred launching subprocess. Error is {0}".format(error)
-                self.send_thread_error(error_fmt)
+                if report_errors:
+                    self.send_thread_error(error_fmt)
                 logger.error(error_fmt)
                 return error_fmt
 
@@ -1002,11 +2301,54 @@ class AniCoreMngr(QtCore.QObject):
                     .format(error, ', '.join(server_file_paths), ', '.join(local_dl_paths))
                 )
 
-            self.send_thread_error(error_fmt)
+            if report_errors:
+                self.send_thread_error(error_fmt)
             logger.error(error_fmt)
             return error_fmt
 
-        # download successful, check if the local version file should be updated
+        # download successful, journal the complete files then move them into place
+        dl_bytes = 0
+        for server_file_path, local_dl_path in zip(dl_server_paths, dl_local_paths):
+            file_name = server_file_path.split("/")[-1]
+            temp_file_path = os.path.join(self._get_download_temp_dir(local_dl_path), file_name)
+            num_bytes = self._get_download_size(temp_file_path)
+            self.download_journal.add(
+                server_file_path,
+                os.path.join(local_dl_path, file_name),
+                temp_file_path,
+                modified_dates.get(server_file_path),
+                self.download_journal.STATE_DOWNLOADED,
+                num_bytes
+            )
+            # throughput for picking the thread count
+            self.concurrency_controller.record_bytes(num_bytes)
+            dl_bytes += num_bytes
+            staged_files.append((server_file_path, local_dl_path))
+        if dl_server_paths:
+            self.bandwidth_limiter.adjust(dl_bytes - expected_bytes)
+            self.telemetry.record_bytes("download", dl_bytes, dl_seconds)
+            self.telemetry.record_download_source(
+                pyani.core.mngr.telemetry.TransferTelemetry.SOURCE_CLOUD, len(dl_server_paths), dl_bytes
+            )
+
+        errors = list()
+        for server_file_path, local_dl_path in staged_files:
+            error = self._install_download(
+                server_file_path,
+                local_dl_path,
+                modified_dates.get(server_file_path),
+                content_key=content_keys.get(server_file_path)
+            )
+            if error:
+                errors.append(error)
+        if errors:
+            error = "Error installing downloaded files. The following errors occurred: {0}".format(", ".join(errors))
+            if report_errors:
+                self.send_thread_error(error)
+            logger.error(error)
+            return error
+
+        # check if the local version file should be updated
         if update_local_version:
             errors = list()
             for index, cgt_file_path in enumerate(server_file_paths):
@@ -1015,12 +2357,607 @@ class AniCoreMngr(QtCore.QObject):
                     errors.append(error)
             if errors:
                 error = "Error updating cgt metadata. The following errors occurred: {0}".format(", ".join(errors))
-                self.send_thread_error(error)
+                if report_errors:
+                    self.send_thread_error(error)
                 logger.error(error)
                 return error
 
         return None
 
+    def _get_expected_download_bytes(self, server_file_paths, local_dl_paths, server_sizes):
+        """
+        Estimates the bytes a download moves, for the bandwidth budget
+        :param server_file_paths: the server files being downloaded
+        :param local_dl_paths: the local directories they download to
+        :param server_sizes: dict of server sizes {server path: bytes}, see server_file_size_batch
+        :return: the bytes, files with an unknown size count as 0 and are charged once downloaded
+        """
+        expected_bytes = 0
+        for server_file_path, local_dl_path in zip(server_file_paths, local_dl_paths):
+            size = server_sizes.get(server_file_path)
+            # sizes are ints, errors are strings
+            if not isinstance(size, (int, long)):
+                size = self._estimate_download_size(server_file_path, local_dl_path)
+            expected_bytes += size or 0
+        return expected_bytes
+
+    def server_file_download_batch(
+            self,
+            server_file_paths,
+            local_file_paths,
+            update_local_version=False,
+            report_errors=True
+    ):
+        """
+        Downloads a batch of files in one bridge call, see get_download_batches. If the batch fails, for example one
+        file is missing on the server, the files are downloaded one at a time so the error names the files at fault
+        and the rest still download
+        :param server_file_paths: a list of server file paths
+        :param local_file_paths: a list of the local directories the files download to, one per file
+        :param update_local_version: True to update the version file on disk after a successful download
+        :param report_errors: False to only return and log errors, not send them with send_thread_error
+        :return: error as string or None
+        """
+        if len(server_file_paths) == 1:
+            return self.server_file_download(
+                server_file_paths,
+                local_file_paths=local_file_paths,
+                update_local_version=update_local_version,
+                report_errors=report_errors
+            )
+
+        error = self.server_file_download(
+            server_file_paths,
+            local_file_paths=local_file_paths,
+            update_local_version=update_local_version,
+            report_errors=False
+        )
+        if not error:
+            return None
+
+        logger.warning(
+            "Download of {0} files in one batch failed, downloading them one at a time. Error is {1}".format(
+                len(server_file_paths), error
+            )
+        )
+        errors = list()
+        for server_file_path, local_file_path in zip(server_file_paths, local_file_paths):
+            error = self.server_file_download(
+                [server_file_path],
+                local_file_paths=[local_file_path],
+                update_local_version=update_local_version,
+                report_errors=False
+            )
+            if error:
+                errors.append(error)
+        if errors:
+            error = "Error downloading {0} of {1} files. The following errors occurred: {2}".format(
+                len(errors), len(server_file_paths), ", ".join(errors)
+            )
+            if report_errors:
+                self.send_thread_error(error)
+            logger.error(error)
+            return error
+        return None
+
+    def get_download_batches(self, file_paths):
+        """
+        Groups files to download into batches that each download in one bridge call with server_file_download_batch,
+        so many small files share one bridge session. Files are grouped by the local directory they download to,
+        small directories share a batch. A batch has at most cgt_download_batch_max_files files and, where the
+        size is known from an earlier download, cgt_download_batch_max_bytes bytes, see AppVars. CGT metadata files
+        are batched on their own so they keep their download priority, see submit_download
+        :param file_paths: a list of tuples (server path, local directory)
+        :return: a list of batches, each a tuple of (list of server paths, list of local directories)
+        """
+        max_files = max(1, self.app_vars.cgt_download_batch_max_files)
+        max_bytes = self.app_vars.cgt_download_batch_max_bytes
+
+        # sort keeps the files' order within a directory
+        sorted_file_paths = sorted(
+            file_paths,
+            key=lambda file_path: (
+                not file_path[0].split("/")[-1] == self.app_vars.cgt_metadata_filename,
+                os.path.normcase(os.path.normpath(file_path[1]))
+            )
+        )
+
+        batches = list()
+        batch_server_paths = list()
+        batch_local_paths = list()
+        batch_bytes = 0
+        batch_is_metadata = None
+        for server_file_path, local_dir in sorted_file_paths:
+            is_metadata = server_file_path.split("/")[-1] == self.app_vars.cgt_metadata_filename
+            # unknown sizes count as nothing, the file limit still applies
+            size = self._estimate_download_size(server_file_path, local_dir) or 0
+            if batch_server_paths and (
+                    len(batch_server_paths) >= max_files or
+                    (max_bytes and batch_bytes + size > max_bytes) or
+                    not is_metadata == batch_is_metadata
+            ):
+                batches.append((batch_server_paths, batch_local_paths))
+                batch_server_paths = list()
+                batch_local_paths = list()
+                batch_bytes = 0
+            batch_server_paths.append(server_file_path)
+            batch_local_paths.append(local_dir)
+            batch_bytes += size
+            batch_is_metadata = is_metadata
+        if batch_server_paths:
+            batches.append((batch_server_paths, batch_local_paths))
+        return batches
+
+    def prefetch_server_files(self, server_file_paths):
+        """
+        Downloads small files nothing is waiting on yet, like metadata, so they can be read later without a
+        server call, see get_prefetched_file. Files download in batches to the prefetch folder, see AppVars
+        cgt_prefetch_dir, at the lowest download priority so any other download goes first. Runs in the
+        background without progress, and errors are only logged since nothing depends on the files
+        :param server_file_paths: a list of server file paths
+        """
+        if not server_file_paths:
+            return
+        logger.info("Prefetching {0} files.".format(len(server_file_paths)))
+        file_paths = [
+            (server_file_path, self.get_prefetch_dir(server_file_path)) for server_file_path in server_file_paths
+        ]
+        with self.download_scheduler:
+            for batch_server_paths, batch_local_paths in self.get_download_batches(file_paths):
+                worker = pyani.core.ui.Worker(
+                    self._prefetch_server_file_batch, False, batch_server_paths, batch_local_paths
+                )
+                self.submit_download(
+                    worker, batch_server_paths, batch_local_paths, priority=AniDownloadScheduler.PRIORITY_PREFETCH
+                )
+
+    def _prefetch_server_file_batch(self, server_file_paths, local_file_paths):
+        """
+        Downloads a batch of prefetched files, see prefetch_server_files. The download manifest is saved at exit
+        :param server_file_paths: a list of server file paths
+        :param local_file_paths: a list of the local directories the files download to, one per file
+        """
+        error = self.server_file_download_batch(server_file_paths, local_file_paths, report_errors=False)
+        if error:
+            logger.warning("Could not prefetch files. Error is {0}".format(error))
+
+    def get_prefetch_dir(self, server_file_path):
+        """
+        :param server_file_path: a server file path
+        :return: the local directory the file is prefetched to, the file's server directory under the prefetch folder
+        """
+        server_dir_parts = server_file_path.strip("/").split("/")[:-1]
+        return os.path.join(self.app_vars.cgt_prefetch_dir, *server_dir_parts)
+
+    def get_prefetched_file(self, server_file_path):
+        """
+        :param server_file_path: a server file path
+        :return: the local path of the file's prefetched copy, or None if the file hasn't been prefetched
+        """
+        local_file_path = os.path.join(self.get_prefetch_dir(server_file_path), server_file_path.split("/")[-1])
+        if os.path.isfile(local_file_path):
+            return local_file_path
+        return None
+
+    def get_prefetch_file_paths(self):
+        """
+        Lists the files to prefetch once a sync finishes, see prefetch_server_files. Managers with files to prefetch
+        override this. List files already prefetched too so changed files are refreshed, unchanged files are skipped
+        by the download manifest
+        :return: a list of server file paths, empty by default
+        """
+        return list()
+
+    def prefetch_server_data(self):
+        """
+        Starts getting server data other than files that guis show later, once a sync finishes, ex: release notes
+        from the CGT api. Managers with data to prefetch override this, and submit the work to the download scheduler
+        at AniDownloadScheduler.PRIORITY_PREFETCH so any download goes first
+        """
+        pass
+
+    def get_known_server_modified_dates(self, server_file_paths):
+        """
+        Gets the server modified dates of files that the manager already knows, for example from its cache, so
+        downloads don't need to ask the server. Managers that keep dates override this
+        :param server_file_paths: a list of server file paths
+        :return: a dict {server path: yyyy-mm-dd hh:mm:ss} of the files with a known date, empty by default
+        """
+        return dict()
+
+    def _get_download_file_info(self, server_file_paths):
+        """
+        Gets the server modified dates and sizes a download needs to skip unchanged files and copy files from another
+        download or the mirror. Dates the manager already knows are used, see get_known_server_modified_dates. Only
+        when some aren't known is the server asked, in one bridge call that gets the sizes as well. Otherwise sizes
+        are left for the files still to download once unchanged files are removed
+        :param server_file_paths: a list of server file paths
+        :return: a tuple of dicts, the modified dates as strings {server path: yyyy-mm-dd hh:mm:ss} and the sizes
+        {server path: size} in the format of server_file_size_batch. A failed lookup leaves the file out of the dates
+        """
+        wants_sizes = self.app_vars.cgt_dedupe_downloads or self.app_vars.cgt_mirror_downloads
+        if not self.app_vars.cgt_skip_unchanged_downloads and not wants_sizes:
+            return dict(), dict()
+
+        modified_dates = self.get_known_server_modified_dates(server_file_paths)
+        date_server_paths = [
+            server_file_path for server_file_path in server_file_paths if server_file_path not in modified_dates
+        ]
+        if not date_server_paths:
+            return modified_dates, dict()
+
+        # a failed lookup isn't an error for the download, the file is just downloaded
+        server_dates, server_sizes = self.server_file_modified_date_and_size_batch(
+            date_server_paths, server_file_paths if wants_sizes else list(), report_errors=False
+        )
+        for server_file_path, modified_date in server_dates.items():
+            if isinstance(modified_date, datetime):
+                modified_dates[server_file_path] = modified_date.strftime("%Y-%m-%d %H:%M:%S")
+        return modified_dates, server_sizes
+
+    def _remove_unchanged_downloads(self, server_file_paths, local_dl_paths, modified_dates):
+        """
+        Removes files that were already downloaded and haven't changed since from a download, by comparing the server
+        modified dates to the download manifest. Skipped files and bytes are added to download_skip_stats
+        :param server_file_paths: a list of server file paths
+        :param local_dl_paths: a list of the local directories the files download to, same order as the server paths
+        :param modified_dates: dict of server modified dates as strings {server path: yyyy-mm-dd hh:mm:ss}, see
+        _get_download_file_info. Files without a modified date are always downloaded
+        :return: a tuple of the server paths and local directories to download
+        """
+        dl_server_paths = list()
+        dl_local_paths = list()
+        for server_file_path, local_dl_path in zip(server_file_paths, local_dl_paths):
+            size = self.download_manifest.is_current(
+                server_file_path,
+                os.path.join(local_dl_path, server_file_path.split("/")[-1]),
+                modified_dates.get(server_file_path)
+            )
+            if size is None:
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+            else:
+                logger.info("Skipping download of {0}, unchanged since last download.".format(server_file_path))
+                with self._download_skip_stats_lock:
+                    self.download_skip_stats["files"] += 1
+                    self.download_skip_stats["bytes"] += size
+
+        return dl_server_paths, dl_local_paths
+
+    def _get_download_temp_dir(self, local_dl_path):
+        """
+        :param local_dl_path: the local directory a file downloads to
+        :return: the temp folder the file downloads to before it is moved into place. Kept in the download directory
+        so the move is a rename on the same drive
+        """
+        return os.path.join(local_dl_path, self.app_vars.cgt_download_temp_dir_name)
+
+    def _hold_download_temp_dirs(self, local_dl_paths):
+        """
+        Marks the temp folders of download directories as in use, so another download in the process doesn't remove
+        them, see _release_download_temp_dirs
+        :param local_dl_paths: a list of local directories files download to
+        :return: the list of temp folders to pass to _release_download_temp_dirs
+        """
+        temp_dl_paths = list(set(self._get_download_temp_dir(local_dl_path) for local_dl_path in local_dl_paths))
+        with AniCoreMngr._download_temp_dir_lock:
+            AniCoreMngr._download_temp_dir_users.update(temp_dl_paths)
+        return temp_dl_paths
+
+    def _release_download_temp_dirs(self, temp_dl_paths):
+        """
+        Removes the temp folders of a download once no other download in the process uses them, see
+        _hold_download_temp_dirs. Folders that still have files, ex: a download that failed, are left for the next
+        run to recover
+        :param temp_dl_paths: the list _hold_download_temp_dirs returned
+        """
+        with AniCoreMngr._download_temp_dir_lock:
+            for temp_dl_path in temp_dl_paths:
+                AniCoreMngr._download_temp_dir_users[temp_dl_path] -= 1
+                if AniCoreMngr._download_temp_dir_users[temp_dl_path] <= 0:
+                    del AniCoreMngr._download_temp_dir_users[temp_dl_path]
+                    self._remove_download_temp_dir(temp_dl_path)
+
+    @staticmethod
+    def _remove_download_temp_dir(temp_dl_path):
+        """
+        Removes a download temp folder if its empty
+        :param temp_dl_path: the temp folder, see _get_download_temp_dir
+        """
+        try:
+            os.rmdir(temp_dl_path)
+        except (IOError, OSError):
+            # doesn't exist or still has files
+            pass
+
+    @staticmethod
+    def _get_download_size(file_path):
+        """
+        :param file_path: a downloaded file or folder
+        :return: the size in bytes of the file, 0 if it doesn't exist or is a folder
+        """
+        try:
+            if os.path.isfile(file_path):
+                return os.path.getsize(file_path)
+        except (IOError, OSError):
+            pass
+        return 0
+
+    def _find_staged_downloads(self, server_file_paths, local_dl_paths, modified_dates):
+        """
+        Finds files that an interrupted download finished but didn't move into place. These are journaled as
+        downloaded and are still current when the server modified date is the same and the temp file is complete
+        :param server_file_paths: a list of server file paths
+        :param local_dl_paths: a list of the local directories the files download to, same order as the server paths
+        :param modified_dates: dict of server modified dates as strings {server path: yyyy-mm-dd hh:mm:ss}
+        :return: a tuple of the server paths and local directories still to download, and a list of
+        (server path, local directory) tuples for the files that only need to be moved into place
+        """
+        dl_server_paths = list()
+        dl_local_paths = list()
+        staged_files = list()
+        for server_file_path, local_dl_path in zip(server_file_paths, local_dl_paths):
+            entry = self.download_journal.get_entry(server_file_path)
+            local_file_path = os.path.join(local_dl_path, server_file_path.split("/")[-1])
+            if entry and entry["state"] == self.download_journal.STATE_DOWNLOADED and entry["modify time"] and \
+                    entry["modify time"] == modified_dates.get(server_file_path) and \
+                    os.path.normpath(entry["local path"]) == os.path.normpath(local_file_path) and \
+                    os.path.isfile(entry["temp path"]) and \
+                    self._get_download_size(entry["temp path"]) == entry["bytes"]:
+                logger.info("Resuming download of {0}, already downloaded by an earlier run.".format(server_file_path))
+                staged_files.append((server_file_path, local_dl_path))
+            else:
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+        return dl_server_paths, dl_local_paths, staged_files
+
+    def _install_download(self, server_file_path, local_dl_path, modify_time, content_key=None):
+        """
+        Moves a downloaded file from the temp folder into place, replacing the old file in one step. Journals the
+        move and records the file in the download manifest and content store
+        :param server_file_path: the server file path
+        :param local_dl_path: the local directory the file downloads to
+        :param modify_time: the server modified date as a string yyyy-mm-dd hh:mm:ss, or None if not known
+        :param content_key: optional key of the file's content, see pyani.core.mngr.content_store
+        :return: None or error as string
+        """
+        file_name = server_file_path.split("/")[-1]
+        temp_file_path = os.path.join(self._get_download_temp_dir(local_dl_path), file_name)
+        local_file_path = os.path.join(local_dl_path, file_name)
+
+        error = pyani.core.util.replace_file(temp_file_path, local_file_path)
+        if error:
+            return error
+
+        # remember what was downloaded so it can be skipped next time if it doesn't change
+        if modify_time:
+            self.download_manifest.record(server_file_path, local_file_path, modify_time)
+        if content_key:
+            self.content_store.add(content_key, local_file_path)
+        self.download_journal.add(
+            server_file_path,
+            local_file_path,
+            temp_file_path,
+            modify_time,
+            self.download_journal.STATE_INSTALLED,
+            self._get_download_size(local_file_path)
+        )
+        return None
+
+    def _copy_downloads_from_content_store(
+            self,
+            server_file_paths,
+            local_dl_paths,
+            modified_dates,
+            server_sizes,
+            staged_files
+    ):
+        """
+        Finds files whose content is already on disk from another download, see pyani.core.mngr.content_store, and
+        hard links or copies them into the temp folder so they are installed like a download. Linked files and bytes
+        are added to download_skip_stats
+        :param server_file_paths: a list of server file paths
+        :param local_dl_paths: a list of the local directories the files download to, same order as the server paths
+        :param modified_dates: dict of server modified dates as strings {server path: yyyy-mm-dd hh:mm:ss}
+        :param server_sizes: dict of server sizes {server path: bytes}, see server_file_size_batch
+        :param staged_files: list of (server path, local directory) tuples to install, files taken from the store are
+        appended
+        :return: a tuple of the server paths and local directories still to download, and a dict of content keys
+        {server path: key} for the files that have one
+        """
+        dl_server_paths = list()
+        dl_local_paths = list()
+        content_keys = dict()
+        for server_file_path, local_dl_path in zip(server_file_paths, local_dl_paths):
+            size = server_sizes.get(server_file_path)
+            # sizes are ints, errors are strings
+            if not isinstance(size, (int, long)):
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+                continue
+
+            file_name = server_file_path.split("/")[-1]
+            content_key = self.content_store.get_key(server_file_path, modified_dates[server_file_path], size)
+            content_keys[server_file_path] = content_key
+            source_path = self.content_store.find(content_key, exclude_path=os.path.join(local_dl_path, file_name))
+            if not source_path:
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+                continue
+
+            temp_file_path = os.path.join(self._get_download_temp_dir(local_dl_path), file_name)
+            # remove a partial file from an interrupted download, a link can't replace it
+            error = pyani.core.util.delete_file(temp_file_path)
+            if not error:
+                error = pyani.core.util.link_or_copy_file(
+                    source_path, temp_file_path, hardlink=self._can_hardlink_download(file_name)
+                )
+            if error:
+                # download it instead
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+                continue
+
+            logger.info("Copied {0} from {1} instead of downloading.".format(server_file_path, source_path))
+            staged_files.append((server_file_path, local_dl_path))
+            with self._download_skip_stats_lock:
+                self.download_skip_stats["deduplicated files"] += 1
+                self.download_skip_stats["deduplicated bytes"] += size
+            self.telemetry.record_download_source(
+                pyani.core.mngr.telemetry.TransferTelemetry.SOURCE_CONTENT_STORE, 1, size
+            )
+
+        return dl_server_paths, dl_local_paths, content_keys
+
+    def _can_hardlink_download(self, file_name):
+        """
+        :param file_name: a downloaded file's name
+        :return: True if the file can be hard linked from another download, see AppVars cgt_dedupe_use_hardlinks.
+        Files written in place, see AppVars cgt_dedupe_hardlink_excludes, are copied so they don't change every
+        linked copy
+        """
+        if not self.app_vars.cgt_dedupe_use_hardlinks:
+            return False
+        return not any(
+            fnmatch.fnmatch(file_name.lower(), pattern.lower()) for pattern in self.app_vars.cgt_dedupe_hardlink_excludes
+        )
+
+    def _copy_downloads_from_mirror(self, server_file_paths, local_dl_paths, modified_dates, server_sizes, staged_files):
+        """
+        Copies files from the local server mirror, the studio's Z drive, into the temp folder so they are installed
+        like a download. Only current copies are used - the mirror file must have the server's size and not be older
+        than the server's modified date. Copied files and bytes are added to download_skip_stats and the copy times
+        to the telemetry as mirror copy
+        :param server_file_paths: a list of server file paths
+        :param local_dl_paths: a list of the local directories the files download to, same order as the server paths
+        :param modified_dates: dict of server modified dates as strings {server path: yyyy-mm-dd hh:mm:ss}
+        :param server_sizes: dict of server sizes {server path: bytes}, see server_file_size_batch
+        :param staged_files: list of (server path, local directory) tuples to install, files copied from the mirror
+        are appended
+        :return: a tuple of the server paths and local directories still to download
+        """
+        # off site, no mirror
+        if not os.path.isdir(self.app_vars.cgt_mirror_root + os.sep):
+            return server_file_paths, local_dl_paths
+
+        dl_server_paths = list()
+        dl_local_paths = list()
+        for server_file_path, local_dl_path in zip(server_file_paths, local_dl_paths):
+            file_name = server_file_path.split("/")[-1]
+            mirror_path = self._get_mirror_path(server_file_path)
+            size = server_sizes.get(server_file_path)
+            # the mirror is where the file is going, it needs the server's copy
+            if os.path.normcase(os.path.normpath(mirror_path)) == \
+                    os.path.normcase(os.path.normpath(os.path.join(local_dl_path, file_name))) or \
+                    not self._is_mirror_copy_current(mirror_path, modified_dates.get(server_file_path), size):
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+                continue
+
+            temp_file_path = os.path.join(self._get_download_temp_dir(local_dl_path), file_name)
+            copy_start_time = time.time()
+            # remove a partial file from an interrupted download
+            error = pyani.core.util.delete_file(temp_file_path)
+            if not error:
+                error = pyani.core.util.link_or_copy_file(mirror_path, temp_file_path, hardlink=False)
+            copy_seconds = time.time() - copy_start_time
+            self.telemetry.record("mirror copy", copy_seconds, succeeded=not error)
+            if error:
+                # download it instead
+                logger.warning("Could not copy {0} from the local server, downloading instead. Error is {1}".format(
+                    mirror_path, error
+                ))
+                dl_server_paths.append(server_file_path)
+                dl_local_paths.append(local_dl_path)
+                continue
+
+            logger.info("Copied {0} from the local server {1} instead of downloading.".format(
+                server_file_path, mirror_path
+            ))
+            staged_files.append((server_file_path, local_dl_path))
+            self.telemetry.record_bytes("mirror copy", size, copy_seconds)
+            self.telemetry.record_download_source(pyani.core.mngr.telemetry.TransferTelemetry.SOURCE_MIRROR, 1, size)
+            with self._download_skip_stats_lock:
+                self.download_skip_stats["mirror files"] += 1
+                self.download_skip_stats["mirror bytes"] += size
+
+        return dl_server_paths, dl_local_paths
+
+    def _get_mirror_path(self, server_file_path):
+        """
+        :param server_file_path: a server file path
+        :return: where the file is on the local server mirror, see convert_server_path_to_local_server_representation
+        """
+        return self.path_map.to_local(server_file_path)
+
+    def _is_mirror_copy_current(self, mirror_path, modify_time, size):
+        """
+        Checks a file on the local server mirror is the same as the server's
+        :param mirror_path: the file on the mirror
+        :param modify_time: the server's modified date in UTC as a string yyyy-mm-dd hh:mm:ss, or None if unknown
+        :param size: the server's size in bytes, or None or an error string if unknown
+        :return: True if the mirror file has the server's size and modified time, within AppVars
+        cgt_mirror_mtime_tolerance, False if not or either is unknown
+        """
+        if not modify_time or not isinstance(size, (int, long)):
+            return False
+        try:
+            mirror_size = os.path.getsize(mirror_path)
+            mirror_modify_time = os.path.getmtime(mirror_path)
+            server_modify_time = calendar.timegm(time.strptime(modify_time, "%Y-%m-%d %H:%M:%S"))
+        except (IOError, OSError, ValueError, OverflowError):
+            return False
+        # the tolerance covers rounding and clock differences, a mirror file modified well before or after the
+        # server's is a different file, ex: an older copy or edited on the mirror
+        return mirror_size == size and \
+            abs(mirror_modify_time - server_modify_time) <= self.app_vars.cgt_mirror_mtime_tolerance
+
+    def _recover_interrupted_downloads(self):
+        """
+        Cleans up after runs that were interrupted, once per process. Only the journals of processes that are no
+        longer running are recovered, see DownloadJournal.take_orphaned_entries, so the downloads of another process
+        running at the same time are left alone. Files that were installed are added to the download manifest in case
+        it wasn't saved, and partial downloads are removed since CGT downloads can't pick up part way through a file.
+        Files that finished downloading are moved to this process's journal for server_file_download to install.
+        """
+        if not self.download_journal.claim_recovery():
+            return
+
+        entries = self.download_journal.take_orphaned_entries()
+        if not entries:
+            return
+
+        for entry in entries:
+            if entry["state"] == self.download_journal.STATE_STARTED:
+                partial_bytes = self._get_download_size(entry["temp path"])
+                if partial_bytes:
+                    logger.info(
+                        "Removing partial download of {0}, {1} were downloaded before the download was interrupted."
+                        .format(entry["server path"], pyani.core.util.convert_bytes_to_readable_size(partial_bytes))
+                    )
+                pyani.core.util.delete_file(entry["temp path"])
+                self._remove_download_temp_dir(os.path.dirname(entry["temp path"]))
+                continue
+
+            if entry["state"] == self.download_journal.STATE_INSTALLED and entry["modify time"]:
+                self.download_manifest.record(entry["server path"], entry["local path"], entry["modify time"])
+            # kept in this process's journal until the manifest is saved, or until the download is installed
+            self.download_journal.add(
+                entry["server path"],
+                entry["local path"],
+                entry["temp path"],
+                entry["modify time"],
+                entry["state"],
+                entry["bytes"]
+            )
+
+        # the journal only needs the finished downloads once the manifest has the installed ones
+        error = self.download_manifest.save()
+        if error:
+            logger.error("Could not save the download manifest. Error is {0}".format(error))
+        else:
+            self.download_journal.compact()
+
     def core_get_latest_version(self, server_path_to_files=None, file_list=None):
         """
         gets the latest file name and version of a file based off files having versions in their name. Must supply
@@ -1075,14 +3012,17 @@ class AniCoreMngr(QtCore.QObject):
         :return: None if no error, error as string if occurs
         """
 
-        # split off path up to root directory of file, removing file name and approved or work folder
-        cgt_path_to_version_history = '/'.join(server_file_path.split("/")[:-1])
-        # check if approved or work, approved requires adding /history/ to end of path
-        if "approved" in server_file_path:
-            cgt_path_to_version_history = "{0}/history/".format(cgt_path_to_version_history)
+        # the cache already has the version for most files, only list the server when it doesn't
+        version = self.get_version_from_cache_by_server_path(server_file_path)
+        if version is None:
+            # split off path up to root directory of file, removing file name and approved or work folder
+            cgt_path_to_version_history = '/'.join(server_file_path.split("/")[:-1])
+            # check if approved or work, approved requires adding /history/ to end of path
+            if "approved" in server_file_path:
+                cgt_path_to_version_history = "{0}/history/".format(cgt_path_to_version_history)
 
-        # get latest version
-        file_name, version = self.core_get_latest_version(cgt_path_to_version_history)
+            # get latest version
+            file_name, version = self.core_get_latest_version(cgt_path_to_version_history)
 
         # open metadata file
         local_version_path = os.path.join(local_file_path_dir, self.app_vars.cgt_metadata_filename)
@@ -1105,6 +3045,15 @@ class AniCoreMngr(QtCore.QObject):
 
         return None
 
+    def get_version_from_cache_by_server_path(self, server_file_path):
+        """
+        Gets the version of a server file from the manager's server cache. Managers with a cache override this, see
+        pyani.core.mngr.assets.AniAssetMngr
+        :param server_file_path: path to the file on the server
+        :return: the version as a string, or None if the cache doesn't have the file
+        """
+        return None
+
     def find_new_and_updated_assets(self, timestamp_before_dl, assets_before_sync, assets_after_sync):
         """
         compares timestamps and files to find which assets were modified, deleted, or added
@@ -1304,23 +3253,25 @@ class AniCoreMngr(QtCore.QObject):
             version = assets_cache[asset_type][asset_category][asset_name]['version']
         return version
 
-    @staticmethod
-    def convert_server_path_to_local_server_representation(server_path, directory_only=False):
+    def convert_server_path_to_local_server_representation(self, server_path, directory_only=False):
         """
-        converts a cgt path in cloud to a local path on the local representation of the server, i.e. Z drive
+        converts a cgt path in cloud to a local path on the local representation of the server, i.e. Z drive. Uses
+        the path map table in AppVars cgt_path_map, and remembers converted paths since the same paths are converted
+        for every file downloaded
         :param server_path: the server path
         :param directory_only: whether to convert full path or path up to file name
         :return: the converted path on the local drive
         """
-        local_path = "Z:"
-        # split up the cgt path and rebuild with backslashes
-        server_path_split = server_path.split("/")
-        # check if we want the directory or the file name too
-        if directory_only:
-            server_path_split = server_path_split[:-1]
-        for path_component in server_path_split:
-            local_path = "{0}\\{1}".format(local_path, path_component)
-        return os.path.normpath(local_path)
+        return self.path_map.to_local(server_path, directory_only=directory_only)
+
+    def convert_local_server_representation_to_server_path(self, local_path):
+        """
+        converts a path on the local representation of the server, i.e. Z drive, to the cgt path in cloud. The
+        reverse of convert_server_path_to_local_server_representation
+        :param local_path: the path on the local drive
+        :return: the server path, None if the path isn't on the local representation of the server
+        """
+        return self.path_map.to_server(local_path)
 
     def is_file_on_local_server_representation(self, server_dir, local_dir):
         """
@@ -1372,8 +3323,10 @@ class AniCoreMngr(QtCore.QObject):
             self.error_thread_signal.emit(error)
             self.thread_error_occurred = True
             self.progress_win.close()
+            self._release_cache_sync_lock()
 
     def init_progress_window(self, title, label):
+        self.progress_label = label
         self.progress_win.setWindowTitle(title)
         self.progress_win.setLabelText(label)
         self.progress_win.setValue(0)
@@ -1385,14 +3338,45 @@ class AniCoreMngr(QtCore.QObject):
         pyani.core.ui.center(self.progress_win)
         QtWidgets.QApplication.processEvents()
 
-    def _thread_server_download_complete(self):
+    def _show_download_status(self):
+        """
+        Shows the download queue depth and time left in the progress window
+        """
+        status = self.download_scheduler.get_status_text()
+        if status:
+            self.progress_win.setLabelText("{0}\n{1}".format(self.progress_label, status))
+        else:
+            self.progress_win.setLabelText(self.progress_label)
+
+    def save_download_manifest(self):
+        """
+        Saves the download manifest, content store and the thread count picked by the concurrency controller. A
+        failed save only means files get downloaded again next time, so it is logged rather than reported
+        """
+        error = self.concurrency_controller.save()
+        if error:
+            logger.error("Could not save the server concurrency level. Error is {0}".format(error))
+
+        error = self.content_store.save()
+        if error:
+            logger.error("Could not save the download content store. Error is {0}".format(error))
+
+        error = self.download_manifest.save()
+        if error:
+            logger.error("Could not save the download manifest. Error is {0}".format(error))
+        else:
+            # installed files are in the manifest now, so the journal doesn't need them
+            self.download_journal.compact()
+
+    def _thread_server_download_complete(self, num_files=1):
         """
         Called when a thread that downloads files completes
+        :param num_files: the number of files the thread downloaded, progress counts files
         """
         # since managers handle, only run for the active tool or asset
         if not self.thread_error_occurred:
             # a thread finished, increment our count
-            self.threads_done += 1.0
+            self.threads_done += num_files
             if self.threads_done > self.thread_total:
                 return
             else:
@@ -1400,22 +3384,25 @@ class AniCoreMngr(QtCore.QObject):
                 progress = (self.threads_done / self.thread_total) * 100.0
 
                 self.progress_win.setValue(progress)
+                self._show_download_status()
                 # check if we are finished
                 if progress >= 100.0:
+                    self.save_download_manifest()
                     # done, let any listening objects/classes know we are finished
                     self.finished_signal.emit(None)
 
-    def _thread_server_sync_complete(self, page_id=None, save_method=None):
+    def _thread_server_sync_complete(self, page_id=None, save_method=None, num_files=1):
         """
         Called when a thread that updates cache and downloads files completes
         :param page_id: passed back to calling app so it can know what tool active_type or asset component called
         the sync.
         :param save_method: the function to call when the cache is complete to save it locally
+        :param num_files: the number of files the thread downloaded, progress counts files. 1 for cache threads
         """
         # since managers handle, only run for the active tool or asset
         if page_id and save_method and not self.thread_error_occurred:
             # a thread finished, increment our count
-            self.threads_done += 1.0
+            self.threads_done += num_files
             if self.threads_done > self.thread_total:
                 return
             else:
@@ -1423,8 +3410,10 @@ class AniCoreMngr(QtCore.QObject):
                 progress = (self.threads_done / self.thread_total) * 100.0
 
                 self.progress_win.setValue(progress)
+                self._show_download_status()
                 # check if we are finished
                 if progress >= 100.0:
+                    self.save_download_manifest()
                     # save the cache locally
                     error = save_method()
                     if error:
@@ -1432,6 +3421,9 @@ class AniCoreMngr(QtCore.QObject):
                     else:
                         # done, let any listening objects/classes know we are finished
                         self.finished_sync_and_download_signal.emit(page_id)
+                        # after the finished signal so the changes are shown with the update config it updated
+                        self._emit_local_cache_changes()
+                        self._prefetch_after_sync()
 
     def _thread_server_cache_complete(self, save_method=None):
         """
@@ -1456,5 +3448,17 @@ class AniCoreMngr(QtCore.QObject):
                     if error:
                         self.send_thread_error(error)
                     else:
+                        self._release_cache_sync_lock()
+                        self._emit_local_cache_changes()
                         # done, let any listening objects/classes know we are finished
                         self.finished_cache_build_signal.emit(None)
+                        self._prefetch_after_sync()
+
+    def _prefetch_after_sync(self):
+        """
+        Starts prefetching files and other server data once a sync is done and the cache saved, see
+        prefetch_server_files and prefetch_server_data
+        """
+        if self.app_vars.cgt_prefetch_after_sync:
+            self.prefetch_server_files(self.get_prefetch_file_paths())
+            self.prefetch_server_data()
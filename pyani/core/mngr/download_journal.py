@@ -0,0 +1,243 @@
+import os
+import json
+import logging
+import threading
+import pyani.core.mngr.machine_lock
+
+
+logger = logging.getLogger()
+
+
+class DownloadJournal(object):
+    """
+    Journal of downloads in progress so an interrupted download, ex: a laptop sleeping or the vpn dropping during the
+    nightly update, can be picked up by the next run instead of starting over.
+
+    Files download to a temp name first and are renamed into place when done, see
+    pyani.core.mngr.core.AniCoreMngr.server_file_download. Each step is appended to the journal as a line of json, so
+    the journal is up to date even if the process dies:
+        {"server path": ..., "local path": ..., "temp path": ..., "modify time": ..., "state": ..., "bytes": ...}
+
+    The states are:
+        started - the download started, bytes is what was already in the temp file from an earlier attempt
+        downloaded - the temp file is complete, bytes is its size
+        installed - the temp file was renamed to the local path
+
+    The last line for a server path is its current state. On the next run, downloaded files whose server modified
+    date hasn't changed are installed without downloading again, installed files are added to the download manifest
+    if the previous run couldn't save it, and partial temp files are removed.
+
+    Each process has its own journal, named with its process id, so the nightly update and the asset manager running
+    at the same time don't clean up or rewrite each other's downloads. A journal is only recovered once the process
+    that wrote it is no longer running, see take_orphaned_entries.
+
+    Thread safe.
+    """
+
+    STATE_STARTED = "started"
+    STATE_DOWNLOADED = "downloaded"
+    STATE_INSTALLED = "installed"
+
+    def __init__(self, journal_path):
+        """
+        :param journal_path: the journal file, json lines. The process's journal is named from it with the process
+        id, ex: cgt_download_journal.txt is cgt_download_journal.1234.txt
+        """
+        self.base_journal_path = journal_path
+        self.journal_path = self.get_process_journal_path(journal_path, os.getpid())
+        # server path: last entry
+        self._entries = None
+        self._lock = threading.Lock()
+        self._recovery_claimed = False
+
+    @staticmethod
+    def get_process_journal_path(journal_path, pid):
+        """
+        :param journal_path: the journal file given to the constructor
+        :param pid: a process id
+        :return: the journal of the process
+        """
+        journal_name, journal_ext = os.path.splitext(journal_path)
+        return "{0}.{1}{2}".format(journal_name, pid, journal_ext)
+
+    def take_orphaned_entries(self):
+        """
+        Takes over the journals of processes that are no longer running, ex: an update that was interrupted. Each
+        journal is renamed before it is read so only one process takes it, and removed once read. Journals of
+        running processes are left alone, their downloads are still in progress
+        :return: a list of the latest entry for every file in the orphaned journals
+        """
+        journal_dir = os.path.dirname(self.base_journal_path)
+        journal_name, journal_ext = os.path.splitext(os.path.basename(self.base_journal_path))
+        try:
+            file_names = os.listdir(journal_dir)
+        except (IOError, OSError):
+            return list()
+
+        entries = dict()
+        for file_name in sorted(file_names):
+            # the journal shared by every process in earlier versions has no process id
+            if file_name == journal_name + journal_ext:
+                pid = None
+            else:
+                pid_text = file_name[len(journal_name) + 1:-len(journal_ext) or None]
+                if not file_name.startswith(journal_name + ".") or not file_name.endswith(journal_ext) or \
+                        not pid_text.isdigit():
+                    continue
+                pid = int(pid_text)
+                # this process's id was used by an earlier process whose journal is left over
+                if not pid == os.getpid() and pyani.core.mngr.machine_lock.is_process_running(pid):
+                    continue
+            journal_path = os.path.join(journal_dir, file_name)
+            taken_path = "{0}.taken.{1}".format(journal_path, os.getpid())
+            try:
+                os.rename(journal_path, taken_path)
+            except (IOError, OSError):
+                # another process took it first
+                continue
+            entries.update(self._read_entries(taken_path))
+            try:
+                os.remove(taken_path)
+            except (IOError, OSError) as e:
+                logger.warning("Could not remove download journal {0}. Error is {1}".format(taken_path, e))
+        return list(entries.values())
+
+    def claim_recovery(self):
+        """
+        Lets one manager clean up after an interrupted run, see AniCoreMngr._recover_interrupted_downloads
+        :return: True the first time called, False after
+        """
+        with self._lock:
+            if self._recovery_claimed:
+                return False
+            self._recovery_claimed = True
+            return True
+
+    def get_entry(self, server_path):
+        """
+        :param server_path: the server file path
+        :return: the latest journal entry for the file as a dict, or None if not in the journal
+        """
+        with self._lock:
+            return self._get_entries().get(server_path)
+
+    def get_entries(self, state=None):
+        """
+        :param state: optional, only get entries in this state
+        :return: a list of the latest entry for every file in the journal
+        """
+        with self._lock:
+            return [
+                entry for entry in self._get_entries().values() if state is None or entry["state"] == state
+            ]
+
+    def add(self, server_path, local_path, temp_path, modify_time, state, num_bytes=0):
+        """
+        Adds a step to the journal and writes it to disk
+        :param server_path: the server file path
+        :param local_path: the file's final local path
+        :param temp_path: the temp path the file downloads to
+        :param modify_time: the server modified date as a string yyyy-mm-dd hh:mm:ss, or None if not known
+        :param state: one of the STATE class variables
+        :param num_bytes: bytes in the temp file
+        :return: None or error as string
+        """
+        entry = {
+            "server path": server_path,
+            "local path": local_path,
+            "temp path": temp_path,
+            "modify time": modify_time,
+            "state": state,
+            "bytes": num_bytes
+        }
+        with self._lock:
+            self._get_entries()[server_path] = entry
+            return self._append(entry)
+
+    def compact(self):
+        """
+        Rewrites this process's journal without installed files, call once the download manifest has them
+        :return: None or error as string
+        """
+        with self._lock:
+            entries = self._get_entries()
+            for server_path in list(entries.keys()):
+                if entries[server_path]["state"] == self.STATE_INSTALLED:
+                    del entries[server_path]
+            try:
+                with open(self.journal_path, "w") as journal_file:
+                    for entry in entries.values():
+                        journal_file.write(json.dumps(entry) + "\n")
+            except (IOError, OSError) as e:
+                error = "Could not write download journal {0}. Error is {1}".format(self.journal_path, e)
+                logger.error(error)
+                return error
+        return None
+
+    def _append(self, entry):
+        """
+        Appends an entry to the journal on disk. Call with the lock held.
+        :param entry: the entry dict
+        :return: None or error as string
+        """
+        try:
+            journal_dir = os.path.dirname(self.journal_path)
+            if not os.path.exists(journal_dir):
+                os.makedirs(journal_dir)
+            with open(self.journal_path, "a") as journal_file:
+                journal_file.write(json.dumps(entry) + "\n")
+        except (IOError, OSError) as e:
+            error = "Could not write download journal {0}. Error is {1}".format(self.journal_path, e)
+            logger.error(error)
+            return error
+        return None
+
+    def _get_entries(self):
+        """
+        Reads the journal off disk the first time its needed. Call with the lock held.
+        :return: dict of server path: latest entry
+        """
+        if self._entries is None:
+            self._entries = self._read_entries(self.journal_path)
+        return self._entries
+
+    @staticmethod
+    def _read_entries(journal_path):
+        """
+        :param journal_path: a journal file
+        :return: dict of server path: latest entry, empty if the journal doesn't exist
+        """
+        entries = dict()
+        if os.path.exists(journal_path):
+            try:
+                with open(journal_path, "r") as journal_file:
+                    for line in journal_file:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # a line cut short when the process died
+                            continue
+                        entries[entry["server path"]] = entry
+            except (IOError, OSError) as e:
+                logger.error("Could not read download journal {0}. Error is {1}".format(journal_path, e))
+        return entries
+
+
+# one journal for the process, managers share the same file
+_shared_journal = None
+_shared_journal_lock = threading.Lock()
+
+
+def get_shared_download_journal(app_vars):
+    """
+    Gets the download journal shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object
+    :return: the DownloadJournal
+    """
+    global _shared_journal
+    with _shared_journal_lock:
+        if _shared_journal is None:
+            _shared_journal = DownloadJournal(
+                os.path.join(app_vars.cgt_temp_file_cache_dir, app_vars.cgt_download_journal_filename)
+            )
+        return _shared_journal
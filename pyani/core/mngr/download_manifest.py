@@ -0,0 +1,164 @@
+import os
+import atexit
+import logging
+import threading
+import pyani.core.util
+
+
+logger = logging.getLogger()
+
+
+class DownloadManifest(object):
+    """
+    Record of the files downloaded from the server, used to skip downloading files that haven't changed since they
+    were last downloaded. Stored on disk as json in the format:
+        {
+            server file path: {
+                "modify time": the server's modified date when downloaded, yyyy-mm-dd hh:mm:ss,
+                "size": size in bytes of the downloaded file,
+                "local path": where the file was downloaded to
+            },
+            ...
+        }
+
+    A file is current when the server's modified date matches the one recorded and the local file is still there
+    with the recorded size, so local files that were deleted or changed are downloaded again. Directories aren't
+    recorded, their size on disk says nothing about their contents, so they are always downloaded.
+
+    Thread safe. Changes are kept in memory until save() is called, and saved automatically at exit.
+    """
+
+    def __init__(self, manifest_path):
+        """
+        :param manifest_path: the json file holding the manifest
+        """
+        self.manifest_path = manifest_path
+        self._entries = None
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def is_current(self, server_path, local_path, modify_time):
+        """
+        Checks if a file was already downloaded and hasn't changed on the server or locally since
+        :param server_path: the server file path
+        :param local_path: the local file path
+        :param modify_time: the server's current modified date as a string, yyyy-mm-dd hh:mm:ss
+        :return: the file size in bytes if current, None if the file needs to be downloaded
+        """
+        with self._lock:
+            entry = self._get_entries().get(server_path)
+        if not entry or not modify_time or os.path.isdir(local_path):
+            return None
+        if not entry["modify time"] == modify_time or not os.path.normpath(entry["local path"]) == \
+                os.path.normpath(local_path):
+            return None
+        try:
+            if not os.path.getsize(local_path) == entry["size"]:
+                return None
+        except (IOError, OSError):
+            return None
+        return entry["size"]
+
+    def get_recorded_size(self, server_path):
+        """
+        :param server_path: the server file path
+        :return: the size in bytes of the file when it was last downloaded, None if it hasn't been downloaded
+        """
+        with self._lock:
+            entry = self._get_entries().get(server_path)
+        if entry:
+            return entry["size"]
+        return None
+
+    def record(self, server_path, local_path, modify_time):
+        """
+        Records a file that was downloaded, directories are ignored
+        :param server_path: the server file path
+        :param local_path: the local file path
+        :param modify_time: the server's modified date as a string, yyyy-mm-dd hh:mm:ss
+        """
+        if os.path.isdir(local_path):
+            return
+        try:
+            size = os.path.getsize(local_path)
+        except (IOError, OSError):
+            # nothing to record, downloads again next time
+            return
+        with self._lock:
+            self._get_entries()[server_path] = {
+                "modify time": modify_time,
+                "size": size,
+                "local path": local_path
+            }
+            self._changed = True
+
+    def remove(self, server_path):
+        """
+        Forgets a file, it will be downloaded next time
+        :param server_path: the server file path
+        """
+        with self._lock:
+            if self._get_entries().pop(server_path, None):
+                self._changed = True
+
+    def save(self):
+        """
+        Writes the manifest to disk if it changed
+        :return: None or error as string
+        """
+        with self._lock:
+            if not self._changed:
+                return None
+            manifest_dir = os.path.dirname(self.manifest_path)
+            if not os.path.exists(manifest_dir):
+                error = pyani.core.util.make_all_dir_in_path(manifest_dir)
+                if error:
+                    return error
+            error = pyani.core.util.write_json(self.manifest_path, self._entries, indent=1)
+            if not error:
+                self._changed = False
+            return error
+
+    def _get_entries(self):
+        """
+        Loads the manifest off disk the first time its needed. Call with the lock held.
+        :return: the entries as a dict
+        """
+        if self._entries is None:
+            if os.path.exists(self.manifest_path):
+                data = pyani.core.util.load_json(self.manifest_path)
+            else:
+                data = None
+            self._entries = data if isinstance(data, dict) else dict()
+        return self._entries
+
+
+# one manifest for the process, managers share the same file
+_shared_manifest = None
+_shared_manifest_lock = threading.Lock()
+
+
+def get_shared_download_manifest(app_vars):
+    """
+    Gets the download manifest shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object
+    :return: the DownloadManifest
+    """
+    global _shared_manifest
+    with _shared_manifest_lock:
+        if _shared_manifest is None:
+            _shared_manifest = DownloadManifest(app_vars.cgt_download_manifest_path)
+        return _shared_manifest
+
+
+def save_shared_download_manifest():
+    """
+    Saves the shared manifest if one was created, called automatically at exit
+    """
+    if _shared_manifest is not None:
+        error = _shared_manifest.save()
+        if error:
+            logger.error("Could not save the download manifest. Error is {0}".format(error))
+
+
+atexit.register(save_shared_download_manifest)
@@ -0,0 +1,340 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import pyani.core.util
+
+
+logger = logging.getLogger()
+
+
+class ServerListingCache(object):
+    """
+    In process cache for server listings, so that asking for the same directory listing again within a short time
+    doesn't go back to the server. Entries expire after a time to live, and can be removed explicitly with
+    invalidate().
+
+    Requests for the same key made while a server call for that key is running wait for that call and share its
+    result instead of starting their own (single flight). This matters when several worker threads list the same
+    path at the same time, for example every file downloaded from one approved folder checks that folder's history.
+
+    Keys are tuples whose first element is the server path, followed by whatever listing options change the result:
+        cache.get(("/LongGong/assets/char", "files_only"), fetch_function)
+
+    Listings can also be kept in a SharedListingStore on disk, so other processes on the machine, ex: the nightly
+    update and the asset manager, reuse them. The disk is checked after memory and before the server.
+
+    Thread safe, one instance is shared by all managers in the process, see get_shared_listing_cache().
+    """
+
+    def __init__(self, ttl=30.0, shared_store=None):
+        """
+        :param ttl: seconds a listing stays valid, 0 disables caching but concurrent requests are still shared
+        :param shared_store: optional SharedListingStore to share listings with other processes
+        """
+        self.ttl = ttl
+        self.shared_store = shared_store
+        # key: (expire time, result)
+        self._entries = dict()
+        # key: _InFlightCall for requests being fetched from the server
+        self._in_flight = dict()
+        self._lock = threading.Lock()
+
+        # stats, useful for logging and debugging
+        self.hits = 0
+        self.misses = 0
+        self.shared_calls = 0
+        self.shared_hits = 0
+
+    def get(self, key, fetch, is_cacheable=None):
+        """
+        Gets a listing from the cache, or from the server when not cached or expired
+        :param key: a tuple, (server path, listing options...)
+        :param fetch: function that takes no arguments and gets the listing from the server
+        :param is_cacheable: optional function that takes the fetched result and returns False if it shouldn't be
+        cached, for example an error. Defaults to caching every result
+        :return: the listing, whatever fetch returns
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expire_time, result = entry
+                if time.time() < expire_time:
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = _InFlightCall()
+                self._in_flight[key] = in_flight
+                is_owner = True
+                self.misses += 1
+            else:
+                is_owner = False
+                self.shared_calls += 1
+
+        # another thread is getting this listing, wait for it
+        if not is_owner:
+            in_flight.done.wait()
+            return in_flight.result
+
+        from_shared_store = False
+        try:
+            if self.shared_store:
+                found, in_flight.result = self.shared_store.get(key)
+                from_shared_store = found
+                if found:
+                    self.shared_hits += 1
+            if not from_shared_store:
+                in_flight.result = fetch()
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                # don't cache if invalidated while fetching, the result may already be out of date
+                is_cached = not in_flight.invalidated and (is_cacheable is None or is_cacheable(in_flight.result))
+                if is_cached and self.ttl > 0:
+                    self._entries[key] = (time.time() + self.ttl, in_flight.result)
+            in_flight.done.set()
+
+        if is_cached and self.shared_store and not from_shared_store:
+            self.shared_store.put(key, in_flight.result)
+
+        return in_flight.result
+
+    def invalidate(self, server_path=None, shared=True):
+        """
+        Removes cached listings
+        :param server_path: optional, only remove listings of this path and paths under it. When not given the whole
+        cache is cleared
+        :param shared: True to also invalidate the listings on disk for every process, ex: after files on the server
+        changed. False only removes this process's listings, ex: before a cache build, so it doesn't use listings
+        from earlier but still reuses listings another process's build made within the shared time to live
+        """
+        with self._lock:
+            if server_path is None:
+                keys = list(self._entries.keys())
+                calls = list(self._in_flight.values())
+            else:
+                server_path = server_path.rstrip("/")
+                keys = [key for key in self._entries if self._is_under(key[0], server_path)]
+                calls = [call for key, call in self._in_flight.items() if self._is_under(key[0], server_path)]
+
+            for key in keys:
+                del self._entries[key]
+            for call in calls:
+                call.invalidated = True
+
+        if self.shared_store and shared:
+            self.shared_store.invalidate(server_path)
+
+        logger.info("Invalidated {0} server listings for {1}".format(len(keys), server_path or "all paths"))
+
+    @staticmethod
+    def _is_under(path, parent_path):
+        """
+        :param path: a server path
+        :param parent_path: a server path without a trailing slash
+        :return: True if path is parent_path or under it
+        """
+        path = path.rstrip("/")
+        return path == parent_path or path.startswith(parent_path + "/")
+
+
+class SharedListingStore(object):
+    """
+    Server listings kept on disk for other processes on the machine, see ServerListingCache. Each listing is a json
+    file named from its key, holding:
+        {"key": the key as a list, "written": seconds since the epoch, "result": the listing}
+
+    Folder listings are a temp file rather than a list, see
+    pyani.core.mngr.core.AniCoreMngr.server_get_file_listing_using_folder_filter. For results that are a dict with a
+    "temp file", the temp file is copied into the store and the stored result points at the copy.
+
+    Files are written to a temp name and renamed into place, so readers never see a partial listing. Listings older
+    than the time to live are ignored and removed from time to time.
+
+    invalidate() touches a marker file for the path in the store's "invalidated" folder. Every process compares a
+    listing's written time with the markers of its path and the paths above it, so listings written before an
+    invalidation are ignored by all processes.
+    """
+
+    INVALIDATED_DIR_NAME = "invalidated"
+
+    def __init__(self, store_dir, ttl=120.0):
+        """
+        :param store_dir: the folder listings are kept in
+        :param ttl: seconds a listing stays valid
+        """
+        self.store_dir = store_dir
+        self.ttl = ttl
+        self._invalidated_dir = os.path.join(store_dir, self.INVALIDATED_DIR_NAME)
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def get(self, key):
+        """
+        :param key: a ServerListingCache key
+        :return: a tuple (True, the listing) if another process listed it recently, otherwise (False, None)
+        """
+        listing_path = self._get_path(key)
+        if not os.path.exists(listing_path):
+            return False, None
+        listing = pyani.core.util.load_json(listing_path)
+        if not isinstance(listing, dict) or not listing.get("key") == list(key):
+            return False, None
+        written = listing.get("written", 0.0)
+        if time.time() - written > self.ttl or written <= self._get_invalidated_time(key[0]):
+            return False, None
+        result = listing.get("result")
+        if isinstance(result, dict) and "temp file" in result and not os.path.exists(result["temp file"]):
+            return False, None
+        return True, result
+
+    def put(self, key, result):
+        """
+        Stores a listing for other processes, a listing that can't be written is only logged
+        :param key: a ServerListingCache key
+        :param result: the listing, must be json serializable
+        """
+        listing_path = self._get_path(key)
+        error = pyani.core.util.make_all_dir_in_path(self.store_dir) if not os.path.exists(self.store_dir) else None
+        if error:
+            logger.warning("Could not share server listing. Error is {0}".format(error))
+            return
+        temp_path = "{0}.{1}.{2}.tmp".format(listing_path, os.getpid(), threading.current_thread().ident)
+        try:
+            if isinstance(result, dict) and "temp file" in result:
+                shared_file = os.path.splitext(listing_path)[0] + ".listing"
+                shutil.copyfile(result["temp file"], temp_path)
+                error = pyani.core.util.replace_file(temp_path, shared_file)
+                if error:
+                    logger.warning("Could not share server listing. Error is {0}".format(error))
+                    return
+                result = dict(result, **{"temp file": shared_file})
+            with open(temp_path, "w") as temp_file:
+                json.dump({"key": list(key), "written": time.time(), "result": result}, temp_file)
+        except (IOError, OSError, TypeError, ValueError) as error:
+            logger.warning("Could not share server listing. Error is {0}".format(error))
+            return
+        error = pyani.core.util.replace_file(temp_path, listing_path)
+        if error:
+            logger.warning("Could not share server listing. Error is {0}".format(error))
+        self._prune()
+
+    def invalidate(self, server_path=None):
+        """
+        Ignores listings written before now, in every process
+        :param server_path: optional, only ignore listings of this path and paths under it
+        """
+        marker_path = self._get_invalidated_path(server_path.rstrip("/") if server_path else None)
+        try:
+            if not os.path.exists(self._invalidated_dir):
+                os.makedirs(self._invalidated_dir)
+            with open(marker_path, "w") as marker_file:
+                marker_file.write(server_path or "")
+            # the marker may exist already, writing it updates its modified time
+            os.utime(marker_path, None)
+        except (IOError, OSError) as error:
+            logger.warning("Could not invalidate shared server listings. Error is {0}".format(error))
+
+    def _get_invalidated_time(self, path):
+        """
+        :param path: a server path
+        :return: the time of the last invalidate() in any process that covers the path, 0 if none did
+        """
+        path = path.rstrip("/")
+        # the path, every path above it and None for all paths
+        covering_paths = [None]
+        path_parts = [part for part in path.split("/") if part]
+        for part_index in range(1, len(path_parts) + 1):
+            covering_paths.append("/" + "/".join(path_parts[:part_index]))
+
+        invalidated_time = 0.0
+        for covering_path in covering_paths:
+            try:
+                invalidated_time = max(invalidated_time, os.path.getmtime(self._get_invalidated_path(covering_path)))
+            except (IOError, OSError):
+                # not invalidated
+                pass
+        return invalidated_time
+
+    def _get_invalidated_path(self, server_path):
+        """
+        :param server_path: a server path without a trailing slash, or None for every path
+        :return: the marker file invalidate() touches for the path
+        """
+        return os.path.join(self._invalidated_dir, get_key_file_name([server_path]))
+
+    def _get_path(self, key):
+        """
+        :param key: a ServerListingCache key
+        :return: the listing's json file
+        """
+        return os.path.join(self.store_dir, get_key_file_name(key) + ".json")
+
+    def _prune(self):
+        """
+        Removes expired listings, at most once per time to live
+        """
+        with self._lock:
+            if time.time() - self._last_prune < self.ttl:
+                return
+            self._last_prune = time.time()
+        # markers older than the time to live can go too, the listings written before them have expired
+        for prune_dir in (self.store_dir, self._invalidated_dir):
+            try:
+                file_names = os.listdir(prune_dir)
+            except (IOError, OSError):
+                continue
+            for file_name in file_names:
+                file_path = os.path.join(prune_dir, file_name)
+                try:
+                    # temp files of a write in progress are young, so only listings and abandoned temp files go
+                    if os.path.isfile(file_path) and time.time() - os.path.getmtime(file_path) > self.ttl * 2:
+                        os.remove(file_path)
+                except (IOError, OSError):
+                    pass
+
+
+def get_key_file_name(key):
+    """
+    :param key: a ServerListingCache key
+    :return: a file name for the key's listing without an extension, the same for the same key in every process
+    """
+    return hashlib.sha1(json.dumps(list(key)).encode("utf-8")).hexdigest()
+
+
+class _InFlightCall(object):
+    """
+    A server call in progress, threads asking for the same key wait on done
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.invalidated = False
+
+
+# one cache for the process so listings are shared between managers
+_shared_listing_cache = None
+_shared_listing_cache_lock = threading.Lock()
+
+
+def get_shared_listing_cache(app_vars):
+    """
+    Gets the listing cache shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object, the times to live are taken from it
+    :return: the ServerListingCache
+    """
+    global _shared_listing_cache
+    with _shared_listing_cache_lock:
+        if _shared_listing_cache is None:
+            shared_store = None
+            if app_vars.cgt_shared_listing_ttl > 0:
+                shared_store = SharedListingStore(app_vars.cgt_shared_listing_dir, ttl=app_vars.cgt_shared_listing_ttl)
+            _shared_listing_cache = ServerListingCache(ttl=app_vars.cgt_listing_cache_ttl, shared_store=shared_store)
+        return _shared_listing_cache
@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+import time
+import errno
+import socket
+import logging
+import threading
+
+
+logger = logging.getLogger()
+
+
+class MachineLock(object):
+    """
+    Lock shared by every process on the machine, so the nightly update and an open asset manager don't sync the same
+    cache at the same time. The lock is a file created only if it doesn't exist, holding the owner as json:
+        {"pid": process id, "host": machine name, "name": what the lock is for, "started": seconds since the epoch}
+
+    While held, a thread touches the file every heartbeat_seconds. A lock is stale and broken when its process is no
+    longer running, or its file wasn't touched for stale_seconds, ex: the process hung or was killed before it could
+    remove the file.
+
+    Processes and threads wait for the lock the same way, so a second sync in the same process waits too. Use
+    was_waiting() after acquire() to find out if another sync held the lock, its result may be reusable.
+    """
+
+    def __init__(self, lock_path, name="", stale_seconds=120.0, heartbeat_seconds=None, poll_seconds=0.5):
+        """
+        :param lock_path: the lock file
+        :param name: what the lock is for, for the log
+        :param stale_seconds: a lock file not touched for this long is broken
+        :param heartbeat_seconds: how often the owner touches the lock file, defaults to a quarter of stale_seconds
+        :param poll_seconds: how often a waiting process checks the lock
+        """
+        self.lock_path = lock_path
+        self.name = name
+        self.stale_seconds = stale_seconds
+        self.heartbeat_seconds = heartbeat_seconds if heartbeat_seconds else stale_seconds / 4.0
+        self.poll_seconds = poll_seconds
+
+        self._owner = None
+        self._waiting = False
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+
+    def acquire(self, timeout=None):
+        """
+        Gets the lock, waiting while another process or thread holds it
+        :param timeout: optional seconds to wait, None waits until the lock is free
+        :return: True if the lock was acquired, False if the timeout passed
+        """
+        start_time = time.time()
+        self._waiting = False
+        while True:
+            if self._try_create():
+                self._start_heartbeat()
+                return True
+            owner = self.get_owner()
+            if owner is not None and self._is_stale(owner):
+                self._break(owner)
+                continue
+            if not self._waiting:
+                self._waiting = True
+                logger.info("Waiting for {0}, held by {1}.".format(self.name or self.lock_path, owner))
+            if timeout is not None and time.time() - start_time >= timeout:
+                return False
+            time.sleep(self.poll_seconds)
+
+    def release(self):
+        """
+        Releases the lock if this object holds it
+        """
+        if self._owner is None:
+            return
+        self._heartbeat_stop.set()
+        # wait for the heartbeat to stop, a lock released at exit would otherwise leave it running while python shuts
+        # down
+        if self._heartbeat_thread is not None and self._heartbeat_thread is not threading.current_thread():
+            self._heartbeat_thread.join(1.0)
+        # don't remove a lock another process took after breaking this one as stale
+        if self.get_owner() == self._owner:
+            try:
+                os.remove(self.lock_path)
+            except (IOError, OSError) as error:
+                logger.warning("Could not remove lock {0}. Error is {1}".format(self.lock_path, error))
+        self._owner = None
+
+    def is_held(self):
+        """
+        :return: True if this object holds the lock
+        """
+        return self._owner is not None
+
+    def was_waiting(self):
+        """
+        :return: True if the last acquire() had to wait for another owner
+        """
+        return self._waiting
+
+    def get_owner(self):
+        """
+        :return: the lock file's owner info as a dict, or None when the lock is free or the file can't be read
+        """
+        try:
+            with open(self.lock_path, "r") as lock_file:
+                owner = json.load(lock_file)
+        except (IOError, OSError, ValueError):
+            return None
+        return owner if isinstance(owner, dict) else None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.release()
+
+    def _try_create(self):
+        """
+        Creates the lock file if it doesn't exist, in one step so only one process can succeed
+        :return: True if created, False if the lock file exists
+        """
+        lock_dir = os.path.dirname(self.lock_path)
+        if lock_dir and not os.path.exists(lock_dir):
+            try:
+                os.makedirs(lock_dir)
+            except (IOError, OSError):
+                # another process made it
+                pass
+        owner = {
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "name": self.name,
+            "started": time.time()
+        }
+        try:
+            file_descriptor = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (IOError, OSError) as error:
+            if error.errno == errno.EEXIST:
+                return False
+            raise
+        with os.fdopen(file_descriptor, "w") as lock_file:
+            json.dump(owner, lock_file)
+        self._owner = owner
+        return True
+
+    def _is_stale(self, owner):
+        """
+        :param owner: the lock file's owner info
+        :return: True if the owner's process isn't running or stopped touching the lock file
+        """
+        if owner.get("host") == socket.gethostname() and not is_process_running(owner.get("pid")):
+            return True
+        try:
+            return time.time() - os.path.getmtime(self.lock_path) > self.stale_seconds
+        except (IOError, OSError):
+            # removed in the meantime, not stale but free
+            return False
+
+    def _break(self, owner):
+        """
+        Removes a stale lock. The file is renamed first so only one of several waiting processes breaks it
+        :param owner: the stale lock's owner info
+        """
+        broken_path = "{0}.{1}.broken".format(self.lock_path, os.getpid())
+        try:
+            os.rename(self.lock_path, broken_path)
+        except (IOError, OSError):
+            # another process broke it or the owner released it
+            return
+        logger.warning("Broke stale lock {0}, held by {1}.".format(self.name or self.lock_path, owner))
+        try:
+            os.remove(broken_path)
+        except (IOError, OSError):
+            pass
+
+    def _start_heartbeat(self):
+        """
+        Starts touching the lock file so other processes know the owner is alive
+        """
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat, args=(self._heartbeat_stop, self._owner)
+        )
+        self._heartbeat_thread.daemon = True
+        self._heartbeat_thread.start()
+
+    def _heartbeat(self, stop, owner):
+        """
+        Touches the lock file until stopped
+        :param stop: a threading.Event set when the lock is released
+        :param owner: the owner info of the lock being held
+        """
+        while not stop.wait(self.heartbeat_seconds):
+            if not self.get_owner() == owner:
+                logger.warning("Lock {0} was taken by another process.".format(self.name or self.lock_path))
+                return
+            try:
+                os.utime(self.lock_path, None)
+            except (IOError, OSError):
+                pass
+
+
+def is_process_running(pid):
+    """
+    :param pid: a process id
+    :return: True if a process with the id is running on this machine, also True when it can't be checked
+    """
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    if sys.platform == "win32":
+        import ctypes
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            if not ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            # STILL_ACTIVE
+            return exit_code.value == 259
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except OSError as error:
+        return not error.errno == errno.ESRCH
+    return True
+
+
+def get_cache_sync_lock(app_vars, cache_path):
+    """
+    Makes the lock that syncs of a cache hold, see pyani.core.mngr.core.AniCoreMngr
+    :param app_vars: a pyani.core.appvars.AppVars object, the settings are taken from it
+    :param cache_path: the cache file being synced
+    :return: a MachineLock
+    """
+    return MachineLock(
+        cache_path + ".lock",
+        name="sync of {0}".format(os.path.basename(cache_path)),
+        stale_seconds=app_vars.cgt_sync_lock_stale_seconds
+    )
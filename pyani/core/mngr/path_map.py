@@ -0,0 +1,216 @@
+import os
+import time
+import threading
+
+
+class LRUCache(object):
+    """
+    Remembers the most recently used values up to a size, the least recently used are forgotten first. Python 2
+    doesn't have functools.lru_cache, and OrderedDict is too slow for paths looked up tens of thousands of times.
+
+    Values are kept in two generations. New values go in the recent generation, and when it's full it becomes the
+    old generation and the previous old values are forgotten. Values found in the old generation move back to the
+    recent one. So values not used in the last max_size / 2 to max_size lookups are forgotten.
+
+    Thread safe. Lookups of recent values don't lock, a dict lookup is atomic.
+    """
+
+    def __init__(self, max_size=50000):
+        """
+        :param max_size: the most values to remember, 0 remembers nothing
+        """
+        self.max_size = max_size
+        self._recent = dict()
+        self._old = dict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute, *args):
+        """
+        Gets a value, computing and remembering it when not known
+        :param key: a hashable key
+        :param compute: function that makes the value
+        :param args: the arguments to call compute with
+        :return: the value
+        """
+        value = self._recent.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self._old.get(key, _MISSING)
+        if value is _MISSING:
+            # computed outside the lock, at worst two threads compute the same value
+            value = compute(*args)
+        if self.max_size > 0:
+            with self._lock:
+                if len(self._recent) >= self.max_size // 2:
+                    self._old = self._recent
+                    self._recent = dict()
+                self._recent[key] = value
+        return value
+
+    def clear(self):
+        """
+        Forgets all values
+        """
+        with self._lock:
+            self._recent = dict()
+            self._old = dict()
+
+    def __len__(self):
+        return len(self._recent) + len(self._old)
+
+
+# marks a value that isn't cached, None is a valid value
+_MISSING = object()
+
+
+class ServerPathMap(object):
+    """
+    Maps server paths to local paths and back with a table of server roots and the local roots they are copied to.
+    The table is made once and each resolved path is remembered, so converting the same paths for every file of a
+    download doesn't split and normalize them again. For example with the table:
+        [("/", "Z:")]
+    the server path /LongGong/assets/char/rig.mb is Z:\\LongGong\\assets\\char\\rig.mb locally, and the other way.
+
+    The longest server root that a path is under is used, so a sub folder can map somewhere else than its parent:
+        [("/", "Z:"), ("/LongGong/sequences", "Y:\\sequences")]
+
+    Local paths are compared without case, since Windows paths aren't case sensitive. Thread safe.
+    """
+
+    def __init__(self, prefixes, cache_size=50000):
+        """
+        :param prefixes: a list of (server root, local root) tuples
+        :param cache_size: the most resolved paths to remember per direction
+        """
+        # server root with a trailing /, local root without a trailing separator. Longest roots first so they match
+        # before their parents
+        self._to_local_table = sorted(
+            [(server_root.rstrip("/") + "/", local_root.rstrip("\\/")) for server_root, local_root in prefixes],
+            key=lambda prefix: len(prefix[0]),
+            reverse=True
+        )
+        self._to_server_table = sorted(
+            [
+                (os.path.normcase(local_root.rstrip("\\/")) + "\\", server_root.rstrip("/"))
+                for server_root, local_root in prefixes
+            ],
+            key=lambda prefix: len(prefix[0]),
+            reverse=True
+        )
+        self._local_paths = LRUCache(cache_size)
+        self._server_paths = LRUCache(cache_size)
+
+    def to_local(self, server_path, directory_only=False):
+        """
+        :param server_path: a server path, ex: /LongGong/assets/char/rig.mb
+        :param directory_only: True to drop the file name, the path's last part
+        :return: the path on the local copy of the server, None when the path isn't under a server root in the table
+        """
+        return self._local_paths.get((server_path, directory_only), self._map_to_local, server_path, directory_only)
+
+    def to_server(self, local_path):
+        """
+        The reverse of to_local()
+        :param local_path: a path on the local copy of the server, ex: Z:\\LongGong\\assets\\char\\rig.mb
+        :return: the server path, None when the path isn't under a local root in the table
+        """
+        return self._server_paths.get(local_path, self._map_to_server, local_path)
+
+    def clear(self):
+        """
+        Forgets the resolved paths
+        """
+        self._local_paths.clear()
+        self._server_paths.clear()
+
+    def _map_to_local(self, server_path, directory_only):
+        """
+        :param server_path: a server path
+        :param directory_only: True to drop the file name
+        :return: the local path or None, see to_local()
+        """
+        if directory_only:
+            server_path = server_path.rsplit("/", 1)[0] if "/" in server_path else ""
+        path = "/" + server_path.lstrip("/")
+        for server_root, local_root in self._to_local_table:
+            if path.startswith(server_root) or path + "/" == server_root:
+                relative_path = path[len(server_root):].replace("/", "\\")
+                return os.path.normpath("{0}\\{1}".format(local_root, relative_path))
+        return None
+
+    def _map_to_server(self, local_path):
+        """
+        :param local_path: a local path
+        :return: the server path or None, see to_server()
+        """
+        path = os.path.normcase(os.path.normpath(local_path)).replace("/", "\\")
+        original_path = os.path.normpath(local_path).replace("/", "\\")
+        for local_root, server_root in self._to_server_table:
+            if path.startswith(local_root) or path + "\\" == local_root:
+                # keep the case of the local path's parts, only the root is compared without case
+                relative_parts = [part for part in original_path[len(local_root):].split("\\") if part]
+                return "/".join([server_root] + relative_parts) or "/"
+        return None
+
+
+# one map for the process, all managers convert the same paths
+_shared_path_map = None
+_shared_path_map_lock = threading.Lock()
+
+
+def get_shared_path_map(app_vars):
+    """
+    Gets the path map shared by all managers, creating it if needed
+    :param app_vars: a pyani.core.appvars.AppVars object, the table and cache size are taken from it
+    :return: the ServerPathMap
+    """
+    global _shared_path_map
+    with _shared_path_map_lock:
+        if _shared_path_map is None:
+            _shared_path_map = ServerPathMap(app_vars.cgt_path_map, cache_size=app_vars.cgt_path_map_cache_size)
+        return _shared_path_map
+
+
+def benchmark(num_paths=100000, prefixes=(("/", "Z:"),)):
+    """
+    Times converting server paths the way the managers used to, splitting and joining each path, against the path
+    map before and after it remembered the paths. Run with python -m pyani.core.mngr.path_map
+    :param num_paths: how many different paths to convert
+    :param prefixes: the path map's table
+    :return: a dict of "split", "map", "map remembered" and "map to server": microseconds per path
+    """
+    server_paths = [
+        "/LongGong/assets/char/char_{0}/rig/approved/char_{0}_rig_v{1:03d}.mb".format(index % 500, index)
+        for index in range(num_paths)
+    ]
+
+    def split_and_join(server_path):
+        local_path = prefixes[0][1]
+        for path_component in server_path.split("/"):
+            local_path = "{0}\\{1}".format(local_path, path_component)
+        return os.path.normpath(local_path)
+
+    # room for every path in the recent generation, see LRUCache
+    path_map = ServerPathMap(prefixes, cache_size=num_paths * 2)
+    timings = dict()
+    for name, convert in (
+        ("split", split_and_join),
+        ("map", path_map.to_local),
+        ("map remembered", path_map.to_local)
+    ):
+        start_time = time.time()
+        for server_path in server_paths:
+            convert(server_path)
+        timings[name] = (time.time() - start_time) / num_paths * 1000000.0
+
+    local_paths = [path_map.to_local(server_path) for server_path in server_paths]
+    start_time = time.time()
+    for local_path in local_paths:
+        path_map.to_server(local_path)
+    timings["map to server"] = (time.time() - start_time) / num_paths * 1000000.0
+    return timings
+
+
+if __name__ == "__main__":
+    for timing_name, microseconds in sorted(benchmark().items()):
+        print("{0}: {1:.2f} microseconds per path".format(timing_name, microseconds))
@@ -0,0 +1,511 @@
+import sys
+import time
+import logging
+import threading
+import traceback
+import Queue
+import pyani.core.mngr.machine_lock
+
+
+logger = logging.getLogger()
+
+
+class ServerFuture(object):
+    """
+    The result of a server operation that runs in the background, see ServerExecutor. Wait for it with result(), or
+    add a callback with add_done_callback() to be told when its done. Chain more work with then().
+
+    Thread safe.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._done = False
+        self._result = None
+        # sys.exc_info() of an exception the operation raised
+        self._exc_info = None
+        self._callbacks = list()
+
+    def done(self):
+        """
+        :return: True if the operation finished, False if not
+        """
+        with self._condition:
+            return self._done
+
+    def result(self, timeout=None):
+        """
+        Waits for the operation to finish
+        :param timeout: optional seconds to wait
+        :return: the operation's result
+        :raises: the exception the operation raised, or RuntimeError if the timeout passed
+        """
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                raise RuntimeError("Server operation didn't finish in {0} seconds.".format(timeout))
+            if self._exc_info:
+                raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+            return self._result
+
+    def exception(self, timeout=None):
+        """
+        Waits for the operation to finish
+        :param timeout: optional seconds to wait
+        :return: the exception the operation raised, or None if it didn't raise one
+        """
+        try:
+            self.result(timeout)
+        except RuntimeError as e:
+            if not self.done():
+                raise
+            return e
+        except Exception as e:
+            return e
+        return None
+
+    def add_done_callback(self, callback):
+        """
+        Calls the callback with this future when the operation finishes, right away if it already has. The
+        callback runs in the thread that finished the operation
+        :param callback: a function that takes the future
+        """
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        self._run_callback(callback)
+
+    def then(self, function):
+        """
+        Chains work that runs after this operation with its result
+        :param function: a function that takes the result. Not called if the operation raised an exception
+        :return: a ServerFuture for the function's result, gets this future's exception if it raised one
+        """
+        chained_future = ServerFuture()
+
+        def run_function(future):
+            if future._exc_info:
+                chained_future.set_exc_info(future._exc_info)
+                return
+            try:
+                chained_future.set_result(function(future._result))
+            except Exception:
+                chained_future.set_exc_info(sys.exc_info())
+
+        self.add_done_callback(run_function)
+        return chained_future
+
+    def set_result(self, result):
+        """
+        Finishes the operation
+        :param result: the operation's result
+        """
+        self._finish(result, None)
+
+    def set_exc_info(self, exc_info):
+        """
+        Finishes the operation with an exception
+        :param exc_info: sys.exc_info() of the exception
+        """
+        self._finish(None, exc_info)
+
+    def _finish(self, result, exc_info):
+        """
+        Stores the result and calls the callbacks
+        :param result: the operation's result
+        :param exc_info: sys.exc_info() of an exception or None
+        """
+        with self._condition:
+            if self._done:
+                return
+            self._result = result
+            self._exc_info = exc_info
+            self._done = True
+            callbacks = self._callbacks
+            self._callbacks = list()
+            self._condition.notify_all()
+        for callback in callbacks:
+            self._run_callback(callback)
+
+    def _run_callback(self, callback):
+        """
+        Calls a done callback, logging anything it raises so one bad callback doesn't stop the others
+        :param callback: a function that takes the future
+        """
+        try:
+            callback(self)
+        except Exception:
+            logger.error("Error in server operation callback: {0}".format(traceback.format_exc()))
+
+
+def gather(futures):
+    """
+    Combines futures into one that finishes when all of them have
+    :param futures: a list of ServerFuture
+    :return: a ServerFuture whose result is a list of the futures' results in the same order. An operation that
+    raised an exception has the exception in its place
+    """
+    gathered_future = ServerFuture()
+    futures = list(futures)
+    if not futures:
+        gathered_future.set_result(list())
+        return gathered_future
+
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def future_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        results = list()
+        for future in futures:
+            error = future.exception()
+            results.append(error if error else future.result())
+        gathered_future.set_result(results)
+
+    for future in futures:
+        future.add_done_callback(future_done)
+    return gathered_future
+
+
+class ServerExecutor(object):
+    """
+    Runs server operations on a fixed number of plain threads, without Qt. Operations are queued and run in the
+    order submitted as threads free up, so thousands of downloads use a handful of threads instead of a thread each.
+    Since server calls wait on the app bridge, the thread count should match the bridge worker pool, see
+    pyani.core.mngr.bridge.CGTBridgeWorkerPool.
+
+        executor = ServerExecutor(4)
+        future = executor.submit(mngr.server_file_download, [server_path], local_file_paths=[local_dir])
+        error = future.result()
+        executor.shutdown()
+
+    Thread safe.
+    """
+
+    def __init__(self, max_workers=4):
+        """
+        :param max_workers: the number of threads
+        """
+        self.max_workers = max(1, max_workers)
+        self._queue = Queue.Queue()
+        self._threads = list()
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queues a function to run on the executor's threads
+        :param function: the function
+        :param args: the function's arguments
+        :param kwargs: the function's keyword arguments
+        :return: a ServerFuture for the function's result
+        """
+        future = ServerFuture()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Can't submit server operations after the executor shut down.")
+            self._queue.put((future, function, args, kwargs))
+            # start threads as needed
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._run, name="ServerExecutor-{0}".format(len(self._threads)))
+                # don't keep the process alive for queued operations when the app exits
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def shutdown(self, wait=True):
+        """
+        Stops the threads once the queued operations are done
+        :param wait: True to wait for the queued operations
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.shutdown(wait=True)
+
+    def _run(self):
+        """
+        A thread's loop, runs queued operations until shut down
+        """
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            future, function, args, kwargs = job
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                logger.error("Error in server operation: {0}".format(traceback.format_exc()))
+                future.set_exc_info(sys.exc_info())
+            else:
+                future.set_result(result)
+
+
+class ServerOperations(object):
+    """
+    Server operations as futures, for code that runs without Qt signals, ex: the asset manager's background
+    refresh of its caches, see pyani.core.mngr.core.AniCoreMngr.revalidate_local_cache, and scripts. Each method
+    queues the operation on a ServerExecutor and returns a ServerFuture right away, so several operations run at once
+    from one thread and are waited on together with gather():
+
+        operations = ServerOperations(core_mngr, executor)
+        futures = [
+            operations.build_asset_cache(asset_mngr),
+            operations.build_tools_cache(tools_mngr),
+            operations.file_listing(server_path, "rig", temp_file)
+        ]
+        errors = [error for error in gather(futures).result() if error]
+
+    The operations run the same job lists as the managers' gui methods, which start the jobs as pyani.core.ui.Worker
+    threads instead. The gui methods don't run on this api, and the nightly update, pyani.core.mngr.ui.update, still
+    runs as a Qt task list with the Worker threads. Managers used only through these operations don't need a
+    QApplication, their progress window is only made by the gui methods.
+
+    Results are what the manager methods return, mostly None or an error string. The composite operations - the asset
+    cache, tools cache and asset downloads - give a list of the errors that occurred.
+    """
+
+    def __init__(self, core_mngr, executor=None):
+        """
+        :param core_mngr: a pyani.core.mngr.core.AniCoreMngr, or subclass, that runs the server calls
+        :param executor: optional ServerExecutor, one sized to the bridge worker pool is made if not given
+        """
+        self.core_mngr = core_mngr
+        if executor is None:
+            executor = ServerExecutor(core_mngr.app_vars.cgt_bridge_pool_size)
+        self.executor = executor
+
+    # listings
+
+    def dir_list(self, server_path, **kwargs):
+        """
+        Lists a server directory, see AniCoreMngr.server_get_dir_list for the keyword arguments
+        :param server_path: the path to the data
+        :return: a ServerFuture for the listing
+        """
+        return self.executor.submit(self.core_mngr.server_get_dir_list, server_path, **kwargs)
+
+    def file_listing(self, server_path, folder_filter, temp_file_name, modified_since=None):
+        """
+        Gets file info under a path, see AniCoreMngr.server_get_file_listing_using_folder_filter
+        :param server_path: the path to the data
+        :param folder_filter: a folder to limit file listing to
+        :param temp_file_name: where to write the file info to
+        :param modified_since: optional date as a string yyyy-mm-dd hh:mm:ss, only list what changed since
+        :return: a ServerFuture for None or an error string
+        """
+        return self.executor.submit(
+            self.core_mngr.server_get_file_listing_using_folder_filter,
+            server_path,
+            folder_filter,
+            temp_file_name,
+            modified_since=modified_since
+        )
+
+    # metadata
+
+    def files_exist(self, server_paths):
+        """
+        :param server_paths: a list of paths on the server
+        :return: a ServerFuture for AniCoreMngr.server_file_exists_batch's result
+        """
+        return self.executor.submit(self.core_mngr.server_file_exists_batch, server_paths)
+
+    def modified_dates(self, server_paths):
+        """
+        :param server_paths: a list of paths on the server
+        :return: a ServerFuture for AniCoreMngr.server_file_modified_date_batch's result
+        """
+        return self.executor.submit(self.core_mngr.server_file_modified_date_batch, server_paths)
+
+    def file_sizes(self, server_paths):
+        """
+        :param server_paths: a list of paths on the server
+        :return: a ServerFuture for AniCoreMngr.server_file_size_batch's result
+        """
+        return self.executor.submit(self.core_mngr.server_file_size_batch, server_paths)
+
+    # downloads
+
+    def download(self, server_file_paths, local_file_paths=None, update_local_version=False):
+        """
+        Downloads files, see AniCoreMngr.server_file_download
+        :param server_file_paths: a list of server file paths
+        :param local_file_paths: a list of the local file paths where cgt files stored
+        :param update_local_version: True to update the local version file after
+        :return: a ServerFuture for None or an error string
+        """
+        return self.executor.submit(
+            self.core_mngr.server_file_download,
+            server_file_paths,
+            local_file_paths=local_file_paths,
+            update_local_version=update_local_version
+        )
+
+    # notes
+
+    def release_notes(self, asset_mngr, asset_component, asset_name):
+        """
+        Gets an asset's release notes, see pyani.core.mngr.assets.AniAssetMngr.get_release_notes
+        :param asset_mngr: a pyani.core.mngr.assets.AniAssetMngr
+        :param asset_component: the asset component
+        :param asset_name: the asset name
+        :return: a ServerFuture for a tuple of the notes and error
+        """
+        return self.executor.submit(asset_mngr.get_release_notes, asset_component, asset_name)
+
+    # caches and syncs
+
+    def build_asset_cache(self, asset_mngr, assets_dict=None):
+        """
+        Builds the asset cache and saves it, the same as AniAssetMngr.server_build_local_cache without a gui
+        :param asset_mngr: a pyani.core.mngr.assets.AniAssetMngr
+        :param assets_dict: optional assets to update, see AniAssetMngr.server_build_local_cache
+        :return: a ServerFuture for a list of errors
+        """
+        return self._run_cache_sync(
+            asset_mngr, lambda: asset_mngr.prepare_cache_jobs(assets_dict), reuse_synced_cache=not assets_dict
+        )
+
+    def sync_asset_cache(self, asset_mngr):
+        """
+        Syncs the whole asset cache with the server and saves it, the same as AniAssetMngr.sync_local_cache_with_server
+        without a gui. Only what changed since the last sync is listed when the cache can be synced incrementally,
+        otherwise the cache is rebuilt
+        :param asset_mngr: a pyani.core.mngr.assets.AniAssetMngr
+        :return: a ServerFuture for a list of errors
+        """
+        def prepare_jobs():
+            if asset_mngr.can_sync_local_cache_incrementally():
+                return asset_mngr.prepare_sync_jobs()
+            return asset_mngr.prepare_cache_jobs()
+
+        return self._run_cache_sync(asset_mngr, prepare_jobs)
+
+    def build_tools_cache(self, tools_mngr, tools_dict=None):
+        """
+        Builds the tools cache with AniToolsMngr.server_get_tool_info and saves it, the same as
+        AniToolsMngr.server_build_local_cache without a gui
+        :param tools_mngr: a pyani.core.mngr.tools.AniToolsMngr
+        :param tools_dict: optional tools to update, see AniToolsMngr.server_build_local_cache
+        :return: a ServerFuture for a list of errors
+        """
+        return self._run_cache_sync(
+            tools_mngr, lambda: tools_mngr.prepare_cache_jobs(tools_dict), reuse_synced_cache=not tools_dict
+        )
+
+    def download_assets(self, asset_mngr, assets_dict=None):
+        """
+        Downloads assets, the same as AniAssetMngr.server_download without a gui. The download records are saved
+        when all downloads finish
+        :param asset_mngr: a pyani.core.mngr.assets.AniAssetMngr
+        :param assets_dict: optional assets to download, all assets if not given
+        :return: a ServerFuture for a list of errors
+        """
+        asset_mngr.reset_download_skip_stats()
+        jobs = asset_mngr.prepare_download_jobs(assets_dict)
+        # the asset cache couldn't be loaded
+        if not isinstance(jobs, list):
+            future = ServerFuture()
+            future.set_result([jobs])
+            return future
+        return self._run_jobs(jobs, asset_mngr.save_download_manifest)
+
+    def _run_cache_sync(self, mngr, prepare_jobs, reuse_synced_cache=True):
+        """
+        Runs a cache sync while holding the machine wide lock for the cache, the same as
+        AniCoreMngr.start_local_cache_sync_with_lock. The lock is waited for in a server thread, up to AppVars
+        cgt_sync_lock_wait_seconds. When another process held it and saved the cache in the meantime, that cache is
+        loaded instead of syncing again
+        :param mngr: the pyani.core.mngr.core.AniCoreMngr subclass whose cache is synced
+        :param prepare_jobs: function with no arguments that returns the sync's jobs, called once the lock is held
+        :param reuse_synced_cache: False to always sync, ex: when only some assets or tools are updated
+        :return: a ServerFuture for a list of errors
+        """
+        sync_future = ServerFuture()
+
+        def start_sync():
+            lock = pyani.core.mngr.machine_lock.get_cache_sync_lock(mngr.app_vars, mngr.get_local_cache_path())
+            wait_start = time.time()
+            if not lock.acquire(timeout=mngr.app_vars.cgt_sync_lock_wait_seconds):
+                sync_future.set_result(
+                    [
+                        "Another sync of the cache by {0} didn't finish in {1} seconds, try again later.".format(
+                            lock.get_owner() or "another process", int(mngr.app_vars.cgt_sync_lock_wait_seconds)
+                        )
+                    ]
+                )
+                return
+            cache_age = mngr.get_local_cache_age()
+            if reuse_synced_cache and lock.was_waiting() and cache_age is not None and \
+                    cache_age <= time.time() - wait_start:
+                lock.release()
+                logger.info("The cache was synced by another process while waiting, using it.")
+                error = mngr.load_local_cache()
+                sync_future.set_result([error] if error else list())
+                return
+
+            def sync_done(jobs_future):
+                lock.release()
+                try:
+                    sync_future.set_result(jobs_future.result())
+                except Exception:
+                    sync_future.set_exc_info(sys.exc_info())
+
+            try:
+                mngr.invalidate_server_listing_cache(shared=False)
+                jobs = prepare_jobs()
+            except Exception:
+                lock.release()
+                raise
+            self._run_jobs(jobs, mngr.server_save_local_cache, finish_on_error=False).add_done_callback(sync_done)
+
+        def start_done(start_future):
+            try:
+                start_future.result()
+            except Exception:
+                sync_future.set_exc_info(sys.exc_info())
+
+        self.executor.submit(start_sync).add_done_callback(start_done)
+        return sync_future
+
+    def _run_jobs(self, jobs, finish_function, finish_on_error=True):
+        """
+        Runs jobs at once then calls a function to finish up, ex: saving a cache
+        :param jobs: a list of (function, args, kwargs) tuples
+        :param finish_function: function to call with no arguments once every job is done, returns None or an
+        error string
+        :param finish_on_error: False to skip the finish function when a job failed. Caches built with errors aren't
+        saved, the same as the gui, so a failed build doesn't replace the cache on disk
+        :return: a ServerFuture for a list of the errors the jobs and the finish function returned or raised
+        """
+        futures = [self.executor.submit(function, *args, **kwargs) for function, args, kwargs in jobs]
+
+        def finish(results):
+            errors = [str(result) for result in results if result]
+            if errors and not finish_on_error:
+                return errors
+            error = finish_function()
+            if error:
+                errors.append(error)
+            return errors
+
+        return gather(futures).then(finish)
@@ -0,0 +1,310 @@
+import os
+import math
+import time
+import logging
+import threading
+import collections
+import pyani.core.util
+
+
+logger = logging.getLogger()
+
+
+class RollingHistogram(object):
+    """
+    Histogram of the most recent values of a measurement, for example call times in seconds. Older values roll off
+    once the window is full, while the count and total cover every value recorded.
+
+    Buckets are powers of two, so they work the same for times in seconds and sizes in bytes:
+        ..., [0.25, 0.5), [0.5, 1), [1, 2), [2, 4), ...
+    """
+
+    def __init__(self, window=1000):
+        """
+        :param window: the number of recent values kept
+        """
+        self._values = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        """
+        :param value: a number, 0 or more
+        """
+        self._values.append(value)
+        self.count += 1
+        self.total += value
+
+    def get_percentile(self, percent):
+        """
+        :param percent: 0 - 100
+        :return: the value at the percentile of the recent values, None when there aren't any
+        """
+        if not self._values:
+            return None
+        values = sorted(self._values)
+        index = min(len(values) - 1, int(round((percent / 100.0) * (len(values) - 1))))
+        return values[index]
+
+    def get_buckets(self):
+        """
+        :return: a list of [bucket low, bucket high, count] for the recent values, sorted low to high, only buckets
+        that have values
+        """
+        buckets = collections.Counter()
+        for value in self._values:
+            low = 0.0
+            if value > 0:
+                # frexp gives value = m * 2 ** e with 0.5 <= m < 1, so the bucket starts at 2 ** (e - 1)
+                low = 2.0 ** (math.frexp(value)[1] - 1)
+            buckets[low] += 1
+        return [[low, low * 2.0 if low else 0.0, buckets[low]] for low in sorted(buckets)]
+
+    def to_dict(self):
+        """
+        :return: the histogram as a json serializable dict
+        """
+        recent = list(self._values)
+        return {
+            "count": self.count,
+            "total": self.total,
+            "recent count": len(recent),
+            "min": min(recent) if recent else None,
+            "max": max(recent) if recent else None,
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "buckets": self.get_buckets()
+        }
+
+
+class TransferTelemetry(object):
+    """
+    Times and sizes of server operations, so a slow update can be traced to where the time went. Every call to the
+    app bridge is recorded under an operation name, see get_operation_name(), with rolling histograms of:
+        - seconds - the whole call as the manager saw it
+        - a histogram per phase, when the bridge reports them, see pyani.core.mngr.bridge:
+            spawn - starting the bridge process
+            wait - waiting for the bridge while it ran other calls
+            login - logging in to CGT
+            listing - finding the files on the server, for downloads everything before the first file starts
+            transfer - moving the bytes
+        - bytes and bytes per second, for downloads
+
+    Downloaded files are also counted by the source that served them, see record_download_source().
+
+    Save with save() to get a json file of the histograms, and get_summary() for a report.
+
+    Thread safe, one is shared by all managers in the process, see get_shared_telemetry().
+    """
+
+    PHASES = ("spawn", "wait", "login", "listing", "transfer")
+    # where a downloaded file came from - CGT, the local server mirror, or another download already on disk
+    SOURCE_CLOUD = "cloud"
+    SOURCE_MIRROR = "mirror"
+    SOURCE_CONTENT_STORE = "content store"
+
+    def __init__(self, window=1000):
+        """
+        :param window: the number of recent values each histogram keeps
+        """
+        self.window = window
+        self.start_time = time.time()
+        # operation: {"calls": int, "failures": int, "histograms": {measurement: RollingHistogram}}
+        self._operations = dict()
+        # source: {"files": int, "bytes": int}
+        self._download_sources = dict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_operation_name(command):
+        """
+        Names the server operation a bridge command does
+        :param command: a bridge command, the script followed by its arguments
+        :return: the operation name, ex: download, dir listing, file info
+        """
+        script = os.path.basename(command[0]).replace(".py", "")
+        if script == "cgt_download":
+            return "download"
+        if script == "cgt_file_info":
+            options = " ".join(command[1:])
+            if "--folder_filter" in options:
+                return "folder listing"
+            if "--is_file=True" in options or "--path_exists=True" in options or "--modified_date=True" in options or \
+                    "--file_size=True" in options:
+                return "file info"
+            return "dir listing"
+        if script == "cgt_get_notes":
+            return "notes"
+        if script == "cgt_show_info":
+            return "show info"
+        return script
+
+    def record(self, operation, seconds, phases=None, succeeded=True):
+        """
+        Records a server call
+        :param operation: the operation name, see get_operation_name()
+        :param seconds: how long the call took
+        :param phases: optional dict of phase name: seconds, see the class description for the phases
+        :param succeeded: False if the call failed
+        """
+        with self._lock:
+            stats = self._get_operation(operation)
+            stats["calls"] += 1
+            if not succeeded:
+                stats["failures"] += 1
+            self._get_histogram(stats, "seconds").add(seconds)
+            if phases:
+                for phase, phase_seconds in phases.items():
+                    if phase_seconds is not None:
+                        self._get_histogram(stats, phase + " seconds").add(phase_seconds)
+
+    def record_bytes(self, operation, num_bytes, seconds):
+        """
+        Records the bytes a server call moved
+        :param operation: the operation name, see get_operation_name()
+        :param num_bytes: bytes transferred
+        :param seconds: how long the transfer took
+        """
+        with self._lock:
+            stats = self._get_operation(operation)
+            self._get_histogram(stats, "bytes").add(num_bytes)
+            if seconds > 0:
+                self._get_histogram(stats, "bytes per second").add(num_bytes / float(seconds))
+
+    def record_download_source(self, source, num_files, num_bytes):
+        """
+        Records where downloaded files came from
+        :param source: one of the SOURCE constants
+        :param num_files: the number of files
+        :param num_bytes: their total size in bytes
+        """
+        with self._lock:
+            if source not in self._download_sources:
+                self._download_sources[source] = {"files": 0, "bytes": 0}
+            self._download_sources[source]["files"] += num_files
+            self._download_sources[source]["bytes"] += num_bytes
+
+    def get_download_sources(self):
+        """
+        :return: a dict of source: {"files": number of files, "bytes": total bytes}, see record_download_source()
+        """
+        with self._lock:
+            return dict((source, dict(counts)) for source, counts in self._download_sources.items())
+
+    def to_dict(self):
+        """
+        :return: all operations' stats as a json serializable dict
+        """
+        download_sources = self.get_download_sources()
+        with self._lock:
+            return {
+                "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.start_time)),
+                "seconds": time.time() - self.start_time,
+                "download sources": download_sources,
+                "operations": dict(
+                    (
+                        operation,
+                        {
+                            "calls": stats["calls"],
+                            "failures": stats["failures"],
+                            "histograms": dict(
+                                (name, histogram.to_dict()) for name, histogram in stats["histograms"].items()
+                            )
+                        }
+                    )
+                    for operation, stats in self._operations.items()
+                )
+            }
+
+    def get_summary(self):
+        """
+        :return: a list of dicts, one per operation sorted by total time, with the keys:
+            "operation", "calls", "failures", "total seconds", "p50 seconds", "p90 seconds", "bytes",
+            "bytes per second" (median, None when no bytes were recorded), and "phases" - a dict of phase: total
+            seconds
+        """
+        summary = list()
+        with self._lock:
+            for operation, stats in self._operations.items():
+                histograms = stats["histograms"]
+                seconds = histograms.get("seconds")
+                transfer_bytes = histograms.get("bytes")
+                throughput = histograms.get("bytes per second")
+                summary.append(
+                    {
+                        "operation": operation,
+                        "calls": stats["calls"],
+                        "failures": stats["failures"],
+                        "total seconds": seconds.total if seconds else 0.0,
+                        "p50 seconds": seconds.get_percentile(50) if seconds else None,
+                        "p90 seconds": seconds.get_percentile(90) if seconds else None,
+                        "bytes": int(transfer_bytes.total) if transfer_bytes else 0,
+                        "bytes per second": throughput.get_percentile(50) if throughput else None,
+                        "phases": dict(
+                            (phase, histograms[phase + " seconds"].total)
+                            for phase in self.PHASES if phase + " seconds" in histograms
+                        )
+                    }
+                )
+        return sorted(summary, key=lambda item: item["total seconds"], reverse=True)
+
+    def save(self, file_path):
+        """
+        Writes the stats to a json file
+        :param file_path: the json file
+        :return: None or error as string
+        """
+        file_dir = os.path.dirname(file_path)
+        if file_dir and not os.path.exists(file_dir):
+            error = pyani.core.util.make_all_dir_in_path(file_dir)
+            if error:
+                return error
+        return pyani.core.util.write_json(file_path, self.to_dict(), indent=1)
+
+    def reset(self):
+        """
+        Clears all stats
+        """
+        with self._lock:
+            self._operations = dict()
+            self._download_sources = dict()
+            self.start_time = time.time()
+
+    def _get_operation(self, operation):
+        """
+        Call with the lock held
+        :param operation: the operation name
+        :return: the operation's stats, created if needed
+        """
+        if operation not in self._operations:
+            self._operations[operation] = {"calls": 0, "failures": 0, "histograms": dict()}
+        return self._operations[operation]
+
+    def _get_histogram(self, stats, name):
+        """
+        Call with the lock held
+        :param stats: an operation's stats
+        :param name: the measurement's name
+        :return: the RollingHistogram, created if needed
+        """
+        if name not in stats["histograms"]:
+            stats["histograms"][name] = RollingHistogram(window=self.window)
+        return stats["histograms"][name]
+
+
+# one for the process, so all managers' calls end up in the same stats
+_shared_telemetry = None
+_shared_telemetry_lock = threading.Lock()
+
+
+def get_shared_telemetry():
+    """
+    Gets the telemetry shared by all managers, creating it if needed
+    :return: the TransferTelemetry
+    """
+    global _shared_telemetry
+    with _shared_telemetry_lock:
+        if _shared_telemetry is None:
+            _shared_telemetry = TransferTelemetry()
+        return _shared_telemetry
@@ -9,6 +9,7 @@ import pyani.core.anivars
 import pyani.core.ui
 import pyani.core.util
 import pyani.core.mngr.core
+import pyani.core.mngr.bandwidth
 
 # set the environment variable to use a specific wrapper
 # it can be set to pyqt, pyqt5, pyside or pyside2 (not implemented yet)
@@ -144,6 +145,34 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
             self._tools_info = None
             return data
 
+    def get_local_cache_path(self):
+        """
+        :return: the path of the tools cache, see pyani.core.mngr.core.AniCoreMngr.revalidate_local_cache
+        """
+        return self.app_vars.cgt_tools_cache_path
+
+    def get_local_cache_data(self):
+        """
+        :return: the tools cache, see pyani.core.mngr.core.AniCoreMngr.get_local_cache_changes
+        """
+        return self._tools_info if self._tools_info else dict()
+
+    def load_local_cache(self):
+        """
+        Loads the tools cache off disk, see load_server_tool_cache
+        :return: None or error as string
+        """
+        return self.load_server_tool_cache()
+
+    def start_local_cache_sync(self, server_ops):
+        """
+        Rebuilds the tools cache from the server without a gui, see
+        pyani.core.mngr.server_ops.ServerOperations.build_tools_cache
+        :param server_ops: a pyani.core.mngr.server_ops.ServerOperations
+        :return: a pyani.core.mngr.server_ops.ServerFuture for a list of errors
+        """
+        return server_ops.build_tools_cache(self)
+
     def open_help_doc(self, tool_name):
         """
         opens an html page in the web browser for help. Returns error if page(s) can't be opened.
@@ -580,8 +609,9 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
         """
         # no tool types, so can't set any other values in data struct, so rebuild entire cache
         if not update_data_dict:
-            self.server_build_local_cache()
+            self.start_local_cache_sync_with_lock(self.server_build_local_cache)
         else:
+            self.take_local_cache_snapshot(update_data_dict)
             self.server_build_local_cache(
                 tools_dict=update_data_dict,
                 thread_callback=self._thread_server_sync_complete,
@@ -612,6 +642,7 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
 
         # reset progress
         self.init_progress_window("Sync Progress", "Updating tools...")
+        self.take_local_cache_snapshot(update_data_dict)
 
         # update the local cache for the tools given - done by type
         self.server_build_local_cache(
@@ -644,6 +675,8 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
         """
         # set number of threads to 3. have issues otherwise
         self.set_number_of_concurrent_threads(3)
+        # count files skipped because they haven't changed for this download only
+        self.reset_download_skip_stats()
 
         # if not in gui mode reset thread count and errors, otherwise don't because cache sync did this already
         if not gui_mode:
@@ -671,8 +704,9 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
         # lists for debugging
         cgt_file_paths = list()
         local_file_paths = list()
+        # (server path, local directory) of every file to download
+        download_file_paths = list()
 
-        # now use multi-threading to download
         for tool_type in tools_dict:
             for tool_category in tools_dict[tool_type]:
                 # need to download the cgt metadata as well - once per category
@@ -744,32 +778,48 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
                             cgt_file_paths.append(cgt_path)
                             local_file_paths.append(local_path)
                         else:
-                            # server_file_download expects a list of files, so pass list even though just one file
-                            worker = pyani.core.ui.Worker(
-                                self.server_file_download,
-                                False,
-                                [cgt_path],
-                                local_file_paths=[local_path]
-                            )
-                            self.thread_total += 1.0
-                            self.thread_pool.start(worker)
-
-                            # slot that is called when a thread finishes
-                            if gui_mode:
-                                # passes the active_type so calling classes can know what was updated
-                                # and the save cache method so that when cache gets updated it can be saved
-                                worker.signals.finished.connect(
-                                    functools.partial(
-                                        self._thread_server_sync_complete,
-                                        self.active_type,
-                                        self.server_save_local_cache
-                                    )
-                                )
-                            else:
-                                worker.signals.finished.connect(self._thread_server_download_complete)
-                            worker.signals.error.connect(self.send_thread_error)
+                            download_file_paths.append((cgt_path, local_path))
                         # reset list
                         files_to_download = list()
+
+        # now use multi-threading to download, files are grouped into batches that each download in one bridge call.
+        # order all the downloads before starting any
+        with self.download_scheduler:
+            for server_file_paths, local_dl_paths in self.get_download_batches(download_file_paths):
+                worker = pyani.core.ui.Worker(
+                    self.server_file_download_batch,
+                    False,
+                    server_file_paths,
+                    local_dl_paths
+                )
+                # progress counts files, not batches
+                self.thread_total += len(server_file_paths)
+
+                # slot that is called when a thread finishes
+                if gui_mode:
+                    # passes the active_type so calling classes can know what was updated
+                    # and the save cache method so that when cache gets updated it can be saved
+                    worker.signals.finished.connect(
+                        functools.partial(
+                            self._thread_server_sync_complete,
+                            self.active_type,
+                            self.server_save_local_cache,
+                            len(server_file_paths)
+                        )
+                    )
+                else:
+                    worker.signals.finished.connect(
+                        functools.partial(self._thread_server_download_complete, len(server_file_paths))
+                    )
+                worker.signals.error.connect(self.send_thread_error)
+
+                # a user is waiting on downloads started from the gui, otherwise its a background
+                # sync such as the nightly update
+                if gui_mode:
+                    priority = pyani.core.mngr.core.AniDownloadScheduler.PRIORITY_INTERACTIVE
+                else:
+                    priority = pyani.core.mngr.core.AniDownloadScheduler.PRIORITY_BACKGROUND
+                self.submit_download(worker, server_file_paths, local_dl_paths, priority=priority)
         if debug:
             self.progress_win.setValue(100)
             tools_file_paths_dict = {
@@ -811,7 +861,44 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
         self._reset_thread_counters()
         # reset thread errors
         self.init_thread_error()
+        # building a cache shouldn't use listings cached earlier in this process. Listings another process's sync made
+        # within the shared time to live are still used, see pyani.core.mngr.listing_cache.SharedListingStore
+        self.invalidate_server_listing_cache(shared=False)
+
+        # if no thread callback then normal cgt cache creation so show progress, otherwise there should be
+        # a progress window already running
+        if not thread_callback:
+            # reset progress
+            self.init_progress_window("Cache Progress", "Creating cache...")
 
+        for function, args, kwargs in self.prepare_cache_jobs(tools_dict):
+            worker = pyani.core.ui.Worker(function, False, *args, **kwargs)
+            self.thread_total += 1.0
+            self.thread_pool.start(worker)
+
+            # slot that is called when a thread finishes, pass the call back function to call when its done
+            # check if thread callback is cache update or cache update with download, if no callback,
+            # use the default cache complete callback
+            if not thread_callback:
+                worker.signals.finished.connect(
+                    functools.partial(self._thread_server_cache_complete, self.server_save_local_cache)
+                )
+            else:
+                category = thread_callback_args[0]
+                save_method = thread_callback_args[1]
+                worker.signals.finished.connect(
+                    functools.partial(thread_callback, category, save_method)
+                )
+            worker.signals.error.connect(self.send_thread_error)
+
+    def prepare_cache_jobs(self, tools_dict=None):
+        """
+        Lists the work to get tool info from the server for the cache, one server_get_tool_info call per tool
+        category. Used by server_build_local_cache to start threads, and by pyani.core.mngr.server_ops to build the
+        cache without a gui. Save the cache with server_save_local_cache once every job is done
+        :param tools_dict: optional tools to update, see server_build_local_cache. Rebuilds all tools if not given
+        :return: a list of (function, args, kwargs) tuples
+        """
         # load existing cache if exists. Note if it can't be loaded and tools dict is provided, ignore tools dict
         # and rebuild entire cache to avoid cache being incomplete. i.e. can't build cache for certain tools if
         # don't have rest of the cache info, otherwise only certain tools get updated
@@ -823,17 +910,12 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
         # get a list of existing tools
         self._existing_tools_before_sync = copy.deepcopy(self._tools_info)
 
-        # if no thread callback then normal cgt cache creation so show progress, otherwise there should be
-        # a progress window already running
-        if not thread_callback:
-            # reset progress
-            self.init_progress_window("Cache Progress", "Creating cache...")
-
         if not tools_dict:
             tool_types = self.app_vars.tool_types
         else:
             tool_types = tools_dict.keys()
 
+        cache_jobs = list()
         # make the tool names and build directories for downloading of metadata
         for tool_type in tool_types:
 
@@ -851,30 +933,10 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
                 else:
                     tool_names = tools_dict[tool_type][tool_category]
 
-                worker = pyani.core.ui.Worker(
-                    self.server_get_tool_info,
-                    False,
-                    tool_type,
-                    tool_category,
-                    tool_names_to_update=tool_names
+                cache_jobs.append(
+                    (self.server_get_tool_info, (tool_type, tool_category), {"tool_names_to_update": tool_names})
                 )
-                self.thread_total += 1.0
-                self.thread_pool.start(worker)
-
-                # slot that is called when a thread finishes, pass the call back function to call when its done
-                # check if thread callback is cache update or cache update with download, if no callback,
-                # use the default cache complete callback
-                if not thread_callback:
-                    worker.signals.finished.connect(
-                        functools.partial(self._thread_server_cache_complete, self.server_save_local_cache)
-                    )
-                else:
-                    category = thread_callback_args[0]
-                    save_method = thread_callback_args[1]
-                    worker.signals.finished.connect(
-                        functools.partial(thread_callback, category, save_method)
-                    )
-                worker.signals.error.connect(self.send_thread_error)
+        return cache_jobs
 
     def server_get_tool_info(self, tool_type, tool_category, tool_names_to_update=None):
         """
@@ -918,17 +980,24 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
             )
             logger.error(msg)
 
+        # check whether every path is a file or directory in one server call rather than one call per path
+        server_paths = {
+            tool: "{0}/{1}".format(self.app_vars.tool_types[tool_type][tool_category]['cgt cloud dir'], tool)
+            for tool in tools_found
+        }
+        server_paths_are_files = self.server_is_file_batch(server_paths.values())
+
         tools_no_extension = []
         # remove any extensions and non tool files
         for tool in tools_found:
             # only get extension if the name is a file
-            server_path = "{0}/{1}".format(self.app_vars.tool_types[tool_type][tool_category]['cgt cloud dir'], tool)
+            server_path = server_paths[tool]
 
             if tool_type == "lib" and tool_category == "scandir":
                 print server_path
 
             # check if path is a file or directory
-            if self.server_is_file(server_path):
+            if server_paths_are_files[server_path]:
                 tool_name_parts = tool.split(".")
                 tool_ext = tool_name_parts[-1]
                 tool_no_ext = '.'.join(tool_name_parts[:-1])
@@ -972,15 +1041,19 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
                 )
                 if tool_type == "lib" and tool_category == "scandir":
                     print "single ", server_path
-                # a directory
-                if self.server_get_dir_list(server_path, files_only=True):
-                    is_dir = True
-                    file_list = self.server_get_dir_list(
+                # a directory, already know from the file check above, so only list the directory's files when
+                # its not a file. An empty listing means its a single file
+                dir_file_list = None
+                if server_paths_are_files.get(server_path) is not True:
+                    dir_file_list = self.server_get_dir_list(
                         self.app_vars.tool_types[tool_type][tool_category]['cgt cloud dir'] + "/" + tool_name,
                         files_only=True,
                         walk_dirs=True,
                         absolute_paths=True
                     )
+                if dir_file_list:
+                    is_dir = True
+                    file_list = dir_file_list
                 # single file
                 else:
                     is_dir = False
@@ -997,8 +1070,10 @@ class AniToolsMngr(pyani.core.mngr.core.AniCoreMngr):
         server_metadata_paths = [self.app_vars.tool_types[tool_type][tool_category]['cgt cloud metadata path']]
         local_temp_metadata_dir = [self.app_vars.tool_types[tool_type][tool_category]['local temp path']]
 
-        # download the metadata which has version and release notes
-        error = self.server_file_download(server_metadata_paths, local_temp_metadata_dir)
+        # download the metadata which has version and release notes. The cache build waits on it, so it uses the
+        # interactive bandwidth budget rather than being throttled like background downloads
+        with pyani.core.mngr.bandwidth.traffic_class(pyani.core.mngr.bandwidth.BandwidthLimiter.CLASS_INTERACTIVE):
+            error = self.server_file_download(server_metadata_paths, local_temp_metadata_dir)
 
         if error:
             error_fmt = "Could not read cgt tool metadata. Error is {0}".format(error)
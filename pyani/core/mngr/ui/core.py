@@ -1,8 +1,11 @@
 import os
+import time
 import logging
+import functools
 import pyani.core.ui
 import pyani.core.mngr.tools
 import pyani.core.appvars
+import pyani.core.util
 import collections
 
 # set the environment variable to use a specific wrapper
@@ -19,10 +22,16 @@ logger = logging.getLogger()
 
 class AniTaskList:
     """
-    The purpose of this class is to provide a list of tasks that can be run in order, sequentially, and let this
-    class manage running those. It uses signal/slots of pyqt to do this. A function runs, fires a signal when it
-    completes or errors, which causes this class to then respond and either report the error or run the next
-    function in the list. Provides a post task list option to run task(s) after the main tasks complete
+    The purpose of this class is to provide a list of tasks and let this class manage running those. It uses
+    signal/slots of pyqt to do this. A function runs, fires a signal when it completes or errors, which causes this
+    class to then respond and either report the error or run the next function(s). Provides a post task list option
+    to run task(s) after the main tasks complete
+
+    Tasks can declare the tasks they depend on. Every task whose dependencies have finished runs at once, so steps
+    that don't need each other, like the tools and asset caches, overlap. A task without dependencies listed waits
+    for the task before it, so a plain list runs in order. When all tasks finish each task's wall time and the
+    critical path - the chain of dependent tasks that decided how long the list took - are logged, see
+    get_timing_report()
 
     Doesn't handle errors directly, connects to methods that get called when error occurs
 
@@ -34,12 +43,24 @@ class AniTaskList:
         self.task_list = [
             # make tools cache
             {
+                'name': "tools cache",
                 'func': self.tools_mngr.sync_local_cache_with_server,
                 'params': [],
                 'finish signal': self.tools_mngr.finished_cache_build_signal,
                 'error signal': self.tools_mngr.error_thread_signal,
                 'thread task': False,
-                'desc': "Created local tools cache."
+                'desc': "Created local tools cache.",
+                'depends on': []
+            },
+            # download tools once the tools cache is made
+            {
+                'func': self.tools_mngr.server_download,
+                'params': [],
+                'finish signal': self.tools_mngr.finished_signal,
+                'error signal': self.tools_mngr.error_thread_signal,
+                'thread task': False,
+                'desc': "Downloaded tools.",
+                'depends on': ["tools cache"]
             }
         ]
 
@@ -64,6 +85,12 @@ class AniTaskList:
                 'thread task': True means put task in thread, False does not. Only thread non threaded methods. If
                                the method in 'func' creates threads, set this to False otherwise errors will occur.
                 'desc': string description describing what this method does. shown in activity log.
+                'name': optional name other tasks use to depend on this task, defaults to the 'desc'
+                'depends on': optional list of task names that must finish first. An empty list means the task can
+                              run right away. When not given the task waits for the task before it in the list.
+                'resource': optional object the task uses, defaults to the manager whose method 'func' is. A task
+                            that isn't a thread task doesn't run at the same time as other tasks with the same
+                            resource, since the manager's thread counters and signals are shared
             }
         :param post_tasks_to_run: optional task(s) to call when main task(s) finish. a list of dicts in format:
             {
@@ -79,23 +106,30 @@ class AniTaskList:
         self._thread_pool = QtCore.QThreadPool()
         logger.info("Multi-threading with maximum %d threads" % self._thread_pool.maxThreadCount())
 
-        # this tells the next_step_in_task_list() method to not get any more tasks from the task list defined by
-        # the class variable task_list
+        # this tells the next_step_in_task_list() method to not start any more tasks from the task list
         self._stop_tasks = False
         # function to call if error occurs
         self._error_callback = error_callback
         # function to call to update a ui
         self._ui_callback = ui_callback
 
-        # method vars for setup and updating
-        self._task_list = task_list_to_run
-        self._method_to_run = None
-        self._method_params = None
-        self._method_finish_signal = None
-        self._method_error_signal = None
+        # tasks waiting to run, in list order
+        self._task_list = list()
+        # task name: task, for tasks that are running
+        self._running_tasks = dict()
+        # task names that finished
+        self._finished_task_names = set()
+        # task name: [start time, end time], seconds since the epoch, and the dependencies of the tasks that ran
+        self._task_times = dict()
+        self._task_dependencies = dict()
+        # the order tasks were given in, for reporting
+        self._task_order = list()
+        for task in task_list_to_run:
+            self.add_task(task)
 
         # tasks to run after the main task list runs
         self._post_tasks = post_tasks_to_run
+        self._post_tasks_run = False
 
     def set_error_method(self, func):
         """Set the error callback function when errors occur"""
@@ -113,6 +147,19 @@ class AniTaskList:
         self._post_tasks = post_tasks
 
     def add_task(self, task):
+        """
+        Adds a task, see init for the format. Fills in the task's name and dependencies when not given
+        :param task: the task dict
+        """
+        task = dict(task)
+        if not task.get('name'):
+            task['name'] = task['desc']
+        if 'depends on' not in task:
+            # wait for the task before this one, so lists without dependencies run in order
+            task['depends on'] = [self._task_order[-1]] if self._task_order else []
+        if 'resource' not in task:
+            task['resource'] = getattr(task['func'], '__self__', None)
+        self._task_order.append(task['name'])
         self._task_list.append(task)
 
     def stop_tasks(self):
@@ -120,72 +167,225 @@ class AniTaskList:
         self._stop_tasks = True
 
     def start_tasks(self):
-        """Starts the task list by getting first task"""
-        self._get_next_task_to_run()
+        """Starts every task that doesn't depend on another task"""
+        error = self._check_dependencies()
+        if error:
+            logger.error(error)
+            self._stop_tasks = True
+            if self._error_callback:
+                self._error_callback(error)
+            return
+        self._start_ready_tasks()
 
     def is_task_remaining(self):
-        """Returns true if tasks remain, False if no more tasks"""
-        if self._task_list:
+        """Returns true if tasks remain or are running, False if no more tasks"""
+        if self._task_list or self._running_tasks:
             return True
         else:
             return False
 
-    def next_step_in_task_list(self):
+    def next_step_in_task_list(self, task_name=None):
         """
-        Increments to the next step in the update or setup process task list, provided via the class variable
-        task_list. If no more tasks are left, shows the activity report and hides step and progress ui labels
+        Called when a task finishes. Starts the tasks that were waiting on it. If no more tasks are left, runs the
+        post tasks and logs the task times
+        :param task_name: the name of the task that finished
         """
+        if task_name in self._running_tasks:
+            task = self._running_tasks.pop(task_name)
+            self._task_times[task_name][1] = time.time()
+            self._finished_task_names.add(task_name)
+            self._disconnect_task(task)
+
         # check for more steps that need to be run
         if self._task_list and not self._stop_tasks:
-            # add to activity log as success
-            self._get_next_task_to_run()
-        # no more steps
-        else:
-            # run the post task(s)
-            if self._post_tasks:
-                for task in self._post_tasks:
-                    func = task['func']
-                    params = task['params']
-                    func(*params)
-
-    def _get_next_task_to_run(self):
-        """
-        Gets a task from the task list and runs it in a thread
-        """
-        if self._task_list:
-            # update the ui with the first step / task
-            if self._ui_callback:
-                self._ui_callback()
-            task_list_package = self._task_list.pop(0)
-            self._method_to_run = task_list_package['func']
-            self._method_params = task_list_package['params']
-            self._method_finish_signal = task_list_package['finish signal']
-            self._method_error_signal = task_list_package['error signal']
-            self._task_desc = task_list_package['desc']
-
-            # some tasks are already multi-threaded, so only thread tasks that have the 'thread task' key in task list
-            # set to True
-            if task_list_package['thread task']:
-                # thread task
-                worker = pyani.core.ui.Worker(
-                    self._method_to_run,
-                    False,
-                    *self._method_params
+            self._start_ready_tasks()
+            # dependencies are checked before starting, so something is running unless the list was stopped
+            if self._running_tasks:
+                return
+        # wait for running tasks before running post tasks
+        if self._running_tasks:
+            return
+
+        # no more steps, run the post task(s)
+        if self._post_tasks_run:
+            return
+        self._post_tasks_run = True
+        self._log_task_times()
+        if self._post_tasks:
+            for task in self._post_tasks:
+                func = task['func']
+                params = task['params']
+                func(*params)
+
+    def get_task_times(self):
+        """
+        :return: a list of (task name, seconds) tuples for tasks that finished, in the order they were given
+        """
+        return [
+            (task_name, self._task_times[task_name][1] - self._task_times[task_name][0])
+            for task_name in self._task_order
+            if task_name in self._finished_task_names
+        ]
+
+    def get_critical_path(self):
+        """
+        Finds the chain of tasks that decided how long the list took, starting from the last task to finish and
+        following the dependency that finished last back to the start. Time between a task's dependencies finishing
+        and it starting is time spent waiting on another task with the same resource
+        :return: a list of task names, first to last
+        """
+        finished = [task_name for task_name in self._task_order if task_name in self._finished_task_names]
+        if not finished:
+            return list()
+        critical_path = list()
+        task_name = max(finished, key=lambda name: self._task_times[name][1])
+        while task_name:
+            critical_path.insert(0, task_name)
+            dependencies = [
+                name for name in self._task_dependencies.get(task_name, list()) if name in self._finished_task_names
+            ]
+            task_name = max(dependencies, key=lambda name: self._task_times[name][1]) if dependencies else None
+        return critical_path
+
+    def get_timing_report(self):
+        """
+        :return: a list of strings describing each task's wall time, the critical path and total time
+        """
+        task_times = self.get_task_times()
+        if not task_times:
+            return list()
+        start_time = min(self._task_times[task_name][0] for task_name, _ in task_times)
+        end_time = max(self._task_times[task_name][1] for task_name, _ in task_times)
+        critical_path = self.get_critical_path()
+        report = ["{0}: {1:.1f}s".format(task_name, seconds) for task_name, seconds in task_times]
+        report.append(
+            "Critical path ({0:.1f}s): {1}".format(
+                sum(seconds for task_name, seconds in task_times if task_name in critical_path),
+                " -> ".join(critical_path)
+            )
+        )
+        report.append("All tasks: {0:.1f}s".format(end_time - start_time))
+        return report
+
+    def _check_dependencies(self):
+        """
+        Checks that every dependency is a task in the list and that no tasks depend on each other in a loop
+        :return: None or error as string
+        """
+        task_names = set(task['name'] for task in self._task_list) | self._finished_task_names
+        for task in self._task_list:
+            missing = [name for name in task['depends on'] if name not in task_names]
+            if missing:
+                return "Task {0} depends on tasks that aren't in the task list: {1}".format(
+                    task['name'], ", ".join(missing)
                 )
+        # resolve tasks in rounds, anything left unresolved depends on itself through other tasks
+        resolved = set(self._finished_task_names)
+        unresolved = list(self._task_list)
+        while unresolved:
+            ready = [task for task in unresolved if set(task['depends on']) <= resolved]
+            if not ready:
+                return "Tasks depend on each other in a loop: {0}".format(
+                    ", ".join(task['name'] for task in unresolved)
+                )
+            resolved.update(task['name'] for task in ready)
+            unresolved = [task for task in unresolved if task not in ready]
+        return None
 
-                self._thread_pool.start(worker)
-                # slot that is called when a thread finishes, passes the active_type so calling classes can
-                # know what was updated and the save cache method so that when cache gets updated it can be
-                # saved
-                worker.signals.finished.connect(self.next_step_in_task_list)
-                if self._error_callback:
-                    worker.signals.error.connect(self._error_callback)
-            # already threaded, don't thread
-            else:
-                self._method_finish_signal.connect(self.next_step_in_task_list)
-                if self._error_callback:
-                    self._method_error_signal.connect(self._error_callback)
-                self._method_to_run(*self._method_params)
+    def _is_task_ready(self, task):
+        """
+        :param task: a task dict
+        :return: True if the task's dependencies finished and nothing running conflicts with its resource
+        """
+        if not set(task['depends on']) <= self._finished_task_names:
+            return False
+        if task['resource'] is None:
+            return True
+        for running_task in self._running_tasks.values():
+            if running_task['resource'] is task['resource'] and \
+                    not (task['thread task'] and running_task['thread task']):
+                return False
+        return True
+
+    def _start_ready_tasks(self):
+        """
+        Starts every waiting task that is ready to run, in list order
+        """
+        for task in list(self._task_list):
+            if self._stop_tasks:
+                return
+            # checked as each task starts, since a task started here can block the next one's resource
+            if self._is_task_ready(task):
+                self._task_list.remove(task)
+                self._run_task(task)
+
+    def _run_task(self, task):
+        """
+        Runs a task in a thread, or calls it if its already threaded
+        :param task: a task dict
+        """
+        # update the ui with the step / task
+        if self._ui_callback:
+            self._ui_callback()
+        task_name = task['name']
+        self._running_tasks[task_name] = task
+        self._task_times[task_name] = [time.time(), None]
+        self._task_dependencies[task_name] = task['depends on']
+        finish_slot = functools.partial(self._task_finished, task_name)
+
+        # some tasks are already multi-threaded, so only thread tasks that have the 'thread task' key in task list
+        # set to True
+        if task['thread task']:
+            # thread task
+            worker = pyani.core.ui.Worker(
+                task['func'],
+                False,
+                *task['params']
+            )
+            # slot that is called when a thread finishes, passes the task name so we know which task finished
+            worker.signals.finished.connect(finish_slot)
+            if self._error_callback:
+                worker.signals.error.connect(self._error_callback)
+            self._thread_pool.start(worker)
+        # already threaded, don't thread
+        else:
+            # remember the slot so it can be disconnected, the signal is the manager's and other tasks use it
+            task['finish slot'] = finish_slot
+            task['finish signal'].connect(finish_slot)
+            if self._error_callback:
+                task['error signal'].connect(self._error_callback)
+            task['func'](*task['params'])
+
+    def _task_finished(self, task_name, *args):
+        """
+        Slot for a task's finish signal, signals may pass values so ignore those
+        :param task_name: the name of the task that finished
+        :param args: any values the signal sent
+        """
+        self.next_step_in_task_list(task_name)
+
+    def _disconnect_task(self, task):
+        """
+        Disconnects the manager signals a task that wasn't threaded connected to, so they don't fire for other tasks
+        :param task: a task dict
+        """
+        if 'finish slot' not in task:
+            return
+        try:
+            task['finish signal'].disconnect(task.pop('finish slot'))
+            if self._error_callback:
+                task['error signal'].disconnect(self._error_callback)
+        except (TypeError, RuntimeError):
+            # already disconnected
+            pass
+
+    def _log_task_times(self):
+        """
+        Logs how long each task took and the critical path
+        """
+        report = self.get_timing_report()
+        if report:
+            logger.info("Task times:\n    {0}".format("\n    ".join(report)))
 
 
 class AniTaskListWindow(pyani.core.ui.AniQMainWindow):
@@ -486,6 +686,15 @@ class AniTaskListWindow(pyani.core.ui.AniQMainWindow):
         else:
             success_msg = ""
 
+        # how long each task took, to see where the time went
+        log_items = list(self.activity_log)
+        timing_report = self.task_mngr.get_timing_report()
+        if timing_report:
+            log_items.append(
+                "<span style='font-size:{0}pt; font-family:{1}; color: #ffffff;'><strong>TASK TIMES</strong>"
+                "<br>{2}</span>".format(self.font_size, self.font_family, "<br>".join(timing_report))
+            )
+
         self.activity_report.setText(
             "<span style='font-size:18pt; font-family:{0}; color: #ffffff;'>ACTIVITY LOG <br><br></span>{1}"
             "<font style='font-size:10pt; font-family:{0}; color: #ffffff;'>"
@@ -493,7 +702,7 @@ class AniTaskListWindow(pyani.core.ui.AniQMainWindow):
             "</font>".format(
                 self.font_family,
                 success_msg,
-                '<li>'.join(self.activity_log)
+                '<li>'.join(log_items)
             )
         )
         self.activity_report.show()
@@ -716,9 +925,37 @@ class AniAssetUpdateReport(AniReportCore):
         assets_modified.update(tools_modified)
         assets_deleted.update(tools_deleted)
 
-        self.display_asset_update_report(assets_added, assets_modified, assets_deleted)
+        # files that weren't downloaded because they were already up to date, on disk under another path or on the
+        # local server mirror
+        download_skip_stats = dict()
+        for mngr in (asset_mngr, tools_mngr):
+            if mngr:
+                for stat, value in mngr.download_skip_stats.items():
+                    download_skip_stats[stat] = download_skip_stats.get(stat, 0) + value
+
+        # time and size of server calls, shared by all managers
+        mngr = asset_mngr or tools_mngr
+        if mngr:
+            transfer_summary = mngr.telemetry.get_summary()
+        else:
+            transfer_summary = None
+
+        self.display_asset_update_report(
+            assets_added,
+            assets_modified,
+            assets_deleted,
+            download_skip_stats=download_skip_stats,
+            transfer_summary=transfer_summary
+        )
 
-    def display_asset_update_report(self, assets_added, assets_modified, assets_deleted):
+    def display_asset_update_report(
+            self,
+            assets_added,
+            assets_modified,
+            assets_deleted,
+            download_skip_stats=None,
+            transfer_summary=None
+    ):
         """
         Shows a report on screen with assets that were added, removed or modified during an update. emits a signal
         when finished.
@@ -727,6 +964,12 @@ class AniAssetUpdateReport(AniReportCore):
         :param assets_modified: dictionary of assets that have had files updated/modified. in same format as assets
         added.
         :param assets_deleted: dictionary of assets that have been removed. in same format as assets added.
+        :param download_skip_stats: optional dict {"files": number of files, "bytes": number of bytes} that were
+        not downloaded because they were already up to date, and optionally "deduplicated files" and
+        "deduplicated bytes" that were copied from another download instead, and "mirror files" and "mirror bytes"
+        that were copied from the local server mirror
+        :param transfer_summary: optional summary of server calls, see
+        pyani.core.mngr.telemetry.TransferTelemetry.get_summary()
         """
         html_report = "<p><div style='font-size:{0}pt; font-family:{1}; color:{2};'><b>NEW ASSETS</b>" \
                       "<br>" \
@@ -785,8 +1028,101 @@ class AniAssetUpdateReport(AniReportCore):
                                 self.font_family
                             )
 
+        if download_skip_stats and (
+                download_skip_stats.get("files") or
+                download_skip_stats.get("deduplicated files") or
+                download_skip_stats.get("mirror files")
+        ):
+            html_report += "<p><div style='font-size:{0}pt; font-family:{1}; color:{2};'><b>SKIPPED DOWNLOADS</b>" \
+                           "<br>" \
+                           "<img src='C:\\PyAniTools\\core\\images\\h_line_cyan.png'></img>" \
+                           "</div>" \
+                           "</p>".format(self.font_size_heading_1, self.font_family, pyani.core.ui.CYAN)
+            if download_skip_stats.get("files"):
+                html_report += "<p>" \
+                               "<div style='font-size:{0}pt; font-family:{1}; color:#ffffff; margin-left:30px;'>" \
+                               "{2} files ({3}) were already up to date and not downloaded again." \
+                               "</div>" \
+                               "</p>".format(
+                                    self.font_size_heading_3,
+                                    self.font_family,
+                                    download_skip_stats["files"],
+                                    pyani.core.util.convert_bytes_to_readable_size(download_skip_stats["bytes"])
+                                )
+            if download_skip_stats.get("deduplicated files"):
+                html_report += "<p>" \
+                               "<div style='font-size:{0}pt; font-family:{1}; color:#ffffff; margin-left:30px;'>" \
+                               "{2} files ({3}) were already downloaded to another folder and were copied from " \
+                               "there." \
+                               "</div>" \
+                               "</p>".format(
+                                    self.font_size_heading_3,
+                                    self.font_family,
+                                    download_skip_stats["deduplicated files"],
+                                    pyani.core.util.convert_bytes_to_readable_size(
+                                        download_skip_stats["deduplicated bytes"]
+                                    )
+                                )
+            if download_skip_stats.get("mirror files"):
+                html_report += "<p>" \
+                               "<div style='font-size:{0}pt; font-family:{1}; color:#ffffff; margin-left:30px;'>" \
+                               "{2} files ({3}) were copied from the local server instead of downloaded." \
+                               "</div>" \
+                               "</p>".format(
+                                    self.font_size_heading_3,
+                                    self.font_family,
+                                    download_skip_stats["mirror files"],
+                                    pyani.core.util.convert_bytes_to_readable_size(
+                                        download_skip_stats["mirror bytes"]
+                                    )
+                                )
+
+        if transfer_summary:
+            html_report += "<p><div style='font-size:{0}pt; font-family:{1}; color:{2};'><b>SERVER TRANSFERS</b>" \
+                           "<br>" \
+                           "<img src='C:\\PyAniTools\\core\\images\\h_line_cyan.png'></img>" \
+                           "</div>" \
+                           "</p>".format(self.font_size_heading_1, self.font_family, pyani.core.ui.CYAN)
+            for operation in transfer_summary:
+                html_report += "<p>" \
+                               "<div style='font-size:{0}pt; font-family:{1}; color:#ffffff; margin-left:30px;'>" \
+                               "{2}" \
+                               "</div>" \
+                               "</p>".format(
+                                    self.font_size_heading_3,
+                                    self.font_family,
+                                    self._format_transfer_summary(operation)
+                                )
+
         self.show_content(html_report)
 
+    @staticmethod
+    def _format_transfer_summary(operation):
+        """
+        Makes a line of the report for a server operation
+        :param operation: a dict of the operation's stats, see pyani.core.mngr.telemetry.TransferTelemetry.get_summary()
+        :return: the line as a string
+        """
+        text = "<b>{0}</b>: {1} calls".format(operation["operation"], operation["calls"])
+        if operation["failures"]:
+            text += ", {0} failed".format(operation["failures"])
+        text += ", {0:.1f}s total (typical {1:.1f}s, slowest 10% over {2:.1f}s)".format(
+            operation["total seconds"], operation["p50 seconds"] or 0.0, operation["p90 seconds"] or 0.0
+        )
+        if operation["bytes"]:
+            text += ", {0}".format(pyani.core.util.convert_bytes_to_readable_size(operation["bytes"]))
+            if operation["bytes per second"]:
+                text += " at {0}/s".format(
+                    pyani.core.util.convert_bytes_to_readable_size(operation["bytes per second"])
+                )
+        if operation["phases"]:
+            phases = [
+                "{0} {1:.1f}s".format(phase, operation["phases"][phase])
+                for phase in ("spawn", "wait", "login", "listing", "transfer") if phase in operation["phases"]
+            ]
+            text += "<br>time spent: {0}".format(", ".join(phases))
+        return text
+
     def _reset_assets_list(self):
         """
         Clears the ordered assets list
@@ -9,6 +9,7 @@ import pyani.core.anivars
 import pyani.core.appvars
 import pyani.core.mngr.assets
 import pyani.core.mngr.tools
+import pyani.core.mngr.server_ops
 import pyani.core.mngr.ui.core
 import pyani.review.core
 
@@ -330,6 +331,69 @@ class CoreTab(QtWidgets.QWidget):
         # check on the assets already listed in the config file
         self.tree.set_checked(existing_items_in_config_file)
 
+    def rebuild_tree(self):
+        """
+        Rebuilds the tree from the manager's data, ex: after the manager's cache was refreshed from the server
+        """
+        tree_data, col_count, existing_items_in_config_file = self.build_tree_data()
+        self.build_tree(tree_data, col_count, existing_items_in_config_file)
+
+    def apply_tree_changes(self, changes):
+        """
+        Updates only the rows of the tree that a cache sync added, removed or changed, instead of rebuilding the
+        whole tree. Tabs with a tree implement get_tree_row_location and build_tree_row. Connect to the manager's
+        cache_changes_signal, see pyani.core.mngr.core.AniCoreMngr.get_local_cache_changes
+        :param changes: a dict of "added", "removed" and "changed" cache keys, or None to rebuild the tree
+        """
+        if changes is None:
+            self.rebuild_tree()
+            return
+
+        rows_changed = 0
+        for cache_key in changes["removed"]:
+            location = self.get_tree_row_location(cache_key)
+            if location:
+                self.tree.remove_child_item(*location)
+                rows_changed += 1
+        for cache_key in changes["added"] + changes["changed"]:
+            location = self.get_tree_row_location(cache_key)
+            if location:
+                parent_name, row_name = location
+                row, checked = self.build_tree_row(cache_key)
+                if row is None:
+                    continue
+                self.tree.set_child_item(
+                    pyani.core.ui.CheckboxTreeWidgetItem([parent_name]), row_name, row, checked=checked
+                )
+                rows_changed += 1
+
+        if rows_changed:
+            logger.info("{0} tab updated {1} rows.".format(self.name, rows_changed))
+            self.tree_rows_changed()
+
+    def get_tree_row_location(self, cache_key):
+        """
+        Finds where a cache key's row is in the tree, see apply_tree_changes. Tabs with a tree override this
+        :param cache_key: a key in the manager's cache, (type, sub type, name)
+        :return: a tuple (parent name, row name), or None if the key isn't shown in this tab
+        """
+        return None
+
+    def build_tree_row(self, cache_key):
+        """
+        Builds a cache key's row in the tree, see apply_tree_changes. Tabs with a tree override this
+        :param cache_key: a key in the manager's cache, (type, sub type, name)
+        :return: a tuple (the row as a pyani.core.ui.CheckboxTreeWidgetItem, True if the row is checked), the row
+        is None if the key isn't shown in this tab
+        """
+        return None, False
+
+    def tree_rows_changed(self):
+        """
+        Called after apply_tree_changes changed rows, ex: to hide new rows that are filtered out
+        """
+        pass
+
 
 class ReviewTab(CoreTab):
     """
@@ -1230,6 +1294,7 @@ class AssetComponentTab(CoreTab):
         self.btn_tracking.clicked.connect(self.generate_tracking_report)
         self.show_only_auto_update_assets_cbox.clicked.connect(self._set_tree_display_mode)
         self.mngr.finished_sync_and_download_signal.connect(self.sync_finished)
+        self.mngr.cache_changes_signal.connect(self.apply_tree_changes)
         self.mngr.finished_tracking.connect(self.tracking_finished)
         self.track_asset_changes_cbox.clicked.connect(self.update_tracking_preferences)
 
@@ -1240,9 +1305,8 @@ class AssetComponentTab(CoreTab):
         :param asset_component: user friendly name of the asset component
         """
         if str(asset_component).lower() == self.name.lower():
+            # the tree is updated with the synced assets by apply_tree_changes
             self.asset_report.generate_asset_update_report(asset_mngr=self.mngr)
-            tree_data, col_count, existing_assets_in_config_file = self.build_tree_data()
-            self.build_tree(tree_data, col_count, existing_assets_in_config_file)
 
     def tracking_finished(self, tracking_info):
         """
@@ -1469,20 +1533,17 @@ class AssetComponentTab(CoreTab):
             for seq in sorted(asset_info_modified):
                 assets_list = list()
                 for shot in sorted(asset_info_modified[seq]):
-                    # check if this asset is in the asset update config, meaning it gets updated automatically
-                    if self.mngr.is_asset_in_update_config(
-                            asset_type, self.asset_component, "{0}/{1}".format(seq, shot)
-                    ):
-                        row_color = [pyani.core.ui.GREEN]
+                    row, in_update_config = self.build_tree_row(
+                        (asset_type, self.asset_component, "{0}/{1}".format(seq, shot))
+                    )
+                    if in_update_config:
                         existing_assets_updated_list.append(
                             {
                                 "parent": seq,
                                 "item name": shot
                             }
                         )
-                    else:
-                        row_color = [pyani.core.ui.WHITE]
-                    assets_list.append(pyani.core.ui.CheckboxTreeWidgetItem([shot], colors=row_color))
+                    assets_list.append(row)
 
                 item = {
                     'root': pyani.core.ui.CheckboxTreeWidgetItem([seq]),
@@ -1494,91 +1555,21 @@ class AssetComponentTab(CoreTab):
             for asset_type in asset_types:
                 asset_names = self.mngr.get_assets_by_asset_component(asset_type, self.asset_component)
                 assets_list = []
+                if self.mngr.is_asset_versioned(asset_type, self.asset_component):
+                    # will be 3 since version assets have approved and work folders and we have a column for that
+                    # after version
+                    col_count = 3
                 # for all asset names, make a list of tree item objects that have asset name and optionally version
                 for asset_name in sorted(asset_names):
-                    if self.mngr.is_asset_versioned(asset_type, self.asset_component):
-                        asset_version = self.mngr.get_asset_version_from_cache(
-                            asset_type,
-                            self.asset_component,
-                            asset_name
-                        )
-                        row_text = [asset_name, asset_version]
-                        # will be 3 since version assets have approved and work folders and we have a column for that
-                        # after version
-                        col_count = 3
-
-                        # check if this asset is in the asset update config, meaning it gets updated automatically
-                        if self.mngr.is_asset_in_update_config(
-                                asset_type, self.asset_component, asset_name
-                        ):
-                            # check if file doesn't exist on server - this let's user know so they don't wonder why
-                            # update isn't getting any files
-                            if not self.mngr.get_asset_files(asset_type, self.asset_component, asset_name):
-                                # found missing file on server, set to strikeout - see pyani.core.ui.CheckboxTreeWidget
-                                # for available formatting main_options_widgets
-                                row_text[0] = "strikethrough:{0}".format(row_text[0])
-                                row_color = [pyani.core.ui.DARK_GREEN, pyani.core.ui.WHITE]
-                            else:
-                                row_color = [pyani.core.ui.GREEN, pyani.core.ui.WHITE]
-
-                            existing_assets_updated_list.append(
-                                {
-                                    "parent": asset_type,
-                                    "item name": asset_name
-                                }
-                            )
-                        else:
-                            row_color = [pyani.core.ui.WHITE, pyani.core.ui.WHITE]
-                            # check if file doesn't exist on server - this let's user know so they don't wonder why
-                            # update isn't getting any files
-                            if not self.mngr.get_asset_files(asset_type, self.asset_component, asset_name):
-                                # found missing file on server, set to strikeout - see pyani.core.ui.CheckboxTreeWidget
-                                # for available formatting main_options_widgets
-                                row_text[0] = "strikethrough:{0}".format(row_text[0])
-                                row_color[0] = pyani.core.ui.GRAY_MED
-
-                        # if version is blank put n/a
-                        if row_text[1] == "":
-                            row_text[1] = "n/a"
-
-                        # check if the version on disk is older than the cloud version
-                        json_data = pyani.core.util.load_json(
-                            os.path.join(
-                                self.mngr.get_asset_local_dir_from_cache(asset_type, self.asset_component,
-                                                                         asset_name),
-                                self.app_vars.cgt_metadata_filename
-                            )
+                    row, in_update_config = self.build_tree_row((asset_type, self.asset_component, asset_name))
+                    if in_update_config:
+                        existing_assets_updated_list.append(
+                            {
+                                "parent": asset_type,
+                                "item name": asset_name
+                            }
                         )
-
-                        if isinstance(json_data, dict):
-                            if not json_data["version"] == asset_version:
-                                row_text[1] = "{0} / ({1})".format(json_data["version"], asset_version)
-                                # keep the first color, but replace white with red for version
-                                row_color = [row_color[0], pyani.core.ui.RED.name()]
-
-                        # check if asset is publishable
-                        if not self.mngr.is_asset_approved(asset_type, self.asset_component, asset_name):
-                            row_text.append("images\\not_approved.png")
-                            row_color.append("")
-
-                    # asset is not versioned
-                    else:
-                        row_text = [asset_name]
-                        # check if this asset is in the asset update config, meaning it gets updated automatically
-                        if self.mngr.is_asset_in_update_config(
-                                asset_type, self.asset_component, asset_name
-                        ):
-                            row_color = [pyani.core.ui.GREEN]
-                            existing_assets_updated_list.append(
-                                {
-                                    "parent": asset_type,
-                                    "item name": asset_name
-                                }
-                            )
-                        else:
-                            row_color = [pyani.core.ui.WHITE]
-
-                    assets_list.append(pyani.core.ui.CheckboxTreeWidgetItem(row_text, colors=row_color))
+                    assets_list.append(row)
                 item = {
                     'root': pyani.core.ui.CheckboxTreeWidgetItem([asset_type]),
                     'children': assets_list
@@ -1587,6 +1578,88 @@ class AssetComponentTab(CoreTab):
 
         return tree_items, col_count, existing_assets_updated_list
 
+    def get_tree_row_location(self, cache_key):
+        """
+        Finds where an asset's row is in the tree, see CoreTab.apply_tree_changes
+        :param cache_key: the asset's key in the cache, (asset type, asset component, asset name)
+        :return: a tuple (parent name, row name), or None if the asset isn't shown in this tab
+        """
+        asset_type, asset_component, asset_name = cache_key
+        if not asset_component == self.asset_component:
+            return None
+        # shots are shown under their sequence
+        if asset_type == "shot":
+            return tuple(asset_name.split("/"))
+        return asset_type, asset_name
+
+    def build_tree_row(self, cache_key):
+        """
+        Builds an asset's row in the tree
+        :param cache_key: the asset's key in the cache, (asset type, asset component, asset name)
+        :return: a tuple (the row as a CheckboxTreeWidgetItem, True if the asset is in the update config)
+        """
+        asset_type, asset_component, asset_name = cache_key
+        # check if this asset is in the asset update config, meaning it gets updated automatically
+        in_update_config = self.mngr.is_asset_in_update_config(asset_type, asset_component, asset_name)
+
+        if asset_type == "shot":
+            row_color = [pyani.core.ui.GREEN] if in_update_config else [pyani.core.ui.WHITE]
+            return pyani.core.ui.CheckboxTreeWidgetItem([asset_name.split("/")[-1]], colors=row_color), \
+                in_update_config
+
+        # asset is not versioned
+        if not self.mngr.is_asset_versioned(asset_type, asset_component):
+            row_color = [pyani.core.ui.GREEN] if in_update_config else [pyani.core.ui.WHITE]
+            return pyani.core.ui.CheckboxTreeWidgetItem([asset_name], colors=row_color), in_update_config
+
+        asset_version = self.mngr.get_asset_version_from_cache(asset_type, asset_component, asset_name)
+        row_text = [asset_name, asset_version]
+
+        if in_update_config:
+            # check if file doesn't exist on server - this let's user know so they don't wonder why
+            # update isn't getting any files
+            if not self.mngr.get_asset_files(asset_type, asset_component, asset_name):
+                # found missing file on server, set to strikeout - see pyani.core.ui.CheckboxTreeWidget
+                # for available formatting main_options_widgets
+                row_text[0] = "strikethrough:{0}".format(row_text[0])
+                row_color = [pyani.core.ui.DARK_GREEN, pyani.core.ui.WHITE]
+            else:
+                row_color = [pyani.core.ui.GREEN, pyani.core.ui.WHITE]
+        else:
+            row_color = [pyani.core.ui.WHITE, pyani.core.ui.WHITE]
+            # check if file doesn't exist on server - this let's user know so they don't wonder why
+            # update isn't getting any files
+            if not self.mngr.get_asset_files(asset_type, asset_component, asset_name):
+                # found missing file on server, set to strikeout - see pyani.core.ui.CheckboxTreeWidget
+                # for available formatting main_options_widgets
+                row_text[0] = "strikethrough:{0}".format(row_text[0])
+                row_color[0] = pyani.core.ui.GRAY_MED
+
+        # if version is blank put n/a
+        if row_text[1] == "":
+            row_text[1] = "n/a"
+
+        # check if the version on disk is older than the cloud version
+        json_data = pyani.core.util.load_json(
+            os.path.join(
+                self.mngr.get_asset_local_dir_from_cache(asset_type, asset_component, asset_name),
+                self.app_vars.cgt_metadata_filename
+            )
+        )
+
+        if isinstance(json_data, dict):
+            if not json_data["version"] == asset_version:
+                row_text[1] = "{0} / ({1})".format(json_data["version"], asset_version)
+                # keep the first color, but replace white with red for version
+                row_color = [row_color[0], pyani.core.ui.RED.name()]
+
+        # check if asset is publishable
+        if not self.mngr.is_asset_approved(asset_type, asset_component, asset_name):
+            row_text.append("images\\not_approved.png")
+            row_color.append("")
+
+        return pyani.core.ui.CheckboxTreeWidgetItem(row_text, colors=row_color), in_update_config
+
     def _convert_tree_selection_to_assets_list_by_type(self, selection):
         """
         converts a flat list of asset types and asset names to a dict structure with format:
@@ -1625,6 +1698,13 @@ class AssetComponentTab(CoreTab):
 
         return assets_by_type
 
+    def tree_rows_changed(self):
+        """
+        Hides new rows not in the update config when only those are shown
+        """
+        if self.show_only_auto_update_assets_cbox.checkState():
+            self._set_tree_display_mode()
+
     def _set_tree_display_mode(self):
         """Shows all assets or just assets in the update config file
         """
@@ -1704,6 +1784,7 @@ class ToolsTab(CoreTab):
         self.btn_wiki.clicked.connect(self.open_confluence_page)
         self.btn_sync_cgt.clicked.connect(self.sync_tools_with_cgt)
         self.mngr.finished_sync_and_download_signal.connect(self.sync_finished)
+        self.mngr.cache_changes_signal.connect(self.apply_tree_changes)
         self.btn_save_config.clicked.connect(self.save_update_config)
         self.show_only_auto_update_assets_cbox.clicked.connect(self._set_tree_display_mode)
 
@@ -1732,9 +1813,8 @@ class ToolsTab(CoreTab):
                 error_msg = "Could not sync update configuration file. Error is: {0}".format(error)
                 self.msg_win.show_error_msg("File Sync Warning", error_msg)
 
+            # the tree is updated with the synced tools by apply_tree_changes, after the update config is updated
             self.asset_report.generate_asset_update_report(tools_mngr=self.mngr)
-            tree_data, col_count, existing_assets_in_config_file = self.build_tree_data()
-            self.build_tree(tree_data, col_count, existing_assets_in_config_file)
 
     def sync_tools_with_cgt(self):
         """
@@ -1898,41 +1978,18 @@ class ToolsTab(CoreTab):
 
             tools_list = list()
             for tool_name in self.mngr.get_tool_names(self.tool_type, tool_category):
-                row_text = [tool_name]
-                cgt_version = self.mngr.get_tool_newest_version(self.tool_type, tool_category, tool_name)
-                desc = self.mngr.get_tool_description(self.tool_type, tool_category, tool_name)
-                if cgt_version:
-                    row_text.append(cgt_version)
-                else:
-                    row_text.append("n/a")
-                if desc:
-                    row_text.append(desc)
-                else:
-                    row_text.append("")
-
-                # check if this asset is in the asset update config, meaning it gets updated automatically
-                if self.mngr.is_asset_in_update_config(
-                        "tools", self.tool_type, tool_name, tool_category
-                ):
-                    row_color = [pyani.core.ui.GREEN, pyani.core.ui.WHITE, pyani.core.ui.GRAY_MED]
+                row, in_update_config = self.build_tree_row(
+                    (self.tool_type, tool_category, tool_name), local_cgt_metadata=local_cgt_metadata
+                )
+                if in_update_config:
                     existing_tools_in_config_file.append(
                         {
                             "parent": tool_category,
                             "item name": tool_name
                         }
                     )
-                else:
-                    row_color = [pyani.core.ui.WHITE, pyani.core.ui.WHITE, pyani.core.ui.GRAY_MED]
-                col_count = len(row_text)
-
-                if local_cgt_metadata:
-                    if tool_name in local_cgt_metadata:
-                        local_version = local_cgt_metadata[tool_name][0]["version"]
-                        if not local_version == cgt_version:
-                            row_text[1] = "{0} / ({1})".format(local_version, cgt_version)
-                            # keep the first color, but replace white with red for version
-                            row_color = [row_color[0], pyani.core.ui.RED.name(), pyani.core.ui.GRAY_MED]
-                tools_list.append(pyani.core.ui.CheckboxTreeWidgetItem(row_text, colors=row_color))
+                col_count = row.col_count()
+                tools_list.append(row)
             tree_items.append(
                 {
                     'root': pyani.core.ui.CheckboxTreeWidgetItem([tool_category]),
@@ -1942,6 +1999,64 @@ class ToolsTab(CoreTab):
 
         return tree_items, col_count, existing_tools_in_config_file
 
+    def get_tree_row_location(self, cache_key):
+        """
+        Finds where a tool's row is in the tree, see CoreTab.apply_tree_changes
+        :param cache_key: the tool's key in the cache, (tool type, tool category, tool name)
+        :return: a tuple (parent name, row name), or None if the tool isn't shown in this tab
+        """
+        tool_type, tool_category, tool_name = cache_key
+        if not tool_type == self.tool_type:
+            return None
+        return tool_category, tool_name
+
+    def build_tree_row(self, cache_key, local_cgt_metadata=False):
+        """
+        Builds a tool's row in the tree
+        :param cache_key: the tool's key in the cache, (tool type, tool category, tool name)
+        :param local_cgt_metadata: the cgt meta data of the tool category's local files, or None if there isn't any.
+        Loaded off disk when not given
+        :return: a tuple (the row as a CheckboxTreeWidgetItem, True if the tool is in the update config)
+        """
+        tool_type, tool_category, tool_name = cache_key
+        if local_cgt_metadata is False:
+            local_cgt_metadata = pyani.core.util.load_json(
+                os.path.join(
+                    self.app_vars.tool_types[tool_type][tool_category]['local dir'],
+                    self.app_vars.cgt_metadata_filename
+                )
+            )
+            if not isinstance(local_cgt_metadata, dict):
+                local_cgt_metadata = None
+
+        row_text = [tool_name]
+        cgt_version = self.mngr.get_tool_newest_version(tool_type, tool_category, tool_name)
+        desc = self.mngr.get_tool_description(tool_type, tool_category, tool_name)
+        if cgt_version:
+            row_text.append(cgt_version)
+        else:
+            row_text.append("n/a")
+        if desc:
+            row_text.append(desc)
+        else:
+            row_text.append("")
+
+        # check if this asset is in the asset update config, meaning it gets updated automatically
+        in_update_config = self.mngr.is_asset_in_update_config("tools", tool_type, tool_name, tool_category)
+        if in_update_config:
+            row_color = [pyani.core.ui.GREEN, pyani.core.ui.WHITE, pyani.core.ui.GRAY_MED]
+        else:
+            row_color = [pyani.core.ui.WHITE, pyani.core.ui.WHITE, pyani.core.ui.GRAY_MED]
+
+        if local_cgt_metadata:
+            if tool_name in local_cgt_metadata:
+                local_version = local_cgt_metadata[tool_name][0]["version"]
+                if not local_version == cgt_version:
+                    row_text[1] = "{0} / ({1})".format(local_version, cgt_version)
+                    # keep the first color, but replace white with red for version
+                    row_color = [row_color[0], pyani.core.ui.RED.name(), pyani.core.ui.GRAY_MED]
+        return pyani.core.ui.CheckboxTreeWidgetItem(row_text, colors=row_color), in_update_config
+
     def _get_tree_selection_clicked(self, tree_item_clicked):
         # get the selection from the ui, always send column 0 because want the tool name
         selected_item = self.tree.get_item_at_position(tree_item_clicked, 0)
@@ -1983,6 +2098,13 @@ class ToolsTab(CoreTab):
 
         return tools_by_type
 
+    def tree_rows_changed(self):
+        """
+        Hides new rows not in the update config when only those are shown
+        """
+        if self.show_only_auto_update_assets_cbox.checkState():
+            self._set_tree_display_mode()
+
     def _set_tree_display_mode(self):
         """Shows all assets or just assets in the asset update config file
         """
@@ -2050,6 +2172,14 @@ class AniAssetMngrGui(pyani.core.ui.AniQMainWindow):
         # tabs class object with the tools hub
         self.tabs = pyani.core.ui.TabsWidget(tab_name="Maintenance and Options", tabs_can_close=False)
 
+        # the tabs show the caches on disk right away, stale caches are refreshed from the server in the background
+        # and this shows how old the data is until they are, see revalidate_caches
+        self.server_ops = pyani.core.mngr.server_ops.ServerOperations(self.asset_mngr)
+        self.cache_status_label = QtWidgets.QLabel("")
+        self.cache_status_label.hide()
+        # errors from the last background refresh per manager, the manager's data is stale while it has one
+        self._cache_revalidation_errors = dict()
+
         error = self.asset_mngr.load_server_asset_info_cache()
         if error:
             self.msg_win.show_error_msg(
@@ -2158,9 +2288,11 @@ class AniAssetMngrGui(pyani.core.ui.AniQMainWindow):
 
         self.create_layout()
         self.set_slots()
+        self.revalidate_caches()
 
     def create_layout(self):
 
+        self.main_layout.addWidget(self.cache_status_label)
         self.main_layout.addWidget(self.tabs)
 
         maint_and_options_layout = self.create_layout_maint_and_options()
@@ -2314,10 +2446,68 @@ class AniAssetMngrGui(pyani.core.ui.AniQMainWindow):
         self.tabs.currentChanged.connect(self.tab_changed)
         self.tools_mngr.error_thread_signal.connect(self.show_multithreaded_error)
         self.asset_mngr.error_thread_signal.connect(self.show_multithreaded_error)
+        self.asset_mngr.cache_revalidated_signal.connect(functools.partial(self.cache_revalidated, self.asset_mngr))
+        self.tools_mngr.cache_revalidated_signal.connect(functools.partial(self.cache_revalidated, self.tools_mngr))
 
     def show_multithreaded_error(self, error):
         self.msg_win.show_error_msg("Error", error)
 
+    def revalidate_caches(self):
+        """
+        Refreshes the asset and tool caches from the server in the background when they are older than AppVars
+        cgt_cache_max_age. The tabs keep showing the cached data meanwhile, see
+        pyani.core.mngr.core.AniCoreMngr.revalidate_local_cache
+        """
+        # the asset cache couldn't be loaded so there aren't any tabs showing cached data
+        if not self.rig_tab:
+            return
+        for mngr in (self.asset_mngr, self.tools_mngr):
+            if mngr.is_local_cache_stale():
+                mngr.revalidate_local_cache(self.server_ops)
+        self._show_cache_status()
+
+    def cache_revalidated(self, mngr, error):
+        """
+        Called when a background refresh of a manager's cache finishes. The tabs showing its data update the rows
+        that changed themselves, see CoreTab.apply_tree_changes
+        :param mngr: the asset or tools manager
+        :param error: None, or the error if the server couldn't be reached, the tabs keep the cached data then
+        """
+        if error:
+            self._cache_revalidation_errors[mngr] = error
+        else:
+            self._cache_revalidation_errors.pop(mngr, None)
+        self._show_cache_status()
+
+    def _show_cache_status(self):
+        """
+        Shows how old the data in the tabs is while a cache is being refreshed or couldn't be refreshed, hides the
+        status when the data is current
+        """
+        status = list()
+        for data_name, mngr in (("Asset", self.asset_mngr), ("Tool", self.tools_mngr)):
+            cache_time = mngr.get_local_cache_time()
+            if cache_time is None:
+                continue
+            cache_time = cache_time.strftime("%Y-%m-%d %H:%M")
+            if mngr.is_revalidating_local_cache():
+                status.append("{0} data is from {1}, checking the server for changes...".format(data_name, cache_time))
+            elif mngr in self._cache_revalidation_errors:
+                status.append(
+                    "{0} data is stale since {1}, the server couldn't be reached. Showing the saved data.".format(
+                        data_name, cache_time
+                    )
+                )
+        if not status:
+            self.cache_status_label.hide()
+            return
+        self.cache_status_label.setText(
+            "<span style='font-size:{0}pt; font-family:{1}; color:{2};'>{3}</span>".format(
+                self.font_size, self.font_family, pyani.core.ui.YELLOW.name(), "<br>".join(status)
+            )
+        )
+        self.cache_status_label.show()
+
     def tab_changed(self):
         # get a list of asset components and if tab is an asset component page set the active component in
         # the asset manager
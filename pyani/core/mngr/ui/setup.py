@@ -17,8 +17,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
         self.tools_mngr = pyani.core.mngr.tools.AniToolsMngr()
         self.asset_mngr = pyani.core.mngr.assets.AniAssetMngr()
 
-        # list of tasks to run, see pyani.core.mngr.ui.core.AniTaskListWindow for format
-        # build tool cache first, since tools download will access
+        # list of tasks to run, see pyani.core.mngr.ui.core.AniTaskListWindow for format. Tasks run as soon as the
+        # tasks they depend on finish. Everything needs the app bridge from the setup dependencies, and tools download
+        # needs the tools cache
         self.task_list = [
             # setup dependencies
             {
@@ -27,7 +28,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Installs any dependencies needed for setup"
+                'name': "setup dependencies",
+                'desc': "Installs any dependencies needed for setup",
+                'depends on': []
             },
             # create sequence list
             {
@@ -36,7 +39,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "List of sequences and their shots created."
+                'name': "sequence list",
+                'desc': "List of sequences and their shots created.",
+                'depends on': ["setup dependencies"]
             },
             # make asset cache
             {
@@ -45,7 +50,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.asset_mngr.finished_cache_build_signal,
                 'error signal': self.asset_mngr.error_thread_signal,
                 'thread task': False,
-                'desc': "Created local asset cache."
+                'name': "asset cache",
+                'desc': "Created local asset cache.",
+                'depends on': ["setup dependencies"]
             },
             # make tools cache
             {
@@ -54,7 +61,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.tools_mngr.finished_cache_build_signal,
                 'error signal': self.tools_mngr.error_thread_signal,
                 'thread task': False,
-                'desc': "Created local tools cache."
+                'name': "tools cache",
+                'desc': "Created local tools cache.",
+                'depends on': ["setup dependencies"]
             },
             # download tools - pyani and maya
             {
@@ -63,7 +72,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.tools_mngr.finished_signal,
                 'error signal': self.tools_mngr.error_thread_signal,
                 'thread task': False,
-                'desc': "Downloaded and installed show tools."
+                'name': "tools download",
+                'desc': "Downloaded and installed show tools.",
+                'depends on': ["tools cache"]
             },
             # create auto-update config
             {
@@ -72,7 +83,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Configuration file for auto-updates is now setup."
+                'name': "update config",
+                'desc': "Configuration file for auto-updates is now setup.",
+                'depends on': ["tools cache"]
             },
             # copy launcher
             {
@@ -81,7 +94,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Created the support launcher for updates."
+                'name': "support launcher",
+                'desc': "Created the support launcher for updates.",
+                'depends on': ["tools download"]
             },
             # copy desktop shortcut
             {
@@ -90,7 +105,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Created desktop shortcut for pyAniTool applications."
+                'name': "desktop shortcut",
+                'desc': "Created desktop shortcut for pyAniTool applications.",
+                'depends on': ["tools download"]
             },
             # create nuke custom plugin path
             {
@@ -99,7 +116,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Added custom menu and plugins to Nuke."
+                'name': "nuke",
+                'desc': "Added custom menu and plugins to Nuke.",
+                'depends on': ["setup dependencies"]
             },
             # create windows task in scheduler
             {
@@ -108,7 +127,9 @@ class AniSetupGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Add daily task to run and update tools and show / shot assets."
+                'name': "update task",
+                'desc': "Add daily task to run and update tools and show / shot assets.",
+                'depends on': ["support launcher"]
             }
         ]
 
@@ -36,8 +36,8 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
             )
         )
 
-        # list of tasks to run, see pyani.core.mngr.ui.core.AniTaskListWindow for format
-        # build tool cache first, since tools download will access
+        # list of tasks to run, see pyani.core.mngr.ui.core.AniTaskListWindow for format. Tasks run as soon as the
+        # tasks they depend on finish, the caches come first since downloads use them
         self.task_list = [
             # rebuild tools cache
             {
@@ -46,7 +46,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.tools_mngr.finished_cache_build_signal,
                 'error signal': self.tools_mngr.error_thread_signal,
                 'thread task': False,
-                'desc': "Updated local tools cache."
+                'name': "tools cache",
+                'desc': "Updated local tools cache.",
+                'depends on': []
             },
             # rebuild asset cache
             {
@@ -55,7 +57,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.asset_mngr.finished_cache_build_signal,
                 'error signal': self.asset_mngr.error_thread_signal,
                 'thread task': False,
-                'desc': "Updated local asset cache."
+                'name': "asset cache",
+                'desc': "Updated local asset cache.",
+                'depends on': []
             },
             # update sequence list
             {
@@ -64,7 +68,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "List of sequences and their shots updated."
+                'name': "sequence list",
+                'desc': "List of sequences and their shots updated.",
+                'depends on': []
             },
             # update desktop shortcut
             {
@@ -73,7 +79,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Updated desktop shortcut for pyAniTool applications."
+                'name': "desktop shortcut",
+                'desc': "Updated desktop shortcut for pyAniTool applications.",
+                'depends on': []
             },
             # create nuke custom plugin path
             {
@@ -82,7 +90,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.core_mngr.finished_signal,
                 'error signal': self.core_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Updated custom menu and plugins to Nuke."
+                'name': "nuke",
+                'desc': "Updated custom menu and plugins to Nuke.",
+                'depends on': []
             }
         ]
 
@@ -95,7 +105,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                     'finish signal': self.tools_mngr.finished_signal,
                     'error signal': self.tools_mngr.error_thread_signal,
                     'thread task': False,
-                    'desc': "Updated show tools."
+                    'name': "tools download",
+                    'desc': "Updated show tools.",
+                    'depends on': ["tools cache"]
                 }
             )
             progress_list.append("Checking for tool updates")
@@ -108,7 +120,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                     'finish signal': self.core_mngr.finished_signal,
                     'error signal': self.core_mngr.error_thread_signal,
                     'thread task': True,
-                    'desc': "Updated the support launcher."
+                    'name': "support launcher",
+                    'desc': "Updated the support launcher.",
+                    'depends on': ["tools download"]
                 }
             )
             progress_list.append("Checking for support launcher updates.")
@@ -122,11 +136,21 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                     'finish signal': self.asset_mngr.finished_signal,
                     'error signal': self.asset_mngr.error_thread_signal,
                     'thread task': False,
-                    'desc': "Updated show and shot assets tracked in the update config file."
+                    'name': "asset download",
+                    'desc': "Updated show and shot assets tracked in the update config file.",
+                    'depends on': ["asset cache"]
                 }
             )
             progress_list.append("Checking for asset updates")
 
+        # tasks that change the asset and tool caches or downloads, the update config syncs wait for these
+        asset_tasks = ["asset cache"]
+        if self.show_and_shot_assets:
+            asset_tasks.append("asset download")
+        tool_tasks = ["tools cache"]
+        if self.tool_assets:
+            tool_tasks.append("tools download")
+
         # add update config sync step for assets
         self.task_list.append(
             {
@@ -135,7 +159,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.asset_mngr.finished_signal,
                 'error signal': self.asset_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Checking update config file for old assets."
+                'name': "asset config sync",
+                'desc': "Checking update config file for old assets.",
+                'depends on': asset_tasks
             }
         )
         progress_list.append("Syncing update config file with assets on server.")
@@ -148,7 +174,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.tools_mngr.finished_signal,
                 'error signal': self.tools_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Checking update config file for old tools or missing new tools."
+                'name': "tools config sync",
+                'desc': "Checking update config file for old tools or missing new tools.",
+                'depends on': tool_tasks
             }
         )
         progress_list.append("Syncing update config file with tools on server.")
@@ -162,9 +190,11 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                     'finish signal': self.asset_mngr.finished_tracking,
                     'error signal': self.asset_mngr.error_thread_signal,
                     'thread task': False,
+                    'name': "audio check",
                     'desc': "Checked for any new audio and saved report in {0}.".format(
                         self.asset_mngr.app_vars.audio_excel_report_dir
-                    )
+                    ),
+                    'depends on': asset_tasks
                 }
             )
             progress_list.append("Checking all show audio for changes.")
@@ -177,7 +207,9 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
                 'finish signal': self.tools_mngr.finished_signal,
                 'error signal': self.tools_mngr.error_thread_signal,
                 'thread task': True,
-                'desc': "Removed out-dated tools."
+                'name': "tools cleanup",
+                'desc': "Removed out-dated tools.",
+                'depends on': tool_tasks + ["tools config sync"]
             }
         )
         progress_list.append("Removing any out-of-date tools.")
@@ -208,6 +240,11 @@ class AniUpdateGui(pyani.core.mngr.ui.core.AniTaskListWindow):
         # move update window so it doesn't cover the main update window
         this_win_rect = self.frameGeometry()
         post_tasks = [
+            # server call times and sizes, saved next to the log so slow updates can be looked into
+            {
+                'func': self.core_mngr.save_transfer_telemetry,
+                'params': [os.path.splitext(error_logging.log_file_name)[0] + "_transfer_stats.json"]
+            },
             {
                 'func': self.asset_report.generate_asset_update_report,
                 'params': [self.asset_mngr, self.tools_mngr]
@@ -1651,23 +1651,7 @@ class CheckboxTreeWidget(QtWidgets.QTreeWidget):
                     for child_item in child_items:
                         child = QtWidgets.QTreeWidgetItem(parent)
                         child.setFlags(child.flags() | QtCore.Qt.ItemIsUserCheckable)
-                        for col_index in range(0, child_item.col_count()):
-                            # flag indicates if column is image or text
-                            image_found = False
-                            # check if it's an image
-                            for image_format in self.__supported_image_formats:
-                                if image_format in child_item.text(col_index):
-                                    image_found = True
-                                    break
-                            if image_found:
-                                child.setData(
-                                    col_index,
-                                    QtCore.Qt.DecorationRole,
-                                    QtGui.QPixmap(child_item.text(col_index))
-                                )
-                            else:
-                                child.setTextColor(col_index, child_item.color(col_index))
-                                self._set_styling(child, child_item.text(col_index), col_index)
+                        self._set_child_columns(child, child_item)
                         if checked:
                             child.setCheckState(0, QtCore.Qt.Checked)
                         else:
@@ -1798,6 +1782,74 @@ class CheckboxTreeWidget(QtWidgets.QTreeWidget):
                     item.setText(col_index, updated_item.text(col_index))
             iterator += 1
 
+    def find_child_item(self, parent_name, item_name):
+        """
+        Finds a child row by its parent's and its own first column text
+        :param parent_name: the parent's text
+        :param item_name: the child's text, without formatting like strikethrough:
+        :return: a tuple of the parent and child as pyqt4 QTreeWidget items, either is None when not found
+        """
+        for parent_index in range(0, self.topLevelItemCount()):
+            parent = self.topLevelItem(parent_index)
+            if str(parent.text(0)) == parent_name:
+                for child_index in range(0, parent.childCount()):
+                    child = parent.child(child_index)
+                    if str(child.text(0)) == item_name:
+                        return parent, child
+                return parent, None
+        return None, None
+
+    def set_child_item(self, root_item, item_name, child_item, checked=False):
+        """
+        Updates a child row in place, or adds it in sorted order when it doesn't exist. Updating single rows
+        avoids rebuilding a large tree when a few rows changed. The parent is added in sorted order when it doesn't
+        exist
+        :param root_item: the parent as a CheckboxTreeWidgetItem
+        :param item_name: the child's text, without formatting like strikethrough:
+        :param child_item: the child as a CheckboxTreeWidgetItem
+        :param checked: whether the child's checkbox is checked
+        """
+        parent, child = self.find_child_item(str(root_item.text(0)), item_name)
+        if not parent:
+            parent = QtWidgets.QTreeWidgetItem()
+            # parents are sorted by name, like the children
+            insert_index = self.topLevelItemCount()
+            for parent_index in range(0, self.topLevelItemCount()):
+                if str(self.topLevelItem(parent_index).text(0)) > str(root_item.text(0)):
+                    insert_index = parent_index
+                    break
+            self.insertTopLevelItem(insert_index, parent)
+            for col_index in range(0, root_item.col_count()):
+                parent.setTextColor(col_index, root_item.color(col_index))
+                self._set_styling(parent, root_item.text(col_index), col_index)
+            parent.setFlags(parent.flags() | QtCore.Qt.ItemIsTristate | QtCore.Qt.ItemIsUserCheckable)
+            parent.setExpanded(True)
+        if not child:
+            child = QtWidgets.QTreeWidgetItem()
+            child.setFlags(child.flags() | QtCore.Qt.ItemIsUserCheckable)
+            # children are sorted by name
+            insert_index = parent.childCount()
+            for child_index in range(0, parent.childCount()):
+                if str(parent.child(child_index).text(0)) > item_name:
+                    insert_index = child_index
+                    break
+            parent.insertChild(insert_index, child)
+        self._set_child_columns(child, child_item)
+        child.setCheckState(0, QtCore.Qt.Checked if checked else QtCore.Qt.Unchecked)
+
+    def remove_child_item(self, parent_name, item_name):
+        """
+        Removes a child row, and its parent when it was the last child
+        :param parent_name: the parent's text
+        :param item_name: the child's text, without formatting like strikethrough:
+        """
+        parent, child = self.find_child_item(parent_name, item_name)
+        if not child:
+            return
+        parent.removeChild(child)
+        if not parent.childCount():
+            self.takeTopLevelItem(self.indexOfTopLevelItem(parent))
+
     def clear_all_items(self):
         """Clear the tree
         """
@@ -1852,6 +1904,37 @@ class CheckboxTreeWidget(QtWidgets.QTreeWidget):
             self.resizeColumnToContents(col)
             self.setColumnWidth(col, self.columnWidth(col) + self.__col_space)
 
+    def _set_child_columns(self, child, child_item):
+        """
+        Sets a child row's columns, images or styled text
+        :param child: the qt tree item
+        :param child_item: the CheckboxTreeWidgetItem with the columns
+        """
+        for col_index in range(0, max(child_item.col_count(), self.columnCount())):
+            # clear what an update may have left, ex: an image or a strikethrough font
+            child.setData(col_index, QtCore.Qt.DecorationRole, None)
+            child.setFont(col_index, self.font())
+            if col_index >= child_item.col_count():
+                child.setText(col_index, "")
+                continue
+            # flag indicates if column is image or text
+            image_found = False
+            # check if it's an image
+            for image_format in self.__supported_image_formats:
+                if image_format in child_item.text(col_index):
+                    image_found = True
+                    break
+            if image_found:
+                child.setText(col_index, "")
+                child.setData(
+                    col_index,
+                    QtCore.Qt.DecorationRole,
+                    QtGui.QPixmap(child_item.text(col_index))
+                )
+            else:
+                child.setTextColor(col_index, child_item.color(col_index))
+                self._set_styling(child, child_item.text(col_index), col_index)
+
     def _set_styling(self, tree_item, col_text, col_index):
         """
         Sets basic formatting for text
@@ -5,6 +5,7 @@ import sys
 import time
 import inspect
 import json
+import io
 from scandir import scandir
 import subprocess
 from bisect import bisect_left
@@ -410,6 +411,82 @@ def move_file(src, dest):
         return error_msg
 
 
+def link_or_copy_file(src, dest, hardlink=True):
+    """
+    Hard links src to dest so both paths share the file's data on disk, or copies when hard links aren't possible,
+    for example src and dest are on different drives. Hard linked files change together, so only link files that
+    are replaced rather than edited in place.
+    :param src: source file
+    :param dest: destination file, must not exist
+    :param hardlink: False to always copy
+    :except IOError, OSError: returns the file src and dest and error
+    :return: None if no errors, otherwise return error as string
+    """
+    try:
+        dest_dir = os.path.dirname(dest)
+        if dest_dir and not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        if hardlink:
+            try:
+                if sys.platform == "win32":
+                    # python 2 doesn't have os.link on windows
+                    import ctypes
+                    if not ctypes.windll.kernel32.CreateHardLinkW(unicode(dest), unicode(src), None):
+                        raise ctypes.WinError()
+                else:
+                    os.link(src, dest)
+                return None
+            except (IOError, OSError) as e:
+                logger.info("Could not link {0} to {1}, copying instead. Error is {2}".format(src, dest, e))
+        shutil.copy2(src, dest)
+        return None
+    except (IOError, OSError) as e:
+        error_msg = "Could not link or copy {0} to {1}. Received error {2}".format(src, dest, e)
+        logger.error(error_msg)
+        return error_msg
+
+
+def replace_file(src, dest):
+    """
+    Renames a file over another file in one step, so dest is either the old file or the new file but never partly
+    written. src and dest must be on the same drive. If src is a directory, the files in it are moved individually
+    into dest.
+    :param src: source file or directory
+    :param dest: destination file or directory, replaced if it exists
+    :except IOError, OSError: returns the file src and dest and error
+    :return: None if no errors, otherwise return error as string
+    """
+    if os.path.isdir(src):
+        for file_name in os.listdir(src):
+            error = replace_file(os.path.join(src, file_name), os.path.join(dest, file_name))
+            if error:
+                return error
+        try:
+            os.rmdir(src)
+        except (IOError, OSError):
+            # only the empty folder is left behind
+            pass
+        return None
+
+    try:
+        dest_dir = os.path.dirname(dest)
+        if dest_dir and not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        if sys.platform == "win32":
+            # os.rename won't replace an existing file on windows
+            import ctypes
+            # MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH
+            if not ctypes.windll.kernel32.MoveFileExW(unicode(src), unicode(dest), 0x1 | 0x8):
+                raise ctypes.WinError()
+        else:
+            os.rename(src, dest)
+        return None
+    except (IOError, OSError) as e:
+        error_msg = "Could not replace {0} with {1}. Received error {2}".format(dest, src, e)
+        logger.error(error_msg)
+        return error_msg
+
+
 def move_files(src, dest):
     """
     moves files from src to dest (ie copies to new path and deletes from old path).
@@ -612,6 +689,63 @@ def load_json(json_path):
         return error_msg
 
 
+def read_json_records(json_path, chunk_size=65536):
+    """
+    Reads json records from a file one at a time, so a large file is never held in memory all at once. Reads files
+    with one json record per line, or a json list of records.
+    Use as a generator:
+        for record in read_json_records(path):
+            ...
+    :param json_path: the path to the json data
+    :param chunk_size: characters read at a time from a json list
+    :exception: IOError, OSError if the file can't be read, ValueError if the json is invalid
+    :return: yields each record
+    """
+    with io.open(json_path, "r", encoding="utf-8") as read_file:
+        # peek at the first character to tell a json list from one record per line
+        first_char = ""
+        while True:
+            first_char = read_file.read(1)
+            if not first_char or not first_char.isspace():
+                break
+
+        # one record per line
+        if not first_char == "[":
+            line = first_char + read_file.readline()
+            while line:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+                line = read_file.readline()
+            return
+
+        # a json list, decode one record at a time from a buffer that is refilled as records are used up
+        decoder = json.JSONDecoder()
+        buffer_text = u""
+        index = 0
+        end_of_file = False
+        while True:
+            # move past whitespace and the separators between records
+            while index < len(buffer_text) and (buffer_text[index].isspace() or buffer_text[index] == ","):
+                index += 1
+            if index < len(buffer_text) and buffer_text[index] == "]":
+                return
+            try:
+                if index >= len(buffer_text):
+                    raise ValueError("Need more data")
+                record, index = decoder.raw_decode(buffer_text, index)
+            except ValueError:
+                # record is cut off at the end of the buffer, read more
+                if end_of_file:
+                    raise ValueError("Unexpected end of json list in {0}".format(json_path))
+                chunk = read_file.read(chunk_size)
+                end_of_file = not chunk
+                buffer_text = buffer_text[index:] + chunk
+                index = 0
+                continue
+            yield record
+
+
 def write_json(json_path, user_data, indent=4):
     """
     Write to a json file
@@ -739,10 +873,25 @@ def call_ext_py_api(command, interpreter=None):
 
     output, error = p.communicate()
 
-    if p.returncode != 0:
+    return check_ext_py_api_output(command, p.returncode, output, error)
+
+
+def check_ext_py_api_output(command, return_code, output, error):
+    """
+    Checks the results of running an external python script for subprocess and CGT errors. Shared by
+    call_ext_py_api and the persistent bridge worker in pyani.core.mngr.bridge so both report the same way.
+    :param command: the command that was run, used in the error message
+    :param return_code: the script's return code
+    :param output: what the script wrote to stdout
+    :param error: what the script wrote to stderr
+    :return: the output from the script and any errors (from subprocess, not CGT) encountered.
+    If no output returns None and if no errors (from subprocess not CGT) returns None
+    :raises: CGTError: means an error occurred connecting or accessing CGT, contains the error
+    """
+    if return_code != 0:
         error = "Problem executing command {0}. Return Code is {1}. Output is {2}. Error is {3} ".format(
             command,
-            p.returncode,
+            return_code,
             output,
             error
         )
@@ -1030,3 +1179,18 @@ def number_of_digits(num):
     """
     # Uses string modulo instead of str(i)
     return len("%i" % num)
+
+
+def convert_bytes_to_readable_size(num_bytes):
+    """
+    Converts bytes to kb, mb, or gb depending on number of digits in bytes
+    :param num_bytes: a number of bytes
+    :return: the size as a string, ex: 2.5 MB
+    """
+    num_digits = number_of_digits(num_bytes)
+    if num_digits < 7:
+        return "{0:.1f} KB".format(num_bytes / 1000.0)
+    elif num_digits < 10:
+        return "{0:.1f} MB".format(num_bytes / 1000000.0)
+    else:
+        return "{0:.1f} GB".format(num_bytes / 1000000000.0)
@@ -1,5 +1,6 @@
 import logging
 import os
+import functools
 import pyani.core.appvars
 import pyani.core.util
 import pyani.core.ui
@@ -137,6 +138,8 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
             logger.info("Multi-threading with maximum %d threads" % self.thread_pool.maxThreadCount())
             self.thread_total = 0.0
             self.threads_done = 0.0
+            # render data downloads in batches of files, the number of batches running
+            self.dl_batch_total = 0
             self.progress_win = QtWidgets.QProgressDialog()
 
             # setup color sets for the graph. Use cool colors for time stats, warm colors for memory stats, and yellow
@@ -495,7 +498,7 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
             QtWidgets.QApplication.processEvents()
             # note not using the return values, as we don't care here whether download was successful. We check below
             # for file existence
-            _, _ = pyani.core.util.call_ext_py_api(dl_command)
+            _, _ = self.tools_mngr.call_bridge_api(dl_command)
             self.msg_win.close()
             shot_stats_path = "Z:\\LongGong\\sequences\\{0}\\lighting\\render_data\\{1}\\{2}\\{0}_{1}.json".format(
                 self.seq,
@@ -617,6 +620,7 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
             self.tools_mngr.error_thread_signal.connect(self._render_data_download_thread_error)
 
             # make the paths to the sequence's render data
+            file_paths = list()
             for shot in self.ani_vars.get_shot_list():
                 cgt_shot_stats_path = "/LongGong/sequences/{0}/lighting/render_data/{1}/{2}/{0}_{1}.json".format(
                     self.seq,
@@ -632,16 +636,25 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
                     shot,
                     self.history
                 )
+                file_paths.append((cgt_shot_stats_path, dl_shot_stats_path))
+
+            # the shots' files are small, so download them in batches that each use one bridge call
+            self.dl_batch_total = 0
+            for server_file_paths, local_file_paths in self.tools_mngr.get_download_batches(file_paths):
                 worker = pyani.core.ui.Worker(
-                    self.tools_mngr.server_download,
+                    self.tools_mngr.server_file_download_batch,
                     False,
-                    [cgt_shot_stats_path],
-                    local_file_paths=[dl_shot_stats_path]
+                    server_file_paths,
+                    local_file_paths
                 )
-                self.thread_total += 1.0
+                # progress counts files, not batches
+                self.thread_total += len(server_file_paths)
+                self.dl_batch_total += 1
                 self.thread_pool.start(worker)
                 # slot that is called when a thread finishes
-                worker.signals.finished.connect(self._render_data_download_thread_complete)
+                worker.signals.finished.connect(
+                    functools.partial(self._render_data_download_thread_complete, len(server_file_paths))
+                )
 
     def process_sequence_stats(self):
         """
@@ -1102,7 +1115,7 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
             app_vars.cgt_pass
         ]
         try:
-            output, error = pyani.core.util.call_ext_py_api(dl_command)
+            output, error = self.tools_mngr.call_bridge_api(dl_command)
             # close the info msg
             self.msg_win.close()
             # error from trying to open subprocess
@@ -1142,17 +1155,18 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
             self._build_render_layer_menu()
             self.update_ui()
 
-    def _render_data_download_thread_complete(self):
+    def _render_data_download_thread_complete(self, num_files=1):
         """
-        Called when a thread that downloads render data for a shot completes. When all threads complete, processes
-        the data
+        Called when a thread that downloads render data for a batch of shots completes. When all threads complete,
+        processes the data
+        :param num_files: the number of shot files the thread downloaded
         """
-        self.threads_done += 1.0
+        self.threads_done += num_files
         progress = (self.threads_done / self.thread_total) * 100.0
         self.progress_win.setValue(progress)
         if progress >= 100.0:
-            # check for errors - first check if error list is the same number as thread total then nothing downloaded
-            if len(self.dl_error_list) >= self.thread_total:
+            # check for errors - first check if every batch errored, then nothing downloaded
+            if len(self.dl_error_list) >= self.dl_batch_total:
                 self.msg_win.show_error_msg("CGT Download Error", "Could not download render stats. "
                                                                   "See log for details.")
                 logger.error("download errors from cgt: " + ', '.join(self.dl_error_list))
@@ -1248,7 +1262,7 @@ class AniRenderDataViewer(pyani.core.ui.AniQMainWindow):
                 self.app_vars.cgt_pass,
                 "True"
             ]
-            output, error = pyani.core.util.call_ext_py_api(dl_command)
+            output, error = self.tools_mngr.call_bridge_api(dl_command)
             self.msg_win.close()
             if output:
                 history_paths = output.split(",")
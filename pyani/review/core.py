@@ -312,7 +312,8 @@ class AniReviewMngr:
             file_path = os.path.join(local_path, file_name)
             self.download_list.append(file_path)
 
-        self.mngr.server_file_download_mt(file_list, thread_count=3)
+        # concurrent downloads are limited per server by the manager's download scheduler
+        self.mngr.server_file_download_mt(file_list)
 
     def update_review_assets_to_latest(self):
         """
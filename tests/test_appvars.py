@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pyani.core.appvars
+
+
+class TestBridgeCapabilities(unittest.TestCase):
+
+    def setUp(self):
+        self.bridge_dir = tempfile.mkdtemp()
+        self.old_bridge_path = os.environ.get("PYANI_CGT_BRIDGE_API_PATH")
+        os.environ["PYANI_CGT_BRIDGE_API_PATH"] = self.bridge_dir
+
+    def tearDown(self):
+        if self.old_bridge_path is None:
+            os.environ.pop("PYANI_CGT_BRIDGE_API_PATH", None)
+        else:
+            os.environ["PYANI_CGT_BRIDGE_API_PATH"] = self.old_bridge_path
+        shutil.rmtree(self.bridge_dir, ignore_errors=True)
+
+    def write_capabilities(self, content):
+        with open(os.path.join(self.bridge_dir, "cgt_bridge_capabilities.json"), "w") as capabilities_file:
+            capabilities_file.write(content)
+
+    def test_bridge_without_capabilities(self):
+        app_vars = pyani.core.appvars.AppVars()
+        self.assertEqual(app_vars.cgt_bridge_capabilities, [])
+        self.assertFalse(app_vars.cgt_modified_since_listings)
+        self.assertFalse(app_vars.cgt_file_size_info)
+        self.assertFalse(app_vars.cgt_dedupe_downloads)
+
+    def test_bridge_with_capabilities(self):
+        self.write_capabilities('{"capabilities": ["modified since listings", "file size"]}')
+        app_vars = pyani.core.appvars.AppVars()
+        self.assertFalse(app_vars.is_cgt_bridge_emulated())
+        self.assertTrue(app_vars.cgt_modified_since_listings)
+        self.assertTrue(app_vars.cgt_file_size_info)
+        self.assertTrue(app_vars.cgt_mirror_downloads)
+        self.assertFalse(app_vars.cgt_line_delimited_listings)
+        self.assertFalse(app_vars.cgt_share_asset_type_listing)
+
+    def test_unreadable_capabilities(self):
+        for content in ("not json", '["file size"]', '{"capabilities": "file size"}'):
+            self.write_capabilities(content)
+            self.assertEqual(pyani.core.appvars.AppVars().cgt_bridge_capabilities, [])
+
+    def test_emulator_capabilities(self):
+        os.environ["PYANI_CGT_BRIDGE_API_PATH"] = pyani.core.appvars.AppVars().cgt_bridge_emulator_path
+        app_vars = pyani.core.appvars.AppVars()
+        self.assertTrue(app_vars.cgt_line_delimited_listings)
+        self.assertTrue(app_vars.cgt_share_asset_type_listing)
+        self.assertTrue(app_vars.cgt_modified_since_listings)
+        self.assertTrue(app_vars.cgt_file_size_info)
+
+
+if __name__ == "__main__":
+    unittest.main()
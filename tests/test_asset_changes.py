@@ -0,0 +1,73 @@
+import unittest
+import pyani.core.util
+
+# the managers need qt, the tests are skipped where it isn't installed
+try:
+    from pyani.core.mngr.assets import AniAssetMngr
+except ImportError:
+    AniAssetMngr = None
+
+
+class FakeServer(object):
+    """
+    Lists folders from a dict of {server path: folder names} and counts the listings
+    """
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.listed_paths = list()
+
+    def server_get_dir_list(self, server_path, dirs_only=True):
+        self.listed_paths.append(server_path)
+        listing = self.listings.get(server_path)
+        if isinstance(listing, Exception):
+            raise listing
+        return listing
+
+
+def make_asset_manager(listings):
+    asset_manager = type(
+        "AssetManager", (FakeServer,), {"_server_get_asset_names": AniAssetMngr.__dict__["_server_get_asset_names"]}
+    )(listings)
+    return asset_manager
+
+
+@unittest.skipUnless(AniAssetMngr, "needs qt")
+class TestServerAssetNames(unittest.TestCase):
+
+    def test_lists_root_once(self):
+        asset_manager = make_asset_manager({"/LongGong/assets/char": ["charHero", "charSidekick"]})
+        self.assertEqual(
+            asset_manager._server_get_asset_names("/LongGong/assets/char/", "char", ["charHero", "charVillain"]),
+            set(["charHero", "charSidekick"])
+        )
+        self.assertEqual(asset_manager.listed_paths, ["/LongGong/assets/char"])
+
+    def test_empty_root(self):
+        asset_manager = make_asset_manager({"/LongGong/assets/char": None})
+        self.assertEqual(asset_manager._server_get_asset_names("/LongGong/assets/char", "char", ["charHero"]), set())
+
+    def test_shots_list_each_sequence(self):
+        asset_manager = make_asset_manager(
+            {
+                "/LongGong/sequences": ["seq040", "seq050"],
+                "/LongGong/sequences/seq040": ["shot010", "shot020"]
+            }
+        )
+        shots = ["seq040/shot010", "seq040/shot030", "seq060/shot010"]
+        self.assertEqual(
+            asset_manager._server_get_asset_names("/LongGong/sequences", "shot", shots),
+            set(["seq040/shot010", "seq040/shot020"])
+        )
+        # removed sequences and sequences without cached shots aren't listed
+        self.assertEqual(asset_manager.listed_paths, ["/LongGong/sequences", "/LongGong/sequences/seq040"])
+
+    def test_errors(self):
+        asset_manager = make_asset_manager({"/LongGong/assets/char": "Error listing"})
+        self.assertIsNone(asset_manager._server_get_asset_names("/LongGong/assets/char", "char", ["charHero"]))
+        asset_manager = make_asset_manager({"/LongGong/assets/char": pyani.core.util.CGTError("CGT Error: failed")})
+        self.assertIsNone(asset_manager._server_get_asset_names("/LongGong/assets/char", "char", ["charHero"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
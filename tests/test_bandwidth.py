@@ -0,0 +1,107 @@
+import time
+import unittest
+from pyani.core.mngr.bandwidth import TokenBucket, BandwidthLimiter, traffic_class, prepaid, get_thread_traffic_class
+
+
+MB = 1024 * 1024
+
+
+def get_limiter(background=1.0, interactive=0):
+    """
+    :return: a BandwidthLimiter whose schedule covers the whole day
+    """
+    return BandwidthLimiter(
+        [
+            {"start": "12:00 AM", "end": "12:00 PM", "background": background, "interactive": interactive},
+            {"start": "12:00 PM", "end": "12:00 AM", "background": background, "interactive": interactive}
+        ],
+        burst_seconds=1.0
+    )
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_no_rate_never_waits(self):
+        bucket = TokenBucket(rate=0)
+        self.assertEqual(bucket.try_consume(10 * MB), 0.0)
+        self.assertLess(bucket.consume(10 * MB), 0.1)
+
+    def test_starts_full(self):
+        bucket = TokenBucket(rate=MB, burst_seconds=1.0)
+        self.assertEqual(bucket.try_consume(MB), 0.0)
+
+    def test_try_consume_reports_wait_without_taking(self):
+        bucket = TokenBucket(rate=MB, burst_seconds=1.0)
+        bucket.try_consume(MB)
+        wait_seconds = bucket.try_consume(MB // 2)
+        self.assertAlmostEqual(wait_seconds, 0.5, delta=0.1)
+        # nothing was taken, the wait is the same
+        self.assertAlmostEqual(bucket.try_consume(MB // 2), wait_seconds, delta=0.1)
+
+    def test_consume_waits_for_the_rate(self):
+        bucket = TokenBucket(rate=4 * MB, burst_seconds=0.25)
+        bucket.consume(MB)
+        start_time = time.time()
+        bucket.consume(MB)
+        self.assertGreater(time.time() - start_time, 0.15)
+
+    def test_big_transfer_leaves_debt(self):
+        bucket = TokenBucket(rate=MB, burst_seconds=1.0)
+        # bigger than the bucket, only waits for a full bucket
+        self.assertEqual(bucket.try_consume(3 * MB), 0.0)
+        self.assertGreater(bucket.try_consume(1), 1.5)
+
+    def test_adjust_gives_bytes_back(self):
+        bucket = TokenBucket(rate=MB, burst_seconds=1.0)
+        bucket.try_consume(MB)
+        bucket.adjust(-MB)
+        self.assertEqual(bucket.try_consume(MB), 0.0)
+
+
+class TestBandwidthLimiter(unittest.TestCase):
+
+    def test_rate_from_schedule(self):
+        limiter = get_limiter(background=2.0, interactive=0)
+        self.assertEqual(limiter.get_rate(BandwidthLimiter.CLASS_BACKGROUND), 2 * MB)
+        self.assertEqual(limiter.get_rate(BandwidthLimiter.CLASS_INTERACTIVE), 0)
+
+    def test_period_over_midnight(self):
+        limiter = BandwidthLimiter([{"start": "11:00 PM", "end": "1:00 AM", "background": 1}])
+        night = time.mktime((2026, 1, 1, 23, 30, 0, 0, 0, -1))
+        noon = time.mktime((2026, 1, 1, 12, 0, 0, 0, 0, -1))
+        self.assertEqual(limiter.get_rate(BandwidthLimiter.CLASS_BACKGROUND, now=night), MB)
+        self.assertEqual(limiter.get_rate(BandwidthLimiter.CLASS_BACKGROUND, now=noon), 0)
+
+    def test_bad_periods_are_skipped(self):
+        limiter = BandwidthLimiter([{"start": "bad"}, {"start": "9:00 AM", "end": "5:00 PM", "background": 1}])
+        noon = time.mktime((2026, 1, 1, 12, 0, 0, 0, 0, -1))
+        self.assertEqual(limiter.get_rate(BandwidthLimiter.CLASS_BACKGROUND, now=noon), MB)
+
+    def test_classes_have_separate_budgets(self):
+        limiter = get_limiter(background=1.0, interactive=1.0)
+        limiter.try_consume(MB, BandwidthLimiter.CLASS_BACKGROUND)
+        self.assertGreater(limiter.try_consume(MB, BandwidthLimiter.CLASS_BACKGROUND), 0)
+        self.assertEqual(limiter.try_consume(MB, BandwidthLimiter.CLASS_INTERACTIVE), 0.0)
+
+    def test_thread_traffic_class(self):
+        self.assertEqual(get_thread_traffic_class(), BandwidthLimiter.CLASS_BACKGROUND)
+        with traffic_class(BandwidthLimiter.CLASS_INTERACTIVE):
+            self.assertEqual(get_thread_traffic_class(), BandwidthLimiter.CLASS_INTERACTIVE)
+        self.assertEqual(get_thread_traffic_class(), BandwidthLimiter.CLASS_BACKGROUND)
+
+    def test_prepaid_bytes_are_not_taken_twice(self):
+        limiter = get_limiter(background=1.0)
+        self.assertEqual(limiter.try_consume(MB, BandwidthLimiter.CLASS_BACKGROUND), 0.0)
+        with prepaid(limiter, MB, BandwidthLimiter.CLASS_BACKGROUND):
+            self.assertLess(limiter.consume(MB, BandwidthLimiter.CLASS_BACKGROUND), 0.1)
+
+    def test_unused_prepaid_bytes_are_given_back(self):
+        limiter = get_limiter(background=1.0)
+        limiter.try_consume(MB, BandwidthLimiter.CLASS_BACKGROUND)
+        with prepaid(limiter, MB, BandwidthLimiter.CLASS_BACKGROUND):
+            limiter.consume(MB // 2, BandwidthLimiter.CLASS_BACKGROUND)
+        self.assertEqual(limiter.try_consume(MB // 2, BandwidthLimiter.CLASS_BACKGROUND), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import pyani.core.util
+from pyani.core.mngr.bridge import CGTBridgeWorker, CGTBridgeWorkerPool
+
+
+WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pyani", "core", "mngr", "cgt_bridge_worker.py"
+)
+
+# bridge scripts for the tests
+BRIDGE_SCRIPTS = {
+    "cgt_echo.py": (
+        "from __future__ import print_function\n"
+        "import sys\n"
+        "print(','.join(sys.argv[1:]))\n"
+    ),
+    "cgt_hang.py": (
+        "import time\n"
+        "time.sleep(60)\n"
+    ),
+    # stands in for CGT's module, counts logins
+    "cgtw2.py": (
+        "logins = 0\n"
+        "class tw(object):\n"
+        "    def __init__(self, ip, user, password):\n"
+        "        global logins\n"
+        "        logins += 1\n"
+    ),
+    # logs in, then fails the way it's asked to
+    "cgt_login.py": (
+        "from __future__ import print_function\n"
+        "import sys\n"
+        "import cgtw2\n"
+        "cgtw2.tw('127.0.0.1', sys.argv[1], 'password')\n"
+        "print(cgtw2.logins)\n"
+        "if sys.argv[2] == 'raise':\n"
+        "    raise RuntimeError('session expired')\n"
+        "if sys.argv[2] == 'exit':\n"
+        "    sys.exit(1)\n"
+        "if sys.argv[2] == 'cgt error':\n"
+        "    print('CGT Error: session expired')\n"
+    ),
+    "cgt_download.py": (
+        "from __future__ import print_function\n"
+        "import time\n"
+        "time.sleep(float(__import__('sys').argv[1]))\n"
+        "print('file_total:0')\n"
+    )
+}
+
+
+class BridgeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.bridge_dir = tempfile.mkdtemp()
+        for script_name, script in BRIDGE_SCRIPTS.items():
+            with open(os.path.join(self.bridge_dir, script_name), "w") as script_file:
+                script_file.write(script)
+        self.workers = list()
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.stop()
+        shutil.rmtree(self.bridge_dir, ignore_errors=True)
+
+    def make_worker(self, **kwargs):
+        worker = CGTBridgeWorker(sys.executable, WORKER_SCRIPT, self.bridge_dir, **kwargs)
+        self.workers.append(worker)
+        return worker
+
+
+class TestCGTBridgeWorker(BridgeTestCase):
+
+    def test_call(self):
+        worker = self.make_worker(timeout=30.0)
+        self.assertEqual(worker.call_ext_py_api(["cgt_echo.py", "a", "b"]), ("a,b\n", None))
+        self.assertEqual(worker.call_ext_py_api(["cgt_echo.py", "c"]), ("c\n", None))
+        self.assertEqual(worker.start_count, 1)
+
+    def test_batch(self):
+        worker = self.make_worker(timeout=30.0)
+        self.assertEqual(
+            worker.call_ext_py_api_batch([["cgt_echo.py", "a"], ["cgt_echo.py", "b"]]),
+            [("a\n", None), ("b\n", None)]
+        )
+
+    def test_hung_script_times_out(self):
+        worker = self.make_worker(timeout=0.5)
+        start_time = time.time()
+        output, error = worker.call_ext_py_api(["cgt_hang.py"])
+        self.assertLess(time.time() - start_time, 10.0)
+        self.assertIsNone(output)
+        self.assertIn("timed out", error)
+        self.assertFalse(worker.is_running())
+        # the next call starts a new process
+        self.assertEqual(worker.call_ext_py_api(["cgt_echo.py", "a"]), ("a\n", None))
+        self.assertEqual(worker.start_count, 2)
+
+    def test_hung_batch_times_out(self):
+        worker = self.make_worker(timeout=0.5)
+        results = worker.call_ext_py_api_batch([["cgt_echo.py", "a"], ["cgt_hang.py"]])
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(output is None and "timed out" in error for output, error in results))
+
+    def test_download_timeout(self):
+        worker = self.make_worker(timeout=0.5, download_timeout=30.0)
+        self.assertEqual(worker.call_ext_py_api(["cgt_download.py", "1.0"]), ("file_total:0\n", None))
+
+    def test_no_timeout(self):
+        worker = self.make_worker()
+        self.assertEqual(worker.call_ext_py_api(["cgt_download.py", "0.5"]), ("file_total:0\n", None))
+
+    def test_ping(self):
+        worker = self.make_worker(timeout=30.0)
+        self.assertTrue(worker.is_available())
+        self.assertTrue(worker.ping())
+
+
+class TestCachedLogins(BridgeTestCase):
+
+    def get_logins(self, worker, user, failure="none"):
+        """
+        :return: how many times the script's process logged in to the fake CGT
+        """
+        output, _ = worker.call_ext_py_api(["cgt_login.py", user, failure])
+        return int(output.split()[0])
+
+    def test_login_is_cached(self):
+        worker = self.make_worker(timeout=30.0)
+        self.assertEqual(self.get_logins(worker, "publish"), 1)
+        self.assertEqual(self.get_logins(worker, "publish"), 1)
+        # different arguments log in separately
+        self.assertEqual(self.get_logins(worker, "artist"), 2)
+
+    def test_failed_script_drops_login(self):
+        worker = self.make_worker(timeout=30.0)
+        self.get_logins(worker, "artist")
+        for failure in ("raise", "exit"):
+            self.get_logins(worker, "publish")
+            output, error = worker.call_ext_py_api(["cgt_login.py", "publish", failure])
+            self.assertIsNone(output)
+            self.assertIsNotNone(error)
+        self.assertEqual(self.get_logins(worker, "publish"), 4)
+        # other logins are kept
+        self.assertEqual(self.get_logins(worker, "artist"), 4)
+
+    def test_cgt_error_drops_login(self):
+        worker = self.make_worker(timeout=30.0)
+        self.assertEqual(self.get_logins(worker, "publish"), 1)
+        self.assertRaises(
+            pyani.core.util.CGTError, worker.call_ext_py_api, ["cgt_login.py", "publish", "cgt error"]
+        )
+        self.assertEqual(self.get_logins(worker, "publish"), 2)
+
+
+class TestCGTBridgeWorkerPool(BridgeTestCase):
+
+    def test_hung_worker_doesnt_block_the_pool(self):
+        pool = CGTBridgeWorkerPool(sys.executable, WORKER_SCRIPT, self.bridge_dir, size=1, timeout=0.5)
+        self.workers.append(pool)
+        output, error = pool.call_ext_py_api(["cgt_hang.py"])
+        self.assertIn("timed out", error)
+        self.assertEqual(pool.call_ext_py_api(["cgt_echo.py", "a"]), ("a\n", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
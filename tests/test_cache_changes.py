@@ -0,0 +1,104 @@
+import copy
+import unittest
+
+# the managers need qt, the tests are skipped where it isn't installed
+try:
+    from pyani.core.mngr.core import AniCoreMngr
+except ImportError:
+    AniCoreMngr = None
+
+
+CACHE_DATA = {
+    "char": {
+        "rig": {
+            "charHero": {"version": "v001", "files": ["charHero_rig.mb"]},
+            "charVillain": {"version": "v003", "files": ["charVillain_rig.mb"]}
+        },
+        "model": {
+            "charHero": {"version": "v002", "files": ["charHero_model.mb"]}
+        }
+    }
+}
+
+
+def make_cache_manager():
+    """
+    Makes an object with AniCoreMngr's cache change methods and a cache held in memory, so the methods can be tested
+    without the gui manager's setup
+    """
+    cache_methods = dict(
+        (method_name, AniCoreMngr.__dict__[method_name])
+        for method_name in (
+            "get_local_cache_snapshot",
+            "get_local_cache_keys",
+            "take_local_cache_snapshot",
+            "get_local_cache_changes"
+        )
+    )
+
+    def get_local_cache_data(self):
+        return self.cache_data
+
+    cache_methods["get_local_cache_data"] = get_local_cache_data
+    cache_manager = type("CacheManager", (object,), cache_methods)()
+    cache_manager.cache_data = copy.deepcopy(CACHE_DATA)
+    cache_manager._cache_snapshot = None
+    cache_manager._cache_sync_updated_keys = list()
+    return cache_manager
+
+
+@unittest.skipUnless(AniCoreMngr, "needs qt")
+class TestLocalCacheChanges(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_manager = make_cache_manager()
+
+    def test_no_snapshot(self):
+        self.assertIsNone(self.cache_manager.get_local_cache_changes())
+
+    def test_no_changes(self):
+        self.cache_manager.take_local_cache_snapshot()
+        self.assertEqual(
+            self.cache_manager.get_local_cache_changes(), {"added": [], "removed": [], "changed": []}
+        )
+
+    def test_added_removed_and_changed(self):
+        self.cache_manager.take_local_cache_snapshot()
+        rigs = self.cache_manager.cache_data["char"]["rig"]
+        rigs["charHero"]["version"] = "v002"
+        del rigs["charVillain"]
+        rigs["charSidekick"] = {"version": "v001", "files": []}
+        self.cache_manager.cache_data["set"] = {"model": {"setCity": {"version": "v001", "files": []}}}
+
+        changes = self.cache_manager.get_local_cache_changes()
+        self.assertEqual(changes["added"], [("char", "rig", "charSidekick"), ("set", "model", "setCity")])
+        self.assertEqual(changes["removed"], [("char", "rig", "charVillain")])
+        self.assertEqual(changes["changed"], [("char", "rig", "charHero")])
+
+    def test_snapshot_is_replaced(self):
+        self.cache_manager.take_local_cache_snapshot()
+        self.cache_manager.cache_data["char"]["rig"]["charHero"]["version"] = "v002"
+        self.cache_manager.get_local_cache_changes()
+        self.assertEqual(
+            self.cache_manager.get_local_cache_changes(), {"added": [], "removed": [], "changed": []}
+        )
+
+    def test_updated_keys_are_changed(self):
+        # downloads changed the files even though the cache didn't change
+        self.cache_manager.take_local_cache_snapshot({"char": {"rig": ["charVillain"], "model": []}})
+        changes = self.cache_manager.get_local_cache_changes()
+        self.assertEqual(changes["changed"], [("char", "model", "charHero"), ("char", "rig", "charVillain")])
+        self.assertEqual(changes["added"], [])
+
+    def test_get_local_cache_keys(self):
+        self.assertEqual(
+            sorted(self.cache_manager.get_local_cache_keys({"char": None})),
+            [("char", "model", "charHero"), ("char", "rig", "charHero"), ("char", "rig", "charVillain")]
+        )
+        self.assertEqual(
+            self.cache_manager.get_local_cache_keys({"char": {"rig": ["charHero"]}}), [("char", "rig", "charHero")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,335 @@
+import os
+import re
+import sys
+import json
+import time
+import calendar
+import shutil
+import tempfile
+import unittest
+import subprocess
+import pyani.core.util
+
+# the managers need qt, the mirror check is skipped where it isn't installed
+try:
+    from pyani.core.mngr.core import AniCoreMngr
+except ImportError:
+    AniCoreMngr = None
+
+
+EMULATOR_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pyani", "core", "mngr", "cgt_bridge_emulator"
+)
+# ip, user and password, the emulator ignores them
+LOGIN = ["127.0.0.1", "user", "password"]
+
+
+class EmulatorTestCase(unittest.TestCase):
+    """
+    Runs the emulator scripts the way the app bridge runs, in their own process, against a tree in a temp folder
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.local_dir = tempfile.mkdtemp()
+        self.env = dict(os.environ)
+        self.env["PYANI_CGT_EMULATOR_ROOT"] = self.root
+        for name in ("PYANI_CGT_EMULATOR_LATENCY", "PYANI_CGT_EMULATOR_FAILURE_RATE", "PYANI_CGT_EMULATOR_BANDWIDTH"):
+            self.env.pop(name, None)
+
+        self.make_file("LongGong/assets/char/charHero/rig/charHero_rig.mb", "rig")
+        self.make_file("LongGong/assets/char/charHero/model/charHero_model.mb", "model content")
+        self.make_file("LongGong/assets/char/charVillain/rig/charVillain_rig.mb", "rig")
+        self.make_file("LongGong/assets/char/charVillain/rig/approved/charVillain_rig.mb", "approved rig")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        shutil.rmtree(self.local_dir, ignore_errors=True)
+
+    def make_file(self, server_path, content=""):
+        file_path = os.path.join(self.root, *server_path.split("/"))
+        if not os.path.exists(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+        with open(file_path, "w") as emulated_file:
+            emulated_file.write(content)
+        return file_path
+
+    def run_script(self, script, *args):
+        """
+        :return: a tuple of the return code, stdout and stderr
+        """
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(EMULATOR_DIR, script)] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self.env,
+            universal_newlines=True
+        )
+        output, error = process.communicate()
+        return process.returncode, output, error
+
+    def file_info(self, server_path, *options):
+        """
+        :return: the script's output, raises pyani.core.util.CGTError for a CGT error like the managers do
+        """
+        command = ["cgt_file_info.py"] + LOGIN + [server_path] + list(options)
+        return_code, output, error = self.run_script(*command)
+        output, error = pyani.core.util.check_ext_py_api_output(command, return_code, output, error)
+        self.assertIsNone(error)
+        return output.strip() if output else output
+
+
+class TestFileInfo(EmulatorTestCase):
+
+    def test_list_files(self):
+        self.assertEqual(
+            self.file_info("/LongGong/assets/char/charVillain").split(","),
+            [
+                "/LongGong/assets/char/charVillain/rig/approved/charVillain_rig.mb",
+                "/LongGong/assets/char/charVillain/rig/charVillain_rig.mb"
+            ]
+        )
+
+    def test_list_without_walking(self):
+        self.assertEqual(
+            self.file_info("/LongGong/assets/char", "--no_walk=True", "--file_mode=dirs").split(","),
+            ["/LongGong/assets/char/charHero", "/LongGong/assets/char/charVillain"]
+        )
+        self.assertIsNone(self.file_info("/LongGong/assets/char", "--no_walk=True"))
+
+    def test_list_files_and_dirs(self):
+        self.assertEqual(
+            self.file_info("/LongGong/assets/char/charHero/rig", "--file_mode=files_and_dirs"),
+            "/LongGong/assets/char/charHero/rig/charHero_rig.mb"
+        )
+        self.assertEqual(
+            self.file_info("/LongGong/assets/char/charVillain/rig", "--file_mode=files_and_dirs").split(","),
+            [
+                "/LongGong/assets/char/charVillain/rig/approved",
+                "/LongGong/assets/char/charVillain/rig/approved/charVillain_rig.mb",
+                "/LongGong/assets/char/charVillain/rig/charVillain_rig.mb"
+            ]
+        )
+
+    def test_path_checks(self):
+        self.assertEqual(self.file_info("/LongGong/assets/char/charHero", "--path_exists=True"), "True")
+        self.assertEqual(self.file_info("/LongGong/assets/char/charNone", "--path_exists=True"), "False")
+        self.assertEqual(self.file_info("/LongGong/assets/char/charHero", "--is_file=True"), "False")
+        self.assertEqual(
+            self.file_info("/LongGong/assets/char/charHero/rig/charHero_rig.mb", "--is_file=True"), "True"
+        )
+
+    def test_modified_date(self):
+        modified_date = self.file_info("/LongGong/assets/char/charHero/rig/charHero_rig.mb", "--modified_date=True")
+        self.assertTrue(re.match(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d$", modified_date), modified_date)
+
+    def test_file_size(self):
+        self.assertEqual(
+            self.file_info("/LongGong/assets/char/charHero/model/charHero_model.mb", "--file_size=True"), "13"
+        )
+
+    def test_folder_filter(self):
+        temp_file = os.path.join(self.local_dir, "listing", "rig.json")
+        self.file_info("/LongGong/assets/char", "--folder_filter=rig", "--temp_file={0}".format(temp_file))
+        with open(temp_file, "r") as json_file:
+            file_info = json.load(json_file)
+        self.assertEqual(
+            [info["path"] for info in file_info],
+            [
+                "/LongGong/assets/char/charHero/rig",
+                "/LongGong/assets/char/charHero/rig/charHero_rig.mb",
+                "/LongGong/assets/char/charVillain/rig",
+                "/LongGong/assets/char/charVillain/rig/approved",
+                "/LongGong/assets/char/charVillain/rig/charVillain_rig.mb",
+                "/LongGong/assets/char/charVillain/rig/approved/charVillain_rig.mb"
+            ]
+        )
+        self.assertTrue(all("modify_time" in info for info in file_info))
+
+    def test_folder_filter_line_delimited(self):
+        temp_file = os.path.join(self.local_dir, "model.json")
+        self.file_info(
+            "/LongGong/assets/char",
+            "--folder_filter=model",
+            "--temp_file={0}".format(temp_file),
+            "--line_delimited=True"
+        )
+        with open(temp_file, "r") as json_file:
+            paths = [json.loads(line)["path"] for line in json_file]
+        self.assertEqual(
+            paths, ["/LongGong/assets/char/charHero/model", "/LongGong/assets/char/charHero/model/charHero_model.mb"]
+        )
+
+    def test_modified_since(self):
+        # everything but the hero model was modified a day ago
+        old_time = time.time() - 24 * 60 * 60
+        for root, dir_names, file_names in os.walk(self.root):
+            for name in dir_names + file_names:
+                if not name.startswith("charHero_model"):
+                    os.utime(os.path.join(root, name), (old_time, old_time))
+        modified_since = self.file_info(
+            "/LongGong/assets/char/charHero/model/charHero_model.mb", "--modified_date=True"
+        )
+
+        temp_file = os.path.join(self.local_dir, "changes.json")
+        self.file_info(
+            "/LongGong/assets/char",
+            "--folder_filter=",
+            "--temp_file={0}".format(temp_file),
+            "--modified_since={0}".format(modified_since)
+        )
+        with open(temp_file, "r") as json_file:
+            paths = [info["path"] for info in json.load(json_file)]
+        self.assertEqual(paths, ["/LongGong/assets/char/charHero/model/charHero_model.mb"])
+
+    def test_missing_path_is_cgt_error(self):
+        # the real bridge prints cgt errors and exits normally
+        return_code, output, _ = self.run_script("cgt_file_info.py", *(LOGIN + ["/LongGong/assets/char/charNone"]))
+        self.assertEqual(return_code, 0)
+        self.assertTrue(output.startswith("CGT Error:"))
+        self.assertRaises(pyani.core.util.CGTError, self.file_info, "/LongGong/assets/char/charNone")
+        self.assertRaises(
+            pyani.core.util.CGTError, self.file_info, "/LongGong/assets/char/charNone", "--modified_date=True"
+        )
+
+    def test_emulated_failure_is_cgt_error(self):
+        self.env["PYANI_CGT_EMULATOR_FAILURE_RATE"] = "1.0"
+        self.assertRaises(pyani.core.util.CGTError, self.file_info, "/LongGong/assets/char")
+
+    def test_missing_arguments_exit_code(self):
+        command = ["cgt_file_info.py"] + LOGIN
+        return_code, output, error = self.run_script(*command)
+        self.assertNotEqual(return_code, 0)
+        output, error = pyani.core.util.check_ext_py_api_output(command, return_code, output, error)
+        self.assertIsNone(output)
+        self.assertIn("Return Code is {0}".format(return_code), error)
+
+
+class TestModifiedDateRoundTrip(EmulatorTestCase):
+    """
+    The emulator writes modified dates in UTC and the managers parse server dates as UTC, whatever the machine's time
+    zone
+    """
+
+    def setUp(self):
+        EmulatorTestCase.setUp(self)
+        self.env["TZ"] = "America/Los_Angeles"
+        self.file_path = self.make_file("LongGong/assets/char/charHero/rig/charHero_rig.mb", "rig")
+        # a whole second, the date format has no fractions
+        self.modify_time = 1577880000.0
+        os.utime(self.file_path, (self.modify_time, self.modify_time))
+
+    def get_modified_date(self):
+        return self.file_info("/LongGong/assets/char/charHero/rig/charHero_rig.mb", "--modified_date=True")
+
+    def test_date_is_utc(self):
+        modified_date = self.get_modified_date()
+        self.assertEqual(modified_date, "2020-01-01 12:00:00")
+        self.assertEqual(calendar.timegm(time.strptime(modified_date, "%Y-%m-%d %H:%M:%S")), self.modify_time)
+
+    @unittest.skipUnless(AniCoreMngr, "needs qt")
+    def test_mirror_copy_is_current(self):
+        class FakeAppVars(object):
+            cgt_mirror_mtime_tolerance = 2.0
+
+        mirror_manager = type(
+            "MirrorManager", (object,), {"_is_mirror_copy_current": AniCoreMngr.__dict__["_is_mirror_copy_current"]}
+        )()
+        mirror_manager.app_vars = FakeAppVars()
+        modified_date = self.get_modified_date()
+        self.assertTrue(mirror_manager._is_mirror_copy_current(self.file_path, modified_date, 3))
+        # a different size or a copy modified before or after the server's isn't current
+        self.assertFalse(mirror_manager._is_mirror_copy_current(self.file_path, modified_date, 4))
+        for offset in (-60.0, 60.0):
+            os.utime(self.file_path, (self.modify_time + offset, self.modify_time + offset))
+            self.assertFalse(mirror_manager._is_mirror_copy_current(self.file_path, modified_date, 3))
+
+
+class TestDownload(EmulatorTestCase):
+
+    def download(self, server_paths, local_dirs, print_file_list=False):
+        args = [",".join(server_paths), ",".join(local_dirs)] + LOGIN
+        if print_file_list:
+            args.append("True")
+        return self.run_script("cgt_download.py", *args)
+
+    def test_download_file(self):
+        local_dir = os.path.join(self.local_dir, "model")
+        return_code, output, _ = self.download(["/LongGong/assets/char/charHero/model/charHero_model.mb"], [local_dir])
+        self.assertEqual(return_code, 0)
+        self.assertEqual(output.splitlines(), ["file_total:1", "-->file_size:13", "-->progress: 100.0 %"])
+        with open(os.path.join(local_dir, "charHero_model.mb"), "r") as local_file:
+            self.assertEqual(local_file.read(), "model content")
+
+    def test_download_directories(self):
+        hero_dir = os.path.join(self.local_dir, "hero")
+        villain_dir = os.path.join(self.local_dir, "villain")
+        return_code, output, _ = self.download(
+            ["/LongGong/assets/char/charHero/rig", "/LongGong/assets/char/charVillain/rig"],
+            [hero_dir, villain_dir],
+            print_file_list=True
+        )
+        self.assertEqual(return_code, 0)
+        lines = output.splitlines()
+        downloaded_files = [
+            os.path.join(hero_dir, "charHero_rig.mb"),
+            os.path.join(villain_dir, "charVillain_rig.mb"),
+            os.path.join(villain_dir, "approved", "charVillain_rig.mb")
+        ]
+        self.assertEqual(
+            lines[0], "file_dirs_to_dl#{0},{1}@file_names#{2}".format(hero_dir, villain_dir, ",".join(downloaded_files))
+        )
+        self.assertEqual(lines[1], "file_total:3")
+        self.assertEqual(len([line for line in lines if line.startswith("-->file_size:")]), 3)
+        self.assertTrue(all(os.path.exists(file_path) for file_path in downloaded_files))
+
+    def test_download_empty_file(self):
+        self.make_file("LongGong/assets/char/charHero/empty.txt")
+        return_code, output, _ = self.download(["/LongGong/assets/char/charHero/empty.txt"], [self.local_dir])
+        self.assertEqual(output.splitlines(), ["file_total:1", "-->file_size:0", "-->progress: 100.0 %"])
+
+    def test_missing_path_is_cgt_error(self):
+        command = ["cgt_download.py", "/LongGong/assets/char/charNone", self.local_dir] + LOGIN
+        return_code, output, error = self.run_script(*command)
+        self.assertEqual(return_code, 0)
+        self.assertRaises(
+            pyani.core.util.CGTError, pyani.core.util.check_ext_py_api_output, command, return_code, output, error
+        )
+        self.assertEqual(os.listdir(self.local_dir), [])
+
+    def test_missing_arguments_exit_code(self):
+        return_code, output, error = self.run_script("cgt_download.py")
+        self.assertNotEqual(return_code, 0)
+        self.assertIn("IndexError", error)
+
+
+class TestNotesAndShowInfo(EmulatorTestCase):
+
+    def test_notes(self):
+        self.make_file("cgt_notes/rig/charHero.txt", "fixed the knees")
+        _, output, _ = self.run_script("cgt_get_notes.py", "rig", "charHero", *LOGIN)
+        self.assertEqual(output, "fixed the knees")
+        _, output, _ = self.run_script("cgt_get_notes.py", "rig", "charVillain", *LOGIN)
+        self.assertEqual(output, "")
+
+    def test_show_info_from_folders(self):
+        os.makedirs(os.path.join(self.root, "LongGong", "sequences", "seq040", "shot010"))
+        os.makedirs(os.path.join(self.root, "LongGong", "sequences", "seq040", "shot020"))
+        os.makedirs(os.path.join(self.root, "LongGong", "sequences", "Library"))
+        json_path = os.path.join(self.local_dir, "show", "cgt_show_info.json")
+        return_code, _, _ = self.run_script("cgt_show_info.py", json_path, *LOGIN)
+        self.assertEqual(return_code, 0)
+        with open(json_path, "r") as json_file:
+            self.assertEqual(
+                json.load(json_file),
+                {
+                    "seq040": [
+                        {"shot": "shot010", "first_frame": 1001, "last_frame": 1100},
+                        {"shot": "shot020", "first_frame": 1001, "last_frame": 1100}
+                    ]
+                }
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pyani.core.util
+import pyani.core.mngr.concurrency
+from pyani.core.mngr.concurrency import AdaptiveConcurrencyController
+
+
+class TestAdaptiveConcurrencyController(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.temp_dir, "state", "cgt_concurrency.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_round(self, controller, duration, succeeded=True, operation="file info"):
+        """
+        Records calls until a round ends
+        :return: the level after the round
+        """
+        for _ in range(max(controller.get_level(), 4)):
+            level = controller.record(duration, succeeded=succeeded, operation=operation)
+        return level
+
+    def test_level_is_clamped(self):
+        self.assertEqual(AdaptiveConcurrencyController(self.state_path, start_level=50, max_level=8).get_level(), 8)
+        self.assertEqual(AdaptiveConcurrencyController(self.state_path, start_level=0, min_level=2).get_level(), 2)
+
+    def test_first_round_increases(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=3)
+        self.assertEqual(self.run_round(controller, 0.1), 4)
+
+    def test_increase_stops_at_max(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=4, max_level=4)
+        self.assertEqual(self.run_round(controller, 0.1), 4)
+
+    def test_errors_decrease(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=8)
+        self.assertEqual(self.run_round(controller, 0.1, succeeded=False), 4)
+        self.assertEqual(self.run_round(controller, 0.1, succeeded=False), 2)
+        self.assertEqual(self.run_round(controller, 0.1, succeeded=False), 1)
+        # never below the min
+        self.assertEqual(self.run_round(controller, 0.1, succeeded=False), 1)
+
+    def test_slow_calls_decrease(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=8, max_level=8)
+        self.run_round(controller, 0.1)
+        self.assertEqual(self.run_round(controller, 0.5), 4)
+
+    def test_baseline_per_operation(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=8, max_level=8)
+        self.run_round(controller, 0.1, operation="file info")
+        self.run_round(controller, 5.0, operation="download")
+        # downloads are slower than file info calls but not than other downloads
+        self.assertEqual(self.run_round(controller, 5.0, operation="download"), 8)
+        self.assertEqual(self.run_round(controller, 0.1, operation="file info"), 8)
+        self.assertEqual(self.run_round(controller, 20.0, operation="download"), 4)
+
+    def test_mixed_round_compares_each_operation(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=4, max_level=4)
+        for duration, operation in ((0.1, "file info"), (0.1, "file info"), (5.0, "download"), (5.0, "download")):
+            controller.record(duration, operation=operation)
+        for duration, operation in ((0.1, "file info"), (5.0, "download"), (0.1, "file info"), (5.0, "download")):
+            level = controller.record(duration, operation=operation)
+        self.assertEqual(level, 4)
+
+    def test_save_and_load(self):
+        controller = AdaptiveConcurrencyController(self.state_path, start_level=3)
+        self.run_round(controller, 0.25, operation="download")
+        self.assertIsNone(controller.save())
+        state = pyani.core.util.load_json(self.state_path)
+        self.assertEqual(state, {"level": 4, "baseline latencies": {"download": 0.25}})
+
+        loaded_controller = AdaptiveConcurrencyController(self.state_path, start_level=1)
+        self.assertEqual(loaded_controller.get_level(), 4)
+        # the loaded baseline makes a slower round overloaded
+        self.assertEqual(self.run_round(loaded_controller, 1.0, operation="download"), 2)
+
+    def test_save_unchanged_does_nothing(self):
+        controller = AdaptiveConcurrencyController(self.state_path)
+        self.assertIsNone(controller.save())
+        self.assertFalse(os.path.exists(self.state_path))
+
+
+class FakeAppVars(object):
+
+    def __init__(self, state_path, endpoint_limits):
+        self.cgt_ip = "server"
+        self.cgt_download_endpoint_limits = endpoint_limits
+        self.cgt_concurrency_state_path = state_path
+        self.cgt_concurrency_start = 3
+        self.cgt_concurrency_min = 1
+        self.cgt_concurrency_max = 16
+
+
+class TestSharedConcurrencyController(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.temp_dir, "cgt_concurrency.json")
+        pyani.core.mngr.concurrency._shared_controller = None
+
+    def tearDown(self):
+        pyani.core.mngr.concurrency._shared_controller = None
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_max_is_server_limit(self):
+        controller = pyani.core.mngr.concurrency.get_shared_concurrency_controller(
+            FakeAppVars(self.state_path, {"server": 6})
+        )
+        self.assertEqual(controller.max_level, 6)
+        self.assertIs(pyani.core.mngr.concurrency.get_shared_concurrency_controller(None), controller)
+
+    def test_max_without_server_limit(self):
+        controller = pyani.core.mngr.concurrency.get_shared_concurrency_controller(
+            FakeAppVars(self.state_path, dict())
+        )
+        self.assertEqual(controller.max_level, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pyani.core.mngr.content_store import ContentStore
+
+
+class TestContentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "index", "content_store.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_file(self, name, content="content"):
+        file_path = os.path.join(self.temp_dir, name)
+        with open(file_path, "w") as local_file:
+            local_file.write(content)
+        return file_path
+
+    def test_key_includes_server_path(self):
+        key = ContentStore.get_key("/LongGong/a/audio.wav", "2020-01-01 00:00:00", 10)
+        self.assertEqual(key, ContentStore.get_key("/LongGong/A/Audio.wav", "2020-01-01 00:00:00", 10))
+        self.assertNotEqual(key, ContentStore.get_key("/LongGong/b/audio.wav", "2020-01-01 00:00:00", 10))
+        self.assertNotEqual(key, ContentStore.get_key("/LongGong/a/audio.wav", "2020-01-01 00:00:01", 10))
+
+    def test_checksum_key(self):
+        self.assertEqual(
+            ContentStore.get_key("/a/audio.wav", "2020-01-01 00:00:00", 10, checksum="abc"),
+            ContentStore.get_key("/b/audio.wav", "2020-02-01 00:00:00", 20, checksum="abc")
+        )
+
+    def test_add_and_find(self):
+        store = ContentStore(self.index_path)
+        file_path = self.make_file("audio.wav")
+        self.assertIsNone(store.find("key"))
+        store.add("key", file_path)
+        self.assertEqual(store.find("key"), file_path)
+        self.assertIsNone(store.find("key", exclude_path=file_path))
+
+    def test_add_missing_file_is_ignored(self):
+        store = ContentStore(self.index_path)
+        store.add("key", os.path.join(self.temp_dir, "missing.wav"))
+        self.assertIsNone(store.find("key"))
+
+    def test_changed_file_is_forgotten(self):
+        store = ContentStore(self.index_path)
+        file_path = self.make_file("audio.wav")
+        store.add("key", file_path)
+        self.make_file("audio.wav", "edited content")
+        self.assertIsNone(store.find("key"))
+
+    def test_max_copies(self):
+        store = ContentStore(self.index_path, max_copies=2)
+        file_paths = [self.make_file("audio{0}.wav".format(index)) for index in range(3)]
+        for file_path in file_paths:
+            store.add("key", file_path)
+        # the oldest copy is forgotten
+        self.assertEqual(store.find("key", exclude_path=file_paths[1]), file_paths[2])
+        self.assertEqual(store.find("key", exclude_path=file_paths[2]), file_paths[1])
+
+    def test_save_and_load(self):
+        store = ContentStore(self.index_path)
+        file_path = self.make_file("audio.wav")
+        store.add("key", file_path)
+        self.assertIsNone(store.save())
+        self.assertFalse(os.path.exists(self.index_path + ".lock"))
+        self.assertEqual(ContentStore(self.index_path).find("key"), file_path)
+
+    def test_save_merges_other_process_entries(self):
+        first_store = ContentStore(self.index_path)
+        second_store = ContentStore(self.index_path)
+        first_path = self.make_file("first.wav")
+        second_path = self.make_file("second.wav")
+        # both stores load the index before either saves
+        self.assertIsNone(first_store.find("shared key"))
+        self.assertIsNone(second_store.find("shared key"))
+        first_store.add("shared key", first_path)
+        first_store.add("first key", first_path)
+        second_store.add("shared key", second_path)
+        second_store.add("second key", second_path)
+        self.assertIsNone(first_store.save())
+        self.assertIsNone(second_store.save())
+
+        store = ContentStore(self.index_path)
+        self.assertEqual(store.find("first key"), first_path)
+        self.assertEqual(store.find("second key"), second_path)
+        self.assertEqual(store.find("shared key", exclude_path=second_path), first_path)
+        self.assertEqual(store.find("shared key", exclude_path=first_path), second_path)
+
+    def test_save_times_out_while_locked(self):
+        store = ContentStore(self.index_path, lock_timeout=0.2)
+        store.add("key", self.make_file("audio.wav"))
+        os.makedirs(os.path.dirname(self.index_path))
+        with open(self.index_path + ".lock", "w") as lock_file:
+            lock_file.write('{"pid": %d, "host": "another machine"}' % os.getpid())
+        self.assertIsNotNone(store.save())
+        os.remove(self.index_path + ".lock")
+        self.assertIsNone(store.save())
+
+
+if __name__ == "__main__":
+    unittest.main()
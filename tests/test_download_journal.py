@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pyani.core.mngr.download_journal import DownloadJournal
+
+
+class TestDownloadJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_path = os.path.join(self.temp_dir, "cgt_download_journal.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def add(self, journal, server_path, state):
+        journal.add(server_path, "C:\\local\\file", "C:\\local\\.pyani_download\\file", "2020-01-01 00:00:00", state)
+
+    def test_journal_per_process(self):
+        journal = DownloadJournal(self.journal_path)
+        self.assertEqual(
+            journal.journal_path, os.path.join(self.temp_dir, "cgt_download_journal.{0}.txt".format(os.getpid()))
+        )
+
+    def test_last_entry_is_current_state(self):
+        journal = DownloadJournal(self.journal_path)
+        self.add(journal, "/a", DownloadJournal.STATE_STARTED)
+        self.add(journal, "/a", DownloadJournal.STATE_DOWNLOADED)
+        self.assertEqual(journal.get_entry("/a")["state"], DownloadJournal.STATE_DOWNLOADED)
+        # read back from disk
+        self.assertEqual(DownloadJournal(self.journal_path).get_entry("/a")["state"], DownloadJournal.STATE_DOWNLOADED)
+
+    def test_get_entries_by_state(self):
+        journal = DownloadJournal(self.journal_path)
+        self.add(journal, "/a", DownloadJournal.STATE_STARTED)
+        self.add(journal, "/b", DownloadJournal.STATE_INSTALLED)
+        self.assertEqual(
+            [entry["server path"] for entry in journal.get_entries(DownloadJournal.STATE_STARTED)], ["/a"]
+        )
+        self.assertEqual(len(journal.get_entries()), 2)
+
+    def test_compact_removes_installed(self):
+        journal = DownloadJournal(self.journal_path)
+        self.add(journal, "/a", DownloadJournal.STATE_DOWNLOADED)
+        self.add(journal, "/b", DownloadJournal.STATE_INSTALLED)
+        self.assertIsNone(journal.compact())
+        entries = DownloadJournal(self.journal_path).get_entries()
+        self.assertEqual([entry["server path"] for entry in entries], ["/a"])
+
+    def test_partial_line_is_skipped(self):
+        journal = DownloadJournal(self.journal_path)
+        self.add(journal, "/a", DownloadJournal.STATE_STARTED)
+        with open(journal.journal_path, "a") as journal_file:
+            journal_file.write('{"server path": "/b", "sta')
+        self.assertEqual([entry["server path"] for entry in DownloadJournal(self.journal_path).get_entries()], ["/a"])
+
+    def test_takes_orphaned_journals(self):
+        # a process that isn't running and the journal shared by every process in earlier versions
+        dead_journal = DownloadJournal(self.journal_path)
+        dead_journal.journal_path = DownloadJournal.get_process_journal_path(self.journal_path, 2 ** 22 + 12345)
+        self.add(dead_journal, "/dead", DownloadJournal.STATE_DOWNLOADED)
+        legacy_journal = DownloadJournal(self.journal_path)
+        legacy_journal.journal_path = self.journal_path
+        self.add(legacy_journal, "/legacy", DownloadJournal.STATE_STARTED)
+
+        entries = DownloadJournal(self.journal_path).take_orphaned_entries()
+        self.assertEqual(sorted(entry["server path"] for entry in entries), ["/dead", "/legacy"])
+        self.assertFalse(os.path.exists(dead_journal.journal_path))
+        self.assertFalse(os.path.exists(self.journal_path))
+        # taken only once
+        self.assertEqual(DownloadJournal(self.journal_path).take_orphaned_entries(), list())
+
+    def test_leaves_running_process_journals(self):
+        # the parent process is running
+        running_journal = DownloadJournal(self.journal_path)
+        running_journal.journal_path = DownloadJournal.get_process_journal_path(self.journal_path, os.getppid())
+        self.add(running_journal, "/running", DownloadJournal.STATE_STARTED)
+        self.assertEqual(DownloadJournal(self.journal_path).take_orphaned_entries(), list())
+        self.assertTrue(os.path.exists(running_journal.journal_path))
+
+    def test_claim_recovery_once(self):
+        journal = DownloadJournal(self.journal_path)
+        self.assertTrue(journal.claim_recovery())
+        self.assertFalse(journal.claim_recovery())
+
+
+if __name__ == "__main__":
+    unittest.main()
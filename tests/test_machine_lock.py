@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from pyani.core.mngr.machine_lock import MachineLock, is_process_running
+
+
+class TestMachineLock(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.lock_path = os.path.join(self.temp_dir, "locks", "cache.json.lock")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_acquire_and_release(self):
+        lock = MachineLock(self.lock_path, stale_seconds=10.0)
+        self.assertTrue(lock.acquire(timeout=1.0))
+        self.assertTrue(lock.is_held())
+        self.assertEqual(lock.get_owner()["pid"], os.getpid())
+        lock.release()
+        self.assertFalse(lock.is_held())
+        self.assertFalse(os.path.exists(self.lock_path))
+
+    def test_second_lock_times_out(self):
+        with MachineLock(self.lock_path, stale_seconds=10.0):
+            other_lock = MachineLock(self.lock_path, stale_seconds=10.0, poll_seconds=0.05)
+            self.assertFalse(other_lock.acquire(timeout=0.2))
+            self.assertTrue(other_lock.was_waiting())
+
+    def test_waits_for_release(self):
+        lock = MachineLock(self.lock_path, stale_seconds=10.0)
+        lock.acquire()
+        releaser = threading.Timer(0.2, lock.release)
+        releaser.start()
+        other_lock = MachineLock(self.lock_path, stale_seconds=10.0, poll_seconds=0.05)
+        self.assertTrue(other_lock.acquire(timeout=5.0))
+        self.assertTrue(other_lock.was_waiting())
+        other_lock.release()
+        releaser.join()
+
+    def test_breaks_lock_of_dead_process(self):
+        os.makedirs(os.path.dirname(self.lock_path))
+        with open(self.lock_path, "w") as lock_file:
+            # a process id that isn't running
+            json.dump({"pid": 2 ** 22 + 12345, "host": __import__("socket").gethostname(), "name": ""}, lock_file)
+        lock = MachineLock(self.lock_path, stale_seconds=60.0)
+        self.assertTrue(lock.acquire(timeout=1.0))
+        lock.release()
+
+    def test_breaks_lock_not_touched(self):
+        os.makedirs(os.path.dirname(self.lock_path))
+        with open(self.lock_path, "w") as lock_file:
+            json.dump({"pid": os.getpid(), "host": "another machine", "name": ""}, lock_file)
+        old_time = time.time() - 100
+        os.utime(self.lock_path, (old_time, old_time))
+        lock = MachineLock(self.lock_path, stale_seconds=10.0)
+        self.assertTrue(lock.acquire(timeout=1.0))
+        lock.release()
+
+    def test_heartbeat_touches_lock(self):
+        lock = MachineLock(self.lock_path, stale_seconds=0.4, heartbeat_seconds=0.05)
+        lock.acquire()
+        old_time = time.time() - 100
+        os.utime(self.lock_path, (old_time, old_time))
+        time.sleep(0.3)
+        self.assertGreater(os.path.getmtime(self.lock_path), old_time + 50)
+        lock.release()
+
+    def test_release_leaves_another_owners_lock(self):
+        lock = MachineLock(self.lock_path, stale_seconds=10.0)
+        lock.acquire()
+        with open(self.lock_path, "w") as lock_file:
+            json.dump({"pid": os.getpid(), "host": "another machine", "name": "", "started": 0}, lock_file)
+        lock.release()
+        self.assertTrue(os.path.exists(self.lock_path))
+
+    def test_is_process_running(self):
+        self.assertTrue(is_process_running(os.getpid()))
+        self.assertFalse(is_process_running(None))
+        self.assertFalse(is_process_running(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
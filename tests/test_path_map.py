@@ -0,0 +1,84 @@
+import os
+import unittest
+from pyani.core.mngr.path_map import LRUCache, ServerPathMap
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_computes_once(self):
+        calls = list()
+        cache = LRUCache(max_size=10)
+
+        def compute(value):
+            calls.append(value)
+            return value * 2
+
+        self.assertEqual(cache.get("a", compute, 1), 2)
+        self.assertEqual(cache.get("a", compute, 1), 2)
+        self.assertEqual(calls, [1])
+
+    def test_none_is_remembered(self):
+        calls = list()
+        cache = LRUCache(max_size=10)
+        cache.get("a", lambda: calls.append(1))
+        cache.get("a", lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+    def test_forgets_least_recently_used(self):
+        cache = LRUCache(max_size=4)
+        for key in range(6):
+            cache.get(key, lambda: key)
+        self.assertLessEqual(len(cache), 4)
+        # recent values are kept
+        self.assertEqual(cache.get(5, lambda: "recomputed"), 5)
+        # the oldest was forgotten
+        self.assertEqual(cache.get(0, lambda: "recomputed"), "recomputed")
+
+    def test_size_zero_remembers_nothing(self):
+        cache = LRUCache(max_size=0)
+        cache.get("a", lambda: 1)
+        self.assertEqual(len(cache), 0)
+
+
+class TestServerPathMap(unittest.TestCase):
+
+    def setUp(self):
+        self.path_map = ServerPathMap([("/", "Z:"), ("/LongGong/sequences", "Y:\\sequences")])
+
+    def test_to_local(self):
+        self.assertEqual(
+            self.path_map.to_local("/LongGong/assets/char/rig.mb"),
+            os.path.normpath("Z:\\LongGong\\assets\\char\\rig.mb")
+        )
+
+    def test_longest_root_wins(self):
+        self.assertEqual(
+            self.path_map.to_local("/LongGong/sequences/Seq040/shot_010.mb"),
+            os.path.normpath("Y:\\sequences\\Seq040\\shot_010.mb")
+        )
+
+    def test_directory_only(self):
+        self.assertEqual(
+            self.path_map.to_local("/LongGong/assets/char/rig.mb", directory_only=True),
+            os.path.normpath("Z:\\LongGong\\assets\\char")
+        )
+
+    def test_not_under_a_root(self):
+        path_map = ServerPathMap([("/LongGong", "Z:\\LongGong")])
+        self.assertIsNone(path_map.to_local("/Other/file.mb"))
+        self.assertIsNone(path_map.to_server("C:\\Other\\file.mb"))
+
+    def test_round_trip(self):
+        server_path = "/LongGong/assets/char/rig.mb"
+        self.assertEqual(self.path_map.to_server(self.path_map.to_local(server_path)), server_path)
+        server_path = "/LongGong/sequences/Seq040/shot_010.mb"
+        self.assertEqual(self.path_map.to_server(self.path_map.to_local(server_path)), server_path)
+
+    def test_clear(self):
+        self.path_map.to_local("/LongGong/assets/char/rig.mb")
+        self.path_map.clear()
+        self.assertEqual(len(self.path_map._local_paths), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import time
+import unittest
+from tests.test_bandwidth import get_limiter, MB
+
+# the managers need qt, the tests are skipped where it isn't installed
+try:
+    from pyani.core.mngr.core import AniDownloadScheduler
+except ImportError:
+    AniDownloadScheduler = None
+
+
+class FakeThreadPool(object):
+    """
+    Records started workers instead of running them
+    """
+
+    def __init__(self, max_thread_count=4):
+        self.max_thread_count = max_thread_count
+        self.started = list()
+
+    def maxThreadCount(self):
+        return self.max_thread_count
+
+    def start(self, worker):
+        self.started.append(worker)
+
+
+class FakeWorker(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.fn = lambda: name
+
+
+@unittest.skipUnless(AniDownloadScheduler, "needs qt")
+class TestAniDownloadScheduler(unittest.TestCase):
+
+    def make_scheduler(self, max_thread_count=4, **kwargs):
+        self.thread_pool = FakeThreadPool(max_thread_count)
+        return AniDownloadScheduler(self.thread_pool, **kwargs)
+
+    def get_started(self):
+        return [worker.name for worker in self.thread_pool.started]
+
+    def finish(self, name):
+        """
+        Runs a started worker's function, which frees its slot like a download finishing
+        """
+        worker = [worker for worker in self.thread_pool.started if worker.name == name][0]
+        return worker.fn()
+
+    def test_starts_up_to_limit(self):
+        scheduler = self.make_scheduler(max_thread_count=2)
+        for name in ("a", "b", "c"):
+            scheduler.submit(FakeWorker(name))
+        self.assertEqual(self.get_started(), ["a", "b"])
+        self.assertEqual(scheduler.get_queue_depth(), 1)
+        self.assertEqual(scheduler.get_running_count(), 2)
+
+        self.assertEqual(self.finish("a"), "a")
+        self.assertEqual(self.get_started(), ["a", "b", "c"])
+        self.assertEqual(scheduler.get_queue_depth(), 0)
+
+    def test_max_concurrent_below_thread_pool(self):
+        scheduler = self.make_scheduler(max_thread_count=4, max_concurrent=1)
+        scheduler.submit(FakeWorker("a"))
+        scheduler.submit(FakeWorker("b"))
+        self.assertEqual(self.get_started(), ["a"])
+
+    def test_priority_then_smallest_first(self):
+        scheduler = self.make_scheduler(max_thread_count=1)
+        with scheduler:
+            scheduler.submit(FakeWorker("background large"), size=100)
+            scheduler.submit(FakeWorker("prefetch"), priority=AniDownloadScheduler.PRIORITY_PREFETCH, size=1)
+            scheduler.submit(FakeWorker("no size"))
+            scheduler.submit(FakeWorker("background small"), size=10)
+            scheduler.submit(FakeWorker("metadata"), priority=AniDownloadScheduler.PRIORITY_METADATA)
+            self.assertEqual(self.get_started(), [])
+        order = ["metadata", "background small", "background large", "no size", "prefetch"]
+        for _ in order:
+            self.finish(self.get_started()[-1])
+        self.assertEqual(self.get_started(), order)
+
+    def test_deadline_order(self):
+        scheduler = self.make_scheduler(max_thread_count=1, order=AniDownloadScheduler.ORDER_DEADLINE)
+        with scheduler:
+            scheduler.submit(FakeWorker("late"), size=1, deadline=200.0)
+            scheduler.submit(FakeWorker("early"), size=100, deadline=100.0)
+        self.finish("early")
+        self.assertEqual(self.get_started(), ["early", "late"])
+
+    def test_hold_nests(self):
+        scheduler = self.make_scheduler()
+        scheduler.hold()
+        with scheduler:
+            scheduler.submit(FakeWorker("a"))
+        self.assertEqual(self.get_started(), [])
+        scheduler.release()
+        self.assertEqual(self.get_started(), ["a"])
+
+    def test_released_when_submit_raises(self):
+        scheduler = self.make_scheduler()
+        try:
+            with scheduler:
+                scheduler.submit(FakeWorker("a"))
+                raise ValueError("submit failed")
+        except ValueError:
+            pass
+        scheduler.submit(FakeWorker("b"))
+        self.assertEqual(self.get_started(), ["a", "b"])
+
+    def test_endpoint_limit(self):
+        scheduler = self.make_scheduler(max_thread_count=4, endpoint_limits={"slow server": 1})
+        with scheduler:
+            scheduler.submit(FakeWorker("slow 1"), size=1, endpoint="slow server")
+            scheduler.submit(FakeWorker("slow 2"), size=2, endpoint="slow server")
+            scheduler.submit(FakeWorker("other"), size=3, endpoint="other server")
+        # the limited endpoint doesn't hold up the other one
+        self.assertEqual(self.get_started(), ["slow 1", "other"])
+        self.finish("slow 1")
+        self.assertEqual(self.get_started(), ["slow 1", "other", "slow 2"])
+
+    def test_slot_freed_when_download_raises(self):
+        scheduler = self.make_scheduler(max_thread_count=1)
+        failing_worker = FakeWorker("failing")
+
+        def fail():
+            raise IOError("download failed")
+        failing_worker.fn = fail
+        scheduler.submit(failing_worker)
+        scheduler.submit(FakeWorker("next"))
+        self.assertRaises(IOError, self.finish, "failing")
+        self.assertEqual(self.get_started(), ["failing", "next"])
+
+    def test_eta_uses_capacity(self):
+        scheduler = self.make_scheduler(max_thread_count=4, endpoint_limits={"server": 2})
+        self.assertIsNone(scheduler.get_eta())
+        with scheduler:
+            for index in range(5):
+                scheduler.submit(FakeWorker(str(index)), size=index, endpoint="server")
+        self.finish("0")
+        # 4 jobs left, 2 at a time since the server allows 2
+        eta = scheduler.get_eta()
+        self.assertIsNotNone(eta)
+        self.assertAlmostEqual(eta, scheduler._job_times[0] * 2, places=3)
+        self.assertIn("2 downloads queued", scheduler.get_status_text())
+
+    def test_waits_for_bandwidth_budget(self):
+        limiter = get_limiter(background=1.0, interactive=0)
+        scheduler = self.make_scheduler(max_thread_count=4, bandwidth_limiter=limiter)
+        with scheduler:
+            scheduler.submit(FakeWorker("large"), size=MB)
+            scheduler.submit(FakeWorker("small"), size=MB // 2)
+            scheduler.submit(FakeWorker("interactive"), priority=AniDownloadScheduler.PRIORITY_INTERACTIVE, size=MB)
+        # the burst holds one second of background bytes, which the small download takes first. The interactive class
+        # isn't limited
+        self.assertEqual(sorted(self.get_started()), ["interactive", "small"])
+        self.assertEqual(scheduler.get_queue_depth(), 1)
+        # dispatched by the timer once the budget has the bytes
+        deadline = time.time() + 5.0
+        while scheduler.get_queue_depth() and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(sorted(self.get_started()), ["interactive", "large", "small"])
+
+    def test_traffic_class(self):
+        scheduler = self.make_scheduler()
+        self.assertEqual(
+            scheduler._get_traffic_class(AniDownloadScheduler.PRIORITY_METADATA),
+            scheduler._get_traffic_class(AniDownloadScheduler.PRIORITY_INTERACTIVE)
+        )
+        self.assertNotEqual(
+            scheduler._get_traffic_class(AniDownloadScheduler.PRIORITY_INTERACTIVE),
+            scheduler._get_traffic_class(AniDownloadScheduler.PRIORITY_BACKGROUND)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import unittest
+
+# the managers need qt, the tests are skipped where it isn't installed
+try:
+    from pyani.core.mngr.assets import AniAssetMngr
+except ImportError:
+    AniAssetMngr = None
+
+
+class CountedDict(dict):
+    """
+    A dict that counts how many times it is iterated, the index walks the cache's asset types once per rebuild
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CountedDict, self).__init__(*args, **kwargs)
+        self.iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return super(CountedDict, self).__iter__()
+
+
+def make_asset_manager(asset_info):
+    methods = dict(
+        (name, AniAssetMngr.__dict__[name]) for name in ("_get_asset_info_by_server_dir", "_asset_info_changed")
+    )
+    asset_manager = type("AssetManager", (object,), methods)()
+    asset_manager._asset_info = asset_info
+    asset_manager._server_dir_index = dict()
+    asset_manager._server_dir_index_lock = threading.Lock()
+    asset_manager._asset_info_generation = 0
+    asset_manager._server_dir_index_generation = -1
+    asset_manager._server_dir_index_misses = set()
+    return asset_manager
+
+
+@unittest.skipUnless(AniAssetMngr, "needs qt")
+class TestServerDirIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.hero_dir = "/LongGong/assets/char/charHero/rig/approved"
+        self.villain_dir = "/LongGong/assets/char/charVillain/rig/approved"
+        self.asset_info = CountedDict(
+            {"char": {"rig": {"charHero": {"cgt cloud dir": self.hero_dir, "version": "v001"}}}}
+        )
+        self.asset_manager = make_asset_manager(self.asset_info)
+
+    def test_finds_asset(self):
+        asset_info = self.asset_manager._get_asset_info_by_server_dir(self.hero_dir)
+        self.assertEqual(asset_info["version"], "v001")
+
+    def test_builds_index_once(self):
+        for _ in range(3):
+            self.asset_manager._get_asset_info_by_server_dir(self.hero_dir)
+        self.assertEqual(self.asset_info.iterations, 1)
+
+    def test_misses_dont_rebuild(self):
+        for _ in range(3):
+            self.assertIsNone(self.asset_manager._get_asset_info_by_server_dir(self.villain_dir))
+        self.assertEqual(self.asset_info.iterations, 1)
+        self.assertIn(self.villain_dir, self.asset_manager._server_dir_index_misses)
+
+    def test_change_rebuilds_and_clears_misses(self):
+        self.assertIsNone(self.asset_manager._get_asset_info_by_server_dir(self.villain_dir))
+        self.asset_info["char"]["rig"]["charVillain"] = {"cgt cloud dir": self.villain_dir, "version": "v002"}
+        # not seen until the cache is marked as changed
+        self.assertIsNone(self.asset_manager._get_asset_info_by_server_dir(self.villain_dir))
+        self.asset_manager._asset_info_changed()
+        self.assertEqual(self.asset_manager._get_asset_info_by_server_dir(self.villain_dir)["version"], "v002")
+        self.assertEqual(self.asset_info.iterations, 2)
+
+    def test_removed_asset_not_found(self):
+        self.asset_manager._get_asset_info_by_server_dir(self.hero_dir)
+        del self.asset_info["char"]["rig"]["charHero"]
+        self.asset_manager._asset_info_changed()
+        self.assertIsNone(self.asset_manager._get_asset_info_by_server_dir(self.hero_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
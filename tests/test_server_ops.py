@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pyani.core.mngr.server_ops import ServerFuture, ServerExecutor, ServerOperations, gather
+
+
+class TestServerFuture(unittest.TestCase):
+
+    def test_result(self):
+        future = ServerFuture()
+        self.assertFalse(future.done())
+        future.set_result("listing")
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), "listing")
+        self.assertIsNone(future.exception())
+
+    def test_exception(self):
+        future = ServerFuture()
+        try:
+            raise ValueError("bad listing")
+        except ValueError:
+            future.set_exc_info(__import__("sys").exc_info())
+        self.assertRaises(ValueError, future.result)
+        self.assertIsInstance(future.exception(), ValueError)
+
+    def test_timeout(self):
+        self.assertRaises(RuntimeError, ServerFuture().result, 0.01)
+
+    def test_then(self):
+        future = ServerFuture()
+        chained_future = future.then(lambda result: result + 1)
+        future.set_result(1)
+        self.assertEqual(chained_future.result(), 2)
+
+        future = ServerFuture()
+        chained_future = future.then(lambda result: 1 / result)
+        future.set_result(0)
+        self.assertIsInstance(chained_future.exception(), ZeroDivisionError)
+
+    def test_callback_after_done(self):
+        future = ServerFuture()
+        future.set_result(1)
+        results = list()
+        future.add_done_callback(lambda done_future: results.append(done_future.result()))
+        self.assertEqual(results, [1])
+
+
+class TestServerExecutor(unittest.TestCase):
+
+    def test_gather(self):
+        with ServerExecutor(2) as executor:
+            futures = [executor.submit(lambda value: 10 / value, value) for value in (1, 2, 0)]
+            results = gather(futures).result(10.0)
+        self.assertEqual(results[:2], [10, 5])
+        self.assertIsInstance(results[2], ZeroDivisionError)
+        self.assertEqual(gather([]).result(), [])
+
+    def test_submit_after_shutdown(self):
+        executor = ServerExecutor(1)
+        executor.shutdown()
+        self.assertRaises(RuntimeError, executor.submit, len, "")
+
+
+class FakeAppVars(object):
+    cgt_bridge_pool_size = 2
+    cgt_sync_lock_wait_seconds = 5.0
+    cgt_sync_lock_stale_seconds = 60.0
+
+
+class FakeToolsMngr(object):
+    """
+    Has the methods ServerOperations uses to sync a cache
+    """
+
+    def __init__(self, cache_path, jobs):
+        self.app_vars = FakeAppVars()
+        self.cache_path = cache_path
+        self.jobs = jobs
+        self.saved = False
+
+    def get_local_cache_path(self):
+        return self.cache_path
+
+    def get_local_cache_age(self):
+        return None
+
+    def invalidate_server_listing_cache(self, shared=True):
+        pass
+
+    def prepare_cache_jobs(self, tools_dict=None):
+        if isinstance(self.jobs, Exception):
+            raise self.jobs
+        return self.jobs
+
+    def server_save_local_cache(self):
+        self.saved = True
+        return None
+
+
+class TestServerOperations(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "cgt_tools_cache.json")
+        self.executor = ServerExecutor(2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def build_tools_cache(self, jobs):
+        tools_mngr = FakeToolsMngr(self.cache_path, jobs)
+        operations = ServerOperations(tools_mngr, self.executor)
+        return tools_mngr, operations.build_tools_cache(tools_mngr)
+
+    def test_cache_is_saved(self):
+        tools_mngr, future = self.build_tools_cache([(lambda: None, (), {})])
+        self.assertEqual(future.result(10.0), [])
+        self.assertTrue(tools_mngr.saved)
+        self.assertFalse(os.path.exists(self.cache_path + ".lock"))
+
+    def test_cache_with_errors_isnt_saved(self):
+        tools_mngr, future = self.build_tools_cache([(lambda: None, (), {}), (lambda: "listing failed", (), {})])
+        self.assertEqual(future.result(10.0), ["listing failed"])
+        self.assertFalse(tools_mngr.saved)
+        self.assertFalse(os.path.exists(self.cache_path + ".lock"))
+
+    def test_exception_preparing_jobs(self):
+        tools_mngr, future = self.build_tools_cache(ValueError("no cache"))
+        self.assertIsInstance(future.exception(10.0), ValueError)
+        self.assertFalse(tools_mngr.saved)
+        # the lock was released
+        self.assertFalse(os.path.exists(self.cache_path + ".lock"))
+
+
+if __name__ == "__main__":
+    unittest.main()